@@ -1,37 +1,52 @@
-from . import client, consts, lib, localnet
-from .application import (
-    Application,
-    precompiled,
-    this_app,
-    unconditional_create_approval,
-    unconditional_opt_in_approval,
-)
-from .build_options import BuildOptions
-from .decorators import Authorize
-from .logic_signature import LogicSignature, LogicSignatureTemplate
-from .state import (
-    GlobalStateBlob,
-    GlobalStateValue,
-    LocalStateBlob,
-    LocalStateValue,
-    ReservedGlobalStateValue,
-    ReservedLocalStateValue,
-    identity_key_gen,
-    prefix_key_gen,
-)
+from typing import TYPE_CHECKING
+
+from beaker._lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from . import client, consts, lib, localnet
+    from .application import (
+        Application,
+        precompiled,
+        this_app,
+        unconditional_create_approval,
+        unconditional_opt_in_approval,
+    )
+    from .batch import build_many
+    from .build_cache import BuildCache
+    from .build_options import BuildOptions
+    from .build_report import BuildReport
+    from .compilation import CompileCache, ConcurrentAssembler, OfflineAssembler
+    from .decorators import Authorize
+    from .logic_signature import LogicSignature, LogicSignatureTemplate
+    from .state import (
+        GlobalStateBlob,
+        GlobalStateValue,
+        LocalStateBlob,
+        LocalStateValue,
+        ReservedGlobalStateValue,
+        ReservedLocalStateValue,
+        identity_key_gen,
+        prefix_key_gen,
+    )
 
 __all__ = [
     "Application",
     "Authorize",
+    "BuildCache",
     "BuildOptions",
+    "BuildReport",
+    "CompileCache",
+    "ConcurrentAssembler",
     "GlobalStateBlob",
     "GlobalStateValue",
     "LocalStateBlob",
     "LocalStateValue",
     "LogicSignature",
     "LogicSignatureTemplate",
+    "OfflineAssembler",
     "ReservedGlobalStateValue",
     "ReservedLocalStateValue",
+    "build_many",
     "client",
     "consts",
     "identity_key_gen",
@@ -43,3 +58,43 @@ __all__ = [
     "unconditional_create_approval",
     "unconditional_opt_in_approval",
 ]
+
+# imported when first used, so that importing beaker doesn't import the clients
+# (and algokit_utils) or the local network helpers for apps that don't use them
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "Application": ".application",
+        "Authorize": ".decorators",
+        "BuildCache": ".build_cache",
+        "BuildOptions": ".build_options",
+        "BuildReport": ".build_report",
+        "CompileCache": ".compilation",
+        "ConcurrentAssembler": ".compilation",
+        "GlobalStateBlob": ".state",
+        "GlobalStateValue": ".state",
+        "LocalStateBlob": ".state",
+        "LocalStateValue": ".state",
+        "LogicSignature": ".logic_signature",
+        "LogicSignatureTemplate": ".logic_signature",
+        "OfflineAssembler": ".compilation",
+        "ReservedGlobalStateValue": ".state",
+        "ReservedLocalStateValue": ".state",
+        "build_many": ".batch",
+        "client": "",
+        "consts": "",
+        "identity_key_gen": ".state",
+        "lib": "",
+        "localnet": "",
+        "precompiled": ".application",
+        "prefix_key_gen": ".state",
+        "this_app": ".application",
+        "unconditional_create_approval": ".application",
+        "unconditional_opt_in_approval": ".application",
+    },
+    globals(),
+)
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,5 @@
+import sys
+
+from beaker.cli import main
+
+sys.exit(main())
@@ -0,0 +1,30 @@
+import importlib
+from collections.abc import Callable
+from typing import Any
+
+__all__ = [
+    "lazy_getattr",
+]
+
+
+def lazy_getattr(
+    package: str, imports: dict[str, str], globals_: dict[str, Any]
+) -> Callable[[str], Any]:
+    """
+    Make a module ``__getattr__`` for ``package`` importing each name of ``imports``
+    from its module (relative to ``package``, or ``"module:attribute"`` if named
+    differently there) when it's first used, and caching it in ``globals_``. A name
+    mapped to ``""`` is a submodule of ``package``.
+    """
+
+    def getattr_(name: str) -> Any:  # noqa: ANN401
+        if (spec := imports.get(name)) is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        if not spec:
+            return importlib.import_module(f".{name}", package)
+        module, _, attribute = spec.partition(":")
+        value = getattr(importlib.import_module(module, package), attribute or name)
+        globals_[name] = value
+        return value
+
+    return getattr_
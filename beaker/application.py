@@ -4,6 +4,7 @@ import warnings
 from collections.abc import Callable, Iterator, MutableMapping
 from contextlib import contextmanager
 from contextvars import ContextVar
+from functools import cache, partial
 from typing import (
     TYPE_CHECKING,
     Concatenate,
@@ -24,16 +25,25 @@ from algokit_utils import (
     OnCompleteActionName,
 )
 from algokit_utils import MethodConfigDict as AlgokitMethodConfigDict
+from algokit_utils.application_specification import StateDict
 from pyteal import (
     ABIReturnSubroutine,
     Approve,
     BareCallActions,
+    Btoi,
     Bytes,
+    Compilation,
+    Cond,
     Expr,
+    If,
     Int,
     MethodConfig,
+    Mode,
     OnCompleteAction,
     Router,
+    ScratchVar,
+    Seq,
+    SourceMapDisabledError,
     SubroutineFnWrapper,
     TealType,
     Txn,
@@ -41,19 +51,30 @@ from pyteal import (
 from pyteal import CallConfig as PyTealCallConfig
 
 from beaker.build_options import BuildOptions
+from beaker.build_report import BuildReport, phase
+from beaker.consts import APP_CALL_BUDGET
 from beaker.decorators import AuthCallable
 from beaker.decorators import authorize as authorize_decorator
 from beaker.logic_signature import LogicSignature, LogicSignatureTemplate
-from beaker.precompile import (
-    PrecompileContextError,
-    PrecompiledApplication,
-    PrecompiledLogicSignature,
-    PrecompiledLogicSignatureTemplate,
-)
 from beaker.state._aggregate import GlobalStateAggregate, LocalStateAggregate
 
+# what's only needed to build (compiling, caching, precompiling, source maps and costs) is
+# imported when building, so that defining an app doesn't import it
 if TYPE_CHECKING:
+    from algosdk import abi as sdk_abi
     from algosdk.v2client.algod import AlgodClient
+    from pyteal.ast.router import CondNode
+
+    from beaker.build_cache import BuildCache
+    from beaker.compilation import Assembler, CompileCache
+    from beaker.precompile import (
+        PrecompiledApplication,
+        PrecompiledLogicSignature,
+        PrecompiledLogicSignatureTemplate,
+        PrecompileNode,
+        PrecompileRegistry,
+    )
+    from beaker.sourcemap import LazySourceMap, SourceMaps
 
 __all__ = [
     "Application",
@@ -78,6 +99,7 @@ class ABIExternal:
     actions: AlgokitMethodConfigDict
     method: ABIReturnSubroutine
     hints: MethodHints
+    weight: int = 0
 
 
 ABIDecoratorFuncType = Callable[[HandlerFunc], ABIReturnSubroutine]
@@ -89,15 +111,42 @@ DecoratorFuncType: TypeAlias = ABIDecoratorFuncType | BareDecoratorFuncType
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class BuildContext:
     app: "Application"
-    client: "AlgodClient | None"
+    client: "AlgodClient | Assembler | None"
+    compile_cache: "CompileCache | None" = None
+    build_cache: "BuildCache | None" = None
+    report: BuildReport | None = None
+    precompiles: "PrecompileRegistry | None" = None
+    #: the children precompiled so far by the outermost build, by id, along with the child itself
+    built: dict[int, tuple[object, object]] = dataclasses.field(default_factory=dict)
 
 
 _ctx: ContextVar[BuildContext] = ContextVar("beaker.build_context")
 
 
 @contextmanager
-def _set_ctx(app: "Application", client: "AlgodClient | None") -> Iterator[None]:
-    token = _ctx.set(BuildContext(app=app, client=client))
+def _set_ctx(
+    app: "Application",
+    client: "AlgodClient | Assembler | None",
+    compile_cache: "CompileCache | None" = None,
+    build_cache: "BuildCache | None" = None,
+    report: BuildReport | None = None,
+    precompiles: "PrecompileRegistry | None" = None,
+) -> Iterator[None]:
+    # a nested build shares the children of the outermost build, and its registry
+    outer = _ctx.get(None)
+    if outer is not None and precompiles is None:
+        precompiles = outer.precompiles
+    token = _ctx.set(
+        BuildContext(
+            app=app,
+            client=client,
+            compile_cache=compile_cache,
+            build_cache=build_cache,
+            report=report,
+            precompiles=precompiles,
+            built=outer.built if outer is not None else {},
+        )
+    )
     try:
         yield
     finally:
@@ -150,6 +199,8 @@ class Application(Generic[TState]):
             LogicSignatureTemplate, PrecompiledLogicSignatureTemplate
         ] = {}
         self._precompiled_apps: dict[Application, PrecompiledApplication] = {}
+        self._cached_precompile_graph: "PrecompileNode | None" = None
+        self._source_maps: "SourceMaps | None" = None
         self._local_state = LocalStateAggregate(self._state)
         self._global_state = GlobalStateAggregate(self._state)
 
@@ -165,26 +216,30 @@ class Application(Generic[TState]):
         return self._state
 
     @overload
-    def precompiled(self, value: "Application", /) -> PrecompiledApplication: ...
+    def precompiled(self, value: "Application", /) -> "PrecompiledApplication": ...
 
     @overload
-    def precompiled(self, value: LogicSignature, /) -> PrecompiledLogicSignature: ...
+    def precompiled(self, value: LogicSignature, /) -> "PrecompiledLogicSignature": ...
 
     @overload
     def precompiled(
         self, value: LogicSignatureTemplate, /
-    ) -> PrecompiledLogicSignatureTemplate: ...
+    ) -> "PrecompiledLogicSignatureTemplate": ...
 
     def precompiled(
         self,
         value: "Application | LogicSignature | LogicSignatureTemplate",
         /,
-    ) -> (
-        PrecompiledApplication
-        | PrecompiledLogicSignature
-        | PrecompiledLogicSignatureTemplate
-    ):
+    ) -> "PrecompiledApplication | PrecompiledLogicSignature | PrecompiledLogicSignatureTemplate":
         """Precompile an Application or LogicSignature for use in the logic of the application."""
+        from beaker.compilation import Assembler
+        from beaker.precompile import (
+            PrecompileContextError,
+            PrecompiledApplication,
+            PrecompiledLogicSignature,
+            PrecompiledLogicSignatureTemplate,
+            _lsig_label,
+        )
 
         if value is self:
             raise PrecompileContextError("Attempted to precompile current Application")
@@ -203,29 +258,90 @@ class Application(Generic[TState]):
                 "Precompilation requires use of a client when calling Application.build"
             )
         client = ctx.client
-        match value:
-            case Application() as app:
-                return _lazy_setdefault(
-                    self._precompiled_apps,
-                    app,
-                    lambda: PrecompiledApplication(app, client),
-                )
-            case LogicSignature() as lsig:
-                return _lazy_setdefault(
-                    self._precompiled_lsigs,
-                    lsig,
-                    lambda: PrecompiledLogicSignature(lsig, client),
-                )
-            case LogicSignatureTemplate() as lsig_template:
-                return _lazy_setdefault(
-                    self._precompiled_lsig_templates,
-                    lsig_template,
-                    lambda: PrecompiledLogicSignatureTemplate(lsig_template, client),
-                )
-            case _:
-                raise TypeError(
-                    f"Expected an Application, LogicSignature, or LogicSignatureTemplate, but got a {type(value)}"
-                )
+        compile_cache = ctx.compile_cache
+        build_cache = ctx.build_cache
+        report = ctx.report
+        registry = ctx.precompiles
+        built = ctx.built
+
+        def shared(
+            value: "Application | LogicSignature | LogicSignatureTemplate",
+            name: str,
+            create: Callable[[BuildReport | None], T],
+        ) -> Callable[[], T]:
+            # build each child once per outermost build, or once per registry if one is given
+            def factory() -> T:
+                child_report = report.child(name) if report is not None else None
+                if id(value) in built:
+                    result = cast(T, built[id(value)][1])
+                    created = False
+                elif registry is None or (key := registry.key(value, client)) is None:
+                    result, created = create(child_report), True
+                else:
+                    result, created = registry.get_or_create(
+                        key, lambda: create(child_report)
+                    )
+                    if created and isinstance(client, Assembler):
+                        # forgotten if what was assembled for it turns out to be wrong
+                        client.on_verified(
+                            lambda: None, discard=partial(registry.discard, key)
+                        )
+                if not created and child_report is not None:
+                    child_report.cached = True
+                built[id(value)] = (value, result)
+                return result
+
+            return factory
+
+        with phase(report, "precompiles"):
+            match value:
+                case Application() as app:
+                    return _lazy_setdefault(
+                        self._precompiled_apps,
+                        app,
+                        shared(
+                            app,
+                            app.name,
+                            lambda child_report: PrecompiledApplication(
+                                app,
+                                client,
+                                cache=compile_cache,
+                                build_cache=build_cache,
+                                report=child_report,
+                            ),
+                        ),
+                    )
+                case LogicSignature() as lsig:
+                    return _lazy_setdefault(
+                        self._precompiled_lsigs,
+                        lsig,
+                        shared(
+                            lsig,
+                            _lsig_label(lsig.program),
+                            lambda child_report: PrecompiledLogicSignature(
+                                lsig, client, cache=compile_cache, report=child_report
+                            ),
+                        ),
+                    )
+                case LogicSignatureTemplate() as lsig_template:
+                    return _lazy_setdefault(
+                        self._precompiled_lsig_templates,
+                        lsig_template,
+                        shared(
+                            lsig_template,
+                            _lsig_label(lsig_template.program),
+                            lambda child_report: PrecompiledLogicSignatureTemplate(
+                                lsig_template,
+                                client,
+                                cache=compile_cache,
+                                report=child_report,
+                            ),
+                        ),
+                    )
+                case _:
+                    raise TypeError(
+                        f"Expected an Application, LogicSignature, or LogicSignatureTemplate, but got a {type(value)}"
+                    )
 
     def _register_abi_external(
         self,
@@ -234,6 +350,7 @@ class Application(Generic[TState]):
         actions: AlgokitMethodConfigDict,
         hints: MethodHints,
         override: bool | None,
+        weight: int = 0,
     ) -> None:
         assert all(cc != CallConfig.NEVER for cc in actions.values())
         method_sig = method.method_signature()
@@ -252,6 +369,7 @@ class Application(Generic[TState]):
             actions=actions,
             method=method,
             hints=hints,
+            weight=weight,
         )
 
     def deregister_abi_method(
@@ -337,6 +455,7 @@ class Application(Generic[TState]):
         authorize: AuthCallable | SubroutineFnWrapper | None = None,
         read_only: bool = False,
         override: bool | None = False,
+        weight: int = 0,
     ) -> ABIDecoratorFuncType: ...
 
     # case 3: bare=False
@@ -351,6 +470,7 @@ class Application(Generic[TState]):
         bare: Literal[False],
         read_only: bool = False,
         override: bool | None = False,
+        weight: int = 0,
     ) -> ABIDecoratorFuncType: ...
 
     # case 4: bare=True
@@ -378,6 +498,7 @@ class Application(Generic[TState]):
         bare: bool,
         read_only: bool = False,
         override: bool | None = False,
+        weight: int = 0,
     ) -> DecoratorFuncType: ...
 
     def external(
@@ -391,6 +512,7 @@ class Application(Generic[TState]):
         bare: bool = False,
         read_only: bool = False,
         override: bool | None = False,
+        weight: int = 0,
     ) -> ABIReturnSubroutine | DecoratorFuncType:
         """
         Add the method decorated to be handled as an ABI method for the Application
@@ -405,6 +527,10 @@ class Application(Generic[TState]):
             bare:
             read_only: Mark a method as callable with no fee using dryrun or simulate
             override:
+            weight: How often the method is expected to be called relative to the others. The
+                router checks for methods in descending order of weight, so the most frequently
+                called methods are dispatched to with the fewest opcodes. Methods of equal weight
+                keep the order they were added in.
 
         Returns:
             An ABIReturnSubroutine or SubroutineFnWrapper
@@ -415,6 +541,8 @@ class Application(Generic[TState]):
                 raise ValueError("@external(bare=True, ...) requires method_config")
             if read_only:
                 raise ValueError("read_only=True has no effect on bare methods")
+            if weight:
+                raise ValueError("weight has no effect on bare methods")
 
         actions: AlgokitMethodConfigDict
         match method_config:
@@ -468,6 +596,7 @@ class Application(Generic[TState]):
                     actions=actions,
                     hints=hints,
                     override=override,
+                    weight=weight,
                 )
                 return method
 
@@ -1057,7 +1186,15 @@ class Application(Generic[TState]):
         func(self, *args, **kwargs)
         return self
 
-    def build(self, client: "AlgodClient | None" = None) -> ApplicationSpecification:
+    def build(
+        self,
+        client: "AlgodClient | Assembler | None" = None,
+        *,
+        cache: "BuildCache | None" = None,
+        compile_cache: "CompileCache | None" = None,
+        report: BuildReport | None = None,
+        precompiles: "PrecompileRegistry | None" = None,
+    ) -> ApplicationSpecification:
         """Build the application specification, including transpiling the application to TEAL, and fully compiling
         any nested (i.e. precompiled) apps/lsigs to byte code.
 
@@ -1065,70 +1202,211 @@ class Application(Generic[TState]):
 
         Args:
             client (optional): An Algod client that is required if there are any ``precompiled`` so they can be fully
-            compiled.
+            compiled. An ``Assembler`` such as ``OfflineAssembler`` may be given instead to compile them without a node.
+            cache (optional): A ``BuildCache`` to look the result up in before building, and to store it in after.
+            It is also used for any ``precompiled`` apps, so only those that changed (and the apps above them) are
+            rebuilt. Builds that resolve a ``precompiled`` the cache key cannot see are not stored.
+            compile_cache (optional): A ``CompileCache`` used when compiling any ``precompiled`` apps/lsigs, including
+            those nested within them, so that each distinct program is only sent to algod once.
+            report (optional): A ``BuildReport`` to fill in with the time spent in each phase of the build, the
+            algod round trips made, program sizes and a report for each ``precompiled`` app/lsig.
+            precompiles (optional): A ``PrecompileRegistry`` to share ``precompiled`` apps/lsigs through with other
+            builds given the same registry. Otherwise each is only shared by the parents within this build.
         """
-
-        with _set_ctx(app=self, client=client):
-            bare_calls = self._bare_calls()
-            router = Router(
-                name=self.name,
-                bare_calls=bare_calls,
-                descr=self.descr,
-                clear_state=self._clear_state_method,
+        from beaker.compilation import Assembler
+        from beaker.precompile import PrecompileNode
+
+        if report is not None and not report.name:
+            report.name = self.name
+        with phase(report if cache is not None else None, "cache"):
+            cache_key = cache.key(self) if cache is not None else None
+            entry = (
+                cache.get_entry(cache_key, client)
+                if cache is not None and cache_key is not None
+                else None
             )
+        if entry is not None:
+            if report is not None:
+                report.cached = True
+            self._source_maps = None
+            self._cached_precompile_graph = (
+                None
+                if entry.precompiles is None
+                else PrecompileNode.from_dict(entry.precompiles)
+            )
+            return self._with_costs(entry.spec, report)
+
+        self._cached_precompile_graph = None
+        spec = self._build(client, compile_cache, cache, report, precompiles)
+        if isinstance(client, Assembler) and _ctx.get(None) is None:
+            # only the outermost build waits for any outstanding compiles
+            with phase(report, "assemble"):
+                client.flush()
+        if report is not None:
+            report.program_sizes["approval"] = len(spec.approval_program.encode())
+            report.program_sizes["clear"] = len(spec.clear_program.encode())
+
+        if (
+            cache is not None
+            and cache_key is not None
+            and cache.covers(self, self._precompiled)
+        ):
+            precompiles_dict = self.precompile_graph.to_dict()
 
-            # Add method externals
-            hints: dict[str, MethodHints] = {}
-            for abi_external in self.abi_externals.values():
-                router.add_method_handler(
-                    method_call=abi_external.method,
-                    method_config=MethodConfig(
-                        **cast(
-                            dict[str, PyTealCallConfig],
-                            {
-                                k: PyTealCallConfig(v.value)
-                                for k, v in abi_external.actions.items()
-                            },
-                        )
-                    ),
-                )
-                hints[abi_external.method.method_signature()] = abi_external.hints
-
-                # Compile approval and clear programs
-            compile_results = router.compile(
-                algod_client=client,
-                version=self.build_options.avm_version,
-                assemble_constants=self.build_options.assemble_constants,
-                optimize=self.build_options.optimize_options,
-                with_sourcemaps=self.build_options.with_sourcemaps,
-                pcs_in_sourcemap=bool(client),
-                annotate_teal=self.build_options.annotate_teal,
-                annotate_teal_headers=self.build_options.annotate_teal_headers,
-                annotate_teal_concise=self.build_options.annotate_teal_concise,
+            def put() -> None:
+                with phase(report, "cache"):
+                    cache.put(
+                        cache_key, spec, client=client, precompiles=precompiles_dict
+                    )
+
+            if isinstance(client, Assembler):
+                # not stored until the outermost build has checked what was assembled
+                client.on_verified(put)
+            else:
+                put()
+        return self._with_costs(spec, report)
+
+    def _with_costs(
+        self, spec: ApplicationSpecification, report: BuildReport | None
+    ) -> ApplicationSpecification:
+        if not self.build_options.analyze_costs:
+            return spec
+        from beaker.cost import analyze_costs
+
+        with phase(report, "costs"):
+            analysis = analyze_costs(spec)
+        if report is not None:
+            report.method_costs = {
+                name: cost.cost
+                for name, cost in [
+                    *analysis.methods.items(),
+                    *analysis.bare_calls.items(),
+                ]
+            }
+        for name, cost in analysis.over_budget().items():
+            warnings.warn(
+                f"{name} of Application {self.name} may cost up to {cost.cost} opcodes, more "
+                f"than the {APP_CALL_BUDGET} budget of an app call, so needs a group of "
+                f"{cost.group_size} app calls (or op ups) to pool enough budget"
             )
+        return analysis.with_hints(spec)
 
-            approval_prog: str = compile_results.approval_teal
-            clear_prog: str = compile_results.clear_teal
+    @property
+    def source_maps(self) -> "SourceMaps | None":
+        """
+        The PyTeal source maps (and annotated TEAL) of the approval and clear programs from the
+        last build, if it was made with ``BuildOptions.with_sourcemaps`` and not read from a
+        ``BuildCache``. With ``BuildOptions.lazy_sourcemaps`` they are generated on first access.
+        """
+        return self._source_maps
 
-            if compile_results.approval_sourcemap is not None:
-                approval_sm = compile_results.approval_sourcemap
-                if approval_sm.annotated_teal is not None:
-                    approval_prog = approval_sm.annotated_teal
+    @property
+    def precompile_graph(self) -> "PrecompileNode":
+        """
+        The tree of apps and logic signatures this app precompiled in its last build, including
+        those resolved from a ``BuildCache``. See ``PrecompileNode.changed_since`` to compare it
+        with the graph of an earlier build.
+        """
+        from beaker.precompile import _application_node, _logic_signature_node
+
+        if self._cached_precompile_graph is not None:
+            return self._cached_precompile_graph
+        return _application_node(
+            self,
+            [precompiled.graph for precompiled in self._precompiled_apps.values()]
+            + [
+                _logic_signature_node(lsig, template=False)
+                for lsig in self._precompiled_lsigs
+            ]
+            + [
+                _logic_signature_node(lsig, template=True)
+                for lsig in self._precompiled_lsig_templates
+            ],
+        )
 
-            if compile_results.clear_sourcemap is not None:
-                clear_sm = compile_results.clear_sourcemap
-                if clear_sm.annotated_teal is not None:
-                    clear_prog = clear_sm.annotated_teal
+    @property
+    def _precompiled(self) -> list[object]:
+        return [
+            *self._precompiled_apps,
+            *self._precompiled_lsigs,
+            *self._precompiled_lsig_templates,
+        ]
+
+    def _build(
+        self,
+        client: "AlgodClient | Assembler | None",
+        compile_cache: "CompileCache | None",
+        build_cache: "BuildCache | None",
+        report: BuildReport | None,
+        precompiles: "PrecompileRegistry | None" = None,
+    ) -> ApplicationSpecification:
+        from beaker.compilation import Assembler
+
+        compact = self.build_options.compact_state_keys
+        with (
+            _set_ctx(
+                app=self,
+                client=client,
+                compile_cache=compile_cache,
+                build_cache=build_cache,
+                report=report,
+                precompiles=precompiles,
+            ),
+            self._global_state.compact_keys(enabled=compact) as global_keys,
+            self._local_state.compact_keys(enabled=compact) as local_keys,
+        ):
+            with phase(report, "registration"):
+                bare_calls = self._bare_calls()
+                router = Router(
+                    name=self.name,
+                    bare_calls=bare_calls,
+                    descr=self.descr,
+                    clear_state=self._clear_state_method,
+                )
+
+                # Add method externals
+                hints: dict[str, MethodHints] = {}
+                for abi_external in self.abi_externals.values():
+                    router.add_method_handler(
+                        method_call=abi_external.method,
+                        method_config=MethodConfig(
+                            **cast(
+                                dict[str, PyTealCallConfig],
+                                {
+                                    k: PyTealCallConfig(v.value)
+                                    for k, v in abi_external.actions.items()
+                                },
+                            )
+                        ),
+                    )
+                    hints[abi_external.method.method_signature()] = (
+                        _compact_default_arguments(
+                            abi_external.hints,
+                            {"global-state": global_keys, "local-state": local_keys},
+                        )
+                    )
+
+            # Compile approval and clear programs
+            # PyTeal can only look up pcs for its source map from algod
+            algod_client = None if isinstance(client, Assembler) else client
+            approval_prog, clear_prog, contract, self._source_maps = _compile_router(
+                router,
+                self.build_options,
+                algod_client,
+                report,
+                weights={sig: ext.weight for sig, ext in self.abi_externals.items()},
+            )
+            schema: StateDict = {
+                "global": self._global_state.dictify(),
+                "local": self._local_state.dictify(),
+            }
 
         return ApplicationSpecification(
             approval_program=approval_prog,
             clear_program=clear_prog,
-            contract=compile_results.abi_contract,
+            contract=contract,
             hints=hints,
-            schema={
-                "global": self._global_state.dictify(),
-                "local": self._local_state.dictify(),
-            },
+            schema=schema,
             global_state_schema=self._global_state.schema,
             local_state_schema=self._local_state.schema,
             bare_call_config=cast(
@@ -1261,6 +1539,24 @@ class Application(Generic[TState]):
         return hints
 
 
+def _compact_default_arguments(
+    hints: MethodHints, keys: dict[str, dict[str, str]]
+) -> MethodHints:
+    """
+    ``hints``, with default arguments read from state values keyed by their name (as
+    they were registered) reading from their compact keys, by source and name, instead
+    """
+    if not any(keys.values()):
+        return hints
+    default_arguments = {}
+    for name, argument in hints.default_arguments.items():
+        compact = keys.get(argument["source"], {})
+        if isinstance(data := argument["data"], str) and data in compact:
+            argument = {**argument, "data": compact[data]}
+        default_arguments[name] = argument
+    return dataclasses.replace(hints, default_arguments=default_arguments)
+
+
 def _default_argument_from_resolver(
     resolver: Expr | ABIExternal | int | bytes | str,
 ) -> DefaultArgumentDict:
@@ -1306,27 +1602,25 @@ def this_app() -> Application[TState]:
 
 
 @overload
-def precompiled(value: Application, /) -> PrecompiledApplication: ...
+def precompiled(value: Application, /) -> "PrecompiledApplication": ...
 
 
 @overload
-def precompiled(value: LogicSignature, /) -> PrecompiledLogicSignature: ...
+def precompiled(value: LogicSignature, /) -> "PrecompiledLogicSignature": ...
 
 
 @overload
 def precompiled(
     value: LogicSignatureTemplate, /
-) -> PrecompiledLogicSignatureTemplate: ...
+) -> "PrecompiledLogicSignatureTemplate": ...
 
 
 def precompiled(
     value: Application | LogicSignature | LogicSignatureTemplate,
     /,
-) -> (
-    PrecompiledApplication
-    | PrecompiledLogicSignature
-    | PrecompiledLogicSignatureTemplate
-):
+) -> "PrecompiledApplication | PrecompiledLogicSignature | PrecompiledLogicSignatureTemplate":
+    from beaker.precompile import PrecompileContextError
+
     try:
         ctx_app: Application = this_app()
     except LookupError as err:
@@ -1368,6 +1662,247 @@ TKey = TypeVar("TKey")
 TValue = TypeVar("TValue")
 
 
+# _compile_router and what it calls are the one place that builds on PyTeal internals (and
+# PyTeal treats this file as its own when recording source maps). They are checked for before
+# each build, falling back to Router.compile when they are missing or have changed, and
+# tests/router_test.py checks the output matches Router.compile
+def _compile_router(
+    router: Router,
+    options: BuildOptions,
+    algod_client: "AlgodClient | None",
+    report: BuildReport | None,
+    *,
+    weights: dict[str, int],
+) -> tuple[str, str, "sdk_abi.Contract", "SourceMaps | None"]:
+    """
+    Equivalent to ``router.compile``, returning the (annotated, if requested) approval and
+    clear TEAL, the ABI contract and the source maps, with each step timed separately
+    """
+    from beaker.sourcemap import SourceMaps
+
+    if options.annotate_teal and not options.with_sourcemaps:
+        raise ValueError(
+            "In order annotate generated teal source, must set with_sourcemap True"
+        )
+    if not _has_router_internals(router):
+        return _compile_router_public(router, options, algod_client, report, weights)
+    with router._cleaning_context():
+        with phase(report, "ast"):
+            approval, clear, contract = _build_router_program(router, options, weights)
+        approval_teal, approval_map = _compile_program(
+            approval,
+            options,
+            f"{router.name}_approval.teal",
+            algod_client,
+            report,
+        )
+        clear_teal, clear_map = _compile_program(
+            clear,
+            options,
+            f"{router.name}_clear.teal",
+            algod_client,
+            report,
+        )
+    source_maps = (
+        SourceMaps(approval=approval_map, clear=clear_map)
+        if approval_map is not None and clear_map is not None
+        else None
+    )
+    return approval_teal, clear_teal, contract, source_maps
+
+
+@cache
+def _has_pyteal_internals() -> bool:
+    from beaker.sourcemap import _PyTealSourceMapper
+
+    try:
+        from pyteal.stack_frame import (  # noqa: F401
+            NatalStackFrame,
+            sourcemapping_off_context,
+        )
+
+        build_program = inspect.signature(Router._build_program).parameters
+        compile_impl = inspect.signature(Compilation._compile_impl).parameters
+    except (ImportError, AttributeError):
+        return False
+    return (
+        _PyTealSourceMapper is not None
+        and callable(getattr(Router, "_cleaning_context", None))
+        and {"version", "optimize"} <= build_program.keys()
+        and "with_sourcemap" in compile_impl
+    )
+
+
+def _has_router_internals(router: Router) -> bool:
+    """
+    Whether the installed PyTeal has the internals _compile_router builds on, in the shape it
+    expects
+    """
+    methods = getattr(router.approval_ast, "methods_with_conds", None)
+    return (
+        _has_pyteal_internals()
+        and isinstance(methods, list)
+        and all(
+            hasattr(m, "method_sig") and hasattr(m, "to_cond_node") for m in methods
+        )
+    )
+
+
+def _compile_router_public(
+    router: Router,
+    options: BuildOptions,
+    algod_client: "AlgodClient | None",
+    report: BuildReport | None,
+    weights: dict[str, int],
+) -> tuple[str, str, "sdk_abi.Contract", "SourceMaps | None"]:
+    """
+    _compile_router for versions of PyTeal without the internals it builds on, using
+    ``router.compile`` as a single phase, so without weights, binary dispatch or source maps
+    """
+    lost = [
+        feature
+        for feature, used in [
+            ("method weights", any(weights.values())),
+            ('dispatch="binary"', options.dispatch == "binary"),
+            ("source maps", options.with_sourcemaps),
+        ]
+        if used
+    ]
+    if lost:
+        warnings.warn(
+            f"The installed version of PyTeal doesn't support {', '.join(lost)} in Beaker, "
+            "so they are ignored",
+            stacklevel=2,
+        )
+    with phase(report, "teal"):
+        results = router.compile(
+            version=options.avm_version,
+            assemble_constants=options.assemble_constants,
+            optimize=options.optimize_options,
+            with_sourcemaps=options.with_sourcemaps,
+            algod_client=algod_client,
+            pcs_in_sourcemap=algod_client is not None,
+            annotate_teal=options.annotate_teal,
+            annotate_teal_headers=options.annotate_teal_headers,
+            annotate_teal_concise=options.annotate_teal_concise,
+        )
+    return results.approval_teal, results.clear_teal, results.abi_contract, None
+
+
+# "binary" dispatch compares selectors one by one once a search is down to this many methods,
+# as each step of the search costs about as much as a comparison
+_BINARY_DISPATCH_LEAF_SIZE = 3
+
+
+def _build_router_program(
+    router: Router, options: BuildOptions, weights: dict[str, int]
+) -> tuple[Expr, Expr, "sdk_abi.Contract"]:
+    """
+    Equivalent to ``router._build_program``, but dispatching ABI method calls in descending
+    order of weight, or by binary search of the selectors when ``options.dispatch`` is
+    ``"binary"``
+    """
+    methods = router.approval_ast.methods_with_conds
+    # a stable sort, so methods of the same weight are checked in the order they were added
+    methods.sort(key=lambda m: -weights.get(m.method_sig, 0))
+    approval, clear, contract = router._build_program(
+        version=options.avm_version, optimize=options.optimize_options
+    )
+    if options.dispatch == "binary" and len(methods) > _BINARY_DISPATCH_LEAF_SIZE:
+        use_frame_pt = options.optimize_options.use_frame_pointers(options.avm_version)
+        nodes = [m.to_cond_node(use_frame_pt=use_frame_pt) for m in methods]
+        selector = ScratchVar(TealType.uint64)
+        by_selector = sorted(
+            (_selector_value(m.method_sig), rank, node)
+            for rank, (m, node) in enumerate(zip(methods, nodes, strict=True))
+        )
+        approval = Seq(
+            selector.store(Btoi(Txn.application_args[0])),
+            _selector_search(selector, by_selector),
+        )
+        for bare in reversed(router.approval_ast.bare_calls):
+            approval = If(bare.condition).Then(bare.branch).Else(approval)
+    return approval, clear, contract
+
+
+def _selector_value(method_sig: str) -> int:
+    from algosdk import abi as sdk_abi
+
+    return int.from_bytes(
+        sdk_abi.Method.from_signature(method_sig).get_selector(), "big"
+    )
+
+
+def _selector_search(
+    selector: ScratchVar, methods: list[tuple[int, int, "CondNode"]]
+) -> Expr:
+    # methods are (selector value, rank by weight, cond node), sorted by selector value
+    if len(methods) <= _BINARY_DISPATCH_LEAF_SIZE:
+        # the selector is compared as bytes here, as its value alone would also match
+        # arguments of other lengths
+        leaf = sorted(methods, key=lambda m: m[1])
+        return Cond(*[[n.condition, n.branch] for _, _, n in leaf])
+    middle = len(methods) // 2
+    return (
+        If(selector.load() < Int(methods[middle][0]))
+        .Then(_selector_search(selector, methods[:middle]))
+        .Else(_selector_search(selector, methods[middle:]))
+    )
+
+
+def _compile_program(
+    program: Expr,
+    options: BuildOptions,
+    filename: str,
+    algod_client: "AlgodClient | None",
+    report: BuildReport | None,
+) -> tuple[str, "LazySourceMap | None"]:
+    from pyteal.stack_frame import NatalStackFrame, sourcemapping_off_context
+
+    from beaker.sourcemap import LazySourceMap
+
+    compilation = Compilation(
+        program,
+        Mode.Application,
+        version=options.avm_version,
+        assemble_constants=options.assemble_constants,
+        optimize=options.optimize_options,
+    )
+    with phase(report, "teal"):
+        bundle = compilation._compile_impl(with_sourcemap=False)
+    if not options.with_sourcemaps:
+        return bundle.teal, None
+
+    if NatalStackFrame.sourcemapping_is_off():
+        raise SourceMapDisabledError()
+    source_map = LazySourceMap(
+        bundle.teal,
+        bundle.teal_chunks,
+        bundle.components,
+        teal_filename=filename,
+        algod_client=algod_client,
+        annotate_teal_headers=options.annotate_teal_headers,
+        annotate_teal_concise=options.annotate_teal_concise,
+    )
+    if options.lazy_sourcemaps:
+        return bundle.teal, source_map
+
+    with phase(report, "sourcemap"):
+        source_map.sourcemap
+        # as PyTeal does, check the frames recorded for the source map didn't change the TEAL
+        with sourcemapping_off_context():
+            unmapped = compilation._compile_impl(with_sourcemap=False).teal
+        if unmapped != bundle.teal:
+            raise AssertionError(
+                "FATAL ERROR. Program without sourcemaps differs from Program with"
+            )
+    if not options.annotate_teal:
+        return bundle.teal, source_map
+
+    with phase(report, "annotate"):
+        return source_map.annotated_teal, source_map
+
+
 def _lazy_setdefault(
     m: MutableMapping[TKey, TValue], key: TKey, default_factory: Callable[[], TValue]
 ) -> TValue:
@@ -0,0 +1,889 @@
+"""
+A pure Python TEAL assembler.
+
+For the AVM versions PyTeal targets, ``assemble`` produces the same bytecode, program hash
+and pc -> line source map as algod's ``/v2/teal/compile`` endpoint, including algod's
+reordering of pseudo-op constants (``int``, ``byte``, ``addr`` and ``method``) into
+``intcblock``/``bytecblock``.
+"""
+
+import base64
+import dataclasses
+import re
+from typing import Any
+
+from algosdk import encoding, logic
+
+__all__ = [
+    "AssembledProgram",
+    "TealAssemblyError",
+    "assemble",
+    "encode_uvarint",
+    "parse_bytes",
+    "parse_bytes_list",
+    "parse_int",
+    "tokenize",
+]
+
+#: the version assumed by algod for a program without a ``#pragma version``
+DEFAULT_VERSION = 1
+#: the highest AVM version the assembler knows the opcodes of
+MAX_VERSION = 10
+
+# from this version on, branches may go backwards, so constants referenced by pseudo-ops
+# are no longer looked up in an explicit constant block
+_BACK_BRANCH_VERSION = 4
+# from this version on, the constant blocks built for pseudo-ops are sorted by use
+_OPTIMIZE_CONSTANTS_VERSION = 4
+
+
+class TealAssemblyError(Exception):
+    def __init__(self, msg: str, line: int | None = None):
+        self.msg = msg
+        #: the 0-based line of the program source the error was found on
+        self.line = line
+        super().__init__(msg if line is None else f"{line + 1}: {msg}")
+
+
+@dataclasses.dataclass(frozen=True)
+class AssembledProgram:
+    #: the assembled program
+    bytecode: bytes
+    #: 0-based source line of each instruction, keyed by the pc it starts at
+    pc_to_line: dict[int, int]
+
+    @property
+    def hash(self) -> str:
+        """The address of the program, as returned by algod"""
+        return logic.address(self.bytecode)
+
+    def source_map(self) -> dict[str, Any]:
+        """The source map of the program, in the format returned by algod"""
+        mappings = []
+        prev_line = 0
+        for pc in range(max(self.pc_to_line, default=-1) + 1):
+            line = self.pc_to_line.get(pc)
+            if line is None:
+                mappings.append("")
+            else:
+                mappings.append("AA" + _vlq(line - prev_line) + "A")
+                prev_line = line
+        return {
+            "version": 3,
+            "sources": [],
+            "names": [],
+            "mappings": ";".join(mappings),
+        }
+
+    def compile_response(self) -> dict[str, Any]:
+        """The program in the same shape as the response from algod's compile endpoint"""
+        return {
+            "result": base64.b64encode(self.bytecode).decode("ascii"),
+            "hash": self.hash,
+            "sourcemap": self.source_map(),
+        }
+
+
+# immediate argument kinds
+_U8 = "uint8"
+_I8 = "int8"
+_VARUINT = "varuint"
+_VARUINTS = "varuints"
+_BYTES = "bytes"
+_BYTESS = "bytess"
+_LABEL = "label"
+_LABELS = "labels"
+_FIELD = "field"
+
+
+@dataclasses.dataclass(frozen=True)
+class _OpSpec:
+    opcode: int
+    version: int
+    immediates: tuple[str, ...] = ()
+    fields: str | None = None
+
+
+def _op(
+    opcode: int, version: int, *immediates: str, fields: str | None = None
+) -> _OpSpec:
+    return _OpSpec(opcode, version, immediates, fields)
+
+
+_TXN = "txn"
+
+# fmt: off
+_OPS: dict[str, _OpSpec] = {
+    "err": _op(0x00, 1),
+    "sha256": _op(0x01, 1),
+    "keccak256": _op(0x02, 1),
+    "sha512_256": _op(0x03, 1),
+    "ed25519verify": _op(0x04, 1),
+    "ecdsa_verify": _op(0x05, 5, _FIELD, fields="ecdsa"),
+    "ecdsa_pk_decompress": _op(0x06, 5, _FIELD, fields="ecdsa"),
+    "ecdsa_pk_recover": _op(0x07, 5, _FIELD, fields="ecdsa"),
+    "+": _op(0x08, 1),
+    "-": _op(0x09, 1),
+    "/": _op(0x0A, 1),
+    "*": _op(0x0B, 1),
+    "<": _op(0x0C, 1),
+    ">": _op(0x0D, 1),
+    "<=": _op(0x0E, 1),
+    ">=": _op(0x0F, 1),
+    "&&": _op(0x10, 1),
+    "||": _op(0x11, 1),
+    "==": _op(0x12, 1),
+    "!=": _op(0x13, 1),
+    "!": _op(0x14, 1),
+    "len": _op(0x15, 1),
+    "itob": _op(0x16, 1),
+    "btoi": _op(0x17, 1),
+    "%": _op(0x18, 1),
+    "|": _op(0x19, 1),
+    "&": _op(0x1A, 1),
+    "^": _op(0x1B, 1),
+    "~": _op(0x1C, 1),
+    "mulw": _op(0x1D, 1),
+    "addw": _op(0x1E, 2),
+    "divmodw": _op(0x1F, 4),
+    "intcblock": _op(0x20, 1, _VARUINTS),
+    "intc": _op(0x21, 1, _U8),
+    "intc_0": _op(0x22, 1),
+    "intc_1": _op(0x23, 1),
+    "intc_2": _op(0x24, 1),
+    "intc_3": _op(0x25, 1),
+    "bytecblock": _op(0x26, 1, _BYTESS),
+    "bytec": _op(0x27, 1, _U8),
+    "bytec_0": _op(0x28, 1),
+    "bytec_1": _op(0x29, 1),
+    "bytec_2": _op(0x2A, 1),
+    "bytec_3": _op(0x2B, 1),
+    "arg": _op(0x2C, 1, _U8),
+    "arg_0": _op(0x2D, 1),
+    "arg_1": _op(0x2E, 1),
+    "arg_2": _op(0x2F, 1),
+    "arg_3": _op(0x30, 1),
+    "txn": _op(0x31, 1, _FIELD, fields=_TXN),
+    "global": _op(0x32, 1, _FIELD, fields="global"),
+    "gtxn": _op(0x33, 1, _U8, _FIELD, fields=_TXN),
+    "load": _op(0x34, 1, _U8),
+    "store": _op(0x35, 1, _U8),
+    "txna": _op(0x36, 2, _FIELD, _U8, fields=_TXN),
+    "gtxna": _op(0x37, 2, _U8, _FIELD, _U8, fields=_TXN),
+    "gtxns": _op(0x38, 3, _FIELD, fields=_TXN),
+    "gtxnsa": _op(0x39, 3, _FIELD, _U8, fields=_TXN),
+    "gload": _op(0x3A, 4, _U8, _U8),
+    "gloads": _op(0x3B, 4, _U8),
+    "gaid": _op(0x3C, 4, _U8),
+    "gaids": _op(0x3D, 4),
+    "loads": _op(0x3E, 5),
+    "stores": _op(0x3F, 5),
+    "bnz": _op(0x40, 1, _LABEL),
+    "bz": _op(0x41, 2, _LABEL),
+    "b": _op(0x42, 2, _LABEL),
+    "return": _op(0x43, 2),
+    "assert": _op(0x44, 3),
+    "bury": _op(0x45, 8, _U8),
+    "popn": _op(0x46, 8, _U8),
+    "dupn": _op(0x47, 8, _U8),
+    "pop": _op(0x48, 1),
+    "dup": _op(0x49, 1),
+    "dup2": _op(0x4A, 2),
+    "dig": _op(0x4B, 3, _U8),
+    "swap": _op(0x4C, 3),
+    "select": _op(0x4D, 3),
+    "cover": _op(0x4E, 5, _U8),
+    "uncover": _op(0x4F, 5, _U8),
+    "concat": _op(0x50, 2),
+    "substring": _op(0x51, 2, _U8, _U8),
+    "substring3": _op(0x52, 2),
+    "getbit": _op(0x53, 3),
+    "setbit": _op(0x54, 3),
+    "getbyte": _op(0x55, 3),
+    "setbyte": _op(0x56, 3),
+    "extract": _op(0x57, 5, _U8, _U8),
+    "extract3": _op(0x58, 5),
+    "extract_uint16": _op(0x59, 5),
+    "extract_uint32": _op(0x5A, 5),
+    "extract_uint64": _op(0x5B, 5),
+    "replace2": _op(0x5C, 7, _U8),
+    "replace3": _op(0x5D, 7),
+    "base64_decode": _op(0x5E, 7, _FIELD, fields="base64"),
+    "json_ref": _op(0x5F, 7, _FIELD, fields="json"),
+    "balance": _op(0x60, 2),
+    "app_opted_in": _op(0x61, 2),
+    "app_local_get": _op(0x62, 2),
+    "app_local_get_ex": _op(0x63, 2),
+    "app_global_get": _op(0x64, 2),
+    "app_global_get_ex": _op(0x65, 2),
+    "app_local_put": _op(0x66, 2),
+    "app_global_put": _op(0x67, 2),
+    "app_local_del": _op(0x68, 2),
+    "app_global_del": _op(0x69, 2),
+    "asset_holding_get": _op(0x70, 2, _FIELD, fields="asset_holding"),
+    "asset_params_get": _op(0x71, 2, _FIELD, fields="asset_params"),
+    "app_params_get": _op(0x72, 5, _FIELD, fields="app_params"),
+    "acct_params_get": _op(0x73, 6, _FIELD, fields="acct_params"),
+    "min_balance": _op(0x78, 3),
+    "pushbytes": _op(0x80, 3, _BYTES),
+    "pushint": _op(0x81, 3, _VARUINT),
+    "pushbytess": _op(0x82, 8, _BYTESS),
+    "pushints": _op(0x83, 8, _VARUINTS),
+    "ed25519verify_bare": _op(0x84, 7),
+    "callsub": _op(0x88, 4, _LABEL),
+    "retsub": _op(0x89, 4),
+    "proto": _op(0x8A, 8, _U8, _U8),
+    "frame_dig": _op(0x8B, 8, _I8),
+    "frame_bury": _op(0x8C, 8, _I8),
+    "switch": _op(0x8D, 8, _LABELS),
+    "match": _op(0x8E, 8, _LABELS),
+    "shl": _op(0x90, 4),
+    "shr": _op(0x91, 4),
+    "sqrt": _op(0x92, 4),
+    "bitlen": _op(0x93, 4),
+    "exp": _op(0x94, 4),
+    "expw": _op(0x95, 4),
+    "bsqrt": _op(0x96, 6),
+    "divw": _op(0x97, 6),
+    "sha3_256": _op(0x98, 7),
+    "b+": _op(0xA0, 4),
+    "b-": _op(0xA1, 4),
+    "b/": _op(0xA2, 4),
+    "b*": _op(0xA3, 4),
+    "b<": _op(0xA4, 4),
+    "b>": _op(0xA5, 4),
+    "b<=": _op(0xA6, 4),
+    "b>=": _op(0xA7, 4),
+    "b==": _op(0xA8, 4),
+    "b!=": _op(0xA9, 4),
+    "b%": _op(0xAA, 4),
+    "b|": _op(0xAB, 4),
+    "b&": _op(0xAC, 4),
+    "b^": _op(0xAD, 4),
+    "b~": _op(0xAE, 4),
+    "bzero": _op(0xAF, 4),
+    "log": _op(0xB0, 5),
+    "itxn_begin": _op(0xB1, 5),
+    "itxn_field": _op(0xB2, 5, _FIELD, fields=_TXN),
+    "itxn_submit": _op(0xB3, 5),
+    "itxn": _op(0xB4, 5, _FIELD, fields=_TXN),
+    "itxna": _op(0xB5, 5, _FIELD, _U8, fields=_TXN),
+    "itxn_next": _op(0xB6, 6),
+    "gitxn": _op(0xB7, 6, _U8, _FIELD, fields=_TXN),
+    "gitxna": _op(0xB8, 6, _U8, _FIELD, _U8, fields=_TXN),
+    "box_create": _op(0xB9, 8),
+    "box_extract": _op(0xBA, 8),
+    "box_replace": _op(0xBB, 8),
+    "box_del": _op(0xBC, 8),
+    "box_len": _op(0xBD, 8),
+    "box_get": _op(0xBE, 8),
+    "box_put": _op(0xBF, 8),
+    "txnas": _op(0xC0, 5, _FIELD, fields=_TXN),
+    "gtxnas": _op(0xC1, 5, _U8, _FIELD, fields=_TXN),
+    "gtxnsas": _op(0xC2, 5, _FIELD, fields=_TXN),
+    "args": _op(0xC3, 5),
+    "gloadss": _op(0xC4, 6),
+    "itxnas": _op(0xC5, 6, _FIELD, fields=_TXN),
+    "gitxnas": _op(0xC6, 6, _U8, _FIELD, fields=_TXN),
+    "vrf_verify": _op(0xD0, 7, _FIELD, fields="vrf"),
+    "block": _op(0xD1, 7, _FIELD, fields="block"),
+    "box_splice": _op(0xD2, 10),
+    "box_resize": _op(0xD3, 10),
+    "ec_add": _op(0xE0, 10, _FIELD, fields="ec"),
+    "ec_scalar_mul": _op(0xE1, 10, _FIELD, fields="ec"),
+    "ec_pairing_check": _op(0xE2, 10, _FIELD, fields="ec"),
+    "ec_multi_scalar_mul": _op(0xE3, 10, _FIELD, fields="ec"),
+    "ec_subgroup_check": _op(0xE4, 10, _FIELD, fields="ec"),
+    "ec_map_to": _op(0xE5, 10, _FIELD, fields="ec"),
+}
+
+# the names of each group of fields, in the order of their encoded value
+_FIELDS: dict[str, tuple[str, ...]] = {
+    _TXN: (
+        "Sender", "Fee", "FirstValid", "FirstValidTime", "LastValid", "Note", "Lease",
+        "Receiver", "Amount", "CloseRemainderTo", "VotePK", "SelectionPK", "VoteFirst",
+        "VoteLast", "VoteKeyDilution", "Type", "TypeEnum", "XferAsset", "AssetAmount",
+        "AssetSender", "AssetReceiver", "AssetCloseTo", "GroupIndex", "TxID",
+        "ApplicationID", "OnCompletion", "ApplicationArgs", "NumAppArgs", "Accounts",
+        "NumAccounts", "ApprovalProgram", "ClearStateProgram", "RekeyTo", "ConfigAsset",
+        "ConfigAssetTotal", "ConfigAssetDecimals", "ConfigAssetDefaultFrozen",
+        "ConfigAssetUnitName", "ConfigAssetName", "ConfigAssetURL",
+        "ConfigAssetMetadataHash", "ConfigAssetManager", "ConfigAssetReserve",
+        "ConfigAssetFreeze", "ConfigAssetClawback", "FreezeAsset", "FreezeAssetAccount",
+        "FreezeAssetFrozen", "Assets", "NumAssets", "Applications", "NumApplications",
+        "GlobalNumUint", "GlobalNumByteSlice", "LocalNumUint", "LocalNumByteSlice",
+        "ExtraProgramPages", "Nonparticipation", "Logs", "NumLogs", "CreatedAssetID",
+        "CreatedApplicationID", "LastLog", "StateProofPK", "ApprovalProgramPages",
+        "NumApprovalProgramPages", "ClearStateProgramPages", "NumClearStateProgramPages",
+    ),
+    "global": (
+        "MinTxnFee", "MinBalance", "MaxTxnLife", "ZeroAddress", "GroupSize",
+        "LogicSigVersion", "Round", "LatestTimestamp", "CurrentApplicationID",
+        "CreatorAddress", "CurrentApplicationAddress", "GroupID", "OpcodeBudget",
+        "CallerApplicationID", "CallerApplicationAddress", "AssetCreateMinBalance",
+        "AssetOptInMinBalance", "GenesisHash",
+    ),
+    "asset_holding": ("AssetBalance", "AssetFrozen"),
+    "asset_params": (
+        "AssetTotal", "AssetDecimals", "AssetDefaultFrozen", "AssetUnitName",
+        "AssetName", "AssetURL", "AssetMetadataHash", "AssetManager", "AssetReserve",
+        "AssetFreeze", "AssetClawback", "AssetCreator",
+    ),
+    "app_params": (
+        "AppApprovalProgram", "AppClearStateProgram", "AppGlobalNumUint",
+        "AppGlobalNumByteSlice", "AppLocalNumUint", "AppLocalNumByteSlice",
+        "AppExtraProgramPages", "AppCreator", "AppAddress",
+    ),
+    "acct_params": (
+        "AcctBalance", "AcctMinBalance", "AcctAuthAddr", "AcctTotalNumUint",
+        "AcctTotalNumByteSlice", "AcctTotalExtraAppPages", "AcctTotalAppsCreated",
+        "AcctTotalAppsOptedIn", "AcctTotalAssetsCreated", "AcctTotalAssets",
+        "AcctTotalBoxes", "AcctTotalBoxBytes",
+    ),
+    "base64": ("URLEncoding", "StdEncoding"),
+    "json": ("JSONString", "JSONUint64", "JSONObject"),
+    "ecdsa": ("Secp256k1", "Secp256r1"),
+    "vrf": ("VrfAlgorand",),
+    "block": ("BlkSeed", "BlkTimestamp"),
+    "ec": ("BN254g1", "BN254g2", "BLS12_381g1", "BLS12_381g2"),
+}
+# fmt: on
+
+# named constants accepted in place of an integer
+_NAMED_INTS = {
+    # transaction types
+    "unknown": 0,
+    "pay": 1,
+    "keyreg": 2,
+    "acfg": 3,
+    "axfer": 4,
+    "afrz": 5,
+    "appl": 6,
+    # on completion actions
+    "NoOp": 0,
+    "OptIn": 1,
+    "CloseOut": 2,
+    "ClearState": 3,
+    "UpdateApplication": 4,
+    "DeleteApplication": 5,
+}
+
+# ops whose name is chosen by the number of immediates given
+_BY_ARG_COUNT = {
+    "txn": {1: "txn", 2: "txna"},
+    "gtxn": {2: "gtxn", 3: "gtxna"},
+    "gtxns": {1: "gtxns", 2: "gtxnsa"},
+    "itxn": {1: "itxn", 2: "itxna"},
+    "gitxn": {2: "gitxn", 3: "gitxna"},
+    "extract": {0: "extract3", 2: "extract"},
+    "replace": {0: "replace3", 1: "replace2"},
+}
+
+_INT_PSEUDO_OPS = {"int"}
+_BYTE_PSEUDO_OPS = {"byte", "addr", "method"}
+
+
+@dataclasses.dataclass
+class _Instruction:
+    line: int
+    op: str
+    #: the encoded immediates, or the label(s) to branch to
+    immediates: bytes = b""
+    labels: tuple[str, ...] = ()
+    #: for a constant reference from a pseudo-op, the value and its type
+    constant: int | bytes | None = None
+    #: position in the program, filled in during layout
+    pc: int = 0
+
+    @property
+    def size(self) -> int:
+        return 1 + len(self.immediates) + 2 * len(self.labels)
+
+
+def assemble(source: str) -> AssembledProgram:
+    """Assemble a TEAL program to bytecode, as algod would"""
+    return _Assembler(source).assemble()
+
+
+class _Assembler:
+    def __init__(self, source: str):
+        self.source = source
+        self.version = DEFAULT_VERSION
+        self.instructions: list[_Instruction] = []
+        self.labels: dict[str, int] = {}
+        self.label_lines: dict[str, int] = {}
+        # explicit constant blocks
+        self.intc_blocks: list[list[int]] = []
+        self.bytec_blocks: list[list[bytes]] = []
+        # constants referenced by pseudo-ops, in order of first appearance
+        self.intc: list[int] = []
+        self.bytec: list[bytes] = []
+
+    def assemble(self) -> AssembledProgram:
+        for line_no, line in enumerate(self.source.splitlines()):
+            for tokens in tokenize(line, line_no):
+                self._statement(tokens, line_no)
+
+        intc = self._resolve_constants(
+            self.intc, "int", explicit_block=bool(self.intc_blocks)
+        )
+        bytec = self._resolve_constants(
+            self.bytec, "byte", explicit_block=bool(self.bytec_blocks)
+        )
+
+        prefix = encode_uvarint(self.version)
+        if intc:
+            prefix += bytes([_OPS["intcblock"].opcode]) + _encode_ints(intc)
+        if bytec:
+            prefix += bytes([_OPS["bytecblock"].opcode]) + _encode_bytess(bytec)
+
+        pc = len(prefix)
+        positions: dict[int, int] = {}
+        for index, instruction in enumerate(self.instructions):
+            positions[index] = pc
+            instruction.pc = pc
+            pc += instruction.size
+        positions[len(self.instructions)] = pc
+        label_pcs = {name: positions[index] for name, index in self.labels.items()}
+
+        program = bytearray(prefix)
+        pc_to_line: dict[int, int] = {}
+        for instruction in self.instructions:
+            pc_to_line[instruction.pc] = instruction.line
+            program.append(_OPS[instruction.op].opcode)
+            program += instruction.immediates
+            end = instruction.pc + instruction.size
+            for label in instruction.labels:
+                program += self._branch_offset(instruction, label, label_pcs, end)
+        return AssembledProgram(bytes(program), pc_to_line)
+
+    def _branch_offset(
+        self,
+        instruction: _Instruction,
+        label: str,
+        label_pcs: dict[str, int],
+        end: int,
+    ) -> bytes:
+        if label not in label_pcs:
+            raise TealAssemblyError(
+                f"reference to undefined label {label!r}", instruction.line
+            )
+        offset = label_pcs[label] - end
+        if offset < 0 and self.version < _BACK_BRANCH_VERSION:
+            raise TealAssemblyError(
+                f"label {label!r} is a back reference, which v{self.version} does not allow",
+                instruction.line,
+            )
+        if not -0x8000 <= offset <= 0x7FFF:
+            raise TealAssemblyError(
+                f"label {label!r} is too far away", instruction.line
+            )
+        return offset.to_bytes(2, "big", signed=True)
+
+    def _statement(self, tokens: list[str], line: int) -> None:
+        first = tokens[0]
+        if first == "#pragma":
+            self._pragma(tokens, line)
+            return
+        if first.endswith(":"):
+            label = first[:-1]
+            if label in self.labels:
+                raise TealAssemblyError(f"duplicate label {label!r}", line)
+            self.labels[label] = len(self.instructions)
+            self.label_lines[label] = line
+            if len(tokens) > 1:
+                self._statement(tokens[1:], line)
+            return
+
+        name, args = first, tokens[1:]
+        if name in _INT_PSEUDO_OPS:
+            self._int(args, line)
+            return
+        if name in _BYTE_PSEUDO_OPS:
+            self._byte(name, args, line)
+            return
+        if name in _BY_ARG_COUNT:
+            by_count = _BY_ARG_COUNT[name]
+            if len(args) not in by_count:
+                raise TealAssemblyError(
+                    f"{name} expects {' or '.join(map(str, by_count))} immediate arguments",
+                    line,
+                )
+            name = by_count[len(args)]
+        self._op(name, args, line)
+
+    def _pragma(self, tokens: list[str], line: int) -> None:
+        if len(tokens) < 2:
+            raise TealAssemblyError("empty pragma", line)
+        if tokens[1] != "version":
+            # other pragmas (e.g. typetrack) don't affect the output
+            return
+        if self.instructions or self.labels:
+            raise TealAssemblyError(
+                "#pragma version is only allowed before instructions", line
+            )
+        if len(tokens) != 3:
+            raise TealAssemblyError("no version value", line)
+        version = parse_int(tokens[2], line)
+        if not 1 <= version <= MAX_VERSION:
+            raise TealAssemblyError(f"unsupported version: {version}", line)
+        self.version = version
+
+    def _spec(self, name: str, line: int) -> _OpSpec:
+        spec = _OPS.get(name)
+        if spec is None:
+            raise TealAssemblyError(f"unknown opcode: {name}", line)
+        if spec.version > self.version:
+            raise TealAssemblyError(
+                f"{name} opcode was introduced in v{spec.version}, program is v{self.version}",
+                line,
+            )
+        return spec
+
+    def _op(self, name: str, args: list[str], line: int) -> None:
+        spec = self._spec(name, line)
+        kinds = spec.immediates
+        instruction = _Instruction(line, name)
+
+        if kinds in ((_VARUINTS,), (_BYTESS,), (_LABELS,)):
+            kind = kinds[0]
+            if kind == _VARUINTS:
+                values = [parse_int(arg, line) for arg in args]
+                instruction.immediates = _encode_ints(values)
+                if name == "intcblock":
+                    self.intc_blocks.append(values)
+            elif kind == _BYTESS:
+                byte_values = parse_bytes_list(args, line)
+                instruction.immediates = _encode_bytess(byte_values)
+                if name == "bytecblock":
+                    self.bytec_blocks.append(byte_values)
+            else:
+                if len(args) > 0xFF:
+                    raise TealAssemblyError(
+                        f"{name} cannot take more than 255 labels", line
+                    )
+                instruction.immediates = bytes([len(args)])
+                instruction.labels = tuple(args)
+            self.instructions.append(instruction)
+            return
+
+        if kinds == (_BYTES,):
+            value, rest = parse_bytes(args, line)
+            if rest:
+                raise TealAssemblyError(f"{name} expects 1 immediate argument", line)
+            instruction.immediates = encode_uvarint(len(value)) + value
+            self.instructions.append(instruction)
+            return
+
+        if len(args) != len(kinds):
+            raise TealAssemblyError(
+                f"{name} expects {len(kinds)} immediate argument{'s' if len(kinds) != 1 else ''}",
+                line,
+            )
+        immediates = bytearray()
+        for kind, arg in zip(kinds, args, strict=True):
+            match kind:
+                case "uint8":
+                    number = parse_int(arg, line)
+                    if number > 0xFF:
+                        raise TealAssemblyError(
+                            f"{name} immediate {arg} is too large", line
+                        )
+                    immediates.append(number)
+                case "int8":
+                    number = _parse_signed(arg, line)
+                    if not -0x80 <= number <= 0x7F:
+                        raise TealAssemblyError(
+                            f"{name} immediate {arg} is out of range", line
+                        )
+                    immediates += number.to_bytes(1, "big", signed=True)
+                case "varuint":
+                    immediates += encode_uvarint(parse_int(arg, line))
+                case "field":
+                    assert spec.fields is not None
+                    names = _FIELDS[spec.fields]
+                    if arg not in names:
+                        raise TealAssemblyError(f"{name} unknown field: {arg!r}", line)
+                    immediates.append(names.index(arg))
+                case "label":
+                    instruction.labels = (arg,)
+        instruction.immediates = bytes(immediates)
+        self.instructions.append(instruction)
+
+    def _int(self, args: list[str], line: int) -> None:
+        if len(args) != 1:
+            raise TealAssemblyError("int expects 1 immediate argument", line)
+        value = parse_int(args[0], line)
+        if self.intc_blocks and self.version >= _BACK_BRANCH_VERSION:
+            # with an explicit block in place the value is pushed directly
+            self._op("pushint", [str(value)], line)
+            return
+        if self.intc_blocks:
+            self._explicit_constant_ref("intc", self.intc_blocks, value, line)
+            return
+        if value not in self.intc:
+            self.intc.append(value)
+        self.instructions.append(_Instruction(line, "intc", constant=value))
+
+    def _byte(self, name: str, args: list[str], line: int) -> None:
+        if name == "addr":
+            if len(args) != 1:
+                raise TealAssemblyError("addr expects 1 immediate argument", line)
+            try:
+                value = encoding.decode_address(args[0])
+            except Exception as err:
+                raise TealAssemblyError(f"addr {args[0]!r} is not valid", line) from err
+        elif name == "method":
+            if len(args) != 1:
+                raise TealAssemblyError("method expects 1 immediate argument", line)
+            signature, _ = parse_bytes(args, line)
+            value = encoding.checksum(signature)[:4]
+        else:
+            value, rest = parse_bytes(args, line)
+            if rest:
+                raise TealAssemblyError("byte expects 1 immediate argument", line)
+
+        if self.bytec_blocks and self.version >= _BACK_BRANCH_VERSION:
+            instruction = _Instruction(line, "pushbytes")
+            instruction.immediates = encode_uvarint(len(value)) + value
+            self._spec("pushbytes", line)
+            self.instructions.append(instruction)
+            return
+        if self.bytec_blocks:
+            self._explicit_constant_ref("bytec", self.bytec_blocks, value, line)
+            return
+        if value not in self.bytec:
+            self.bytec.append(value)
+        self.instructions.append(_Instruction(line, "bytec", constant=value))
+
+    def _explicit_constant_ref(
+        self,
+        op: str,
+        blocks: list[list[int]] | list[list[bytes]],
+        value: int | bytes,
+        line: int,
+    ) -> None:
+        if len(blocks) > 1:
+            raise TealAssemblyError(
+                f"{op} reference with multiple {op}blocks in a v{self.version} program",
+                line,
+            )
+        block: list[Any] = blocks[0]
+        if value not in block:
+            raise TealAssemblyError(
+                f"value {value!r} does not appear in the existing {op}block", line
+            )
+        self.instructions.append(_constant_instruction(op, block.index(value), line))
+
+    def _resolve_constants(
+        self, values: list[Any], kind: str, *, explicit_block: bool
+    ) -> list[Any]:
+        """Choose the constant block for pseudo-op constants and rewrite their references"""
+        op = "intc" if kind == "int" else "bytec"
+        refs = [i for i in self.instructions if i.op == op and i.constant is not None]
+        if not refs or explicit_block:
+            return []
+
+        block = list(values)
+        if self.version >= _OPTIMIZE_CONSTANTS_VERSION:
+            frequency = {repr(v): 0 for v in values}
+            for ref in refs:
+                frequency[repr(ref.constant)] += 1
+            # most used first, preserving the order of first appearance for ties.
+            # constants used only once are pushed rather than stored in the block
+            block = sorted(values, key=lambda v: -frequency[repr(v)])
+            block = [v for v in block if frequency[repr(v)] > 1]
+
+        for ref in refs:
+            if ref.constant in block:
+                replacement = _constant_instruction(
+                    op, block.index(ref.constant), ref.line
+                )
+            elif kind == "int":
+                assert isinstance(ref.constant, int)
+                replacement = _Instruction(
+                    ref.line, "pushint", encode_uvarint(ref.constant)
+                )
+            else:
+                assert isinstance(ref.constant, bytes)
+                replacement = _Instruction(
+                    ref.line,
+                    "pushbytes",
+                    encode_uvarint(len(ref.constant)) + ref.constant,
+                )
+            ref.op = replacement.op
+            ref.immediates = replacement.immediates
+            ref.constant = None
+        return block
+
+
+def _constant_instruction(op: str, index: int, line: int) -> _Instruction:
+    if index < 4:
+        return _Instruction(line, f"{op}_{index}")
+    if index > 0xFF:
+        raise TealAssemblyError(f"{op} index {index} is too large", line)
+    return _Instruction(line, op, bytes([index]))
+
+
+def tokenize(line: str, line_no: int) -> list[list[str]]:
+    """
+    Split a line of TEAL into statements (separated by ``;``), each a list of tokens, as the
+    assembler does. ``line_no`` is the 0-based line reported by any ``TealAssemblyError``
+    """
+    statements: list[list[str]] = []
+    tokens: list[str] = []
+    i, n = 0, len(line)
+    while i < n:
+        c = line[i]
+        if c.isspace():
+            i += 1
+        elif line.startswith("//", i):
+            break
+        elif c == ";":
+            if tokens:
+                statements.append(tokens)
+            tokens = []
+            i += 1
+        else:
+            start = i
+            in_string = False
+            while i < n:
+                c = line[i]
+                if in_string:
+                    if c == "\\":
+                        i += 1
+                    elif c == '"':
+                        in_string = False
+                elif c == '"':
+                    in_string = True
+                elif c.isspace() or c == ";" or line.startswith("//", i):
+                    break
+                i += 1
+            if in_string:
+                raise TealAssemblyError("unterminated string literal", line_no)
+            tokens.append(line[start:i])
+    if tokens:
+        statements.append(tokens)
+    return statements
+
+
+_OCTAL = re.compile(r"^0[0-7_]+$")
+
+
+def parse_int(token: str, line: int) -> int:
+    """Parse an integer constant, including the named ones such as ``NoOp`` and ``pay``"""
+    if token in _NAMED_INTS:
+        return _NAMED_INTS[token]
+    try:
+        value = int(token, 8) if _OCTAL.match(token) else int(token, 0)
+    except ValueError:
+        raise TealAssemblyError(f"unable to parse {token!r} as integer", line) from None
+    if not 0 <= value < 2**64:
+        raise TealAssemblyError(f"{token} is not a uint64", line)
+    return value
+
+
+def _parse_signed(token: str, line: int) -> int:
+    if token.startswith("-"):
+        return -parse_int(token[1:], line)
+    return parse_int(token, line)
+
+
+def parse_bytes_list(args: list[str], line: int) -> list[bytes]:
+    """Parse ``args`` as a list of byte constants, e.g. the immediates of ``bytecblock``"""
+    values = []
+    while args:
+        value, args = parse_bytes(args, line)
+        values.append(value)
+    return values
+
+
+_ENCODED = re.compile(r"^(base64|b64|base32|b32)\((.*)\)$")
+
+
+def parse_bytes(args: list[str], line: int) -> tuple[bytes, list[str]]:
+    """Parse a byte constant from the start of ``args``, returning it and the remaining args"""
+    if not args:
+        raise TealAssemblyError("expected a byte constant", line)
+    arg = args[0]
+    try:
+        if arg in ("base64", "b64", "base32", "b32"):
+            if len(args) < 2:
+                raise TealAssemblyError(f"{arg} needs an argument", line)
+            return _decode(arg, args[1]), args[2:]
+        if match := _ENCODED.match(arg):
+            return _decode(match[1], match[2]), args[1:]
+        if arg.startswith("0x"):
+            return bytes.fromhex(arg[2:]), args[1:]
+        if arg.startswith('"') and arg.endswith('"') and len(arg) >= 2:
+            return _parse_string(arg[1:-1], line), args[1:]
+    except ValueError as err:
+        raise TealAssemblyError(f"unable to parse byte constant {arg!r}", line) from err
+    raise TealAssemblyError(f"unable to parse byte constant {arg!r}", line)
+
+
+def _decode(encoding_name: str, value: str) -> bytes:
+    if encoding_name in ("base64", "b64"):
+        return base64.b64decode(value + "=" * (-len(value) % 4), validate=True)
+    return base64.b32decode(value + "=" * (-len(value) % 8))
+
+
+_ESCAPES = {"n": b"\n", "r": b"\r", "t": b"\t", "\\": b"\\", '"': b'"'}
+
+
+def _parse_string(value: str, line: int) -> bytes:
+    result = bytearray()
+    i = 0
+    while i < len(value):
+        c = value[i]
+        if c != "\\":
+            result += c.encode("utf8")
+            i += 1
+            continue
+        escape = value[i + 1 : i + 2]
+        if escape in _ESCAPES:
+            result += _ESCAPES[escape]
+            i += 2
+        elif escape == "x" and len(value) >= i + 4:
+            result.append(int(value[i + 2 : i + 4], 16))
+            i += 4
+        else:
+            raise TealAssemblyError(f"invalid escape sequence in {value!r}", line)
+    return bytes(result)
+
+
+def encode_uvarint(value: int) -> bytes:
+    """Encode ``value`` as the variable length unsigned integers of the bytecode"""
+    result = bytearray()
+    while value >= 0x80:
+        result.append((value & 0x7F) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def _encode_ints(values: list[int]) -> bytes:
+    return encode_uvarint(len(values)) + b"".join(encode_uvarint(v) for v in values)
+
+
+def _encode_bytess(values: list[bytes]) -> bytes:
+    return encode_uvarint(len(values)) + b"".join(
+        encode_uvarint(len(v)) + v for v in values
+    )
+
+
+_B64_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+
+def _vlq(value: int) -> str:
+    """Base64 VLQ encoding, as used by source maps"""
+    vlq = (-value << 1) | 1 if value < 0 else value << 1
+    result = ""
+    while True:
+        digit = vlq & 0x1F
+        vlq >>= 5
+        if vlq:
+            digit |= 0x20
+        result += _B64_CHARS[digit]
+        if not vlq:
+            return result
@@ -0,0 +1,270 @@
+import importlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+from algokit_utils import ApplicationSpecification
+from algosdk.v2client.algod import AlgodClient
+
+from beaker.build_cache import _cache_key
+from beaker.compilation import Assembler, OfflineAssembler, as_assembler
+
+if TYPE_CHECKING:
+    from beaker.application import Application
+
+__all__ = [
+    "AppBuildResult",
+    "build_many",
+    "discover",
+]
+
+# records the inputs an app's artifacts were built from, next to the artifacts
+FINGERPRINT_FILE = ".fingerprint"
+
+# the files written by ApplicationSpecification.export
+_ARTIFACTS = ("approval.teal", "clear.teal", "contract.json", "application.json")
+
+
+@dataclass(frozen=True)
+class AppBuildResult:
+    #: The module the app was found in
+    module: str
+    #: The name of the app
+    name: str
+    #: The directory the artifacts are in
+    output_dir: Path
+    #: ``skipped`` if the app's inputs hadn't changed so it wasn't built, ``unchanged``
+    #: if it was built but the artifacts were the same, otherwise ``written``
+    status: Literal["skipped", "unchanged", "written"]
+    #: The artifacts that were (re)written
+    written: tuple[str, ...]
+    #: Wall seconds taken to build the app, zero if skipped
+    seconds: float
+
+
+def discover(module: str) -> list["Application"]:
+    """
+    Import ``module`` and return the Applications defined at its top level, or just the one
+    named when given as ``module:attribute``
+    """
+    return [app for _, app in _resolve(module)]
+
+
+def _resolve(module: str) -> list[tuple[str, "Application"]]:
+    """``discover``, also returning the attribute each app was found at"""
+    from beaker.application import Application
+
+    module_name, _, attribute = module.partition(":")
+    imported = importlib.import_module(module_name)
+    if attribute:
+        app = getattr(imported, attribute)
+        if not isinstance(app, Application):
+            raise TypeError(f"{module} is a {type(app)}, not an Application")
+        return [(attribute, app)]
+
+    apps: list[tuple[str, Application]] = []
+    for name, value in vars(imported).items():
+        if isinstance(value, Application) and not any(value is a for _, a in apps):
+            apps.append((name, value))
+    return apps
+
+
+def build_many(
+    modules: Iterable[str],
+    output_dir: Path | str,
+    *,
+    max_workers: int | None = None,
+    algod_address: str | None = None,
+    algod_token: str = "",
+    force: bool = False,
+) -> list[AppBuildResult]:
+    """
+    Build every Application found in ``modules`` (see ``discover``) and export their
+    artifacts to ``<output_dir>/<app name>.artifacts``.
+
+    Modules are built in parallel on a pool of ``max_workers`` processes (in this process
+    if 1). Artifacts are only written when their content changes, and an app whose
+    fingerprint (see ``BuildCache``) matches that of its existing artifacts isn't built at
+    all, unless ``force`` is set.
+
+    Precompiles are compiled by the algod at ``algod_address`` if given, otherwise by the
+    ``OfflineAssembler``.
+
+    An app found in more than one of ``modules`` is built once, reported with the first.
+    Raises ValueError, before building or writing anything, if two apps have the same name
+    so would share an output directory.
+    """
+    tasks = _plan(
+        modules,
+        output_dir=Path(output_dir),
+        algod_address=algod_address,
+        algod_token=algod_token,
+        force=force,
+    )
+    if max_workers == 1 or len(tasks) <= 1:
+        results = [_build_module(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_build_module, tasks))
+
+    return [result for module_results in results for result in module_results]
+
+
+@dataclass(frozen=True, kw_only=True)
+class _ModuleTask:
+    module: str
+    #: The attributes of the module the apps to build are at
+    attributes: tuple[str, ...]
+    output_dir: Path
+    algod_address: str | None
+    algod_token: str
+    force: bool
+
+
+def _plan(
+    modules: Iterable[str],
+    *,
+    output_dir: Path,
+    algod_address: str | None,
+    algod_token: str,
+    force: bool,
+) -> list[_ModuleTask]:
+    """
+    Find the apps in each module, once each, failing before anything is built if two apps
+    would export to the same directory
+    """
+    seen: dict[Path, tuple[str, "Application"]] = {}
+    tasks = []
+    for module in modules:
+        attributes = []
+        for attribute, app in _resolve(module):
+            app_dir = _app_dir(output_dir, app)
+            if app_dir not in seen:
+                seen[app_dir] = (module, app)
+                attributes.append(attribute)
+                continue
+            first, other = seen[app_dir]
+            if other is not app:
+                raise ValueError(
+                    f"Apps named {app.name} in {first} and {module} share "
+                    f"the output directory {app_dir}"
+                )
+        if attributes:
+            tasks.append(
+                _ModuleTask(
+                    module=module,
+                    attributes=tuple(attributes),
+                    output_dir=output_dir,
+                    algod_address=algod_address,
+                    algod_token=algod_token,
+                    force=force,
+                )
+            )
+    return tasks
+
+
+def _app_dir(output_dir: Path, app: "Application") -> Path:
+    return output_dir / f"{app.name}.artifacts"
+
+
+def _build_module(task: _ModuleTask) -> list[AppBuildResult]:
+    assembler: Assembler = (
+        as_assembler(AlgodClient(task.algod_token, task.algod_address))
+        if task.algod_address
+        else OfflineAssembler()
+    )
+    module_name = task.module.partition(":")[0]
+    return [
+        _build_app(task, app, assembler)
+        for attribute in task.attributes
+        for app in discover(f"{module_name}:{attribute}")
+    ]
+
+
+def _build_app(
+    task: _ModuleTask, app: "Application", assembler: Assembler
+) -> AppBuildResult:
+    module = task.module
+    app_dir = _app_dir(task.output_dir, app)
+    key = _cache_key(app)
+    fingerprint = None if key is None else f"{key}:{assembler.identity}"
+    fingerprint_path = app_dir / FINGERPRINT_FILE
+    if (
+        not task.force
+        and fingerprint is not None
+        and _read(fingerprint_path) == fingerprint
+        and all((app_dir / name).is_file() for name in _ARTIFACTS)
+    ):
+        return AppBuildResult(
+            module=module,
+            name=app.name,
+            output_dir=app_dir,
+            status="skipped",
+            written=(),
+            seconds=0.0,
+        )
+
+    start = time.perf_counter()
+    spec = app.build(assembler)
+    seconds = time.perf_counter() - start
+
+    app_dir.mkdir(parents=True, exist_ok=True)
+    written = tuple(
+        name
+        for name, content in _artifacts(spec).items()
+        if _write_if_changed(app_dir / name, content)
+    )
+    if fingerprint is not None:
+        _write_if_changed(fingerprint_path, fingerprint)
+    else:
+        fingerprint_path.unlink(missing_ok=True)
+    return AppBuildResult(
+        module=module,
+        name=app.name,
+        output_dir=app_dir,
+        status="written" if written else "unchanged",
+        written=written,
+        seconds=seconds,
+    )
+
+
+def _artifacts(spec: ApplicationSpecification) -> dict[str, str]:
+    return dict(
+        zip(
+            _ARTIFACTS,
+            (
+                spec.approval_program,
+                spec.clear_program,
+                json.dumps(spec.contract.dictify(), indent=4),
+                spec.to_json(),
+            ),
+            strict=True,
+        )
+    )
+
+
+def _read(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf8")
+    except OSError:
+        return None
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    if _read(path) == content:
+        return False
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf8") as fp:
+            fp.write(content)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return True
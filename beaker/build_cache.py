@@ -0,0 +1,490 @@
+import dataclasses
+import enum
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+import types
+from collections.abc import Iterable
+from contextvars import ContextVar
+from importlib import metadata
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from algokit_utils import ApplicationSpecification
+from pyteal import (
+    ABIReturnSubroutine,
+    Expr,
+    ScratchSlot,
+    ScratchVar,
+    SubroutineFnWrapper,
+)
+
+from beaker.logic_signature import LogicSignature, LogicSignatureTemplate
+
+if TYPE_CHECKING:
+    from algosdk.v2client.algod import AlgodClient
+
+    from beaker.application import Application
+    from beaker.compilation import Assembler
+
+__all__ = [
+    "BuildCache",
+    "BuildCacheEntry",
+    "CacheStats",
+    "application_fingerprint",
+    "logic_signature_fingerprint",
+]
+
+#: default upper bound on the total size of a cache directory
+DEFAULT_MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+_DESCRIBE_DEPTH = 3
+
+# ids of the apps currently being fingerprinted, to break reference cycles
+_fingerprinting: ContextVar[frozenset[int]] = ContextVar(
+    "beaker.fingerprinting", default=frozenset()
+)
+# when set, collects the ids of apps and logic signatures a fingerprint covers
+_referenced: ContextVar[set[int] | None] = ContextVar("beaker.referenced", default=None)
+
+
+@dataclasses.dataclass
+class CacheStats:
+    #: number of lookups that returned a stored entry
+    hits: int = 0
+    #: number of lookups that found nothing (or a corrupt entry)
+    misses: int = 0
+    #: number of entries written
+    stores: int = 0
+    #: number of entries removed to keep the cache under its size bound
+    evictions: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+@dataclasses.dataclass(frozen=True)
+class BuildCacheEntry:
+    spec: ApplicationSpecification
+    #: identity of the assembler that compiled the app's precompiles, if it has any
+    assembler: str | None = None
+    #: the app's precompile graph, as produced by ``PrecompileNode.to_dict``
+    precompiles: dict[str, Any] | None = None
+
+
+class BuildCache:
+    """
+    BuildCache is an opt-in, content addressed, on-disk cache of the
+    ``ApplicationSpecification`` produced by ``Application.build``.
+
+    Entries are keyed by :func:`application_fingerprint`, which covers the source of the
+    registered handlers (and the values they close over), the ``BuildOptions``, the state
+    declarations and the installed PyTeal/Beaker versions. On a hit the stored spec is
+    returned without invoking PyTeal.
+
+    Apps, logic signatures and templates referenced by a handler (directly, through a
+    closure, or as an attribute of an imported module) are covered by their own
+    fingerprints, so an app with ``precompiled`` children is only rebuilt when one of them
+    (or a precompile of theirs) changes. Such entries also record the assembler that compiled
+    the children, and are only used with that assembler.
+
+    The directory is bounded to ``max_bytes``; the least recently used entries are evicted
+    first. A single directory may be safely shared between processes.
+
+    Note: changes the fingerprint cannot see (for example to a helper function imported from
+    another module that a handler calls through an attribute lookup) will not invalidate an
+    entry, call ``clear`` if in doubt.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str | None = None,
+        *,
+        max_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+    ):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.directory = (
+            Path(directory) if directory is not None else _default_dir("build")
+        )
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._last_used_ns = 0
+
+    def key(self, app: "Application") -> str | None:
+        """Returns the cache key for ``app``, or None if its output can't be cached"""
+        return _cache_key(app)
+
+    def get(
+        self, key: str, client: "AlgodClient | Assembler | None" = None
+    ) -> ApplicationSpecification | None:
+        """Look up a previously stored spec, marking it as recently used"""
+        entry = self.get_entry(key, client)
+        return entry.spec if entry is not None else None
+
+    def get_entry(
+        self, key: str, client: "AlgodClient | Assembler | None" = None
+    ) -> BuildCacheEntry | None:
+        """
+        Look up a previously stored entry, marking it as recently used. An entry with
+        precompiles is only returned if ``client`` is the assembler that compiled them.
+        """
+        path = self._path(key)
+        try:
+            stored = json.loads(path.read_text(encoding="utf8"))
+            found = BuildCacheEntry(
+                spec=ApplicationSpecification.from_json(json.dumps(stored["spec"])),
+                assembler=stored.get("assembler"),
+                precompiles=stored.get("precompiles"),
+            )
+            if found.assembler is not None and (
+                client is None or _assembler_identity(client) != found.assembler
+            ):
+                entry = None
+            else:
+                entry = found
+                self._touch(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return entry
+
+    def put(
+        self,
+        key: str,
+        spec: ApplicationSpecification,
+        *,
+        client: "AlgodClient | Assembler | None" = None,
+        precompiles: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        Store a spec under ``key``, evicting old entries if the size bound is exceeded.
+
+        If the app has precompiles, ``precompiles`` should describe them and ``client``
+        be the client or assembler that compiled them.
+        """
+        stored: dict[str, Any] = {"spec": json.loads(spec.to_json())}
+        if precompiles is not None and precompiles.get("children"):
+            if client is None:
+                raise ValueError(
+                    "A client is required to store an app with precompiles"
+                )
+            stored["assembler"] = _assembler_identity(client)
+            stored["precompiles"] = precompiles
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf8") as fp:
+                json.dump(stored, fp)
+            os.replace(tmp_name, self._path(key))
+            self._touch(self._path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self.stats.stores += 1
+        self._evict()
+
+    def covers(self, app: "Application", precompiles: Iterable[object]) -> bool:
+        """
+        Whether the key of ``app`` covers each of ``precompiles``, i.e. they are all found by
+        following the references of its handlers
+        """
+        referenced: set[int] = set()
+        token = _referenced.set(referenced)
+        try:
+            application_fingerprint(app)
+        finally:
+            _referenced.reset(token)
+        return all(id(p) in referenced for p in precompiles)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache directory"""
+        for path, _ in self._entries():
+            path.unlink(missing_ok=True)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of all entries currently stored"""
+        return sum(size for _, size in self._entries())
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def _touch(self, path: Path) -> None:
+        # file system timestamps can be coarse, so keep them strictly increasing
+        # to preserve the order entries were used in by this process
+        with self._lock:
+            self._last_used_ns = max(time.time_ns(), self._last_used_ns + 1)
+            used_ns = self._last_used_ns
+        os.utime(path, ns=(used_ns, used_ns))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _entries(self) -> list[tuple[Path, int]]:
+        entries = []
+        try:
+            candidates = list(self.directory.glob("*.json"))
+        except OSError:
+            return []
+        for path in candidates:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, path, stat.st_size))
+        entries.sort(key=lambda e: e[0])
+        return [(path, size) for _, path, size in entries]
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        total = sum(size for _, size in entries)
+        # oldest first, but always keep the most recently written entry
+        for path, size in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self.stats.evictions += 1
+
+
+def application_fingerprint(app: "Application") -> str:
+    """
+    Returns a stable sha256 hex digest over everything that determines the output of
+    ``app.build()``: the handlers registered on the app, the ``BuildOptions``, the declared
+    state and the PyTeal/Beaker versions. Apps and logic signatures the handlers reference
+    are covered by their own fingerprints.
+    """
+    in_progress = _fingerprinting.get()
+    token = _fingerprinting.set(in_progress | {id(app)})
+    try:
+        payload = _application_payload(app)
+    finally:
+        _fingerprinting.reset(token)
+    return _sha256(json.dumps(payload, sort_keys=True, default=str))
+
+
+def logic_signature_fingerprint(lsig: LogicSignature | LogicSignatureTemplate) -> str:
+    """Returns a stable sha256 hex digest of a logic signature (or template) program"""
+    return _sha256(type(lsig).__name__, lsig.program)
+
+
+def _application_payload(app: "Application") -> dict[str, Any]:
+    return {
+        "versions": _versions(),
+        "name": app.name,
+        "descr": app.descr,
+        "build_options": dataclasses.asdict(app.build_options),
+        "abi": {
+            sig: {
+                "actions": {k: v.name for k, v in ext.actions.items()},
+                "hints": ext.hints.dictify(),
+                "weight": ext.weight,
+                "handler": _describe(ext.method, _DESCRIBE_DEPTH),
+            }
+            for sig, ext in app.abi_externals.items()
+        },
+        "bare": {
+            str(action): {
+                "call_config": oca.call_config.name,
+                "handler": _describe(oca.action, _DESCRIBE_DEPTH),
+            }
+            for action, oca in app.bare_actions.items()
+        },
+        "clear_state": _describe(app._clear_state_method, _DESCRIBE_DEPTH),
+        "state": {
+            "global": _describe_state(app._global_state._fields),
+            "local": _describe_state(app._local_state._fields),
+        },
+    }
+
+
+def _cache_key(app: "Application") -> str | None:
+    options = app.build_options
+    if options.annotate_teal and not options.lazy_sourcemaps:
+        # annotations embed source line numbers, which the fingerprint doesn't track
+        return None
+    return application_fingerprint(app)
+
+
+def _assembler_identity(client: "AlgodClient | Assembler") -> str:
+    from beaker.compilation import as_assembler
+
+    return as_assembler(client).identity
+
+
+def _default_dir(name: str) -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "beaker" / name
+
+
+def _sha256(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _versions() -> dict[str, str]:
+    result = {}
+    for dist in ("pyteal", "beaker-pyteal"):
+        try:
+            result[dist] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            result[dist] = "unknown"
+    return result
+
+
+def _describe_state(fields: dict[str, Any]) -> dict[str, Any]:
+    return {
+        name: [type(field).__qualname__, _describe_attrs(field, _DESCRIBE_DEPTH)]
+        for name, field in fields.items()
+    }
+
+
+def _describe_attrs(obj: object, depth: int) -> dict[str, Any]:
+    return {
+        name: _describe(value, depth - 1)
+        for name, value in sorted(vars(obj).items())
+        if not name.startswith("__")
+    }
+
+
+def _describe(value: object, depth: int) -> Any:  # noqa: ANN401
+    """Produce a JSON-able, process independent description of ``value``"""
+    from beaker.application import Application
+
+    match value:
+        case None | bool() | int() | float() | str():
+            return value
+        case bytes():
+            return value.hex()
+        case enum.Enum():
+            return repr(value)
+        case ScratchVar() | ScratchSlot():
+            # slot ids are allocated from a global counter, so are not stable
+            return type(value).__qualname__
+        case Application():
+            _reference(value)
+            if id(value) in _fingerprinting.get():
+                return f"Application({value.name})"
+            return f"Application({application_fingerprint(value)})"
+        case LogicSignature() | LogicSignatureTemplate():
+            _reference(value)
+            return f"{type(value).__name__}({logic_signature_fingerprint(value)})"
+        case ABIReturnSubroutine():
+            return _describe(value.subroutine.implementation, depth)
+        case SubroutineFnWrapper():
+            return _describe(value.subroutine.implementation, depth)
+        case types.FunctionType() | types.MethodType():
+            return _describe_function(value, depth)
+        case types.ModuleType():
+            return f"module {value.__name__}"
+        case type():
+            return f"{value.__module__}.{value.__qualname__}"
+        case list() | tuple() | set() | frozenset():
+            items = [_describe(v, depth - 1) for v in value]
+            return (
+                sorted(items, key=repr) if isinstance(value, set | frozenset) else items
+            )
+        case dict():
+            return {str(k): _describe(v, depth - 1) for k, v in value.items()}
+        case Expr():
+            return str(value)
+        case types.BuiltinFunctionType():
+            return value.__qualname__
+    if depth <= 0 or not hasattr(value, "__dict__"):
+        return type(value).__qualname__
+    return [type(value).__qualname__, _describe_attrs(value, depth)]
+
+
+def _describe_function(
+    fn: types.FunctionType | types.MethodType, depth: int
+) -> Any:  # noqa: ANN401
+    if isinstance(fn, types.MethodType):
+        return [_describe(fn.__self__, depth - 1), _describe(fn.__func__, depth)]
+
+    code = fn.__code__
+    result: dict[str, Any] = {"name": fn.__qualname__, "code": _describe_code(fn)}
+    if depth > 0:
+        closure = {}
+        for name, cell in zip(code.co_freevars, fn.__closure__ or (), strict=True):
+            try:
+                closure[name] = _describe(cell.cell_contents, depth - 1)
+            except ValueError:  # empty cell
+                closure[name] = None
+        result["closure"] = closure
+        result["globals"] = {
+            name: _describe(fn.__globals__[name], depth - 1)
+            for name in sorted(_code_names(code))
+            if name in fn.__globals__
+        }
+        # precompilable objects used as attributes of an imported module, e.g. child.app
+        names = _code_names(code)
+        result["module_attrs"] = {
+            f"{module_name}.{name}": _describe(getattr(module, name), depth - 1)
+            for module_name in sorted(names)
+            if isinstance(module := fn.__globals__.get(module_name), types.ModuleType)
+            for name in sorted(names)
+            if _is_precompilable(getattr(module, name, None))
+        }
+        if (wrapped := getattr(fn, "__wrapped__", None)) is not None:
+            result["wrapped"] = _describe(wrapped, depth)
+    return result
+
+
+def _describe_code(fn: types.FunctionType) -> Any:  # noqa: ANN401
+    try:
+        return inspect.getsource(fn)
+    except (OSError, TypeError):
+        pass
+    # no source available (e.g. defined in a REPL), fall back to the byte code
+    return _describe_code_object(fn.__code__)
+
+
+def _describe_code_object(code: types.CodeType) -> Any:  # noqa: ANN401
+    return [
+        code.co_code.hex(),
+        [
+            _describe_code_object(c) if isinstance(c, types.CodeType) else repr(c)
+            for c in code.co_consts
+        ],
+        list(code.co_names),
+    ]
+
+
+def _reference(value: object) -> None:
+    referenced = _referenced.get()
+    if referenced is not None:
+        referenced.add(id(value))
+
+
+def _is_precompilable(value: object) -> bool:
+    from beaker.application import Application
+
+    return isinstance(value, Application | LogicSignature | LogicSignatureTemplate)
+
+
+def _code_names(code: types.CodeType) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
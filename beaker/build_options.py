@@ -1,4 +1,5 @@
 import dataclasses
+from typing import Literal
 
 from pyteal import MAX_PROGRAM_VERSION, OptimizeOptions
 
@@ -37,6 +38,32 @@ class BuildOptions:
     """When `True` along with `annotate_teal` being `True`, the compiler
         will provide fewer columns in the annotated teal. Defaults to `False`."""
 
+    lazy_sourcemaps: bool = False
+    """When `True` along with `with_sourcemaps` being `True`, the build returns as soon as the TEAL is
+        compiled, and the source map and annotated TEAL are only generated when first accessed through
+        `Application.source_maps` (or in the background, after `SourceMaps.prefetch()`). The approval and
+        clear programs of the spec are then never annotated. Defaults to `False`."""
+
+    dispatch: Literal["linear", "binary"] = "linear"
+    """How the approval program finds the handler for an ABI method call. `"linear"` compares the
+        selector against each method in turn, in descending order of `weight`, so a call costs
+        more the later its method is checked. `"binary"` binary searches the selectors, so every
+        call costs about the same, growing with the log of the number of methods, which is cheaper
+        for all but the first few methods of a large contract. Defaults to `"linear"`."""
+
+    analyze_costs: bool = False
+    """When `True`, the approval program is analyzed for the worst case opcode cost of each ABI method and bare
+        action, which is included in the method hints of the spec and the `BuildReport`, with a warning for any
+        method that may exceed the budget of a single app call. See `beaker.cost.analyze_costs`.
+        Defaults to `False`."""
+
+    compact_state_keys: bool = False
+    """When `True`, global and local state values keyed by their attribute name (the default) are keyed by
+        one or two letters instead, shrinking the program and its state reads and writes. The names stay in
+        the `schema` of the spec, from which `ApplicationClient.get_global_state`/`get_local_state` map the
+        keys back. Keys are assigned in order of name, so changing the declared state of a deployed app may
+        change them. Defaults to `False`."""
+
     @property
     def optimize_options(self) -> OptimizeOptions:
         return OptimizeOptions(
@@ -0,0 +1,172 @@
+import json
+import math
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from beaker.consts import APP_CALL_BUDGET
+
+__all__ = [
+    "BuildReport",
+]
+
+# the report that algod calls made by the current build are recorded against
+_active_report: ContextVar["BuildReport | None"] = ContextVar(
+    "beaker.build_report", default=None
+)
+
+
+@dataclass
+class BuildReport:
+    """
+    BuildReport records where the time goes in ``Application.build``. Pass one in as
+    ``report`` and it is filled in as the build runs.
+
+    Phase times are exclusive, e.g. time spent building a precompiled child is counted
+    under ``precompiles`` and not under ``ast``, and the child has a report of its own in
+    ``precompiles``. The phases of an app are:
+
+    * ``registration``: adding the handlers and their hints to the PyTeal ``Router``
+    * ``ast``: evaluating the handlers to build the PyTeal expression tree
+    * ``teal``: compiling the expression tree to TEAL, including the optimizer
+    * ``sourcemap``: building the PyTeal source map, when ``with_sourcemaps`` is set
+    * ``annotate``: annotating the TEAL, when ``annotate_teal`` is set
+    * ``precompiles``: building and compiling ``precompiled`` apps and logic signatures
+    * ``assemble``: compiling the programs of a precompile to bytecode
+    * ``cache``: looking the app up in a ``BuildCache``
+    * ``costs``: analyzing the opcode cost of each method, when ``analyze_costs`` is set
+    """
+
+    #: The name of the app, or ``LogicSignature(<hash>)`` for a logic signature
+    name: str = ""
+    #: Wall seconds spent in each phase, in the order they were first entered
+    phases: dict[str, float] = field(default_factory=dict)
+    #: Number of programs sent to algod to compile
+    algod_calls: int = 0
+    #: Bytes of TEAL sent to algod
+    algod_bytes_sent: int = 0
+    #: Bytes of JSON received from algod
+    algod_bytes_received: int = 0
+    #: Size in bytes of each program, TEAL for ``approval``/``clear`` and bytecode
+    #: for ``approval_binary``/``clear_binary``/``logic_binary`` once compiled
+    program_sizes: dict[str, int] = field(default_factory=dict)
+    #: Reports for each precompiled app or logic signature, in the order they were resolved
+    precompiles: list["BuildReport"] = field(default_factory=list)
+    #: Whether the result was read from a ``BuildCache``
+    cached: bool = False
+    #: Worst case opcode cost of each ABI method (by signature) and bare action, None if
+    #: unbounded, when ``BuildOptions.analyze_costs`` is set
+    method_costs: dict[str, int | None] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stack: list[str] = []
+        self._since = 0.0
+
+    @property
+    def total_seconds(self) -> float:
+        """Wall seconds spent in the build, including precompiles"""
+        return sum(self.phases.values())
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Attribute the time spent within to ``name``, pausing the enclosing phase"""
+        now = time.perf_counter()
+        if self._stack:
+            self._add(self._stack[-1], now - self._since)
+        self._stack.append(name)
+        self._since = now
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self._add(self._stack.pop(), now - self._since)
+            self._since = now
+
+    @contextmanager
+    def activate(self) -> Iterator[None]:
+        """Record algod calls made within against this report"""
+        token = _active_report.set(self)
+        try:
+            yield
+        finally:
+            _active_report.reset(token)
+
+    def child(self, name: str) -> "BuildReport":
+        """Returns a new report for the precompile ``name``"""
+        report = BuildReport(name=name)
+        self.precompiles.append(report)
+        return report
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "phases": dict(self.phases),
+            "algod_calls": self.algod_calls,
+            "algod_bytes_sent": self.algod_bytes_sent,
+            "algod_bytes_received": self.algod_bytes_received,
+            "program_sizes": dict(self.program_sizes),
+            "precompiles": [p.to_dict() for p in self.precompiles],
+            "cached": self.cached,
+            "method_costs": dict(self.method_costs),
+        }
+
+    def summary(self) -> str:
+        """A human readable breakdown of the build, one line per app or logic signature"""
+        return "\n".join(self._summary_lines(0))
+
+    def _summary_lines(self, depth: int) -> list[str]:
+        phases = ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in self.phases.items())
+        sizes = ", ".join(f"{k}={v}" for k, v in self.program_sizes.items())
+        parts = [f"{'  ' * depth}{self.name}: {self.total_seconds * 1000:.1f}ms"]
+        if self.cached:
+            parts.append("(cached)")
+        if phases:
+            parts.append(f"[{phases}]")
+        if self.algod_calls:
+            parts.append(
+                f"algod calls={self.algod_calls} sent={self.algod_bytes_sent} "
+                f"received={self.algod_bytes_received}"
+            )
+        if sizes:
+            parts.append(f"sizes: {sizes}")
+        if over := [
+            f"{name}={cost} ({math.ceil(cost / APP_CALL_BUDGET)} app calls)"
+            for name, cost in self.method_costs.items()
+            if cost is not None and cost > APP_CALL_BUDGET
+        ]:
+            parts.append(f"over budget: {', '.join(over)}")
+        lines = [" ".join(parts)]
+        for precompile in self.precompiles:
+            lines.extend(precompile._summary_lines(depth + 1))
+        return lines
+
+    def _add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def _record_algod_call(self, teal: str, response: dict[str, Any]) -> None:
+        received = len(json.dumps(response))
+        with self._lock:
+            self.algod_calls += 1
+            self.algod_bytes_sent += len(teal.encode("utf8"))
+            self.algod_bytes_received += received
+
+
+def record_algod_call(teal: str, response: dict[str, Any]) -> None:
+    """Record a compile round trip to algod against the report of the current build"""
+    if (report := _active_report.get()) is not None:
+        report._record_algod_call(teal, response)
+
+
+@contextmanager
+def phase(report: BuildReport | None, name: str) -> Iterator[None]:
+    """Time ``name`` and record algod calls against ``report``, if there is one"""
+    if report is None:
+        yield
+    else:
+        with report.activate(), report.phase(name):
+            yield
@@ -0,0 +1,137 @@
+import argparse
+import json
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+
+from algosdk.v2client.algod import AlgodClient
+
+from beaker.batch import build_many, discover
+from beaker.compilation import Assembler, OfflineAssembler, as_assembler
+from beaker.size import SizeReport, analyze_sizes
+
+__all__ = [
+    "main",
+]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="beaker")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser(
+        "build",
+        help="build the Applications in some modules and export their artifacts",
+    )
+    build.add_argument(
+        "modules",
+        nargs="+",
+        metavar="MODULE",
+        help="module to build every Application in, or module:attribute for just one",
+    )
+    build.add_argument(
+        "-o",
+        "--output-dir",
+        default="artifacts",
+        help="directory to export to, as <app name>.artifacts (default: artifacts)",
+    )
+    build.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of processes to build with (default: one per CPU)",
+    )
+    build.add_argument(
+        "--algod-address",
+        help="compile precompiles with this algod, rather than in process",
+    )
+    build.add_argument("--algod-token", default="", help="token for --algod-address")
+    build.add_argument(
+        "--force",
+        action="store_true",
+        help="build apps even if their inputs haven't changed",
+    )
+
+    size = commands.add_parser(
+        "size",
+        help="report where the bytes of the programs of the Applications in some modules go",
+    )
+    size.add_argument(
+        "modules",
+        nargs="+",
+        metavar="MODULE",
+        help="module to report on every Application in, or module:attribute for just one",
+    )
+    size.add_argument("--json", metavar="FILE", help="also write the reports to FILE")
+    size.add_argument(
+        "--compare",
+        metavar="FILE",
+        help="show the changes since the reports written to FILE by an earlier --json",
+    )
+    size.add_argument(
+        "--fail-on-growth",
+        action="store_true",
+        help="exit with status 1 if any app got bigger since --compare",
+    )
+    size.add_argument(
+        "--algod-address",
+        help="compile precompiles with this algod, rather than in process",
+    )
+    size.add_argument("--algod-token", default="", help="token for --algod-address")
+
+    args = parser.parse_args(argv)
+    # make modules in the working directory importable, as with python -m
+    sys.path.insert(0, "")
+    if args.command == "size":
+        return _size(args)
+    results = build_many(
+        args.modules,
+        args.output_dir,
+        max_workers=args.jobs,
+        algod_address=args.algod_address,
+        algod_token=args.algod_token,
+        force=args.force,
+    )
+    for result in results:
+        detail = ", ".join(result.written) if result.written else ""
+        print(
+            f"{result.status:9} {result.name} ({result.module}) -> {result.output_dir}"
+            + (f" [{detail}]" if detail else "")
+        )
+    return 0
+
+
+def _size(args: argparse.Namespace) -> int:
+    assembler: Assembler = (
+        as_assembler(AlgodClient(args.algod_token, args.algod_address))
+        if args.algod_address
+        else OfflineAssembler()
+    )
+    reports = {
+        app.name: analyze_sizes(app.build(assembler), app=app)
+        for module in args.modules
+        for app in discover(module)
+    }
+    before = (
+        {
+            name: SizeReport.from_dict(data)
+            for name, data in json.loads(Path(args.compare).read_text()).items()
+        }
+        if args.compare
+        else {}
+    )
+
+    grew = False
+    for name, report in reports.items():
+        if name in before:
+            diff = report.diff(before[name])
+            grew = grew or diff.grew
+            print(diff.summary())
+        else:
+            print(report.summary())
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps({n: r.to_dict() for n, r in reports.items()}, indent=2)
+        )
+    return 1 if grew and args.fail_on_growth else 0
@@ -1,14 +1,47 @@
-from algokit_utils import LogicError
+from typing import TYPE_CHECKING
 
-from .api_providers import AlgoNode, Network, PureStake, Sandbox
-from .application_client import ApplicationClient
+from beaker._lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from algokit_utils import LogicError
+
+    from .api_providers import AlgoNode, Network, PureStake, Sandbox
+    from .application_client import ApplicationClient
+    from .box_btree import BoxBTreeClient
+    from .box_hash_map import BoxHashMapClient
+    from .box_ring_buffer import BoxRingBufferClient
+
+    LogicException = LogicError
 
-LogicException = LogicError
 __all__ = [
     "AlgoNode",
     "ApplicationClient",
+    "BoxBTreeClient",
+    "BoxHashMapClient",
+    "BoxRingBufferClient",
     "LogicException",
     "Network",
     "PureStake",
     "Sandbox",
 ]
+
+# imported when first used, since the application client imports algokit_utils
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "AlgoNode": ".api_providers",
+        "ApplicationClient": ".application_client",
+        "BoxBTreeClient": ".box_btree",
+        "BoxHashMapClient": ".box_hash_map",
+        "BoxRingBufferClient": ".box_ring_buffer",
+        "LogicException": "algokit_utils:LogicError",
+        "Network": ".api_providers",
+        "PureStake": ".api_providers",
+        "Sandbox": ".api_providers",
+    },
+    globals(),
+)
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
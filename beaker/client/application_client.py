@@ -7,6 +7,7 @@ from typing import Any
 from algokit_utils import ApplicationClient as AlgokitApplicationClient
 from algokit_utils import (
     ApplicationSpecification,
+    AppSpecStateDict,
     CommonCallParameters,
     CreateCallParameters,
     OnCompleteCallParameters,
@@ -413,12 +414,30 @@ class ApplicationClient:
     def get_local_state(
         self, account: str | None = None, *, raw: bool = False
     ) -> dict[bytes | str, bytes | str | int]:
-        return self._app_client.get_local_state(account, raw=raw)
+        """
+        Gets the local state of ``account`` (by default the sender). Unless ``raw``, values
+        with compact keys (see ``BuildOptions.compact_state_keys``) are keyed by their name
+        """
+        state = self._app_client.get_local_state(account, raw=raw)
+        return (
+            state
+            if raw
+            else _name_compact_keys(state, self._app_client.app_spec.schema["local"])
+        )
 
     def get_global_state(
         self, *, raw: bool = False
     ) -> dict[bytes | str, bytes | str | int]:
-        return self._app_client.get_global_state(raw=raw)
+        """
+        Gets the global state of the app. Unless ``raw``, values with compact keys (see
+        ``BuildOptions.compact_state_keys``) are keyed by their name
+        """
+        state = self._app_client.get_global_state(raw=raw)
+        return (
+            state
+            if raw
+            else _name_compact_keys(state, self._app_client.app_spec.schema["global"])
+        )
 
     def prepare(
         self,
@@ -443,6 +462,17 @@ class ApplicationClient:
         return copy
 
 
+def _name_compact_keys(
+    state: dict[bytes | str, bytes | str | int], schema: AppSpecStateDict
+) -> dict[bytes | str, bytes | str | int]:
+    names = {
+        declared["key"]: name
+        for name, declared in schema.get("declared", {}).items()
+        if declared.get("compact")
+    }
+    return {names.get(k, k) if isinstance(k, str) else k: v for k, v in state.items()}
+
+
 def _extract_kwargs(
     kwargs: dict[str, Any],
     sender: str | None,
@@ -0,0 +1,112 @@
+from bisect import bisect_left, bisect_right
+from typing import Literal, NamedTuple
+
+from beaker.client.application_client import ApplicationClient
+from beaker.lib.storage.box_btree import (
+    META_NEXT_ID,
+    META_ROOT,
+    NODE_COUNT,
+    NODE_KEYS,
+    NODE_LEAF,
+    NODE_NEXT,
+    BoxBTree,
+)
+
+__all__ = ["BoxBTreeClient"]
+
+
+class _Node(NamedTuple):
+    leaf: bool
+    keys: list[int]
+    next_id: int
+    children: list[int]
+
+
+class BoxBTreeClient:
+    """
+    Reads the boxes of a :any:`BoxBTree` of an application, to find the box references a call
+    operating on it needs, or the keys in it.
+
+    .. code-block:: python
+
+        tree = BoxBTreeClient(app_client, app.state.index)
+        app_client.call(add, key=key, boxes=tree.box_references("insert", key))
+
+    The references are for the tree as it is when they're found, so they may be wrong for a call
+    after another has changed it.
+    """
+
+    def __init__(self, app_client: ApplicationClient, tree: BoxBTree):
+        self.app_client = app_client
+        self.tree = tree
+
+    def box_references(
+        self,
+        operation: Literal["insert", "delete", "contains", "scan"],
+        key: int,
+        *,
+        limit: int = 0,
+    ) -> list[tuple[int, bytes]]:
+        """
+        The box references of an operation on the tree: the meta box and each node read on
+        the way to the key's leaf, then for an insert, the nodes made by splitting the full
+        nodes on the way, or for a scan of ``limit`` keys from ``key``, the leaves after it
+        that the scan reaches.
+        """
+        meta = self._read(self.tree.meta_box_name())
+        node_id = _uint64(meta, META_ROOT)
+        node_ids = [node_id]
+        path = [self._node(node_id)]
+        while not path[-1].leaf:
+            node_id = path[-1].children[bisect_right(path[-1].keys, key)]
+            node_ids.append(node_id)
+            path.append(self._node(node_id))
+
+        node = path[-1]
+        if operation == "insert":
+            # each full node is split, and a full root is split under a new root
+            full = [n for n in path if len(n.keys) == self.tree._order]
+            made = len(full) + (1 if full and full[0] is path[0] else 0)
+            next_id = _uint64(meta, META_NEXT_ID)
+            node_ids += range(next_id, next_id + made)
+        elif operation == "scan":
+            taken = min(len(node.keys) - bisect_left(node.keys, key), limit)
+            while taken < limit and node.next_id:
+                node_ids.append(node.next_id)
+                node = self._node(node.next_id)
+                taken += len(node.keys)
+
+        app_id = self.app_client.app_id
+        return [(app_id, self.tree.meta_box_name())] + [
+            (app_id, self.tree.node_box_name(n)) for n in node_ids
+        ]
+
+    def keys(self) -> list[int]:
+        """All the keys in the tree, in order"""
+        node = self._node(_uint64(self._read(self.tree.meta_box_name()), META_ROOT))
+        while not node.leaf:
+            node = self._node(node.children[0])
+        keys = list(node.keys)
+        while node.next_id:
+            node = self._node(node.next_id)
+            keys += node.keys
+        return keys
+
+    def _read(self, name: bytes) -> bytes:
+        return self.app_client.get_box_contents(name)
+
+    def _node(self, node_id: int) -> _Node:
+        data = self._read(self.tree.node_box_name(node_id))
+        count = int.from_bytes(data[NODE_COUNT : NODE_COUNT + 2], "big")
+        leaf = bool(data[NODE_LEAF])
+        keys = [_uint64(data, NODE_KEYS + 8 * i) for i in range(count)]
+        children = (
+            []
+            if leaf
+            else [_uint64(data, self.tree._children + 8 * i) for i in range(count + 1)]
+        )
+        return _Node(leaf, keys, _uint64(data, NODE_NEXT), children)
+
+
+def _uint64(data: bytes, offset: int) -> int:
+    return int.from_bytes(data[offset : offset + 8], "big")
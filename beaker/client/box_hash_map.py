@@ -0,0 +1,62 @@
+from typing import Any
+
+from algosdk.abi import ABIType
+
+from beaker.client.application_client import ApplicationClient
+from beaker.lib.storage.box_hash_map import MAP_START, SLOT_USED, BoxHashMap
+
+__all__ = ["BoxHashMapClient"]
+
+
+class BoxHashMapClient:
+    """
+    Reads the entries of a :any:`BoxHashMap` of an application, and finds the box a call on a key
+    needs a reference to.
+
+    .. code-block:: python
+
+        balances = BoxHashMapClient(app_client, app.state.balances)
+        app_client.call(deposit, account=addr, boxes=[balances.box_reference(addr)])
+    """
+
+    def __init__(self, app_client: ApplicationClient, hash_map: BoxHashMap):
+        self.app_client = app_client
+        self.hash_map = hash_map
+        self.key_codec = ABIType.from_string(str(hash_map._key_type_spec))
+        self.value_codec = ABIType.from_string(str(hash_map._value_type_spec))
+
+    def box_reference(self, key: object) -> tuple[int, bytes]:
+        """The reference to the box holding the entry of key, given as a value of the key type"""
+        return (
+            self.app_client.app_id,
+            self.hash_map.key_box_name(self.key_codec.encode(key)),
+        )
+
+    def box_references(self) -> list[tuple[int, bytes]]:
+        """The references to all the boxes of the map"""
+        return [(self.app_client.app_id, n) for n in self.hash_map.box_names()]
+
+    def read(self, *, raw: bool = False) -> dict[Any, Any]:
+        """The entries of the map, decoded unless ``raw``, reading each of its boxes"""
+        key_size = self.hash_map._key_size
+        slot_size = self.hash_map._slot_size
+        entries: dict[Any, Any] = {}
+        for name in self.hash_map.box_names():
+            data = self.app_client.get_box_contents(name)
+            for offset in range(MAP_START, len(data), slot_size):
+                if data[offset] != SLOT_USED:
+                    continue
+                key = data[offset + 1 : offset + 1 + key_size]
+                value = data[offset + 1 + key_size : offset + slot_size]
+                if raw:
+                    entries[key] = value
+                else:
+                    entries[_hashable(self.key_codec.decode(key))] = (
+                        self.value_codec.decode(value)
+                    )
+        return entries
+
+
+def _hashable(value: object) -> object:
+    # tuples and arrays decode to lists
+    return tuple(_hashable(v) for v in value) if isinstance(value, list) else value
@@ -0,0 +1,46 @@
+from collections.abc import Iterator
+from typing import Any
+
+from algosdk.abi import ABIType
+
+from beaker.client.application_client import ApplicationClient
+from beaker.lib.storage.box_ring_buffer import (
+    RECORDS_HEAD,
+    RECORDS_START,
+    RECORDS_TAIL,
+    BoxRecords,
+)
+
+__all__ = ["BoxRingBufferClient"]
+
+
+class BoxRingBufferClient:
+    """
+    Reads the records of a :any:`BoxRingBuffer` or :any:`BoxLog` of an application, oldest first,
+    getting the whole box at once.
+
+    .. code-block:: python
+
+        for price in BoxRingBufferClient(app_client, app.state.prices):
+            print(price)
+    """
+
+    def __init__(self, app_client: ApplicationClient, records: BoxRecords):
+        self.app_client = app_client
+        self.records = records
+        self.codec = ABIType.from_string(str(records.value_type))
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.read())
+
+    def read(self, *, raw: bool = False) -> list[Any]:
+        """The records held, oldest first, decoded unless ``raw``"""
+        data = self.app_client.get_box_contents(self.records.box_name())
+        head = int.from_bytes(data[RECORDS_HEAD:RECORDS_TAIL], "big")
+        tail = int.from_bytes(data[RECORDS_TAIL:RECORDS_START], "big")
+        size = self.records._element_size
+        encoded = []
+        for count in range(head, tail):
+            offset = RECORDS_START + size * (count % self.records._capacity)
+            encoded.append(data[offset : offset + size])
+        return encoded if raw else [self.codec.decode(e) for e in encoded]
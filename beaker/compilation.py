@@ -1,15 +1,333 @@
 import base64
+import contextvars
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from functools import cached_property
+from pathlib import Path
+from typing import Any
 
 from algosdk.constants import APP_PAGE_MAX_SIZE
 from algosdk.source_map import SourceMap
 from algosdk.v2client.algod import AlgodClient
 from pyteal import Bytes, Expr
 
+from beaker.assembler import TealAssemblyError, assemble
+from beaker.build_cache import CacheStats, _default_dir, _versions
+from beaker.build_report import record_algod_call
+
 __all__ = [
+    "AlgodAssembler",
+    "Assembler",
+    "CompileCache",
+    "CompileMismatchError",
+    "CompileReport",
+    "CompileTiming",
+    "ConcurrentAssembler",
+    "OfflineAssembler",
     "Program",
 ]
 
+# the chain of precompiles being compiled, outermost first
+_compile_path: ContextVar[tuple[str, ...]] = ContextVar(
+    "beaker.compile_path", default=()
+)
+
+
+@contextmanager
+def compile_scope(label: str) -> Iterator[None]:
+    """Attribute any programs compiled within to the precompile ``label``"""
+    token = _compile_path.set((*_compile_path.get(), label))
+    try:
+        yield
+    finally:
+        _compile_path.reset(token)
+
+
+class CompileMismatchError(Exception):
+    pass
+
+
+class Assembler(ABC):
+    """
+    Assembler turns TEAL into bytecode for a ``Program``. Anywhere an ``AlgodClient`` is
+    accepted for precompilation an Assembler may be given instead.
+    """
+
+    @abstractmethod
+    def compile(self, teal: str) -> dict[str, Any]:
+        """
+        Assemble ``teal``, returning the ``result`` (base64 bytecode), ``hash`` and
+        ``sourcemap`` in the same shape as algod's compile endpoint
+        """
+
+    @property
+    @abstractmethod
+    def identity(self) -> str:
+        """Identifies the output of this assembler, used as part of a ``CompileCache`` key"""
+
+    def flush(self) -> None:
+        """Wait for any outstanding work, called at the end of ``Application.build``"""
+        return None
+
+    def on_verified(
+        self, commit: Callable[[], None], *, discard: Callable[[], None] | None = None
+    ) -> None:
+        """
+        Call ``commit`` once the results returned so far are known to be right, or ``discard``
+        if ``flush`` finds they aren't. Used to hold back storing results in caches.
+        The results of most assemblers are final, so ``commit`` is called straight away.
+        """
+        commit()
+
+
+class AlgodAssembler(Assembler):
+    """Assembles programs by sending them to algod"""
+
+    def __init__(self, client: AlgodClient):
+        self.client = client
+
+    def compile(self, teal: str) -> dict[str, Any]:
+        result = self.client.compile(teal, source_map=True)
+        record_algod_call(teal, result)
+        return result
+
+    @property
+    def identity(self) -> str:
+        return _node_identity(self.client)
+
+
+class OfflineAssembler(Assembler):
+    """
+    Assembles programs in process, without a node, producing the same bytecode, hash
+    and source map as algod for the AVM versions PyTeal targets
+    """
+
+    def compile(self, teal: str) -> dict[str, Any]:
+        return assemble(teal).compile_response()
+
+    @property
+    def identity(self) -> str:
+        return f"offline:{_versions()['beaker-pyteal']}"
+
+
+@dataclass(frozen=True)
+class CompileTiming:
+    #: the chain of precompiles leading to the program, outermost first
+    path: tuple[str, ...]
+    #: how long the program took to compile
+    seconds: float
+    #: whether the build had to wait for the compile to finish
+    blocking: bool
+
+
+@dataclass(frozen=True)
+class CompileReport:
+    #: every program compiled, in the order they finished
+    timings: list[CompileTiming] = field(default_factory=list)
+    #: elapsed time from the first compile being submitted to the last finishing
+    wall_seconds: float = 0.0
+
+    @property
+    def total_seconds(self) -> float:
+        """Time the compiles would have taken one after another"""
+        return sum(t.seconds for t in self.timings)
+
+    @cached_property
+    def critical_path(self) -> tuple[str, ...]:
+        """
+        The deepest chain of precompiles, weighted by compile time. A build that compiles
+        each precompile only after its children can't take less time than this chain.
+        """
+        chains = self._chains
+        return max(chains, key=chains.__getitem__, default=())
+
+    @property
+    def critical_path_seconds(self) -> float:
+        return self._chains.get(self.critical_path, 0.0)
+
+    @cached_property
+    def _chains(self) -> dict[tuple[str, ...], float]:
+        node_seconds: dict[tuple[str, ...], float] = {}
+        for timing in self.timings:
+            node_seconds[timing.path] = (
+                node_seconds.get(timing.path, 0.0) + timing.seconds
+            )
+        return {
+            path: sum(
+                seconds
+                for node, seconds in node_seconds.items()
+                if path[: len(node)] == node
+            )
+            for path in node_seconds
+        }
+
+
+class ConcurrentAssembler(Assembler):
+    """
+    ConcurrentAssembler stops a build from waiting on algod for each precompile in turn.
+
+    Each program is assembled in process straight away, so the build can carry on, while
+    the given client (or assembler) compiles it on a pool of at most ``max_workers``
+    threads. At the end of ``Application.build`` the pool is drained and each result is
+    checked against what was assembled in process, raising a ``CompileMismatchError`` if
+    they differ. Programs the offline assembler can't handle are compiled by the client
+    before the build carries on.
+
+    Until then, results are only stored in a ``CompileCache``, ``BuildCache`` or
+    ``PrecompileRegistry`` for the rest of the build to use, and they are dropped if
+    they turn out to be wrong. They're cached under their own identity, so they're
+    never used by a build with the wrapped client or assembler alone.
+
+    After a build, ``report`` holds the time taken by each compile and the critical path
+    through the precompiles.
+    """
+
+    def __init__(
+        self,
+        client: "AlgodClient | Assembler",
+        *,
+        max_workers: int = 4,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.assembler = as_assembler(client)
+        self.max_workers = max_workers
+        self.report = CompileReport()
+        self._offline = OfflineAssembler()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: list[tuple[dict[str, Any], Future[dict[str, Any]]]] = []
+        self._deferred: list[tuple[Callable[[], None], Callable[[], None] | None]] = []
+        self._timings: list[CompileTiming] = []
+        self._started: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def identity(self) -> str:
+        # the offline results, checked against those of the wrapped assembler
+        return f"speculative:{self._offline.identity}:{self.assembler.identity}"
+
+    def on_verified(
+        self, commit: Callable[[], None], *, discard: Callable[[], None] | None = None
+    ) -> None:
+        with self._lock:
+            if self._pending:
+                self._deferred.append((commit, discard))
+                return
+        commit()
+
+    def compile(self, teal: str) -> dict[str, Any]:
+        path = _compile_path.get()
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter()
+        try:
+            speculative = self._offline.compile(teal)
+        except TealAssemblyError:
+            return self._timed_compile(teal, path, blocking=True)
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="beaker-compile",
+                )
+            # run in the caller's context, so the compile is recorded against its build
+            future = self._executor.submit(
+                contextvars.copy_context().run,
+                self._timed_compile,
+                teal,
+                path,
+                blocking=False,
+            )
+            self._pending.append((speculative, future))
+        return speculative
+
+    def flush(self) -> None:
+        """Wait for all compiles to finish, and check them against the speculative results"""
+        with self._lock:
+            if self._started is None:
+                # nothing has been compiled since the last flush
+                return
+            pending, self._pending = self._pending, []
+            deferred, self._deferred = self._deferred, []
+        # wait for everything before checking, so nothing is left running on error
+        for _, future in pending:
+            future.exception()
+        with self._lock:
+            wall = time.perf_counter() - self._started
+            self.report = CompileReport(timings=self._timings, wall_seconds=wall)
+            self._timings = []
+            self._started = None
+        try:
+            for speculative, future in pending:
+                result = future.result()
+                if not _same_compile_result(speculative, result):
+                    raise CompileMismatchError(
+                        f"Program {result['hash']} was assembled by {self.assembler.identity} "
+                        f"to different bytecode than the offline assembler produced "
+                        f"({speculative['hash']})"
+                    )
+        except BaseException:
+            for _, discard in deferred:
+                if discard is not None:
+                    discard()
+            raise
+        for commit, _ in deferred:
+            commit()
+
+    def close(self) -> None:
+        """Wait for outstanding compiles and release the thread pool"""
+        try:
+            self.flush()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __enter__(self) -> "ConcurrentAssembler":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _timed_compile(
+        self, teal: str, path: tuple[str, ...], *, blocking: bool
+    ) -> dict[str, Any]:
+        start = time.perf_counter()
+        result = self.assembler.compile(teal)
+        timing = CompileTiming(
+            path=path, seconds=time.perf_counter() - start, blocking=blocking
+        )
+        with self._lock:
+            self._timings.append(timing)
+        return result
+
+
+def _same_compile_result(a: dict[str, Any], b: dict[str, Any]) -> bool:
+    return (
+        a["result"] == b["result"]
+        and a["hash"] == b["hash"]
+        and SourceMap(a["sourcemap"]).pc_to_line == SourceMap(b["sourcemap"]).pc_to_line
+    )
+
+
+def as_assembler(client: "AlgodClient | Assembler") -> Assembler:
+    """Returns ``client`` if it is an Assembler, otherwise an Assembler that uses it"""
+    if isinstance(client, Assembler):
+        return client
+    return AlgodAssembler(client)
+
 
 class Program:
     """
@@ -17,13 +335,22 @@ class Program:
     and LSigPrecompile for Applications and Logic Signature programs, respectively.
     """
 
-    def __init__(self, program: str, client: AlgodClient):
+    def __init__(
+        self,
+        program: str,
+        client: AlgodClient | Assembler,
+        *,
+        cache: "CompileCache | None" = None,
+    ):
         """
         Fully compile the program source to binary and generate a
         source map for matching pc to line number
         """
         self.teal = program
-        self._result = client.compile(self.teal, source_map=True)
+        if cache is None:
+            self._result = as_assembler(client).compile(self.teal)
+        else:
+            self._result = cache.compile(self.teal, client)
         self.raw_binary = base64.b64decode(self._result["result"])
         self.binary_hash: str = self._result["hash"]
         self.source_map = SourceMap(self._result["sourcemap"])
@@ -38,3 +365,132 @@ class Program:
             Bytes(self.raw_binary[i : i + APP_PAGE_MAX_SIZE])
             for i in range(0, len(self.raw_binary), APP_PAGE_MAX_SIZE)
         ]
+
+
+class CompileCache:
+    """
+    CompileCache memoizes the result of compiling TEAL with algod (or another ``Assembler``),
+    so that each distinct program is only sent to algod once.
+
+    Results are keyed by the sha256 of the TEAL source along with the version and genesis of
+    the node that compiled it (or the identity of the assembler), and hold the assembled binary, its hash and the source map.
+    They are kept in memory, and on disk under ``directory`` so they survive between
+    processes. Pass ``persist=False`` to keep results in memory only. A single directory
+    may be safely shared between processes.
+    """
+
+    def __init__(self, directory: Path | str | None = None, *, persist: bool = True):
+        self.directory: Path | None = None
+        if persist:
+            self.directory = (
+                Path(directory) if directory is not None else _default_dir("compile")
+            )
+        self.stats = CacheStats()
+        self._memory: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def compile(self, teal: str, client: AlgodClient | Assembler) -> dict[str, Any]:
+        """Returns the compile response for ``teal``, compiling only on a miss"""
+        assembler = as_assembler(client)
+        key = self.key(teal, assembler)
+        result = self._get(key)
+        if result is not None:
+            return result
+        response = assembler.compile(teal)
+        compiled = {
+            "result": response["result"],
+            "hash": response["hash"],
+            "sourcemap": response["sourcemap"],
+        }
+        # usable by the rest of the build, but only stored once it's known to be right
+        with self._lock:
+            self._memory[key] = compiled
+        assembler.on_verified(
+            lambda: self._put(key, compiled), discard=lambda: self._forget(key)
+        )
+        return compiled
+
+    def key(self, teal: str, client: AlgodClient | Assembler) -> str:
+        h = hashlib.sha256(teal.encode("utf-8"))
+        h.update(b"\0")
+        h.update(as_assembler(client).identity.encode("utf-8"))
+        return h.hexdigest()
+
+    def clear(self) -> None:
+        """Remove all results, from memory and from disk"""
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            result = self._memory.get(key)
+        if result is None and self.directory is not None:
+            try:
+                result = json.loads((self.directory / f"{key}.json").read_text("utf8"))
+            except (OSError, ValueError):
+                result = None
+            else:
+                with self._lock:
+                    self._memory[key] = result
+        with self._lock:
+            if result is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return result
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+
+    def _put(self, key: str, result: dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = result
+            self.stats.stores += 1
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf8") as fp:
+                json.dump(result, fp)
+            os.replace(tmp_name, self.directory / f"{key}.json")
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+
+_node_identities: "weakref.WeakKeyDictionary[AlgodClient, str]" = (
+    weakref.WeakKeyDictionary()
+)
+_node_identities_lock = threading.Lock()
+
+
+def _node_identity(client: AlgodClient) -> str:
+    """Identifies the network and algod build a client talks to, fetched once per client"""
+    with _node_identities_lock:
+        identity = _node_identities.get(client)
+    if identity is None:
+        versions = client.versions()
+        assert isinstance(versions, dict)
+        build = versions.get("build", {})
+        identity = ":".join(
+            str(part)
+            for part in (
+                versions.get("genesis_id"),
+                versions.get("genesis_hash_b64"),
+                build.get("major"),
+                build.get("minor"),
+                build.get("build_number"),
+                build.get("commit_hash"),
+            )
+        )
+        with _node_identities_lock:
+            _node_identities[client] = identity
+    return identity
@@ -54,6 +54,9 @@ LSIG_MAX_ARGS = 255
 #: The prefix used when hashing bytecode to produce a unique hash
 PROGRAM_DOMAIN_SEPARATOR = "Program"
 
+#: The max size of a box in bytes
+MAX_BOX_SIZE = 32768
+
 #: The min balance increase per box created
 BOX_FLAT_MIN_BALANCE = 2500
 
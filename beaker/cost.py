@@ -0,0 +1,686 @@
+import dataclasses
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, TypeAlias
+
+from algokit_utils import ApplicationSpecification, MethodHints, OnCompleteActionName
+from algosdk import abi as sdk_abi
+from algosdk.constants import TX_GROUP_LIMIT
+from algosdk.encoding import checksum, decode_address
+
+from beaker.assembler import parse_bytes, parse_bytes_list, parse_int, tokenize
+from beaker.consts import APP_CALL_BUDGET, MAX_OPS
+
+__all__ = [
+    "CostAnalysis",
+    "MethodCost",
+    "MethodCostHints",
+    "analyze_costs",
+    "program_cost",
+]
+
+
+@dataclass(frozen=True)
+class MethodCost:
+    """The worst case opcode cost of a successful call to a method or bare action"""
+
+    #: The most opcodes a call that succeeds may execute, or None if that couldn't be
+    #: bounded, e.g. because it loops a number of times only known at runtime
+    cost: int | None
+
+    @property
+    def bounded(self) -> bool:
+        return self.cost is not None
+
+    @property
+    def exceeds_budget(self) -> bool:
+        """Whether a call may cost more than the budget of a single app call"""
+        return self.cost is not None and self.cost > APP_CALL_BUDGET
+
+    @property
+    def group_size(self) -> int | None:
+        """
+        The number of app calls (the call itself, plus any op ups) needed to pool enough
+        budget for a call, or None if the cost couldn't be bounded
+        """
+        if self.cost is None:
+            return None
+        return max(1, math.ceil(self.cost / APP_CALL_BUDGET))
+
+    @property
+    def fits_in_group(self) -> bool:
+        """Whether enough budget can be pooled within a single transaction group"""
+        return self.group_size is not None and self.group_size <= TX_GROUP_LIMIT
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"cost": self.cost, "group_size": self.group_size}
+
+
+@dataclass
+class MethodCostHints(MethodHints):
+    """``MethodHints`` that also include the ``MethodCost`` of the method"""
+
+    cost: MethodCost | None = None
+
+    def dictify(self) -> dict[str, Any]:
+        d = super().dictify()
+        if self.cost is not None:
+            d["cost"] = self.cost.to_dict()
+        return d
+
+
+@dataclass(frozen=True)
+class CostAnalysis:
+    #: The cost of each ABI method, by method signature
+    methods: dict[str, MethodCost]
+    #: The cost of each bare action, by OnComplete action
+    bare_calls: dict[OnCompleteActionName, MethodCost]
+
+    def over_budget(self) -> dict[str, MethodCost]:
+        """The methods and bare actions that may cost more than a single app call's budget"""
+        return {
+            name: cost
+            for name, cost in [*self.methods.items(), *self.bare_calls.items()]
+            if cost.exceeds_budget
+        }
+
+    def with_hints(self, spec: ApplicationSpecification) -> ApplicationSpecification:
+        """Returns a copy of ``spec`` with the cost of each method included in its hints"""
+        hints: dict[str, MethodHints] = {
+            sig: MethodCostHints(
+                read_only=hint.read_only,
+                structs=hint.structs,
+                default_arguments=hint.default_arguments,
+                call_config=hint.call_config,
+                cost=self.methods.get(sig),
+            )
+            for sig, hint in spec.hints.items()
+        }
+        return dataclasses.replace(spec, hints=hints)
+
+
+def analyze_costs(spec: ApplicationSpecification) -> CostAnalysis:
+    """
+    Statically analyze the approval program of ``spec`` for the worst case opcode cost of a
+    successful call to each ABI method and bare action.
+
+    Each call is followed from the start of the program with the method selector, number of
+    app args and (for bare actions) OnComplete known, so only the dispatch path to the method
+    is counted. Every other value is treated as unknown, taking the most expensive of the
+    paths either side of branches that depend on them. Loops are followed for as long as
+    their bounds are known, so loops over constants are counted in full, while loops over
+    values only known at runtime (or that pass through a branch on such a value more than
+    256 times) are reported as unbounded.
+    """
+    program = _Program(spec.approval_program)
+    methods = {
+        method.get_signature(): MethodCost(
+            program.cost(
+                _App(
+                    num_app_args=_num_app_args(method),
+                    selector=method.get_selector(),
+                    on_completion=None,
+                )
+            )
+        )
+        for method in spec.contract.methods
+    }
+    bare_calls = {
+        action: MethodCost(
+            program.cost(
+                _App(
+                    num_app_args=0,
+                    selector=None,
+                    on_completion=_ON_COMPLETION[action],
+                )
+            )
+        )
+        for action in spec.bare_call_config
+    }
+    return CostAnalysis(methods=methods, bare_calls=bare_calls)
+
+
+def program_cost(
+    teal: str,
+    *,
+    app_args: Sequence[bytes | None] = (),
+    on_completion: OnCompleteActionName | None = None,
+) -> int | None:
+    """
+    Returns the worst case opcode cost of a successful app call to the program ``teal``
+    with ``app_args`` (None for those not known) and ``on_completion`` (any if None), or None
+    if it couldn't be bounded
+    """
+    return _Program(teal).cost(
+        _App(
+            num_app_args=len(app_args),
+            selector=app_args[0] if app_args else None,
+            app_args=tuple(app_args),
+            on_completion=(
+                None if on_completion is None else _ON_COMPLETION[on_completion]
+            ),
+        )
+    )
+
+
+# the arguments that come from the transaction group rather than the app args
+_TRANSACTION_ARGS = frozenset(["txn", "pay", "keyreg", "acfg", "axfer", "afrz", "appl"])
+# ABI methods with more args than this pass the rest in a tuple as the last app arg
+_MAX_APP_ARGS = 16
+
+_ON_COMPLETION: dict[str, int] = {
+    "no_op": 0,
+    "opt_in": 1,
+    "close_out": 2,
+    "clear_state": 3,
+    "update_application": 4,
+    "delete_application": 5,
+}
+
+# the largest a byte array may be, used for the cost of ops over values of unknown length
+_MAX_BYTES = 4096
+
+_UINT64_MAX = 2**64 - 1
+
+
+def _num_app_args(method: sdk_abi.Method) -> int:
+    args = [a for a in method.args if str(a.type) not in _TRANSACTION_ARGS]
+    return 1 + min(len(args), _MAX_APP_ARGS - 1)
+
+
+def _op_effects() -> dict[str, tuple[int, int]]:
+    effects: dict[str, tuple[int, int]] = {}
+    for ops, effect in {
+        "err b intcblock bytecblock itxn_begin itxn_submit itxn_next": (0, 0),
+        "int byte addr method intc intc_0 intc_1 intc_2 intc_3 bytec bytec_0 bytec_1 "
+        "bytec_2 bytec_3 pushint pushbytes txn global gtxn load txna gtxna gload gaid arg "
+        "arg_0 arg_1 arg_2 arg_3 itxn itxna gitxn gitxna online_stake": (0, 1),
+        "store pop assert return log itxn_field app_global_del": (1, 0),
+        "sha256 keccak256 sha512_256 sha3_256 ! len itob btoi ~ bitlen sqrt bsqrt b~ bzero "
+        "balance min_balance app_global_get substring extract base64_decode args gtxns "
+        "gtxnsa gloads gaids loads txnas gtxnas gitxnas itxnas ec_subgroup_check ec_map_to "
+        "block sumhash512 mimc box_del": (1, 1),
+        "ecdsa_pk_decompress asset_params_get app_params_get acct_params_get box_len "
+        "box_get voter_params_get": (1, 2),
+        "stores app_global_put app_local_del box_put box_resize": (2, 0),
+        "+ - / * < > <= >= && || == != % | & ^ shl shr exp concat getbit getbyte "
+        "extract_uint16 extract_uint32 extract_uint64 b+ b- b/ b* b< b> b<= b>= b== b!= b% "
+        "b| b& b^ app_opted_in app_local_get json_ref replace2 box_create ec_add "
+        "ec_scalar_mul ec_pairing_check ec_multi_scalar_mul gtxnsas gloadss": (2, 1),
+        "mulw addw expw app_global_get_ex asset_holding_get": (2, 2),
+        "app_local_put box_replace": (3, 0),
+        "ed25519verify ed25519verify_bare select substring3 setbit setbyte extract3 "
+        "replace3 divw box_extract falcon_verify": (3, 1),
+        "app_local_get_ex vrf_verify": (3, 2),
+        "box_splice": (4, 0),
+        "ecdsa_pk_recover": (4, 2),
+        "divmodw": (4, 4),
+        "ecdsa_verify": (5, 1),
+    }.items():
+        effects.update(dict.fromkeys(ops.split(), effect))
+    return effects
+
+
+# the (pops, pushes) of each op with a fixed effect on the stack
+_OP_EFFECTS = _op_effects()
+
+# the cost of each op that costs more than 1, or the cost of the curve/group given as its
+# first immediate
+_OP_COSTS: dict[str, int | dict[str, int]] = {
+    "sha256": 35,
+    "keccak256": 130,
+    "sha512_256": 45,
+    "sha3_256": 130,
+    "ed25519verify": 1900,
+    "ed25519verify_bare": 1900,
+    "ecdsa_verify": {"Secp256k1": 1700, "Secp256r1": 2500},
+    "ecdsa_pk_decompress": {"Secp256k1": 650, "Secp256r1": 2400},
+    "ecdsa_pk_recover": 2000,
+    "vrf_verify": 5700,
+    "falcon_verify": 1700,
+    "divmodw": 20,
+    "sqrt": 4,
+    "expw": 10,
+    "b+": 10,
+    "b-": 10,
+    "b*": 20,
+    "b/": 20,
+    "b%": 20,
+    "b|": 6,
+    "b&": 6,
+    "b^": 6,
+    "b~": 4,
+    "bsqrt": 40,
+    "ec_add": {
+        "BN254g1": 125,
+        "BN254g2": 170,
+        "BLS12_381g1": 205,
+        "BLS12_381g2": 290,
+    },
+    "ec_scalar_mul": {
+        "BN254g1": 1810,
+        "BN254g2": 3430,
+        "BLS12_381g1": 2950,
+        "BLS12_381g2": 6530,
+    },
+    "ec_subgroup_check": {
+        "BN254g1": 20,
+        "BN254g2": 3100,
+        "BLS12_381g1": 1850,
+        "BLS12_381g2": 2340,
+    },
+    "ec_map_to": {
+        "BN254g1": 630,
+        "BN254g2": 3300,
+        "BLS12_381g1": 1950,
+        "BLS12_381g2": 8150,
+    },
+}
+
+# ops whose cost grows with the length of an argument: the index of the argument from the
+# top of the stack, the base cost, and the cost per chunk of the given size, of each
+# curve/group given as the first immediate (or "" if there's no immediate)
+_DYNAMIC_COSTS: dict[str, tuple[int, dict[str, tuple[int, int, int]]]] = {
+    "base64_decode": (0, {"": (1, 1, 16)}),
+    "json_ref": (1, {"": (25, 2, 7)}),
+    "sumhash512": (0, {"": (150, 7, 4)}),
+    "mimc": (0, {"BN254Mp110": (10, 550, 32), "BLS12_381Mp111": (10, 550, 32)}),
+    "ec_pairing_check": (
+        0,
+        {
+            "BN254g1": (8000, 7400, 64),
+            "BN254g2": (8000, 7400, 128),
+            "BLS12_381g1": (13000, 10000, 48),
+            "BLS12_381g2": (13000, 10000, 96),
+        },
+    ),
+    "ec_multi_scalar_mul": (
+        0,
+        {
+            "BN254g1": (3600, 90, 32),
+            "BN254g2": (7200, 270, 32),
+            "BLS12_381g1": (6500, 95, 32),
+            "BLS12_381g2": (14850, 485, 32),
+        },
+    ),
+}
+
+# a value on the stack or in scratch, None if not known
+_Value: TypeAlias = int | bytes | None
+# (return pc, stack height at callsub, args and returns given by proto)
+_Frame: TypeAlias = tuple[int, int, tuple[int, int] | None]
+
+
+@dataclass(frozen=True)
+class _App:
+    num_app_args: int
+    selector: bytes | None
+    on_completion: int | None
+    app_args: tuple[bytes | None, ...] = ()
+
+
+@dataclass(frozen=True)
+class _State:
+    pc: int
+    stack: tuple[_Value, ...]
+    scratch: tuple[tuple[int, _Value], ...]
+    frames: tuple[_Frame, ...]
+    intc: tuple[int, ...]
+    bytec: tuple[bytes, ...]
+
+
+class _PathFailedError(Exception):
+    """The path being followed fails"""
+
+
+class _UnboundedError(Exception):
+    """The cost of the program can't be bounded"""
+
+
+class _Program:
+    # the number of times a path may fork at the same point before it is considered an
+    # unbounded loop, see analyze_costs
+    loop_limit = 256
+    # the number of distinct points a program's paths may fork at before giving up
+    state_limit = 20_000
+
+    def __init__(self, teal: str):
+        self.ops: list[tuple[str, list[str]]] = []
+        self.labels: dict[str, int] = {}
+        # the int and byte constants of each op with any, parsed as the assembler does
+        self.ints: dict[int, tuple[int, ...]] = {}
+        self.bytes: dict[int, tuple[bytes, ...]] = {}
+        for line_no, line in enumerate(teal.splitlines()):
+            for tokens in tokenize(line, line_no):
+                if tokens[0].startswith("#"):
+                    continue
+                if tokens[0].endswith(":"):
+                    self.labels[tokens[0][:-1]] = len(self.ops)
+                    if not (tokens := tokens[1:]):
+                        continue
+                op, imm = tokens[0], tokens[1:]
+                if op in ("intcblock", "int", "pushint", "pushints"):
+                    self.ints[len(self.ops)] = tuple(parse_int(i, line_no) for i in imm)
+                elif op in ("bytecblock", "byte", "pushbytes", "pushbytess"):
+                    self.bytes[len(self.ops)] = tuple(parse_bytes_list(imm, line_no))
+                elif op == "addr":
+                    self.bytes[len(self.ops)] = (decode_address(imm[0]),)
+                elif op == "method":
+                    signature, _ = parse_bytes(imm, line_no)
+                    self.bytes[len(self.ops)] = (checksum(signature)[:4],)
+                self.ops.append((op, imm))
+
+    def cost(self, app: _App) -> int | None:
+        try:
+            worst = self._worst(_State(0, (), (), (), (), ()), app)
+        except _UnboundedError:
+            return None
+        if math.isinf(worst):
+            return None if worst > 0 else 0
+        return int(worst)
+
+    def _worst(self, root: _State, app: _App) -> float:
+        # the most expensive successful path from root to the end of the program, found by
+        # a depth first search over the points execution forks at, memoized by state
+        memo: dict[_State, float] = {}
+        active: dict[int, int] = {}
+        # each frame is [state, cost of its linear run, states it forks to, next, best]
+        frames: list[list[Any]] = []
+
+        def open_(state: _State) -> float | None:
+            if (known := memo.get(state)) is not None:
+                return known
+            if active.get(state.pc, 0) >= self.loop_limit:
+                raise _UnboundedError
+            if len(memo) >= self.state_limit:
+                raise _UnboundedError
+            cost, forks, end = self._run(state, app)
+            if end is not None:
+                memo[state] = cost + end
+                return cost + end
+            active[state.pc] = active.get(state.pc, 0) + 1
+            frames.append([state, cost, forks, 0, -math.inf])
+            return None
+
+        value = open_(root)
+        while frames:
+            frame = frames[-1]
+            if value is not None:
+                frame[4] = max(frame[4], value)
+                value = None
+            if frame[3] < len(frame[2]):
+                frame[3] += 1
+                value = open_(frame[2][frame[3] - 1])
+                continue
+            frames.pop()
+            active[frame[0].pc] -= 1
+            value = frame[1] + frame[4]
+            memo[frame[0]] = value
+        assert value is not None
+        return value
+
+    def _run(self, state: _State, app: _App) -> tuple[int, list[_State], float | None]:
+        """
+        Execute from ``state`` until a branch on an unknown value or the end of the program,
+        returning the cost, the states the branch forks to, and the further cost of the path
+        if it ended (0 if it succeeded, -inf if it failed)
+        """
+        pc = state.pc
+        stack = list(state.stack)
+        scratch = dict(state.scratch)
+        frames = list(state.frames)
+        intc = state.intc
+        bytec = state.bytec
+        cost = 0
+
+        def fork(*targets: int) -> list[_State]:
+            return [
+                _State(
+                    target,
+                    tuple(stack),
+                    tuple(sorted(scratch.items())),
+                    tuple(frames),
+                    intc,
+                    bytec,
+                )
+                for target in targets
+            ]
+
+        def pop(n: int = 1) -> list[_Value]:
+            if len(stack) < n:
+                raise _PathFailedError
+            popped = stack[len(stack) - n :]
+            del stack[len(stack) - n :]
+            return popped
+
+        try:
+            while True:
+                if cost > MAX_OPS:
+                    # more than could ever be pooled
+                    raise _UnboundedError
+                if pc >= len(self.ops):
+                    return cost, [], 0.0 if stack and stack[-1] != 0 else -math.inf
+                op, imm = self.ops[pc]
+                pc += 1
+                cost += self._op_cost(op, imm, stack)
+
+                match op:
+                    case "intcblock":
+                        intc = self.ints[pc - 1]
+                    case "bytecblock":
+                        bytec = self.bytes[pc - 1]
+                    case "intc_0" | "intc_1" | "intc_2" | "intc_3":
+                        stack.append(intc[int(op[-1])])
+                    case "intc":
+                        stack.append(intc[int(imm[0])])
+                    case "bytec_0" | "bytec_1" | "bytec_2" | "bytec_3":
+                        stack.append(bytec[int(op[-1])])
+                    case "bytec":
+                        stack.append(bytec[int(imm[0])])
+                    case "int" | "pushint" | "pushints":
+                        stack.extend(self.ints[pc - 1])
+                    case "byte" | "pushbytes" | "pushbytess" | "addr" | "method":
+                        stack.extend(self.bytes[pc - 1])
+                    case "txn" if imm[0] == "NumAppArgs":
+                        stack.append(app.num_app_args)
+                    case "txn" if imm[0] == "OnCompletion":
+                        stack.append(app.on_completion)
+                    case "txna" if imm[0] == "ApplicationArgs":
+                        index = int(imm[1])
+                        if index >= app.num_app_args:
+                            raise _PathFailedError
+                        if index < len(app.app_args):
+                            stack.append(app.app_args[index])
+                        else:
+                            stack.append(app.selector if index == 0 else None)
+                    case "load":
+                        stack.append(scratch.get(int(imm[0])))
+                    case "store":
+                        (scratch[int(imm[0])],) = pop()
+                    case "dup":
+                        (a,) = pop()
+                        stack.extend((a, a))
+                    case "dup2":
+                        a, b = pop(2)
+                        stack.extend((a, b, a, b))
+                    case "dupn":
+                        (a,) = pop()
+                        stack.extend([a] * (int(imm[0]) + 1))
+                    case "popn":
+                        pop(int(imm[0]))
+                    case "swap":
+                        a, b = pop(2)
+                        stack.extend((b, a))
+                    case "dig":
+                        depth = int(imm[0])
+                        if depth >= len(stack):
+                            raise _PathFailedError
+                        stack.append(stack[-1 - depth])
+                    case "bury":
+                        depth = int(imm[0])
+                        (a,) = pop()
+                        if depth == 0 or depth > len(stack):
+                            raise _PathFailedError
+                        stack[-depth] = a
+                    case "cover":
+                        depth = int(imm[0])
+                        (a,) = pop()
+                        if depth > len(stack):
+                            raise _PathFailedError
+                        stack.insert(len(stack) - depth, a)
+                    case "uncover":
+                        depth = int(imm[0])
+                        if depth >= len(stack):
+                            raise _PathFailedError
+                        stack.append(stack.pop(-1 - depth))
+                    case "select":
+                        a, b, c = pop(3)
+                        stack.append(None if c is None else (b if c else a))
+                    case "callsub":
+                        frames.append((pc, len(stack), None))
+                        pc = self.labels[imm[0]]
+                    case "proto":
+                        if not frames:
+                            raise _PathFailedError
+                        ret, height, _ = frames[-1]
+                        frames[-1] = (ret, height, (int(imm[0]), int(imm[1])))
+                    case "frame_dig":
+                        stack.append(stack[self._frame_index(frames, stack, imm)])
+                    case "frame_bury":
+                        (a,) = pop()
+                        stack[self._frame_index(frames, stack, imm)] = a
+                    case "retsub":
+                        if not frames:
+                            raise _PathFailedError
+                        pc, height, proto = frames.pop()
+                        if proto is not None:
+                            args, returns = proto
+                            results = stack[len(stack) - returns :] if returns else []
+                            del stack[height - args :]
+                            stack.extend(results)
+                    case "b":
+                        pc = self.labels[imm[0]]
+                    case "bnz" | "bz":
+                        (a,) = pop()
+                        target = self.labels[imm[0]]
+                        if a is None:
+                            return cost, fork(pc, target), None
+                        if bool(a) == (op == "bnz"):
+                            pc = target
+                    case "switch":
+                        (a,) = pop()
+                        targets = [self.labels[label] for label in imm]
+                        if a is None:
+                            return cost, fork(pc, *targets), None
+                        if isinstance(a, int) and a < len(targets):
+                            pc = targets[a]
+                    case "match":
+                        *cases, a = pop(len(imm) + 1)
+                        targets = [self.labels[label] for label in imm]
+                        if a is None or None in cases:
+                            return cost, fork(pc, *targets), None
+                        if a in cases:
+                            pc = targets[cases.index(a)]
+                    case "assert":
+                        (a,) = pop()
+                        if a is not None and not a:
+                            raise _PathFailedError
+                    case "err":
+                        raise _PathFailedError
+                    case "return":
+                        (a,) = pop()
+                        return cost, [], -math.inf if a == 0 else 0.0
+                    case _:
+                        pops, pushes = _OP_EFFECTS.get(op, (None, None))
+                        if pops is None or pushes is None:
+                            raise ValueError(f"Unsupported op in cost analysis: {op}")
+                        operands = pop(pops)
+                        if pushes == 1 and None not in operands:
+                            stack.append(_evaluate(op, operands))
+                        else:
+                            stack.extend([None] * pushes)
+        except _PathFailedError:
+            return cost, [], -math.inf
+
+    @staticmethod
+    def _frame_index(frames: list[_Frame], stack: list[_Value], imm: list[str]) -> int:
+        if not frames or frames[-1][2] is None:
+            raise _PathFailedError
+        index = frames[-1][1] + int(imm[0])
+        if not 0 <= index < len(stack):
+            raise _PathFailedError
+        return index
+
+    @staticmethod
+    def _op_cost(op: str, imm: list[str], stack: list[_Value]) -> int:
+        if (dynamic := _DYNAMIC_COSTS.get(op)) is not None:
+            depth, by_group = dynamic
+            group = "" if "" in by_group or not imm else imm[0]
+            base, per_chunk, chunk = by_group.get(group) or max(by_group.values())
+            value = stack[-1 - depth] if depth < len(stack) else None
+            length = len(value) if isinstance(value, bytes) else _MAX_BYTES
+            return base + per_chunk * math.ceil(length / chunk)
+        match _OP_COSTS.get(op, 1):
+            case int(cost):
+                return cost
+            case costs:
+                return (
+                    costs.get(imm[0], max(costs.values()))
+                    if imm
+                    else max(costs.values())
+                )
+
+
+def _evaluate(op: str, args: list[_Value]) -> _Value:
+    """Evaluate ``op`` over known ``args``, returning None if it isn't modelled"""
+    match op, args:
+        case "+", [int(a), int(b)]:
+            result = a + b
+        case "-", [int(a), int(b)]:
+            result = a - b
+        case "*", [int(a), int(b)]:
+            result = a * b
+        case "/", [int(a), int(b)]:
+            if b == 0:
+                raise _PathFailedError
+            result = a // b
+        case "%", [int(a), int(b)]:
+            if b == 0:
+                raise _PathFailedError
+            result = a % b
+        case "<", [int(a), int(b)]:
+            result = int(a < b)
+        case ">", [int(a), int(b)]:
+            result = int(a > b)
+        case "<=", [int(a), int(b)]:
+            result = int(a <= b)
+        case ">=", [int(a), int(b)]:
+            result = int(a >= b)
+        case "&&", [int(a), int(b)]:
+            result = int(bool(a and b))
+        case "||", [int(a), int(b)]:
+            result = int(bool(a or b))
+        case "==", [a, b] if type(a) is type(b):
+            return int(a == b)
+        case "!=", [a, b] if type(a) is type(b):
+            return int(a != b)
+        case "!", [int(a)]:
+            return int(not a)
+        case "len", [bytes(a)]:
+            return len(a)
+        case "itob", [int(a)]:
+            return a.to_bytes(8, "big")
+        case "btoi", [bytes(a)]:
+            if len(a) > 8:
+                raise _PathFailedError
+            return int.from_bytes(a, "big")
+        case "concat", [bytes(a), bytes(b)]:
+            if len(a) + len(b) > _MAX_BYTES:
+                raise _PathFailedError
+            return a + b
+        case _:
+            return None
+    if not 0 <= result <= _UINT64_MAX:
+        raise _PathFailedError
+    return result
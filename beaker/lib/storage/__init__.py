@@ -1,11 +1,50 @@
-from .box_list import BoxList
-from .box_mapping import BoxMapping
-from .global_blob import GlobalBlob
-from .local_blob import LocalBlob
+from typing import TYPE_CHECKING
+
+from beaker._lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from .box_blob import BoxBlob
+    from .box_btree import BoxBTree
+    from .box_field import BoxField
+    from .box_hash_map import BoxHashMap
+    from .box_list import BoxList
+    from .box_log import BoxLog
+    from .box_mapping import BoxMapping
+    from .box_ring_buffer import BoxRingBuffer
+    from .global_blob import GlobalBlob
+    from .local_blob import LocalBlob
 
 __all__ = [
+    "BoxBlob",
+    "BoxBTree",
+    "BoxField",
+    "BoxHashMap",
     "BoxList",
+    "BoxLog",
     "BoxMapping",
+    "BoxRingBuffer",
     "GlobalBlob",
     "LocalBlob",
 ]
+
+# imported when first used, so that an app only imports the storage it uses
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "BoxBlob": ".box_blob",
+        "BoxBTree": ".box_btree",
+        "BoxField": ".box_field",
+        "BoxHashMap": ".box_hash_map",
+        "BoxList": ".box_list",
+        "BoxLog": ".box_log",
+        "BoxMapping": ".box_mapping",
+        "BoxRingBuffer": ".box_ring_buffer",
+        "GlobalBlob": ".global_blob",
+        "LocalBlob": ".local_blob",
+    },
+    globals(),
+)
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
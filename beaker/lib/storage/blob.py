@@ -1,12 +1,131 @@
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 
-from pyteal import Bytes, BytesZero, Expr, Extract, Int
+from pyteal import (
+    BitLen,
+    Break,
+    Bytes,
+    BytesNot,
+    BytesZero,
+    Concat,
+    Expr,
+    Extract,
+    ExtractUint64,
+    For,
+    GetByte,
+    If,
+    Int,
+    Len,
+    Replace,
+    ScratchVar,
+    Seq,
+    SetBit,
+    SetByte,
+    ShiftLeft,
+    ShiftRight,
+    Substring,
+    Suffix,
+    TealInputError,
+    TealType,
+    While,
+)
 
 blob_page_size = 128 - 1  # need 1 byte for key
 BLOB_PAGE_SIZE = Int(blob_page_size)
+BLOB_PAGE_BITS = Int(blob_page_size * 8)
 EMPTY_PAGE = BytesZero(BLOB_PAGE_SIZE)
 _MAX_KEY = 255
+# the most bytes a value on the stack may hold
+_MAX_BYTES = 4096
+
+
+class BlobStorage(ABC):
+    """The reads and writes of the bytes and bits of a blob, however it's stored"""
+
+    @abstractmethod
+    def read(self, start: Expr, stop: Expr) -> Expr:
+        """
+        Reads some bytes from the buffer
+
+        Args:
+            start: An ``Expr`` that represents the start index to read from. Should evaluate to ``uint64``.
+            stop: An ``Expr`` that represents the stop index to read until. Should evaluate to ``uint64``.
+        Returns:
+            The bytes read from the blob from start to stop
+        """
+        ...
+
+    @abstractmethod
+    def write(self, start: Expr, buff: Expr) -> Expr:
+        """
+        Writes the buffer to the blob
+
+        Args:
+            start: An ``Expr`` that represents where to start writing. Should evaluate to ``uint64``.
+            buff: An ``Expr`` that represents the bytes to write. Should evaluate to ``bytes``.
+
+        """
+        ...
+
+    @abstractmethod
+    def read_byte(self, idx: Expr) -> Expr:
+        """
+        Reads a single byte from the given index
+
+        Args:
+            idx: An ``Expr`` that represents the index into the blob to read the byte from. Should evaluate to ``uint64``.
+
+        Returns:
+            A single byte as a ``uint64``
+
+        """
+        ...
+
+    @abstractmethod
+    def write_byte(self, idx: Expr, byte: Expr) -> Expr:
+        """
+        Writes a single byte to the given index
+
+        Args:
+            idx: An ``Expr`` that represents the index to write the byte to. Should evaluate to ``uint64``.
+            byte: An ``Expr`` That represents the index to write the byte to. Should evaluate to ``uint64``.
+
+        """
+        ...
+
+    @abstractmethod
+    def read_all(self) -> Expr:
+        """Reads the whole blob, which must fit in a single value"""
+        ...
+
+    @abstractmethod
+    def get_bit(self, idx: Expr) -> Expr:
+        """Gets a single bit, counting from the highest bit of the first byte"""
+        ...
+
+    @abstractmethod
+    def set_bit(self, idx: Expr, value: Expr = Int(1)) -> Expr:  # noqa: B008
+        """Sets a single bit, to 1 by default"""
+        ...
+
+    def clear_bit(self, idx: Expr) -> Expr:
+        """Clears a single bit"""
+        return self.set_bit(idx, Int(0))
+
+    @abstractmethod
+    def popcount(self, start: Expr, stop: Expr) -> Expr:
+        """Counts the bits set from the bit index start until stop"""
+        ...
+
+    @abstractmethod
+    def find_first_set(self) -> Expr:
+        """Finds the index of the first bit set, or the number of bits if none are"""
+        ...
+
+    @abstractmethod
+    def find_first_zero(self) -> Expr:
+        """Finds the index of the first bit not set, or the number of bits if all are"""
+        ...
 
 
 class Blob(ABC):
@@ -51,6 +170,269 @@ class Blob(ABC):
     def _offset_for_idx(idx: Expr) -> Expr:
         return idx % BLOB_PAGE_SIZE
 
+    def _read_pages(
+        self, get: Callable[[Expr], Expr], bstart: Expr, bstop: Expr
+    ) -> Expr:
+        """
+        Read the bytes from bstart to bstop, getting each page they're in once: just the
+        one if they're in a single page, else the end of the first, the whole of any in
+        between and the start of the last. As for any value, at most 4096 bytes may be read.
+        """
+        start_key = ScratchVar(TealType.uint64)
+        stop_key = ScratchVar(TealType.uint64)
+        key = ScratchVar(TealType.uint64)
+        buff = ScratchVar(TealType.bytes)
+        return Seq(
+            start_key.store(self._key_idx(bstart)),
+            stop_key.store(self._key_idx(bstop)),
+            If(start_key.load() == stop_key.load())
+            .Then(
+                Substring(
+                    get(self._key(start_key.load())),
+                    self._offset_for_idx(bstart),
+                    self._offset_for_idx(bstop),
+                )
+            )
+            .Else(
+                buff.store(
+                    Suffix(
+                        get(self._key(start_key.load())), self._offset_for_idx(bstart)
+                    )
+                ),
+                For(
+                    key.store(start_key.load() + Int(1)),
+                    key.load() < stop_key.load(),
+                    key.store(key.load() + Int(1)),
+                ).Do(buff.store(Concat(buff.load(), get(self._key(key.load()))))),
+                # the start of the last, unless bstop is the end of a page, which may be
+                # the end of the blob
+                If(self._offset_for_idx(bstop)).Then(
+                    buff.store(
+                        Concat(
+                            buff.load(),
+                            Substring(
+                                get(self._key(stop_key.load())),
+                                Int(0),
+                                self._offset_for_idx(bstop),
+                            ),
+                        )
+                    )
+                ),
+                buff.load(),
+            ),
+        )
+
+    def _write_pages(
+        self,
+        get: Callable[[Expr], Expr],
+        put: Callable[[Expr, Expr], Expr],
+        bstart: Expr,
+        buff: Expr,
+    ) -> Expr:
+        """
+        Write buff from bstart, getting only the pages it partly overwrites, each once: the
+        first and last, while any in between are put from buff directly.
+        """
+        start_key = ScratchVar(TealType.uint64)
+        stop = ScratchVar(TealType.uint64)
+        key = ScratchVar(TealType.uint64)
+        written = ScratchVar(TealType.uint64)
+        return Seq(
+            start_key.store(self._key_idx(bstart)),
+            stop.store(bstart + Len(buff)),
+            If(start_key.load() == self._key_idx(stop.load()))
+            .Then(
+                put(
+                    self._key(start_key.load()),
+                    Replace(
+                        get(self._key(start_key.load())),
+                        self._offset_for_idx(bstart),
+                        buff,
+                    ),
+                )
+            )
+            .Else(
+                written.store(BLOB_PAGE_SIZE - self._offset_for_idx(bstart)),
+                put(
+                    self._key(start_key.load()),
+                    Replace(
+                        get(self._key(start_key.load())),
+                        self._offset_for_idx(bstart),
+                        Extract(buff, Int(0), written.load()),
+                    ),
+                ),
+                For(
+                    key.store(start_key.load() + Int(1)),
+                    key.load() < self._key_idx(stop.load()),
+                    key.store(key.load() + Int(1)),
+                ).Do(
+                    put(
+                        self._key(key.load()),
+                        Extract(buff, written.load(), BLOB_PAGE_SIZE),
+                    ),
+                    written.store(written.load() + BLOB_PAGE_SIZE),
+                ),
+                # the rest, unless buff ends at the end of a page
+                If(self._offset_for_idx(stop.load())).Then(
+                    put(
+                        self._key(key.load()),
+                        Replace(
+                            get(self._key(key.load())),
+                            Int(0),
+                            Suffix(buff, written.load()),
+                        ),
+                    )
+                ),
+            ),
+        )
+
+    def _read_all(self, get: Callable[[Expr], Expr]) -> Expr:
+        if self._max_bytes > _MAX_BYTES:
+            raise TealInputError(
+                f"A blob of {self._max_bytes} bytes can't be read at once, "
+                f"the most bytes a value may hold is {_MAX_BYTES}"
+            )
+        pages = [get(Bytes(key)) for key in self.byte_keys]
+        return Concat(*pages) if len(pages) > 1 else pages[0]
+
+    @staticmethod
+    def _bit_key_idx(idx: Expr) -> Expr:
+        return idx / BLOB_PAGE_BITS
+
+    @staticmethod
+    def _bit_offset_for_idx(idx: Expr) -> Expr:
+        return idx % BLOB_PAGE_BITS
+
+    def _set_bit(
+        self,
+        get: Callable[[Expr], Expr],
+        put: Callable[[Expr, Expr], Expr],
+        idx: Expr,
+        value: Expr,
+    ) -> Expr:
+        key = ScratchVar(TealType.bytes)
+        return Seq(
+            key.store(self._key(self._bit_key_idx(idx))),
+            put(
+                key.load(),
+                SetBit(get(key.load()), self._bit_offset_for_idx(idx), value),
+            ),
+        )
+
+    @staticmethod
+    def _popcount(read: Callable[[Expr, Expr], Expr], start: Expr, stop: Expr) -> Expr:
+        """
+        Count the bits set from bit start to bit stop: read the bytes they're in, at most
+        4096 at a time as that's the most a value may hold, clear the bits either side of
+        the range, and count those set in each 8 bytes in parallel.
+        """
+        chunk_start = ScratchVar(TealType.uint64)
+        chunk_stop = ScratchVar(TealType.uint64)
+        buff = ScratchVar(TealType.bytes)
+        count = ScratchVar(TealType.uint64)
+        idx = ScratchVar(TealType.uint64)
+        word = ScratchVar(TealType.uint64)
+        last = Len(buff.load()) - Int(1)
+        return Seq(
+            count.store(Int(0)),
+            chunk_start.store(start),
+            While(chunk_start.load() < stop).Do(
+                chunk_stop.store(
+                    (chunk_start.load() / Int(8) + Int(_MAX_BYTES)) * Int(8)
+                ),
+                If(stop < chunk_stop.load()).Then(chunk_stop.store(stop)),
+                buff.store(
+                    read(
+                        chunk_start.load() / Int(8),
+                        (chunk_stop.load() + Int(7)) / Int(8),
+                    )
+                ),
+                buff.store(
+                    SetByte(
+                        buff.load(),
+                        Int(0),
+                        GetByte(buff.load(), Int(0))
+                        & ShiftRight(Int(0xFF), chunk_start.load() % Int(8)),
+                    )
+                ),
+                buff.store(
+                    SetByte(
+                        buff.load(),
+                        last,
+                        GetByte(buff.load(), last)
+                        & (
+                            Int(0x100)
+                            - ShiftLeft(
+                                Int(1), (Int(8) - chunk_stop.load() % Int(8)) % Int(8)
+                            )
+                        ),
+                    )
+                ),
+                buff.store(
+                    Concat(
+                        buff.load(),
+                        BytesZero((Int(8) - Len(buff.load()) % Int(8)) % Int(8)),
+                    )
+                ),
+                For(
+                    idx.store(Int(0)),
+                    idx.load() < Len(buff.load()),
+                    idx.store(idx.load() + Int(8)),
+                ).Do(
+                    word.store(ExtractUint64(buff.load(), idx.load())),
+                    word.store(
+                        word.load()
+                        - (ShiftRight(word.load(), Int(1)) & Int(0x5555555555555555))
+                    ),
+                    word.store(
+                        (word.load() & Int(0x3333333333333333))
+                        + (ShiftRight(word.load(), Int(2)) & Int(0x3333333333333333))
+                    ),
+                    word.store(
+                        (word.load() + ShiftRight(word.load(), Int(4)))
+                        & Int(0x0F0F0F0F0F0F0F0F)
+                    ),
+                    *(
+                        word.store(word.load() + ShiftRight(word.load(), Int(shift)))
+                        for shift in (8, 16, 32)
+                    ),
+                    count.store(count.load() + (word.load() & Int(0x7F))),
+                ),
+                chunk_start.store(chunk_stop.load()),
+            ),
+            count.load(),
+        )
+
+    def _find_first(self, get: Callable[[Expr], Expr], *, value: int) -> Expr:
+        """
+        Find the first bit with value, using bitlen to find the first bit set in each page
+        (after inverting it with b~ to find the first zero), or the number of bits in the
+        blob if there isn't one.
+        """
+        key = ScratchVar(TealType.uint64)
+        page = ScratchVar(TealType.bytes)
+        found = ScratchVar(TealType.uint64)
+        return Seq(
+            found.store(Int(self._max_bits)),
+            For(
+                key.store(Int(0)),
+                key.load() < self.max_keys,
+                key.store(key.load() + Int(1)),
+            ).Do(
+                page.store(get(self._key(key.load()))),
+                *([] if value else [page.store(BytesNot(page.load()))]),
+                If(BitLen(page.load())).Then(
+                    found.store(
+                        key.load() * BLOB_PAGE_BITS
+                        + BLOB_PAGE_BITS
+                        - BitLen(page.load())
+                    ),
+                    Break(),
+                ),
+            ),
+            found.load(),
+        )
+
     @abstractmethod
     def zero(self) -> Expr: ...
 
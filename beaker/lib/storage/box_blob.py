@@ -0,0 +1,219 @@
+from pyteal import (
+    Assert,
+    BitLen,
+    BoxCreate,
+    BoxDelete,
+    BoxExtract,
+    BoxGet,
+    BoxReplace,
+    Break,
+    Bytes,
+    BytesNot,
+    Expr,
+    Extract,
+    For,
+    GetBit,
+    GetByte,
+    If,
+    Int,
+    Itob,
+    Len,
+    Pop,
+    ScratchVar,
+    Seq,
+    SetBit,
+    Subroutine,
+    TealInputError,
+    TealType,
+)
+
+from beaker.consts import MAX_BOX_SIZE
+from beaker.lib.storage.blob import _MAX_BYTES, Blob, BlobStorage
+
+
+class BoxBlob(BlobStorage):
+    """BoxBlob stores a blob of bytes in a single box, named as the class attribute unless an overriding name is provided"""
+
+    def __init__(self, size: int = MAX_BOX_SIZE, name: str | None = None):
+        """Initialize a BoxBlob with the size of its box
+
+        Args:
+            size: The number of bytes in the blob, at most the max size of a box.
+            name (Optional): The name of the box, the name of the class attribute by default.
+        """
+        if not 0 < size <= MAX_BOX_SIZE:
+            raise ValueError(f"size must be between 1 and {MAX_BOX_SIZE} bytes")
+
+        # Will be set later if its part of an Application
+        self.name: Expr | None = None
+        if name is not None:
+            self.name = Bytes(name)
+
+        self._max_bytes = size
+        self.max_bytes = Int(self._max_bytes)
+
+        @Subroutine(TealType.uint64)
+        def get_bit_impl(idx: Expr) -> Expr:
+            return GetBit(
+                BoxExtract(self._box_name(), idx / Int(8), Int(1)), idx % Int(8)
+            )
+
+        self._get_bit_impl = get_bit_impl
+
+        @Subroutine(TealType.none)
+        def set_bit_impl(idx: Expr, value: Expr) -> Expr:
+            return BoxReplace(
+                self._box_name(),
+                idx / Int(8),
+                SetBit(
+                    BoxExtract(self._box_name(), idx / Int(8), Int(1)),
+                    idx % Int(8),
+                    value,
+                ),
+            )
+
+        self._set_bit_impl = set_bit_impl
+
+        @Subroutine(TealType.uint64)
+        def popcount_impl(start: Expr, stop: Expr) -> Expr:
+            return Blob._popcount(self.read, start, stop)
+
+        self._popcount_impl = popcount_impl
+
+        @Subroutine(TealType.uint64)
+        def find_first_set_impl() -> Expr:
+            return self._find_first(value=1)
+
+        self._find_first_set_impl = find_first_set_impl
+
+        @Subroutine(TealType.uint64)
+        def find_first_zero_impl() -> Expr:
+            return self._find_first(value=0)
+
+        self._find_first_zero_impl = find_first_zero_impl
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        if self.name is None:
+            self.name = Bytes(name)
+
+    def _box_name(self) -> Expr:
+        assert self.name is not None
+        return self.name
+
+    def create(self) -> Expr:
+        """creates the box for the blob, filled with zero bytes"""
+        return BoxCreate(self._box_name(), self.max_bytes)
+
+    def zero(self) -> Expr:
+        """sets every byte of the blob to zero, creating the box if it doesn't exist"""
+        return Seq(
+            Pop(BoxDelete(self._box_name())),
+            Pop(BoxCreate(self._box_name(), self.max_bytes)),
+        )
+
+    def read(self, start: Expr, stop: Expr) -> Expr:
+        """
+        read the bytes between start and stop from the blob
+        """
+        return BoxExtract(self._box_name(), start, stop - start)
+
+    def write(self, start: Expr, buff: Expr) -> Expr:
+        """
+        write buff to the blob from start
+        """
+        return BoxReplace(self._box_name(), start, buff)
+
+    def read_byte(self, idx: Expr) -> Expr:
+        """
+        read a single byte from the blob by index, as a uint64
+        """
+        return GetByte(BoxExtract(self._box_name(), idx, Int(1)), Int(0))
+
+    def write_byte(self, idx: Expr, byte: Expr) -> Expr:
+        """
+        write a single byte, given as a uint64, to the blob by index
+        """
+        return BoxReplace(self._box_name(), idx, Extract(Itob(byte), Int(7), Int(1)))
+
+    def read_all(self) -> Expr:
+        """
+        read the whole blob, if it's small enough to be held in one value
+        """
+        if self._max_bytes > _MAX_BYTES:
+            raise TealInputError(
+                f"A blob of {self._max_bytes} bytes can't be read at once, "
+                f"the most bytes a value may hold is {_MAX_BYTES}"
+            )
+        return Seq(
+            maybe := BoxGet(self._box_name()), Assert(maybe.hasValue()), maybe.value()
+        )
+
+    def get_bit(self, idx: Expr) -> Expr:
+        """
+        get a single bit from the blob by index, counting from the highest bit of the first byte
+        """
+        return self._get_bit_impl(idx)
+
+    def set_bit(self, idx: Expr, value: Expr = Int(1)) -> Expr:  # noqa: B008
+        """
+        set a single bit of the blob by index, to 1 by default
+        """
+        return self._set_bit_impl(idx, value)
+
+    def popcount(self, start: Expr, stop: Expr) -> Expr:
+        """
+        count the bits set between the bit indexes start and stop of the blob
+        """
+        return self._popcount_impl(start, stop)
+
+    def find_first_set(self) -> Expr:
+        """
+        find the index of the first bit set in the blob, or the number of bits in the blob
+        if none are
+        """
+        return self._find_first_set_impl()
+
+    def find_first_zero(self) -> Expr:
+        """
+        find the index of the first bit not set in the blob, or the number of bits in the
+        blob if all are
+        """
+        return self._find_first_zero_impl()
+
+    def _find_first(self, *, value: int) -> Expr:
+        """
+        As Blob._find_first, but reading the box in chunks of as many bytes as a value may
+        hold rather than by page
+        """
+        start = ScratchVar(TealType.uint64)
+        chunk = ScratchVar(TealType.bytes)
+        found = ScratchVar(TealType.uint64)
+        chunk_size = min(self._max_bytes, _MAX_BYTES)
+        return Seq(
+            found.store(Int(self._max_bytes * 8)),
+            For(
+                start.store(Int(0)),
+                start.load() < self.max_bytes,
+                start.store(start.load() + Int(chunk_size)),
+            ).Do(
+                chunk.store(
+                    BoxExtract(
+                        self._box_name(),
+                        start.load(),
+                        # the last chunk may be shorter
+                        If(start.load() + Int(chunk_size) > self.max_bytes)
+                        .Then(self.max_bytes - start.load())
+                        .Else(Int(chunk_size)),
+                    )
+                ),
+                *([] if value else [chunk.store(BytesNot(chunk.load()))]),
+                If(BitLen(chunk.load())).Then(
+                    found.store(
+                        (start.load() + Len(chunk.load())) * Int(8)
+                        - BitLen(chunk.load())
+                    ),
+                    Break(),
+                ),
+            ),
+            found.load(),
+        )
@@ -0,0 +1,498 @@
+from pyteal import (
+    And,
+    Assert,
+    BoxCreate,
+    BoxExtract,
+    BoxPut,
+    BoxReplace,
+    Btoi,
+    Bytes,
+    Concat,
+    Expr,
+    Extract,
+    ExtractUint16,
+    ExtractUint64,
+    GetByte,
+    If,
+    Int,
+    Itob,
+    Len,
+    Not,
+    ScratchVar,
+    Seq,
+    Subroutine,
+    Suffix,
+    TealType,
+    While,
+    abi,
+)
+
+from beaker.consts import MAX_BOX_SIZE
+from beaker.lib.math import Min
+
+# a node is a header of whether it's a leaf, its number of keys (a uint16) and the id of
+# the next leaf, then its keys and, if it's not a leaf, the ids of its children
+NODE_LEAF = 0
+NODE_COUNT = 1
+NODE_NEXT = 3
+NODE_KEYS = 11
+# the meta box holds the id of the root, the next id to give a node and the number of keys
+META_ROOT = 0
+META_NEXT_ID = 8
+META_SIZE = 16
+
+
+class BoxBTree:
+    """
+    BoxBTree is a sorted index of uint64 keys, held in a B+ tree with a node in each box. The boxes are named
+    after the class attribute unless an overriding name is provided: a meta box with the name itself, and
+    a box per node with the name followed by the node's id as 8 bytes.
+
+    Finding, inserting and deleting a key read one node at each level of the tree, and a range scan
+    then follows the links between leaves. Deleting a key doesn't merge the nodes left with few keys,
+    so the height of the tree is that for the most keys it has held.
+    """
+
+    def __init__(self, order: int = 62, name: str | None = None):
+        """Initialize a BoxBTree with the most keys a node holds
+
+        Args:
+            order (Optional): The most keys a node holds, by default as many as fit a box read with one box reference.
+            name (Optional): The name of the meta box and prefix of the node boxes, the name of the class attribute by default.
+        """
+        if order < 3:
+            raise ValueError("order must be at least 3")
+        node_size = NODE_KEYS + 8 * order + 8 * (order + 1)
+        if node_size > MAX_BOX_SIZE:
+            raise ValueError(f"a node of order {order} is larger than a box")
+
+        # Will be set later if its part of an Application
+        self._name = name
+
+        self._order = order
+        self.order = Int(self._order)
+        self._node_size = node_size
+        self.node_size = Int(self._node_size)
+        self._children = NODE_KEYS + 8 * order
+
+        @Subroutine(TealType.uint64)
+        def search_impl(keys: Expr, key: Expr, after: Expr) -> Expr:
+            # the first index of the sorted keys after key if after is set, else not before it
+            lo = ScratchVar(TealType.uint64)
+            hi = ScratchVar(TealType.uint64)
+            mid = ScratchVar(TealType.uint64)
+            probe = ScratchVar(TealType.uint64)
+            return Seq(
+                lo.store(Int(0)),
+                hi.store(Len(keys) / Int(8)),
+                While(lo.load() < hi.load()).Do(
+                    mid.store((lo.load() + hi.load()) / Int(2)),
+                    probe.store(ExtractUint64(keys, mid.load() * Int(8))),
+                    If(If(after, probe.load() <= key, probe.load() < key))
+                    .Then(lo.store(mid.load() + Int(1)))
+                    .Else(hi.store(mid.load())),
+                ),
+                lo.load(),
+            )
+
+        self._search_impl = search_impl
+
+        @Subroutine(TealType.uint64)
+        def alloc_impl() -> Expr:
+            node_id = ScratchVar(TealType.uint64)
+            return Seq(
+                node_id.store(
+                    Btoi(BoxExtract(self._meta(), Int(META_NEXT_ID), Int(8)))
+                ),
+                BoxReplace(
+                    self._meta(), Int(META_NEXT_ID), Itob(node_id.load() + Int(1))
+                ),
+                Assert(BoxCreate(self._node(node_id.load()), self.node_size)),
+                node_id.load(),
+            )
+
+        self._alloc_impl = alloc_impl
+
+        @Subroutine(TealType.none)
+        def split_impl(parent_id: Expr, idx: Expr, child_id: Expr) -> Expr:
+            # split the full child at idx of parent, which isn't full, in two halves,
+            # the new right one after it in parent
+            half = order // 2
+            parent = ScratchVar(TealType.bytes)
+            child = ScratchVar(TealType.bytes)
+            new_id = ScratchVar(TealType.uint64)
+            new = ScratchVar(TealType.bytes)
+            header = ScratchVar(TealType.bytes)
+            count = ScratchVar(TealType.uint64)
+            return Seq(
+                parent.store(self._node(parent_id)),
+                child.store(self._node(child_id)),
+                new_id.store(alloc_impl()),
+                new.store(self._node(new_id.load())),
+                header.store(BoxExtract(child.load(), Int(0), Int(NODE_KEYS))),
+                If(GetByte(header.load(), Int(NODE_LEAF)))
+                .Then(
+                    # the right leaf takes the upper keys, and is linked between the two
+                    BoxReplace(
+                        new.load(),
+                        Int(0),
+                        Concat(
+                            Bytes(b"\x01" + (order - half).to_bytes(2, "big")),
+                            Extract(header.load(), Int(NODE_NEXT), Int(8)),
+                        ),
+                    ),
+                    self._move(child.load(), new.load(), NODE_KEYS, half, order - half),
+                    BoxReplace(
+                        child.load(),
+                        Int(NODE_COUNT),
+                        Concat(Bytes(half.to_bytes(2, "big")), Itob(new_id.load())),
+                    ),
+                )
+                .Else(
+                    # the middle key moves up to parent, the right node takes those after it
+                    BoxReplace(
+                        new.load(),
+                        Int(0),
+                        Bytes(b"\x00" + (order - half - 1).to_bytes(2, "big")),
+                    ),
+                    self._move(
+                        child.load(), new.load(), NODE_KEYS, half + 1, order - half - 1
+                    ),
+                    self._move(
+                        child.load(), new.load(), self._children, half + 1, order - half
+                    ),
+                    BoxReplace(
+                        child.load(),
+                        Int(NODE_COUNT),
+                        Bytes(half.to_bytes(2, "big")),
+                    ),
+                ),
+                count.store(self._count(parent.load())),
+                self._open(parent.load(), NODE_KEYS, idx, count.load()),
+                BoxReplace(
+                    parent.load(),
+                    self._slot(NODE_KEYS, idx),
+                    BoxExtract(child.load(), self._slot(NODE_KEYS, Int(half)), Int(8)),
+                ),
+                self._open(
+                    parent.load(), self._children, idx + Int(1), count.load() + Int(1)
+                ),
+                BoxReplace(
+                    parent.load(),
+                    self._slot(self._children, idx + Int(1)),
+                    Itob(new_id.load()),
+                ),
+                self._set_count(parent.load(), count.load() + Int(1)),
+            )
+
+        self._split_impl = split_impl
+
+        @Subroutine(TealType.uint64)
+        def find_leaf_impl(key: Expr) -> Expr:
+            node_id = ScratchVar(TealType.uint64)
+            node = ScratchVar(TealType.bytes)
+            return Seq(
+                node_id.store(self._root()),
+                node.store(self._node(node_id.load())),
+                While(Not(self._is_leaf(node.load()))).Do(
+                    node_id.store(
+                        self._child_at(
+                            node.load(),
+                            search_impl(self._keys(node.load()), key, Int(1)),
+                        )
+                    ),
+                    node.store(self._node(node_id.load())),
+                ),
+                node_id.load(),
+            )
+
+        self._find_leaf_impl = find_leaf_impl
+
+        @Subroutine(TealType.uint64)
+        def insert_impl(key: Expr) -> Expr:
+            root_id = ScratchVar(TealType.uint64)
+            node_id = ScratchVar(TealType.uint64)
+            node = ScratchVar(TealType.bytes)
+            child_id = ScratchVar(TealType.uint64)
+            idx = ScratchVar(TealType.uint64)
+            keys = ScratchVar(TealType.bytes)
+            inserted = ScratchVar(TealType.uint64)
+            return Seq(
+                # split full nodes on the way down, so there's room for a key from below
+                root_id.store(self._root()),
+                If(self._count(self._node(root_id.load())) == self.order).Then(
+                    node_id.store(alloc_impl()),
+                    BoxReplace(
+                        self._node(node_id.load()),
+                        Int(self._children),
+                        Itob(root_id.load()),
+                    ),
+                    split_impl(node_id.load(), Int(0), root_id.load()),
+                    BoxReplace(self._meta(), Int(META_ROOT), Itob(node_id.load())),
+                    root_id.store(node_id.load()),
+                ),
+                node_id.store(root_id.load()),
+                node.store(self._node(node_id.load())),
+                While(Not(self._is_leaf(node.load()))).Do(
+                    idx.store(search_impl(self._keys(node.load()), key, Int(1))),
+                    child_id.store(self._child_at(node.load(), idx.load())),
+                    If(self._count(self._node(child_id.load())) == self.order).Then(
+                        split_impl(node_id.load(), idx.load(), child_id.load()),
+                        If(key >= self._key_at(node.load(), idx.load())).Then(
+                            child_id.store(
+                                self._child_at(node.load(), idx.load() + Int(1))
+                            )
+                        ),
+                    ),
+                    node_id.store(child_id.load()),
+                    node.store(self._node(node_id.load())),
+                ),
+                keys.store(self._keys(node.load())),
+                idx.store(search_impl(keys.load(), key, Int(0))),
+                inserted.store(Int(1)),
+                If(idx.load() < Len(keys.load()) / Int(8)).Then(
+                    inserted.store(
+                        ExtractUint64(keys.load(), idx.load() * Int(8)) != key
+                    )
+                ),
+                If(inserted.load()).Then(
+                    self._open(
+                        node.load(), NODE_KEYS, idx.load(), Len(keys.load()) / Int(8)
+                    ),
+                    BoxReplace(
+                        node.load(), self._slot(NODE_KEYS, idx.load()), Itob(key)
+                    ),
+                    self._set_count(node.load(), Len(keys.load()) / Int(8) + Int(1)),
+                    self._change_size(added=True),
+                ),
+                inserted.load(),
+            )
+
+        self._insert_impl = insert_impl
+
+        @Subroutine(TealType.uint64)
+        def delete_impl(key: Expr) -> Expr:
+            node = ScratchVar(TealType.bytes)
+            keys = ScratchVar(TealType.bytes)
+            idx = ScratchVar(TealType.uint64)
+            deleted = ScratchVar(TealType.uint64)
+            count = Len(keys.load()) / Int(8)
+            return Seq(
+                node.store(self._node(find_leaf_impl(key))),
+                keys.store(self._keys(node.load())),
+                idx.store(search_impl(keys.load(), key, Int(0))),
+                deleted.store(Int(0)),
+                If(idx.load() < count).Then(
+                    deleted.store(
+                        ExtractUint64(keys.load(), idx.load() * Int(8)) == key
+                    )
+                ),
+                If(deleted.load()).Then(
+                    BoxReplace(
+                        node.load(),
+                        self._slot(NODE_KEYS, idx.load()),
+                        Suffix(keys.load(), (idx.load() + Int(1)) * Int(8)),
+                    ),
+                    self._set_count(node.load(), count - Int(1)),
+                    self._change_size(added=False),
+                ),
+                deleted.load(),
+            )
+
+        self._delete_impl = delete_impl
+
+        @Subroutine(TealType.uint64)
+        def contains_impl(key: Expr) -> Expr:
+            keys = ScratchVar(TealType.bytes)
+            idx = ScratchVar(TealType.uint64)
+            found = ScratchVar(TealType.uint64)
+            return Seq(
+                keys.store(self._keys(self._node(find_leaf_impl(key)))),
+                idx.store(search_impl(keys.load(), key, Int(0))),
+                found.store(Int(0)),
+                If(idx.load() < Len(keys.load()) / Int(8)).Then(
+                    found.store(ExtractUint64(keys.load(), idx.load() * Int(8)) == key)
+                ),
+                found.load(),
+            )
+
+        self._contains_impl = contains_impl
+
+        @Subroutine(TealType.bytes)
+        def scan_impl(start: Expr, limit: Expr) -> Expr:
+            node_id = ScratchVar(TealType.uint64)
+            node = ScratchVar(TealType.bytes)
+            header = ScratchVar(TealType.bytes)
+            idx = ScratchVar(TealType.uint64)
+            take = ScratchVar(TealType.uint64)
+            keys = ScratchVar(TealType.bytes)
+            return Seq(
+                node_id.store(find_leaf_impl(start)),
+                idx.store(
+                    search_impl(self._keys(self._node(node_id.load())), start, Int(0))
+                ),
+                keys.store(Bytes("")),
+                While(And(node_id.load(), Len(keys.load()) < limit * Int(8))).Do(
+                    node.store(self._node(node_id.load())),
+                    header.store(BoxExtract(node.load(), Int(0), Int(NODE_KEYS))),
+                    take.store(
+                        Min(
+                            ExtractUint16(header.load(), Int(NODE_COUNT)) - idx.load(),
+                            limit - Len(keys.load()) / Int(8),
+                        )
+                    ),
+                    keys.store(
+                        Concat(
+                            keys.load(),
+                            BoxExtract(
+                                node.load(),
+                                self._slot(NODE_KEYS, idx.load()),
+                                take.load() * Int(8),
+                            ),
+                        )
+                    ),
+                    idx.store(Int(0)),
+                    node_id.store(ExtractUint64(header.load(), Int(NODE_NEXT))),
+                ),
+                keys.load(),
+            )
+
+        self._scan_impl = scan_impl
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        if self._name is None:
+            self._name = name
+
+    def _meta(self) -> Expr:
+        return Bytes(self.meta_box_name())
+
+    def _node(self, node_id: Expr) -> Expr:
+        return Concat(self._meta(), Itob(node_id))
+
+    def _root(self) -> Expr:
+        return Btoi(BoxExtract(self._meta(), Int(META_ROOT), Int(8)))
+
+    @staticmethod
+    def _slot(base: int, idx: Expr) -> Expr:
+        return Int(base) + idx * Int(8)
+
+    @staticmethod
+    def _count(node: Expr) -> Expr:
+        return ExtractUint16(BoxExtract(node, Int(NODE_COUNT), Int(2)), Int(0))
+
+    @staticmethod
+    def _is_leaf(node: Expr) -> Expr:
+        return GetByte(BoxExtract(node, Int(NODE_LEAF), Int(1)), Int(0))
+
+    def _keys(self, node: Expr) -> Expr:
+        return BoxExtract(node, Int(NODE_KEYS), self._count(node) * Int(8))
+
+    def _key_at(self, node: Expr, idx: Expr) -> Expr:
+        return Btoi(BoxExtract(node, self._slot(NODE_KEYS, idx), Int(8)))
+
+    def _child_at(self, node: Expr, idx: Expr) -> Expr:
+        return Btoi(BoxExtract(node, self._slot(self._children, idx), Int(8)))
+
+    @staticmethod
+    def _set_count(node: Expr, count: Expr) -> Expr:
+        return BoxReplace(node, Int(NODE_COUNT), Suffix(Itob(count), Int(6)))
+
+    def _open(self, node: Expr, base: int, idx: Expr, count: Expr) -> Expr:
+        """move the slots from idx until count along one, to make room at idx"""
+        return BoxReplace(
+            node,
+            self._slot(base, idx + Int(1)),
+            BoxExtract(node, self._slot(base, idx), (count - idx) * Int(8)),
+        )
+
+    @staticmethod
+    def _move(src: Expr, dst: Expr, base: int, start: int, count: int) -> Expr:
+        """copy count slots of src from start to the start of dst"""
+        return BoxReplace(
+            dst, Int(base), BoxExtract(src, Int(base + start * 8), Int(count * 8))
+        )
+
+    def _change_size(self, *, added: bool) -> Expr:
+        size = self.size()
+        return BoxReplace(
+            self._meta(),
+            Int(META_SIZE),
+            Itob(size + Int(1) if added else size - Int(1)),
+        )
+
+    def create(self) -> Expr:
+        """creates the meta box and the box of the root, an empty leaf"""
+        return Seq(
+            # the root is the first node, and there are no keys
+            BoxPut(self._meta(), Bytes(_meta_bytes(root=1, next_id=2, size=0))),
+            Assert(BoxCreate(self._node(Int(1)), self.node_size)),
+            BoxReplace(self._node(Int(1)), Int(NODE_LEAF), Bytes(b"\x01")),
+        )
+
+    def size(self) -> Expr:
+        """get the number of keys in the index"""
+        return Btoi(BoxExtract(self._meta(), Int(META_SIZE), Int(8)))
+
+    def insert(self, key: Expr) -> Expr:
+        """add a key to the index, returning 1 if it was added or 0 if it was already there
+
+        Args:
+            key: The uint64 key to add
+        """
+        return self._insert_impl(key)
+
+    def delete(self, key: Expr) -> Expr:
+        """remove a key from the index, returning 1 if it was removed or 0 if it wasn't there
+
+        Args:
+            key: The uint64 key to remove
+        """
+        return self._delete_impl(key)
+
+    def contains(self, key: Expr) -> Expr:
+        """check whether a key is in the index
+
+        Args:
+            key: The uint64 key to look for
+        """
+        return self._contains_impl(key)
+
+    def scan(self, start: Expr, limit: Expr) -> Expr:
+        """get the keys from start onwards in order, at most limit of them, as encoded uint64s
+
+        Args:
+            start: The least key to get
+            limit: The most keys to get
+        """
+        return self._scan_impl(start, limit)
+
+    def store_scan_into(
+        self, start: Expr, limit: Expr, output: abi.DynamicArray[abi.Uint64]
+    ) -> Expr:
+        """decode the keys from start onwards in order, at most limit of them, into a dynamic array
+
+        Args:
+            start: The least key to get
+            limit: The most keys to get
+            output: An instance of the dynamic array to decode into
+        """
+        keys = ScratchVar(TealType.bytes)
+        return Seq(
+            keys.store(self.scan(start, limit)),
+            output.decode(
+                Concat(Suffix(Itob(Len(keys.load()) / Int(8)), Int(6)), keys.load())
+            ),
+        )
+
+    def meta_box_name(self) -> bytes:
+        """the name of the meta box, to reference it from a client"""
+        assert self._name is not None
+        return self._name.encode()
+
+    def node_box_name(self, node_id: int) -> bytes:
+        """the name of the box of the node with node_id, to reference it from a client"""
+        return self.meta_box_name() + node_id.to_bytes(8, "big")
+
+
+def _meta_bytes(*, root: int, next_id: int, size: int) -> bytes:
+    return b"".join(i.to_bytes(8, "big") for i in (root, next_id, size))
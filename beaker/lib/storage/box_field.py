@@ -0,0 +1,173 @@
+from collections.abc import Callable
+from inspect import get_annotations
+
+from pyteal import (
+    BoxExtract,
+    BoxReplace,
+    Bytes,
+    Expr,
+    GetBit,
+    Int,
+    Seq,
+    SetBit,
+    TealInputError,
+    TealType,
+    TealTypeError,
+    abi,
+)
+from pyteal.types import require_type
+
+
+class BoxField:
+    """A field of a static tuple (or NamedTuple) stored in a box, read and written without the rest of the tuple"""
+
+    def __init__(
+        self,
+        box_name: Expr,
+        offset: Expr | None,
+        tuple_type: abi.TypeSpec,
+        field: str | int,
+        *,
+        setup: Expr | None = None,
+    ):
+        """Find the bytes a field is encoded in, from the tuple's type spec
+
+        Args:
+            box_name: The name of the box holding the tuple.
+            offset: Where in the box the tuple starts, or None if at the start.
+            tuple_type: The type of the tuple, which must be static.
+            field: The name of the field of a NamedTuple, or the index of the field of any tuple.
+            setup: Evaluated once before each read or write, e.g. to find the tuple, so that
+                ``box_name`` and ``offset`` can just load what it found.
+        """
+        if not isinstance(tuple_type, abi.TupleTypeSpec):
+            raise TealInputError(f"Expected a tuple type for fields, got {tuple_type}")
+        if tuple_type.is_dynamic():
+            raise TealInputError(f"Fields of {tuple_type} aren't at static offsets")
+
+        index = _field_index(tuple_type, field)
+        self.box_name = box_name
+        self.setup = setup
+        self.type_spec = tuple_type.value_type_specs()[index]
+        field_offset, self.bit = _field_position(tuple_type, index)
+        if offset is None:
+            self.offset: Expr = Int(field_offset)
+        else:
+            self.offset = offset + Int(field_offset) if field_offset else offset
+
+    def _is_bool(self) -> bool:
+        return self.bit is not None
+
+    def _after_setup(self, expr: Expr) -> Expr:
+        return expr if self.setup is None else Seq(self.setup, expr)
+
+    def get(self) -> Expr:
+        """get the encoded bytes of the field"""
+        return self._after_setup(self._get())
+
+    def _get(self) -> Expr:
+        if self._is_bool():
+            return SetBit(Bytes("base16", "00"), Int(0), self._get_bit())
+        return BoxExtract(
+            self.box_name, self.offset, Int(self.type_spec.byte_length_static())
+        )
+
+    def store_into(self, val: abi.BaseType) -> Expr:
+        """decode the field into an instance of its type
+
+        Args:
+            val: An instance of the type of the field to decode into
+        """
+        if val.type_spec() != self.type_spec:
+            raise TealTypeError(val.type_spec(), self.type_spec)
+        if isinstance(val, abi.Bool):
+            return self._after_setup(val.set(self._get_bit()))
+        return self._after_setup(val.decode(self._get()))
+
+    def set(self, val: abi.BaseType | Expr) -> Expr:
+        """overwrite just the bytes of the field with the provided value
+
+        Args:
+            val: An instance of the type of the field or an Expr that evaluates to its encoding
+        """
+        return self._after_setup(self._set(val))
+
+    def update(self, f: Callable[[Expr], Expr]) -> Expr:
+        """overwrite the field with ``f`` of its encoded bytes, e.g. to increment it, doing any
+        setup (such as finding the tuple) once for both the read and the write
+
+        Args:
+            f: Given an Expr that evaluates to the encoding of the field, returns an Expr that
+                evaluates to its new encoding
+        """
+        return self._after_setup(self._set(f(self._get())))
+
+    def _set(self, val: abi.BaseType | Expr) -> Expr:
+        match val:
+            case abi.BaseType():
+                if val.type_spec() != self.type_spec:
+                    raise TealTypeError(val.type_spec(), self.type_spec)
+                if isinstance(val, abi.Bool):
+                    return self._set_bit(val.get())
+                bytes_val = val.encode()
+            case Expr():
+                require_type(val, TealType.bytes)
+                if self._is_bool():
+                    return self._set_bit(GetBit(val, Int(0)))
+                bytes_val = val
+            case _:
+                raise TealTypeError(type(val), Expr | abi.BaseType)
+        return BoxReplace(self.box_name, self.offset, bytes_val)
+
+    def _get_bit(self) -> Expr:
+        assert self.bit is not None
+        return GetBit(BoxExtract(self.box_name, self.offset, Int(1)), Int(self.bit))
+
+    def _set_bit(self, value: Expr) -> Expr:
+        # bools share their byte with the bools next to them
+        assert self.bit is not None
+        return BoxReplace(
+            self.box_name,
+            self.offset,
+            SetBit(
+                BoxExtract(self.box_name, self.offset, Int(1)), Int(self.bit), value
+            ),
+        )
+
+
+def _field_index(tuple_type: abi.TupleTypeSpec, field: str | int) -> int:
+    if isinstance(field, int):
+        if not 0 <= field < tuple_type.length_static():
+            raise TealInputError(f"{tuple_type} has no field {field}")
+        return field
+    if not isinstance(tuple_type, abi.NamedTupleTypeSpec):
+        raise TealInputError(f"Fields of {tuple_type} can only be found by index")
+    names = list(get_annotations(tuple_type.annotation_type()))
+    if field not in names:
+        raise TealInputError(
+            f"{tuple_type.annotation_type().__name__} has no field {field}"
+        )
+    return names.index(field)
+
+
+def _field_position(
+    tuple_type: abi.TupleTypeSpec, index: int
+) -> tuple[int, int | None]:
+    """
+    The offset of the field's bytes in the tuple's encoding, and the bit in the byte
+    holding it if it's a bool, since consecutive bools are packed into bytes
+    """
+    offset = 0
+    bools = 0
+    for i, spec in enumerate(tuple_type.value_type_specs()):
+        if spec == abi.BoolTypeSpec():
+            if i == index:
+                return offset + bools // 8, bools % 8
+            bools += 1
+            continue
+        offset += (bools + 7) // 8
+        bools = 0
+        if i == index:
+            return offset, None
+        offset += spec.byte_length_static()
+    raise AssertionError("field index out of range")
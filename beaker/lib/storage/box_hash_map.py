@@ -0,0 +1,351 @@
+from hashlib import sha256
+
+from pyteal import (
+    And,
+    Assert,
+    BoxCreate,
+    BoxExtract,
+    BoxReplace,
+    Btoi,
+    Bytes,
+    Concat,
+    Expr,
+    ExtractUint64,
+    GetByte,
+    If,
+    Int,
+    Itob,
+    Len,
+    Not,
+    Return,
+    ScratchVar,
+    Seq,
+    Sha256,
+    Subroutine,
+    Suffix,
+    TealType,
+    TealTypeError,
+    While,
+    abi,
+)
+from pyteal.types import require_type
+
+from beaker.consts import BOX_BYTE_MIN_BALANCE, BOX_FLAT_MIN_BALANCE, MAX_BOX_SIZE
+from beaker.lib.storage.box_field import BoxField
+
+# each box starts with the number of entries in it, as a uint64, then its slots, each a
+# byte of whether it's empty, holds an entry or held a deleted one, then the key and value
+MAP_COUNT = 0
+MAP_START = 8
+SLOT_EMPTY = 0
+SLOT_USED = 1
+SLOT_DELETED = 2
+
+
+def slot_hash(key: bytes) -> int:
+    """the hash of an encoded key, the first 8 bytes of its sha256 as a uint64"""
+    return int.from_bytes(sha256(key).digest()[:8], "big")
+
+
+class BoxHashMap:
+    """
+    BoxHashMap stores entries of a static key type and static value type in the slots of one or a few boxes,
+    named as the class attribute unless an overriding name is provided, followed by the box's index as 8 bytes
+    if there's more than one.
+
+    The sha256 of a key picks its box and a slot in it, and its entry is put in the first slot from there that's
+    free when it's added, so an operation on a key needs a reference to just the one box. Deleted entries leave
+    their slots marked, to be reused by the next key added past them.
+    """
+
+    def __init__(
+        self,
+        key_type: type[abi.BaseType],
+        value_type: type[abi.BaseType],
+        capacity: int,
+        name: str | None = None,
+        *,
+        boxes: int = 1,
+    ):
+        """Initialize a BoxHashMap with the number of slots in each of its boxes
+
+        Args:
+            key_type: The type of the keys, which must be static.
+            value_type: The type of the values, which must be static.
+            capacity: The number of slots in each box. Lookups of keys not in the map check each slot of a full box, so it should be kept well short of full.
+            name (Optional): The name of the boxes, the name of the class attribute by default.
+            boxes (Optional): The number of boxes the slots are spread across.
+        """
+        self._key_type_spec = abi.type_spec_from_annotation(key_type)
+        self._value_type_spec = abi.type_spec_from_annotation(value_type)
+
+        assert not self._key_type_spec.is_dynamic(), "Expected static type for key"
+        assert not self._value_type_spec.is_dynamic(), "Expected static type for value"
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if boxes < 1:
+            raise ValueError("boxes must be at least 1")
+
+        self._key_size = self._key_type_spec.byte_length_static()
+        self._value_size = self._value_type_spec.byte_length_static()
+        self._slot_size = 1 + self._key_size + self._value_size
+        self.slot_size = Int(self._slot_size)
+
+        self._capacity = capacity
+        self.capacity = Int(self._capacity)
+        self._boxes = boxes
+
+        self._box_size = MAP_START + self._slot_size * self._capacity
+        if self._box_size > MAX_BOX_SIZE:
+            raise ValueError(f"{capacity} slots are larger than a box")
+        self.box_size = Int(self._box_size)
+
+        # Will be set later if its part of an Application
+        self._name = name
+
+        @Subroutine(TealType.uint64)
+        def probe_impl(box: Expr, key: Expr, start: Expr) -> Expr:
+            # the offset of the slot holding key, else of the first free one it'd be added to, else 0
+            i = ScratchVar(TealType.uint64)
+            offset = ScratchVar(TealType.uint64)
+            slot = ScratchVar(TealType.bytes)
+            free = ScratchVar(TealType.uint64)
+            return Seq(
+                free.store(Int(0)),
+                i.store(Int(0)),
+                While(i.load() < self.capacity).Do(
+                    offset.store(
+                        Int(MAP_START)
+                        + self.slot_size * ((start + i.load()) % self.capacity)
+                    ),
+                    slot.store(BoxExtract(box, offset.load(), Int(1 + self._key_size))),
+                    If(GetByte(slot.load(), Int(0)) == Int(SLOT_EMPTY))
+                    .Then(
+                        # no entry was added past here, so key isn't in the box
+                        Return(If(free.load(), free.load(), offset.load()))
+                    )
+                    .ElseIf(GetByte(slot.load(), Int(0)) == Int(SLOT_USED))
+                    .Then(
+                        If(Suffix(slot.load(), Int(1)) == key).Then(
+                            Return(offset.load())
+                        )
+                    )
+                    .ElseIf(free.load() == Int(0))
+                    .Then(free.store(offset.load())),
+                    i.store(i.load() + Int(1)),
+                ),
+                free.load(),
+            )
+
+        self._probe_impl = probe_impl
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        if self._name is None:
+            self._name = name
+
+    def _box(self, index: Expr) -> Expr:
+        if self._boxes == 1:
+            return Bytes(self.box_name(0))
+        return Concat(Bytes(self._name_bytes()), Itob(index))
+
+    @staticmethod
+    def _count(box: Expr) -> Expr:
+        return Btoi(BoxExtract(box, Int(MAP_COUNT), Int(8)))
+
+    class Element:
+        """Container type for the entry of a specific key"""
+
+        def __init__(self, hash_map: "BoxHashMap", key: Expr, *, check_key: bool):
+            require_type(key, TealType.bytes)
+
+            self.hash_map = hash_map
+            self._key_expr = key
+            # a key given as bytes rather than an abi value may not be the size of one
+            self._check_key = check_key
+            self.key = ScratchVar(TealType.bytes)
+            self.box = ScratchVar(TealType.bytes)
+            self.offset = ScratchVar(TealType.uint64)
+
+        def _locate(self) -> Expr:
+            hm = self.hash_map
+            h = ScratchVar(TealType.uint64)
+            return Seq(
+                self.key.store(self._key_expr),
+                *(
+                    [Assert(Len(self.key.load()) == Int(hm._key_size))]
+                    if self._check_key
+                    else []
+                ),
+                h.store(ExtractUint64(Sha256(self.key.load()), Int(0))),
+                self.box.store(hm._box(h.load() % Int(hm._boxes))),
+                self.offset.store(
+                    hm._probe_impl(
+                        self.box.load(),
+                        self.key.load(),
+                        h.load() / Int(hm._boxes) % hm.capacity,
+                    )
+                ),
+            )
+
+        def _found(self) -> Expr:
+            return And(
+                self.offset.load() != Int(0),
+                GetByte(BoxExtract(self.box.load(), self.offset.load(), Int(1)), Int(0))
+                == Int(SLOT_USED),
+            )
+
+        def _value_offset(self) -> Expr:
+            return self.offset.load() + Int(1 + self.hash_map._key_size)
+
+        def _set_count(self, count: Expr) -> Expr:
+            return BoxReplace(self.box.load(), Int(MAP_COUNT), Itob(count))
+
+        def exists(self) -> Expr:
+            """check whether the map has an entry for this key"""
+            return Seq(self._locate(), self._found())
+
+        def get(self) -> Expr:
+            """get the bytes of the value for this key, failing if there isn't one"""
+            return Seq(
+                self._locate(),
+                Assert(self._found()),
+                BoxExtract(
+                    self.box.load(),
+                    self._value_offset(),
+                    Int(self.hash_map._value_size),
+                ),
+            )
+
+        def store_into(self, val: abi.BaseType) -> Expr:
+            """decode the value for this key into an abi type, failing if there isn't one
+
+            Args:
+                val: An instance of the value type to be populated with the bytes of the value
+            """
+            return val.decode(self.get())
+
+        def set(self, val: abi.BaseType | Expr) -> Expr:
+            """add an entry for this key with the value, or overwrite the value if there is one already
+
+            Fails if the key isn't in the map and its box has no free slot.
+
+            Args:
+                val: An instance of the value type or an Expr that evaluates to its encoding
+            """
+            hm = self.hash_map
+            value = ScratchVar(TealType.bytes)
+            match val:
+                case abi.BaseType():
+                    if val.type_spec() != hm._value_type_spec:
+                        raise TealTypeError(val.type_spec(), hm._value_type_spec)
+                    bytes_val = val.encode()
+                    checks = []
+                case Expr():
+                    require_type(val, TealType.bytes)
+                    bytes_val = val
+                    checks = [Assert(Len(value.load()) == Int(hm._value_size))]
+                case _:
+                    raise TealTypeError(type(val), Expr | abi.BaseType)
+            return Seq(
+                value.store(bytes_val),
+                *checks,
+                self._locate(),
+                Assert(self.offset.load()),
+                If(Not(self._found())).Then(
+                    self._set_count(hm._count(self.box.load()) + Int(1))
+                ),
+                # the marker and key are written too, the same as before if it was there
+                BoxReplace(
+                    self.box.load(),
+                    self.offset.load(),
+                    Concat(Bytes(bytes([SLOT_USED])), self.key.load(), value.load()),
+                ),
+            )
+
+        def delete(self) -> Expr:
+            """remove the entry for this key, returning 1 if it was removed or 0 if there wasn't one"""
+            return Seq(
+                self._locate(),
+                If(self._found())
+                .Then(
+                    BoxReplace(
+                        self.box.load(),
+                        self.offset.load(),
+                        Bytes(bytes([SLOT_DELETED])),
+                    ),
+                    self._set_count(self.hash_map._count(self.box.load()) - Int(1)),
+                    Int(1),
+                )
+                .Else(Int(0)),
+            )
+
+        def field(self, field: str | int) -> BoxField:
+            """a field of the tuple value for this key, to read or write without the rest of it
+
+            Each read or write finds the entry once, failing if there isn't one, so use
+            ``update`` of the field to read and write it with one lookup.
+
+            Args:
+                field: The name of the field of a NamedTuple, or the index of the field of any static tuple
+            """
+            return BoxField(
+                self.box.load(),
+                self._value_offset(),
+                self.hash_map._value_type_spec,
+                field,
+                setup=Seq(self._locate(), Assert(self._found())),
+            )
+
+    def __getitem__(self, key: abi.BaseType | Expr) -> Element:
+        check_key = isinstance(key, Expr)
+        match key:
+            case abi.BaseType():
+                if key.type_spec() != self._key_type_spec:
+                    raise TealTypeError(key.type_spec(), self._key_type_spec)
+                key = key.encode()
+            case Expr():
+                require_type(key, TealType.bytes)
+            case _:
+                raise TealTypeError(type(key), Expr | abi.BaseType)
+
+        return self.Element(self, key, check_key=check_key)
+
+    def create(self) -> Expr:
+        """creates the boxes, with every slot empty, returning 1 if they were all created"""
+        creates = [
+            BoxCreate(Bytes(self.box_name(i)), self.box_size)
+            for i in range(self._boxes)
+        ]
+        return creates[0] if len(creates) == 1 else And(*creates)
+
+    def size(self) -> Expr:
+        """get the number of entries in the map, reading every box"""
+        total: Expr = self._count(Bytes(self.box_name(0)))
+        for i in range(1, self._boxes):
+            total = total + self._count(Bytes(self.box_name(i)))
+        return total
+
+    def _name_bytes(self) -> bytes:
+        assert self._name is not None
+        return self._name.encode()
+
+    def box_name(self, index: int) -> bytes:
+        """the name of the box at index, to reference it from a client"""
+        if self._boxes == 1:
+            return self._name_bytes()
+        return self._name_bytes() + index.to_bytes(8, "big")
+
+    def box_names(self) -> list[bytes]:
+        """the names of all the boxes"""
+        return [self.box_name(i) for i in range(self._boxes)]
+
+    def key_box_name(self, key: bytes) -> bytes:
+        """the name of the box holding the entry of an encoded key, to reference it from a client"""
+        return self.box_name(slot_hash(key) % self._boxes)
+
+    def min_balance(self) -> int:
+        """the min balance the boxes need the application to hold, in microalgos"""
+        return sum(
+            BOX_FLAT_MIN_BALANCE + BOX_BYTE_MIN_BALANCE * (len(name) + self._box_size)
+            for name in self.box_names()
+        )
@@ -1,25 +1,59 @@
 from pyteal import (
+    Assert,
     BoxCreate,
     BoxExtract,
     BoxReplace,
     Bytes,
+    BytesLt,
     CompileOptions,
+    Concat,
     Expr,
+    ExtractUint16,
+    If,
     Int,
+    Itob,
+    ScratchVar,
+    Seq,
+    Subroutine,
+    Suffix,
     TealBlock,
+    TealInputError,
     TealSimpleBlock,
     TealType,
+    TealTypeError,
+    While,
     abi,
 )
 from pyteal.types import require_type
 
+from beaker.lib.storage.box_field import BoxField
+
+# the size of the length header of a list with_length, a uint16 as in an abi array
+_LENGTH_SIZE = 2
+# the most bytes b< compares
+_MAX_COMPARE_BYTES = 64
+
 
 class BoxList:
     """List stores a list of static types in a box, named as the class attribute unless an overriding name is provided"""
 
     def __init__(
-        self, value_type: type[abi.BaseType], elements: int, name: str | None = None
+        self,
+        value_type: type[abi.BaseType],
+        elements: int,
+        name: str | None = None,
+        *,
+        with_length: bool = False,
     ):
+        """Initialize a BoxList with the type and number of its elements
+
+        Args:
+            value_type: The static type of the elements.
+            elements: The number of elements the box holds.
+            name (Optional): The name of the box, the name of the class attribute by default.
+            with_length (Optional): Whether to store the number of elements appended before them, as a uint16, so the
+                box holds the abi encoding of a dynamic array of them. Required by ``length``, ``append`` and ``insert``.
+        """
         ts = abi.type_spec_from_annotation(value_type)
 
         assert not ts.is_dynamic(), "Expected static type for value"
@@ -40,9 +74,32 @@ class BoxList:
         self._elements = elements
         self.elements = Int(self._elements)
 
-        self._box_size = self._element_size * self._elements
+        self.with_length = with_length
+        self._header_size = _LENGTH_SIZE if with_length else 0
+
+        self._box_size = self._header_size + self._element_size * self._elements
         self.box_size = Int(self._box_size)
 
+        @Subroutine(TealType.uint64)
+        def binary_search_impl(val: Expr, start: Expr, stop: Expr) -> Expr:
+            # the first index in [start, stop) whose element isn't less than val
+            lo = ScratchVar(TealType.uint64)
+            hi = ScratchVar(TealType.uint64)
+            mid = ScratchVar(TealType.uint64)
+            return Seq(
+                lo.store(start),
+                hi.store(stop),
+                While(lo.load() < hi.load()).Do(
+                    mid.store((lo.load() + hi.load()) / Int(2)),
+                    If(BytesLt(self[mid.load()].get(), val))
+                    .Then(lo.store(mid.load() + Int(1)))
+                    .Else(hi.store(mid.load())),
+                ),
+                lo.load(),
+            )
+
+        self._binary_search_impl = binary_search_impl
+
     def __set_name__(self, owner: type, name: str) -> None:
         if self.name is None:
             self.name = Bytes(name)
@@ -52,8 +109,185 @@ class BoxList:
         assert self.name is not None
         return BoxCreate(self.name, self.box_size)
 
+    def _box_name(self) -> Expr:
+        assert self.name is not None
+        return self.name
+
+    def _offset(self, idx: Expr) -> Expr:
+        offset = self.element_size * idx
+        return offset + Int(self._header_size) if self._header_size else offset
+
+    def _encode(self, val: abi.BaseType | Expr) -> Expr:
+        match val:
+            case abi.BaseType():
+                if val.type_spec() != self.value_type:
+                    raise TealTypeError(val.type_spec(), self.value_type)
+                return val.encode()
+            case Expr():
+                require_type(val, TealType.bytes)
+                return val
+            case _:
+                raise TealTypeError(type(val), Expr | abi.BaseType)
+
+    def _require_length(self, method: str) -> None:
+        if not self.with_length:
+            raise TealInputError(f"{method} requires a BoxList with_length")
+
+    def get_range(self, start: Expr, stop: Expr) -> Expr:
+        """get the bytes of the elements from start until stop, in one box read
+
+        Args:
+            start: The index of the first element
+            stop: The index after the last element
+        """
+        return BoxExtract(
+            self._box_name(), self._offset(start), self.element_size * (stop - start)
+        )
+
+    def set_range(self, start: Expr, buff: Expr) -> Expr:
+        """set the elements from start to the encoded elements in buff, in one box write
+
+        Args:
+            start: The index of the first element to set
+            buff: The encoded elements, a multiple of the element size in bytes
+        """
+        require_type(buff, TealType.bytes)
+        return BoxReplace(self._box_name(), self._offset(start), buff)
+
+    def store_range_into(
+        self, start: Expr, stop: Expr, output: abi.DynamicArray
+    ) -> Expr:
+        """decode the elements from start until stop into a dynamic array of the element type
+
+        Args:
+            start: The index of the first element
+            stop: The index after the last element
+            output: An instance of the dynamic array to decode into
+        """
+        count = ScratchVar(TealType.uint64)
+        return Seq(
+            count.store(stop - start),
+            output.decode(
+                Concat(
+                    Suffix(Itob(count.load()), Int(6)),
+                    BoxExtract(
+                        self._box_name(),
+                        self._offset(start),
+                        self.element_size * count.load(),
+                    ),
+                )
+            ),
+        )
+
+    def length(self) -> Expr:
+        """get the number of elements appended to the list"""
+        self._require_length("length")
+        return ExtractUint16(
+            BoxExtract(self._box_name(), Int(0), Int(_LENGTH_SIZE)), Int(0)
+        )
+
+    def _set_length(self, length: Expr) -> Expr:
+        return BoxReplace(self._box_name(), Int(0), Suffix(Itob(length), Int(6)))
+
+    def append(self, val: abi.BaseType | Expr) -> Expr:
+        """add an element after those appended to the list, failing if it's full
+
+        Args:
+            val: The value to append, an instance of the element type or its encoding
+        """
+        self._require_length("append")
+        length = ScratchVar(TealType.uint64)
+        return Seq(
+            length.store(self.length()),
+            Assert(length.load() < self.elements),
+            BoxReplace(
+                self._box_name(), self._offset(length.load()), self._encode(val)
+            ),
+            self._set_length(length.load() + Int(1)),
+        )
+
+    def insert(self, idx: Expr, val: abi.BaseType | Expr) -> Expr:
+        """insert an element at idx, moving those appended after it along one, failing if it's full
+
+        Args:
+            idx: The index to insert the element at, at most the length of the list
+            val: The value to insert, an instance of the element type or its encoding
+        """
+        self._require_length("insert")
+        length = ScratchVar(TealType.uint64)
+        pos = ScratchVar(TealType.uint64)
+        return Seq(
+            length.store(self.length()),
+            pos.store(idx),
+            Assert(length.load() < self.elements, pos.load() <= length.load()),
+            self.move(pos.load(), pos.load() + Int(1), length.load() - pos.load()),
+            BoxReplace(self._box_name(), self._offset(pos.load()), self._encode(val)),
+            self._set_length(length.load() + Int(1)),
+        )
+
+    def swap(self, i: Expr, j: Expr) -> Expr:
+        """swap the elements at indexes i and j
+
+        Args:
+            i: The index of one element
+            j: The index of the other
+        """
+        tmp = ScratchVar(TealType.bytes)
+        first = ScratchVar(TealType.uint64)
+        second = ScratchVar(TealType.uint64)
+        return Seq(
+            first.store(i),
+            second.store(j),
+            tmp.store(self[first.load()].get()),
+            BoxReplace(
+                self._box_name(),
+                self._offset(first.load()),
+                self[second.load()].get(),
+            ),
+            BoxReplace(self._box_name(), self._offset(second.load()), tmp.load()),
+        )
+
+    def move(self, src: Expr, dst: Expr, count: Expr) -> Expr:
+        """copy count elements from src to dst, in one box read and write, even if the ranges overlap
+
+        Args:
+            src: The index of the first element to copy
+            dst: The index to copy it to
+            count: The number of elements to copy
+        """
+        return self.set_range(
+            dst,
+            BoxExtract(self._box_name(), self._offset(src), self.element_size * count),
+        )
+
+    def binary_search(self, val: abi.BaseType | Expr, stop: Expr | None = None) -> Expr:
+        """find the first index of a sorted list whose element isn't less than val, where it would be inserted
+
+        Elements are compared by their encoding, which orders unsigned ints and strings of the same length by value.
+
+        Args:
+            val: The value to search for, an instance of the element type or its encoding
+            stop (Optional): The index after the last element to search, the length of a list with_length,
+                else the number of elements
+        """
+        if self._element_size > _MAX_COMPARE_BYTES:
+            raise TealInputError(
+                f"Elements of {self._element_size} bytes can't be compared, "
+                f"the most bytes b< compares is {_MAX_COMPARE_BYTES}"
+            )
+        if stop is None:
+            stop = self.length() if self.with_length else self.elements
+        return self._binary_search_impl(self._encode(val), Int(0), stop)
+
     class Element(Expr):
-        def __init__(self, name: Expr, element_size: Expr, idx: Expr):
+        def __init__(
+            self,
+            name: Expr,
+            element_size: Expr,
+            idx: Expr,
+            header_size: int = 0,
+            value_type: abi.TypeSpec | None = None,
+        ):
             super().__init__()
 
             require_type(name, TealType.bytes)
@@ -63,6 +297,12 @@ class BoxList:
             self.name = name
             self.element_size = element_size
             self.idx = idx
+            self.header_size = header_size
+            self.value_type = value_type
+
+        def _offset(self) -> Expr:
+            offset = self.element_size * self.idx
+            return offset + Int(self.header_size) if self.header_size else offset
 
         def store_into(self, val: abi.BaseType) -> Expr:
             """decode the bytes from this list element into the instance of the type provided
@@ -74,9 +314,7 @@ class BoxList:
 
         def get(self) -> Expr:
             """get the bytes for this element in the list"""
-            return BoxExtract(
-                self.name, self.element_size * self.idx, self.element_size
-            )
+            return BoxExtract(self.name, self._offset(), self.element_size)
 
         def set(self, val: abi.BaseType) -> Expr:
             """set the bytes for this element in the list
@@ -84,7 +322,17 @@ class BoxList:
             Args:
                 The value to write into the list at the given index
             """
-            return BoxReplace(self.name, self.element_size * self.idx, val.encode())
+            return BoxReplace(self.name, self._offset(), val.encode())
+
+        def field(self, field: str | int) -> BoxField:
+            """a field of the tuple in this list element, to read or write without the rest of it
+
+            Args:
+                field: The name of the field of a NamedTuple, or the index of the field of any static tuple
+            """
+            if self.value_type is None:
+                raise TealInputError("The type of the element isn't known")
+            return BoxField(self.name, self._offset(), self.value_type, field)
 
         def __str__(self) -> str:
             return f"List Element: {self.name}[{self.idx}]"
@@ -101,5 +349,10 @@ class BoxList:
             return TealType.bytes
 
     def __getitem__(self, idx: Expr) -> Element:
-        assert self.name is not None
-        return self.Element(self.name, self.element_size, idx)
+        return self.Element(
+            self._box_name(),
+            self.element_size,
+            idx,
+            self._header_size,
+            self.value_type,
+        )
@@ -0,0 +1,38 @@
+from pyteal import (
+    Assert,
+    BoxExtract,
+    BoxReplace,
+    Btoi,
+    Expr,
+    Int,
+    Itob,
+    ScratchVar,
+    Seq,
+    TealType,
+    abi,
+)
+
+from beaker.lib.storage.box_ring_buffer import RECORDS_TAIL, BoxRecords
+
+
+class BoxLog(BoxRecords):
+    """
+    BoxLog is an append-only log of records of a static type in a box, up to its capacity, named as the class attribute
+    unless an overriding name is provided.
+
+    Appending reads and writes the count of the records and writes the record.
+    """
+
+    def append(self, val: abi.BaseType | Expr) -> Expr:
+        """add a record after the newest, failing if the log is full
+
+        Args:
+            val: The record, an instance of the record type or its encoding
+        """
+        tail = ScratchVar(TealType.uint64)
+        return Seq(
+            tail.store(Btoi(BoxExtract(self._box(), Int(RECORDS_TAIL), Int(8)))),
+            Assert(tail.load() < self.capacity),
+            BoxReplace(self._box(), self._offset(tail.load()), self._encode(val)),
+            BoxReplace(self._box(), Int(RECORDS_TAIL), Itob(tail.load() + Int(1))),
+        )
@@ -1,19 +1,32 @@
 from pyteal import (
+    And,
     Assert,
     BoxDelete,
     BoxGet,
     BoxLen,
     BoxPut,
+    BoxResize,
+    CompileOptions,
     Concat,
     Expr,
+    If,
+    Len,
     Pop,
+    ScratchVar,
     Seq,
+    TealBlock,
+    TealSimpleBlock,
     TealType,
     TealTypeError,
     abi,
 )
 from pyteal.types import require_type
 
+from beaker.lib.storage.box_field import BoxField
+
+# the first AVM version with box_resize
+_BOX_RESIZE_VERSION = 10
+
 
 class BoxMapping:
     """Mapping provides an abstraction to store some typed data in a box keyed with a typed key"""
@@ -77,6 +90,9 @@ class BoxMapping:
         def set(self, val: abi.BaseType | Expr) -> Expr:
             """overwrites the contents of the box with the provided value.
 
+            A value of a static type is put over the old one in place. Otherwise the box is resized if the size
+            of the value changes, or deleted first before AVM version 10, which doesn't have ``box_resize``.
+
             Args:
                 val: An instance of the type or an Expr that evaluates to bytes
             """
@@ -84,15 +100,38 @@ class BoxMapping:
                 case abi.BaseType():
                     if not isinstance(val, self._value_type):
                         raise TealTypeError(val.__class__, self._value_type)
+                    if not val.type_spec().is_dynamic():
+                        # always the same size, so put over any value in place
+                        return BoxPut(self.key, val.encode())
                     bytes_val = val.encode()
                 case Expr():
                     require_type(val, TealType.bytes)
                     bytes_val = val
                 case _:
                     raise TealTypeError(type(val), Expr | abi.BaseType)
+            buff = ScratchVar(TealType.bytes)
             return Seq(
-                Pop(BoxDelete(self.key)),
-                BoxPut(self.key, bytes_val),
+                buff.store(bytes_val),
+                length := BoxLen(self.key),
+                # box_put may only overwrite a value of the same size
+                If(And(length.hasValue(), length.value() != Len(buff.load()))).Then(
+                    _ForVersion(
+                        _BOX_RESIZE_VERSION,
+                        BoxResize(self.key, Len(buff.load())),
+                        otherwise=Pop(BoxDelete(self.key)),
+                    )
+                ),
+                BoxPut(self.key, buff.load()),
+            )
+
+        def field(self, field: str | int) -> BoxField:
+            """a field of the tuple in this box, to read or write without the rest of it
+
+            Args:
+                field: The name of the field of a NamedTuple, or the index of the field of any static tuple
+            """
+            return BoxField(
+                self.key, None, abi.type_spec_from_annotation(self._value_type), field
             )
 
         def delete(self) -> Expr:
@@ -111,3 +150,27 @@ class BoxMapping:
                 raise TealTypeError(type(key), Expr | abi.BaseType)
 
         return self.Element(self._prefix_key(key), self._value_type)
+
+
+class _ForVersion(Expr):
+    """An expression for AVM versions from min_version, or otherwise for earlier ones"""
+
+    def __init__(self, min_version: int, expr: Expr, *, otherwise: Expr):
+        super().__init__()
+        self.min_version = min_version
+        self.expr = expr
+        self.otherwise = otherwise
+
+    def __teal__(self, options: CompileOptions) -> tuple[TealBlock, TealSimpleBlock]:
+        if options.version >= self.min_version:
+            return self.expr.__teal__(options)
+        return self.otherwise.__teal__(options)
+
+    def __str__(self) -> str:
+        return f"(for version {self.min_version} {self.expr} {self.otherwise})"
+
+    def type_of(self) -> TealType:
+        return self.expr.type_of()
+
+    def has_return(self) -> bool:
+        return False
@@ -0,0 +1,185 @@
+from pyteal import (
+    Assert,
+    BoxCreate,
+    BoxExtract,
+    BoxReplace,
+    Bytes,
+    Concat,
+    Expr,
+    ExtractUint64,
+    If,
+    Int,
+    Itob,
+    ScratchVar,
+    Seq,
+    TealType,
+    TealTypeError,
+    abi,
+)
+from pyteal.types import require_type
+
+from beaker.consts import MAX_BOX_SIZE
+
+# the box starts with the count of records removed and the count of those added, as uint64s
+RECORDS_HEAD = 0
+RECORDS_TAIL = 8
+RECORDS_START = 16
+
+
+class BoxRecords:
+    """The records of a static type held in a box by a BoxRingBuffer or BoxLog, after the counts of those removed and added"""
+
+    def __init__(
+        self, value_type: type[abi.BaseType], capacity: int, name: str | None = None
+    ):
+        ts = abi.type_spec_from_annotation(value_type)
+
+        assert not ts.is_dynamic(), "Expected static type for value"
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if RECORDS_START + ts.byte_length_static() * capacity > MAX_BOX_SIZE:
+            raise ValueError(f"{capacity} records are larger than a box")
+
+        # Will be set later if its part of an Application
+        self._name = name
+
+        self.value_type = ts
+
+        self._element_size = ts.byte_length_static()
+        self.element_size = Int(self._element_size)
+
+        self._capacity = capacity
+        self.capacity = Int(self._capacity)
+
+        self._box_size = RECORDS_START + self._element_size * self._capacity
+        self.box_size = Int(self._box_size)
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        if self._name is None:
+            self._name = name
+
+    def box_name(self) -> bytes:
+        """the name of the box, to reference it from a client"""
+        assert self._name is not None
+        return self._name.encode()
+
+    def _box(self) -> Expr:
+        return Bytes(self.box_name())
+
+    def _read_header(self, header: ScratchVar) -> Expr:
+        return header.store(BoxExtract(self._box(), Int(0), Int(RECORDS_START)))
+
+    @staticmethod
+    def _head(header: ScratchVar) -> Expr:
+        return ExtractUint64(header.load(), Int(RECORDS_HEAD))
+
+    @staticmethod
+    def _tail(header: ScratchVar) -> Expr:
+        return ExtractUint64(header.load(), Int(RECORDS_TAIL))
+
+    def _offset(self, count: Expr) -> Expr:
+        return Int(RECORDS_START) + self.element_size * (count % self.capacity)
+
+    def _encode(self, val: abi.BaseType | Expr) -> Expr:
+        match val:
+            case abi.BaseType():
+                if val.type_spec() != self.value_type:
+                    raise TealTypeError(val.type_spec(), self.value_type)
+                return val.encode()
+            case Expr():
+                require_type(val, TealType.bytes)
+                return val
+            case _:
+                raise TealTypeError(type(val), Expr | abi.BaseType)
+
+    def create(self) -> Expr:
+        """creates the box, with no records"""
+        return BoxCreate(self._box(), self.box_size)
+
+    def length(self) -> Expr:
+        """get the number of records held"""
+        header = ScratchVar(TealType.bytes)
+        return Seq(self._read_header(header), self._tail(header) - self._head(header))
+
+    def get(self, idx: Expr) -> Expr:
+        """get the bytes of the record idx places after the oldest held, failing if there isn't one
+
+        Args:
+            idx: The index of the record, from 0 for the oldest
+        """
+        header = ScratchVar(TealType.bytes)
+        pos = ScratchVar(TealType.uint64)
+        return Seq(
+            self._read_header(header),
+            pos.store(self._head(header) + idx),
+            Assert(pos.load() < self._tail(header)),
+            BoxExtract(self._box(), self._offset(pos.load()), self.element_size),
+        )
+
+    def latest(self) -> Expr:
+        """get the bytes of the newest record, failing if there isn't one"""
+        header = ScratchVar(TealType.bytes)
+        return Seq(
+            self._read_header(header),
+            Assert(self._tail(header) > self._head(header)),
+            BoxExtract(
+                self._box(),
+                self._offset(self._tail(header) - Int(1)),
+                self.element_size,
+            ),
+        )
+
+
+class BoxRingBuffer(BoxRecords):
+    """
+    BoxRingBuffer keeps the newest records of a static type in a box, up to its capacity, named as the class attribute
+    unless an overriding name is provided. Pushing a record when it's full overwrites the oldest.
+
+    Each operation reads the counts of the records removed and added, then reads or writes one record and the counts.
+    """
+
+    def push(self, val: abi.BaseType | Expr) -> Expr:
+        """add a record after the newest, replacing the oldest if the buffer is full
+
+        Args:
+            val: The record, an instance of the record type or its encoding
+        """
+        header = ScratchVar(TealType.bytes)
+        head = ScratchVar(TealType.uint64)
+        tail = ScratchVar(TealType.uint64)
+        return Seq(
+            self._read_header(header),
+            head.store(self._head(header)),
+            tail.store(self._tail(header)),
+            BoxReplace(self._box(), self._offset(tail.load()), self._encode(val)),
+            BoxReplace(
+                self._box(),
+                Int(RECORDS_HEAD),
+                Concat(
+                    Itob(
+                        If(
+                            tail.load() - head.load() == self.capacity,
+                            head.load() + Int(1),
+                            head.load(),
+                        )
+                    ),
+                    Itob(tail.load() + Int(1)),
+                ),
+            ),
+        )
+
+    def pop(self) -> Expr:
+        """remove the oldest record and get its bytes, failing if there isn't one"""
+        header = ScratchVar(TealType.bytes)
+        head = ScratchVar(TealType.uint64)
+        return Seq(
+            self._read_header(header),
+            head.store(self._head(header)),
+            Assert(head.load() < self._tail(header)),
+            BoxReplace(self._box(), Int(RECORDS_HEAD), Itob(head.load() + Int(1))),
+            BoxExtract(self._box(), self._offset(head.load()), self.element_size),
+        )
+
+    def peek(self) -> Expr:
+        """get the bytes of the oldest record, the one pop would remove, failing if there isn't one"""
+        return self.get(Int(0))
@@ -1,26 +1,19 @@
 from pyteal import (
     App,
-    Bytes,
-    Concat,
     Expr,
-    Extract,
-    For,
+    GetBit,
     GetByte,
-    If,
     Int,
-    Len,
-    Or,
     ScratchVar,
     Seq,
     SetByte,
     Subroutine,
-    Substring,
     TealType,
 )
 
 from beaker.consts import MAX_GLOBAL_STATE
 from beaker.lib.inline import InlineAssembly
-from beaker.lib.storage.blob import BLOB_PAGE_SIZE, EMPTY_PAGE, Blob
+from beaker.lib.storage.blob import EMPTY_PAGE, Blob
 
 
 class GlobalBlob(Blob):
@@ -69,101 +62,48 @@ class GlobalBlob(Blob):
 
         self._get_byte_impl = get_byte_impl
 
-        @Subroutine(TealType.bytes)
-        def read_impl(bstart: Expr, bstop: Expr) -> Expr:
-            start_key = self._key_idx(bstart)
-            start_offset = self._offset_for_idx(bstart)
+        @Subroutine(TealType.uint64)
+        def get_bit_impl(idx: Expr) -> Expr:
+            return GetBit(
+                App.globalGet(self._key(self._bit_key_idx(idx))),
+                self._bit_offset_for_idx(idx),
+            )
 
-            stop_key = self._key_idx(bstop)
-            stop_offset = self._offset_for_idx(bstop)
+        self._get_bit_impl = get_bit_impl
 
-            key = ScratchVar()
-            buff = ScratchVar()
+        @Subroutine(TealType.none)
+        def set_bit_impl(idx: Expr, value: Expr) -> Expr:
+            return self._set_bit(App.globalGet, App.globalPut, idx, value)
 
-            start = ScratchVar()
-            stop = ScratchVar()
+        self._set_bit_impl = set_bit_impl
 
-            init = key.store(start_key)
-            cond = key.load() <= stop_key
-            incr = key.store(key.load() + Int(1))
+        @Subroutine(TealType.uint64)
+        def popcount_impl(start: Expr, stop: Expr) -> Expr:
+            return self._popcount(self.read, start, stop)
 
-            return Seq(
-                buff.store(Bytes("")),
-                For(init, cond, incr).Do(
-                    start.store(If(key.load() == start_key, start_offset, Int(0))),
-                    stop.store(If(key.load() == stop_key, stop_offset, BLOB_PAGE_SIZE)),
-                    buff.store(
-                        Concat(
-                            buff.load(),
-                            Substring(
-                                App.globalGet(self._key(key.load())),
-                                start.load(),
-                                stop.load(),
-                            ),
-                        )
-                    ),
-                ),
-                buff.load(),
-            )
+        self._popcount_impl = popcount_impl
 
-        self._read_impl = read_impl
+        @Subroutine(TealType.uint64)
+        def find_first_set_impl() -> Expr:
+            return self._find_first(App.globalGet, value=1)
 
-        @Subroutine(TealType.none)
-        def write_impl(bstart: Expr, buff: Expr) -> Expr:
-            start_key = self._key_idx(bstart)
-            start_offset = self._offset_for_idx(bstart)
+        self._find_first_set_impl = find_first_set_impl
 
-            stop_key = self._key_idx(bstart + Len(buff))
-            stop_offset = self._offset_for_idx(bstart + Len(buff))
+        @Subroutine(TealType.uint64)
+        def find_first_zero_impl() -> Expr:
+            return self._find_first(App.globalGet, value=0)
 
-            key = ScratchVar()
-            start = ScratchVar()
-            stop = ScratchVar()
-            written = ScratchVar()
+        self._find_first_zero_impl = find_first_zero_impl
 
-            init = key.store(start_key)
-            cond = key.load() <= stop_key
-            incr = key.store(key.load() + Int(1))
+        @Subroutine(TealType.bytes)
+        def read_impl(bstart: Expr, bstop: Expr) -> Expr:
+            return self._read_pages(App.globalGet, bstart, bstop)
 
-            delta = ScratchVar()
+        self._read_impl = read_impl
 
-            return Seq(
-                written.store(Int(0)),
-                For(init, cond, incr).Do(
-                    start.store(If(key.load() == start_key, start_offset, Int(0))),
-                    stop.store(If(key.load() == stop_key, stop_offset, BLOB_PAGE_SIZE)),
-                    App.globalPut(
-                        self._key(key.load()),
-                        If(
-                            Or(
-                                stop.load() != BLOB_PAGE_SIZE,
-                                start.load() != Int(0),
-                            )
-                        )  # Its a partial write
-                        .Then(
-                            delta.store(stop.load() - start.load()),
-                            Concat(
-                                Substring(
-                                    App.globalGet(self._key(key.load())),
-                                    Int(0),
-                                    start.load(),
-                                ),
-                                Extract(buff, written.load(), delta.load()),
-                                Substring(
-                                    App.globalGet(self._key(key.load())),
-                                    stop.load(),
-                                    BLOB_PAGE_SIZE,
-                                ),
-                            ),
-                        )
-                        .Else(
-                            delta.store(BLOB_PAGE_SIZE),
-                            Extract(buff, written.load(), BLOB_PAGE_SIZE),
-                        ),
-                    ),
-                    written.store(written.load() + delta.load()),
-                ),
-            )
+        @Subroutine(TealType.none)
+        def write_impl(bstart: Expr, buff: Expr) -> Expr:
+            return self._write_pages(App.globalGet, App.globalPut, bstart, buff)
 
         self._write_impl = write_impl
 
@@ -190,7 +130,7 @@ class GlobalBlob(Blob):
     def read(self, bstart: Expr, bstop: Expr) -> Expr:
         """
         read bytes between bstart and bend from global storage
-        of an application by index
+        of an application by index, at most 4096 of them as for any value
         """
         return self._read_impl(bstart, bstop)
 
@@ -199,3 +139,50 @@ class GlobalBlob(Blob):
         write bytes between bstart and len(buff) to global storage of an application
         """
         return self._write_impl(bstart, buff)
+
+    def get_bit(self, idx: Expr) -> Expr:
+        """
+        Get a single bit from global storage of an application by index, counting from
+        the highest bit of the first byte
+        """
+        return self._get_bit_impl(idx)
+
+    def set_bit(self, idx: Expr, value: Expr = Int(1)) -> Expr:  # noqa: B008
+        """
+        Set a single bit in global storage of an application by index, to 1 by default
+        """
+        return self._set_bit_impl(idx, value)
+
+    def clear_bit(self, idx: Expr) -> Expr:
+        """
+        Clear a single bit in global storage of an application by index
+        """
+        return self._set_bit_impl(idx, Int(0))
+
+    def popcount(self, start: Expr, stop: Expr) -> Expr:
+        """
+        Count the bits set between the bit indexes start and stop in global storage
+        of an application
+        """
+        return self._popcount_impl(start, stop)
+
+    def find_first_set(self) -> Expr:
+        """
+        Find the index of the first bit set in global storage of an application, or
+        the number of bits in the blob if none are
+        """
+        return self._find_first_set_impl()
+
+    def find_first_zero(self) -> Expr:
+        """
+        Find the index of the first bit not set in global storage of an application, or
+        the number of bits in the blob if all are
+        """
+        return self._find_first_zero_impl()
+
+    def read_all(self) -> Expr:
+        """
+        read the whole blob from global storage of an application, if it's small enough
+        to be held in one value
+        """
+        return self._read_all(App.globalGet)
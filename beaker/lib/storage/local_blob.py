@@ -1,26 +1,20 @@
 from pyteal import (
     App,
     Bytes,
-    Concat,
     Expr,
-    Extract,
-    For,
+    GetBit,
     GetByte,
-    If,
     Int,
-    Len,
-    Or,
     ScratchVar,
     Seq,
     SetByte,
     Subroutine,
-    Substring,
     TealType,
     Txn,
 )
 
 from beaker.consts import MAX_LOCAL_STATE
-from beaker.lib.storage.blob import BLOB_PAGE_SIZE, EMPTY_PAGE, Blob
+from beaker.lib.storage.blob import EMPTY_PAGE, Blob
 
 
 class LocalBlob(Blob):
@@ -67,120 +61,59 @@ class LocalBlob(Blob):
 
         self._set_byte_impl = set_byte_impl
 
-        @Subroutine(TealType.bytes)
-        def read_impl(acct: Expr, bstart: Expr, bend: Expr) -> Expr:
-            start_key_idx = self._key_idx(bstart)
-            start_offset = self._offset_for_idx(bstart)
-
-            stop_key_idx = self._key_idx(bend)
-            stop_offset = self._offset_for_idx(bend)
+        @Subroutine(TealType.uint64)
+        def get_bit_impl(acct: Expr, idx: Expr) -> Expr:
+            return GetBit(
+                App.localGet(acct, self._key(self._bit_key_idx(idx))),
+                self._bit_offset_for_idx(idx),
+            )
 
-            key_idx = ScratchVar()
-            buff = ScratchVar()
+        self._get_bit_impl = get_bit_impl
 
-            start = ScratchVar()
-            stop = ScratchVar()
+        @Subroutine(TealType.none)
+        def set_bit_impl(acct: Expr, idx: Expr, value: Expr) -> Expr:
+            return self._set_bit(
+                lambda key: App.localGet(acct, key),
+                lambda key, value: App.localPut(acct, key, value),
+                idx,
+                value,
+            )
 
-            init = key_idx.store(start_key_idx)
-            cond = key_idx.load() <= stop_key_idx
-            incr = key_idx.store(key_idx.load() + Int(1))
+        self._set_bit_impl = set_bit_impl
 
-            return Seq(
-                buff.store(Bytes("")),
-                For(init, cond, incr).Do(
-                    start.store(
-                        If(key_idx.load() == start_key_idx, start_offset, Int(0))
-                    ),
-                    stop.store(
-                        If(
-                            key_idx.load() == stop_key_idx,
-                            stop_offset,
-                            BLOB_PAGE_SIZE,
-                        )
-                    ),
-                    buff.store(
-                        Concat(
-                            buff.load(),
-                            Substring(
-                                App.localGet(acct, self._key(key_idx.load())),
-                                start.load(),
-                                stop.load(),
-                            ),
-                        )
-                    ),
-                ),
-                buff.load(),
+        @Subroutine(TealType.uint64)
+        def popcount_impl(acct: Expr, start: Expr, stop: Expr) -> Expr:
+            return self._popcount(
+                lambda bstart, bend: self.read(bstart, bend, acct=acct), start, stop
             )
 
-        self._read_impl = read_impl
+        self._popcount_impl = popcount_impl
 
-        @Subroutine(TealType.none)
-        def write_impl(acct: Expr, bstart: Expr, buff: Expr) -> Expr:
+        @Subroutine(TealType.uint64)
+        def find_first_set_impl(acct: Expr) -> Expr:
+            return self._find_first(lambda key: App.localGet(acct, key), value=1)
 
-            start_key_idx = self._key_idx(bstart)
-            start_offset = self._offset_for_idx(bstart)
+        self._find_first_set_impl = find_first_set_impl
 
-            stop_key_idx = self._key_idx(bstart + Len(buff))
-            stop_offset = self._offset_for_idx(bstart + Len(buff))
+        @Subroutine(TealType.uint64)
+        def find_first_zero_impl(acct: Expr) -> Expr:
+            return self._find_first(lambda key: App.localGet(acct, key), value=0)
 
-            key_idx = ScratchVar()
-            start = ScratchVar()
-            stop = ScratchVar()
-            written = ScratchVar()
+        self._find_first_zero_impl = find_first_zero_impl
 
-            init = key_idx.store(start_key_idx)
-            cond = key_idx.load() <= stop_key_idx
-            incr = key_idx.store(key_idx.load() + Int(1))
+        @Subroutine(TealType.bytes)
+        def read_impl(acct: Expr, bstart: Expr, bend: Expr) -> Expr:
+            return self._read_pages(lambda key: App.localGet(acct, key), bstart, bend)
 
-            delta = ScratchVar()
+        self._read_impl = read_impl
 
-            return Seq(
-                written.store(Int(0)),
-                For(init, cond, incr).Do(
-                    Seq(
-                        start.store(
-                            If(key_idx.load() == start_key_idx, start_offset, Int(0))
-                        ),
-                        stop.store(
-                            If(
-                                key_idx.load() == stop_key_idx,
-                                stop_offset,
-                                BLOB_PAGE_SIZE,
-                            )
-                        ),
-                        App.localPut(
-                            acct,
-                            self._key(key_idx.load()),
-                            If(
-                                Or(
-                                    stop.load() != BLOB_PAGE_SIZE,
-                                    start.load() != Int(0),
-                                )
-                            )  # Its a partial write
-                            .Then(
-                                delta.store(stop.load() - start.load()),
-                                Concat(
-                                    Substring(
-                                        App.localGet(acct, self._key(key_idx.load())),
-                                        Int(0),
-                                        start.load(),
-                                    ),
-                                    Extract(buff, written.load(), delta.load()),
-                                    Substring(
-                                        App.localGet(acct, self._key(key_idx.load())),
-                                        stop.load(),
-                                        BLOB_PAGE_SIZE,
-                                    ),
-                                ),
-                            )
-                            .Else(
-                                delta.store(BLOB_PAGE_SIZE),
-                                Extract(buff, written.load(), BLOB_PAGE_SIZE),
-                            ),
-                        ),
-                        written.store(written.load() + delta.load()),
-                    )
-                ),
+        @Subroutine(TealType.none)
+        def write_impl(acct: Expr, bstart: Expr, buff: Expr) -> Expr:
+            return self._write_pages(
+                lambda key: App.localGet(acct, key),
+                lambda key, value: App.localPut(acct, key, value),
+                bstart,
+                buff,
             )
 
         self._write_impl = write_impl
@@ -218,7 +151,8 @@ class LocalBlob(Blob):
         acct: Expr = Txn.sender(),  # noqa: B008
     ) -> Expr:
         """
-        read bytes between bstart and bend from local storage of an account by index
+        read bytes between bstart and bend from local storage of an account by index,
+        at most 4096 of them as for any value
         """
         return self._read_impl(acct, bstart, bend)
 
@@ -232,3 +166,59 @@ class LocalBlob(Blob):
         write bytes between bstart and len(buff) to local storage of an account
         """
         return self._write_impl(acct, bstart, buff)
+
+    def get_bit(self, idx: Expr, acct: Expr = Txn.sender()) -> Expr:  # noqa: B008
+        """
+        Get a single bit from local storage of an account by index, counting from the
+        highest bit of the first byte
+        """
+        return self._get_bit_impl(acct, idx)
+
+    def set_bit(
+        self,
+        idx: Expr,
+        value: Expr = Int(1),  # noqa: B008
+        acct: Expr = Txn.sender(),  # noqa: B008
+    ) -> Expr:
+        """
+        Set a single bit in local storage of an account by index, to 1 by default
+        """
+        return self._set_bit_impl(acct, idx, value)
+
+    def clear_bit(self, idx: Expr, acct: Expr = Txn.sender()) -> Expr:  # noqa: B008
+        """
+        Clear a single bit in local storage of an account by index
+        """
+        return self._set_bit_impl(acct, idx, Int(0))
+
+    def popcount(
+        self,
+        start: Expr,
+        stop: Expr,
+        acct: Expr = Txn.sender(),  # noqa: B008
+    ) -> Expr:
+        """
+        Count the bits set between the bit indexes start and stop in local storage of
+        an account
+        """
+        return self._popcount_impl(acct, start, stop)
+
+    def find_first_set(self, acct: Expr = Txn.sender()) -> Expr:  # noqa: B008
+        """
+        Find the index of the first bit set in local storage of an account, or the
+        number of bits in the blob if none are
+        """
+        return self._find_first_set_impl(acct)
+
+    def find_first_zero(self, acct: Expr = Txn.sender()) -> Expr:  # noqa: B008
+        """
+        Find the index of the first bit not set in local storage of an account, or the
+        number of bits in the blob if all are
+        """
+        return self._find_first_zero_impl(acct)
+
+    def read_all(self, acct: Expr = Txn.sender()) -> Expr:  # noqa: B008
+        """
+        read the whole blob from local storage of an account
+        """
+        return self._read_all(lambda key: App.localGet(acct, key))
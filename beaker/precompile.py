@@ -1,6 +1,9 @@
-from collections.abc import KeysView
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, KeysView
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, TypeVar, cast
 
 from pyteal import (
     Addr,
@@ -21,7 +24,22 @@ from pyteal import (
 )
 from pyteal.types import require_type
 
-from beaker.compilation import Program
+from beaker.build_cache import (
+    BuildCache,
+    CacheStats,
+    _cache_key,
+    _sha256,
+    application_fingerprint,
+    logic_signature_fingerprint,
+)
+from beaker.build_report import BuildReport, phase
+from beaker.compilation import (
+    Assembler,
+    CompileCache,
+    Program,
+    as_assembler,
+    compile_scope,
+)
 from beaker.consts import PROGRAM_DOMAIN_SEPARATOR, num_extra_program_pages
 from beaker.lib.strings import EncodeUVarInt
 
@@ -36,12 +54,16 @@ if TYPE_CHECKING:
 
 
 __all__ = [
+    "PrecompileNode",
+    "PrecompileRegistry",
     "PrecompiledApplication",
     "PrecompiledLogicSignature",
     "PrecompiledLogicSignatureTemplate",
     "PrecompileContextError",
 ]
 
+T = TypeVar("T")
+
 
 class PrecompiledApplication:
     """
@@ -49,15 +71,38 @@ class PrecompiledApplication:
     should be fully compiled prior to constructing its own program.
     """
 
-    def __init__(self, app: "Application", client: "AlgodClient"):
-        app_spec = app.build(client)
-        self._global_schema = app_spec.global_state_schema
-        self._local_schema = app_spec.local_state_schema
-
-        # at this point, we should have all the dependant logic built
-        # so we can compile the app teal
-        self.approval_program = Program(app_spec.approval_program, client)
-        self.clear_program = Program(app_spec.clear_program, client)
+    def __init__(
+        self,
+        app: "Application",
+        client: "AlgodClient | Assembler",
+        *,
+        cache: CompileCache | None = None,
+        build_cache: BuildCache | None = None,
+        report: BuildReport | None = None,
+    ):
+        with compile_scope(app.name):
+            app_spec = app.build(
+                client, cache=build_cache, compile_cache=cache, report=report
+            )
+            # kept here, as the app may be shared with parents that never built it
+            self.graph = app.precompile_graph
+            self._global_schema = app_spec.global_state_schema
+            self._local_schema = app_spec.local_state_schema
+
+            # at this point, we should have all the dependant logic built
+            # so we can compile the app teal
+            with phase(report, "assemble"):
+                self.approval_program = Program(
+                    app_spec.approval_program, client, cache=cache
+                )
+                self.clear_program = Program(
+                    app_spec.clear_program, client, cache=cache
+                )
+        if report is not None:
+            report.program_sizes["approval_binary"] = len(
+                self.approval_program.raw_binary
+            )
+            report.program_sizes["clear_binary"] = len(self.clear_program.raw_binary)
 
     def get_create_config(self) -> dict[TxnField, Expr | list[Expr]]:
         """get a dictionary of the fields and values that should be set when
@@ -93,14 +138,106 @@ class PrecompiledApplication:
         return result
 
 
+@dataclass(frozen=True)
+class PrecompileNode:
+    """
+    A node in the tree of apps and logic signatures resolved by ``precompiled``, as
+    returned by ``Application.precompile_graph``.
+
+    The fingerprint of a node covers its own inputs and the fingerprints of its children, so
+    it changes whenever anything below it does and two graphs can be compared to find out
+    what a rebuild had to recompile.
+    """
+
+    #: The name of the app, or ``LogicSignature(<hash>)`` for a logic signature
+    name: str
+    #: One of ``application``, ``logic_signature`` or ``logic_signature_template``
+    kind: str
+    fingerprint: str
+    children: tuple["PrecompileNode", ...] = ()
+
+    def walk(self) -> Iterator[tuple[tuple[str, ...], "PrecompileNode"]]:
+        """Yields every node in the tree, depth first, along with its path from the root"""
+        stack: list[tuple[tuple[str, ...], PrecompileNode]] = [((self.name,), self)]
+        while stack:
+            path, node = stack.pop()
+            yield path, node
+            stack.extend(
+                ((*path, child.name), child) for child in reversed(node.children)
+            )
+
+    def changed_since(self, previous: "PrecompileNode | None") -> list[tuple[str, ...]]:
+        """
+        Returns the paths of the nodes that are new or different compared to ``previous``,
+        i.e. the nodes a rebuild from ``previous`` had to recompile
+        """
+        before = {} if previous is None else dict(_fingerprints(previous))
+        return [path for path, fp in _fingerprints(self) if before.get(path) != fp]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "fingerprint": self.fingerprint,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "PrecompileNode":
+        return cls(
+            name=data["name"],
+            kind=data["kind"],
+            fingerprint=data["fingerprint"],
+            children=tuple(cls.from_dict(child) for child in data["children"]),
+        )
+
+
+def _fingerprints(root: PrecompileNode) -> Iterator[tuple[tuple[str, ...], str]]:
+    for path, node in root.walk():
+        yield path, node.fingerprint
+
+
+def _application_node(
+    app: "Application", children: list[PrecompileNode]
+) -> PrecompileNode:
+    return PrecompileNode(
+        name=app.name,
+        kind="application",
+        fingerprint=_sha256(
+            application_fingerprint(app), *(child.fingerprint for child in children)
+        ),
+        children=tuple(children),
+    )
+
+
+def _logic_signature_node(
+    lsig: "LogicSignature | LogicSignatureTemplate", *, template: bool
+) -> PrecompileNode:
+    return PrecompileNode(
+        name=_lsig_label(lsig.program),
+        kind="logic_signature_template" if template else "logic_signature",
+        fingerprint=logic_signature_fingerprint(lsig),
+    )
+
+
 class PrecompiledLogicSignature:
     """
     LSigPrecompile allows a smart contract to signal that some child Logic Signature
     should be fully compiled prior to constructing its own program.
     """
 
-    def __init__(self, lsig: "LogicSignature", client: "AlgodClient"):
-        self.logic_program = Program(lsig.program, client)
+    def __init__(
+        self,
+        lsig: "LogicSignature",
+        client: "AlgodClient | Assembler",
+        *,
+        cache: CompileCache | None = None,
+        report: BuildReport | None = None,
+    ):
+        with compile_scope(_lsig_label(lsig.program)), phase(report, "assemble"):
+            self.logic_program = Program(lsig.program, client, cache=cache)
+        if report is not None:
+            report.program_sizes["logic_binary"] = len(self.logic_program.raw_binary)
 
     def address(self) -> Expr:
         """Get the address from this LSig program."""
@@ -123,7 +260,14 @@ class PrecompiledLogicSignatureTemplate:
     should be fully compiled prior to constructing its own program.
     """
 
-    def __init__(self, lsig: "LogicSignatureTemplate", client: "AlgodClient"):
+    def __init__(
+        self,
+        lsig: "LogicSignatureTemplate",
+        client: "AlgodClient | Assembler",
+        *,
+        cache: CompileCache | None = None,
+        report: BuildReport | None = None,
+    ):
         self._template_values: dict[str, PrecompileTemplateValue] = {}
 
         lines = lsig.program.splitlines()
@@ -140,7 +284,10 @@ class PrecompiledLogicSignatureTemplate:
                 is_bytes=is_bytes, line=idx
             )
 
-        self.logic_program = Program("\n".join(lines), client)
+        with compile_scope(_lsig_label(lsig.program)), phase(report, "assemble"):
+            self.logic_program = Program("\n".join(lines), client, cache=cache)
+        if report is not None:
+            report.program_sizes["logic_binary"] = len(self.logic_program.raw_binary)
 
         for tv in self._template_values.values():
             # +1 to acount for the pushbytes/pushint op
@@ -280,6 +427,88 @@ class PrecompileContextError(Exception):
     pass
 
 
+class PrecompileRegistry:
+    """
+    PrecompileRegistry shares precompiled apps and logic signatures between the builds it is
+    given to (see ``Application.build``), so that each distinct child is built and assembled
+    once across them. Within one build, each child is already only built once.
+
+    Children are keyed on their fingerprint (which covers their ``BuildOptions``, see
+    ``BuildCache``) and the identity of the assembler, i.e. the network, they are compiled
+    for. Apps that can't be fingerprinted (see ``BuildCache.key``) aren't shared. As with
+    ``BuildCache``, the fingerprint doesn't cover helpers reached through module attributes,
+    so ``clear`` the registry after changing one in a long lived process.
+
+    At most ``max_entries`` children are kept, dropping the least recently used.
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, object] = OrderedDict()
+        self._key_locks: dict[str, threading.RLock] = {}
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        value: "Application | LogicSignature | LogicSignatureTemplate",
+        client: "AlgodClient | Assembler",
+    ) -> str | None:
+        """
+        Returns the key ``value`` is shared under when compiled by ``client``, or None if
+        it can't be shared
+        """
+        from beaker.application import Application
+
+        if isinstance(value, Application):
+            fingerprint = _cache_key(value)
+            if fingerprint is None:
+                return None
+        else:
+            fingerprint = logic_signature_fingerprint(value)
+        return _sha256(type(value).__name__, fingerprint, as_assembler(client).identity)
+
+    def get_or_create(self, key: str, factory: Callable[[], T]) -> tuple[T, bool]:
+        """
+        Returns the entry for ``key``, calling ``factory`` to create it if there isn't one yet,
+        and whether it was created. Concurrent requests for the same key wait for the first.
+        """
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.RLock())
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return cast(T, self._entries[key]), False
+                self.stats.misses += 1
+            value = factory()
+            with self._lock:
+                self._entries[key] = value
+                self.stats.stores += 1
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._key_locks.pop(evicted, None)
+            return value, True
+
+    def discard(self, key: str) -> None:
+        """Forget the entry for ``key``, if there is one"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Forget every shared precompile, so they are built again when next used"""
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
 def _py_encode_uvarint(integer: int) -> bytes:
     """Encodes an integer as an uvarint.
     :param integer: the integer to encode
@@ -298,3 +527,7 @@ def _py_encode_uvarint(integer: int) -> bytes:
     buffer.append(to_byte(integer))
 
     return bytes(buffer)
+
+
+def _lsig_label(program: str) -> str:
+    return f"LogicSignature({hashlib.sha256(program.encode()).hexdigest()[:8]})"
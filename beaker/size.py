@@ -0,0 +1,456 @@
+import re
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field, fields
+from typing import TYPE_CHECKING, Any
+
+from algokit_utils import ApplicationSpecification
+from algosdk import encoding
+
+from beaker.assembler import (
+    AssembledProgram,
+    assemble,
+    encode_uvarint,
+    parse_bytes,
+    parse_bytes_list,
+    tokenize,
+)
+from beaker.consts import PROGRAM_DOMAIN_SEPARATOR, num_extra_program_pages
+
+if TYPE_CHECKING:
+    from beaker.application import Application
+
+__all__ = [
+    "SizeChange",
+    "SizeDiff",
+    "SizeReport",
+    "analyze_sizes",
+]
+
+# a byte constant shorter than this is only attributed to a precompile if it is the
+# whole program, since short runs of bytes turn up in any program
+_MIN_PRECOMPILE_MATCH = 32
+# the number of largest unattributed constants kept in a report
+_MAX_CONSTANTS = 10
+
+
+@dataclass
+class SizeReport:
+    """
+    Where the bytes of an app's programs go. ``methods`` and ``sections`` divide up the
+    approval program between them, each ABI method's branch of the program being counted
+    along with the subroutines only it calls. The remaining views overlap with those,
+    breaking the same bytes down another way.
+
+    Compare the reports of two builds with ``diff``.
+    """
+
+    #: The name of the app
+    name: str = ""
+    #: Size in bytes of the approval program
+    approval: int = 0
+    #: Size in bytes of the clear program
+    clear: int = 0
+    #: Extra program pages needed to deploy the app
+    extra_pages: int = 0
+    #: Bytes of the approval program outside the ABI methods: the version and constant
+    #: blocks (``header``, ``constant_blocks``), the method routing (``dispatch``), the
+    #: bare calls (``bare_calls``) and subroutines called by more than one of those or
+    #: by none (``shared_subroutines``)
+    sections: dict[str, int] = field(default_factory=dict)
+    #: Bytes of each ABI method (by signature), including the subroutines only it calls
+    methods: dict[str, int] = field(default_factory=dict)
+    #: Bytes of each subroutine, excluding those it calls
+    subroutines: dict[str, int] = field(default_factory=dict)
+    #: Bytes of the keys of each declared state value, as ``global.<name>``/``local.<name>``
+    state: dict[str, int] = field(default_factory=dict)
+    #: Bytes of the programs (or addresses) of each precompiled app and logic signature
+    precompiles: dict[str, int] = field(default_factory=dict)
+    #: Bytes of the largest other byte constants, by a prefix of their hex
+    constants: dict[str, int] = field(default_factory=dict)
+    #: Bytes produced by each PyTeal function (``file:qualified name``), when the app was
+    #: built with ``BuildOptions.with_sourcemaps``
+    sources: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SizeReport":
+        names = {f.name for f in fields(cls)}
+        copied: dict[str, Any] = {
+            k: dict(v) if isinstance(v, dict) else v
+            for k, v in data.items()
+            if k in names
+        }
+        return cls(**copied)
+
+    def diff(self, before: "SizeReport") -> "SizeDiff":
+        """The changes in size since the ``before`` report, e.g. of the last release"""
+        changes = []
+        for f in fields(self):
+            old, new = getattr(before, f.name), getattr(self, f.name)
+            if isinstance(new, int):
+                if old != new:
+                    changes.append(SizeChange("total", f.name, old, new))
+            elif isinstance(new, dict):
+                for name in [*new, *(k for k in old if k not in new)]:
+                    if (was := old.get(name, 0)) != (now := new.get(name, 0)):
+                        changes.append(SizeChange(f.name, name, was, now))
+        # totals first, then the largest changes
+        changes.sort(key=lambda c: (c.section != "total", -abs(c.delta)))
+        return SizeDiff(before=before, after=self, changes=changes)
+
+    def summary(self) -> str:
+        """A human readable breakdown of the report, largest first within each view"""
+        pages = f", {self.extra_pages} extra pages" if self.extra_pages else ""
+        lines = [
+            f"{self.name}: approval={self.approval} clear={self.clear} bytes{pages}"
+        ]
+        for f in fields(self):
+            view = getattr(self, f.name)
+            if isinstance(view, dict) and view:
+                lines.append(f"  {f.name}:")
+                width = max(len(name) for name in view)
+                for name, size in sorted(view.items(), key=lambda kv: -kv[1]):
+                    lines.append(f"    {name:{width}} {size:6}")
+        return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class SizeChange:
+    #: ``total`` for the program sizes and extra pages, otherwise the ``SizeReport`` view
+    section: str
+    #: The program, method, subroutine etc that changed
+    name: str
+    #: Bytes before, 0 if it is new
+    before: int
+    #: Bytes after, 0 if it was removed
+    after: int
+
+    @property
+    def delta(self) -> int:
+        return self.after - self.before
+
+
+@dataclass
+class SizeDiff:
+    before: SizeReport
+    after: SizeReport
+    #: What changed, the totals first and then largest change first
+    changes: list[SizeChange]
+
+    @property
+    def grew(self) -> bool:
+        """Whether the programs got bigger"""
+        return (
+            self.after.approval + self.after.clear
+            > self.before.approval + self.before.clear
+        )
+
+    def summary(self) -> str:
+        """A human readable list of the changes"""
+        if not self.changes:
+            return f"{self.after.name}: no change"
+        lines = [f"{self.after.name}:"]
+        width = max(len(f"{c.section}.{c.name}") for c in self.changes)
+        for c in self.changes:
+            lines.append(
+                f"  {c.section + '.' + c.name:{width}} {c.before:6} -> {c.after:6} "
+                f"({c.delta:+})"
+            )
+        return "\n".join(lines)
+
+
+def analyze_sizes(
+    spec: ApplicationSpecification, *, app: "Application | None" = None
+) -> SizeReport:
+    """
+    Break down the size of the programs in ``spec``. Pass the ``app`` it was built from
+    to attribute embedded programs to its precompiles, and to break the approval program
+    down by PyTeal source when it was built with source maps.
+    """
+    approval = assemble(spec.approval_program)
+    clear = assemble(spec.clear_program)
+    selectors = {m.get_selector(): m.get_signature() for m in spec.contract.methods}
+    layout = _Layout(spec.approval_program, selectors)
+    line_sizes = _line_sizes(approval)
+
+    def size(lines: Iterable[int]) -> int:
+        return sum(line_sizes.get(line, 0) for line in lines)
+
+    report = SizeReport(
+        name=spec.contract.name,
+        approval=len(approval.bytecode),
+        clear=len(clear.bytecode),
+        extra_pages=max(0, num_extra_program_pages(approval.bytecode, clear.bytecode)),
+    )
+
+    # the main program blocks of each method, and of the bare calls and dispatch
+    owned: dict[str, set[str]] = {
+        sig: layout.reachable(label) for label, sig in layout.method_roots.items()
+    }
+    methods = set().union(*owned.values())
+    bare = set() if layout.bare_root is None else layout.reachable(layout.bare_root)
+    owned["bare_calls"] = bare - methods
+    owned["dispatch"] = set(layout.main) - methods - bare
+
+    # subroutines count towards their owner if only one owner calls them
+    owners: dict[str, set[str]] = {label: set() for label in layout.subroutines}
+    for owner, blocks in owned.items():
+        for label in layout.called(
+            set().union(*(layout.main[b].calls for b in blocks))
+        ):
+            owners[label].add(owner)
+
+    def owned_size(owner: str) -> int:
+        return size(
+            line for block in owned[owner] for line in layout.main[block].lines
+        ) + sum(
+            size(sub.lines)
+            for label, sub in layout.subroutines.items()
+            if owners[label] == {owner}
+        )
+
+    report.methods = {
+        m.get_signature(): (
+            owned_size(m.get_signature()) if m.get_signature() in owned else 0
+        )
+        for m in spec.contract.methods
+    }
+    constant_blocks = size(layout.constant_lines)
+    report.sections = {
+        "header": report.approval - size(line_sizes),
+        "constant_blocks": constant_blocks,
+        "dispatch": owned_size("dispatch"),
+        "bare_calls": owned_size("bare_calls"),
+        "shared_subroutines": sum(
+            size(sub.lines)
+            for label, sub in layout.subroutines.items()
+            if len(owners[label]) != 1
+        ),
+    }
+    for label, sub in layout.subroutines.items():
+        # without the counter suffix, which changes between builds
+        name = re.sub(r"_\d+$", "", label)
+        report.subroutines[name] = report.subroutines.get(name, 0) + size(sub.lines)
+
+    _attribute_constants(report, layout, spec, app, set(selectors))
+
+    source_maps = None if app is None else app.source_maps
+    if source_maps is not None:
+        plain = assemble(source_maps.approval.teal)
+        # the source maps are of the app's last build, which may not be that of spec
+        if plain.bytecode == approval.bytecode:
+            sources = source_maps.approval.line_sources()
+            for line, line_size in _line_sizes(plain).items():
+                name = sources[line]
+                report.sources[name] = report.sources.get(name, 0) + line_size
+    return report
+
+
+@dataclass
+class _Block:
+    lines: set[int] = field(default_factory=set)
+    successors: list[str] = field(default_factory=list)
+    calls: set[str] = field(default_factory=set)
+
+
+class _Layout:
+    """The blocks of the main program, and the subroutines, of a TEAL program"""
+
+    def __init__(self, teal: str, selectors: dict[bytes, str]):
+        statements: list[tuple[int, list[str]]] = []
+        for line_no, text in enumerate(teal.splitlines()):
+            for tokens in tokenize(text, line_no):
+                if tokens[0].endswith(":") and len(tokens) > 1:
+                    statements += [(line_no, tokens[:1]), (line_no, tokens[1:])]
+                else:
+                    statements.append((line_no, tokens))
+        called = {args[0] for _, (op, *args) in statements if op == "callsub" and args}
+
+        self.statements = statements
+        self.intc: list[int] = []
+        self.bytec: list[bytes] = []
+        self.main: dict[str, _Block] = {"": _Block()}
+        self.subroutines: dict[str, _Block] = {}
+        self.constant_lines: set[int] = set()
+        #: the main program block each method's branch starts at, by signature
+        self.method_roots: dict[str, str] = {}
+        self.bare_root: str | None = None
+
+        block = self.main[""]
+        in_main = falls_through = True
+        recent: list[list[str]] = []
+        seen: set[int] = set()
+        for line, tokens in statements:
+            op, *args = tokens
+            if op.endswith(":"):
+                label = op[:-1]
+                if label in called:
+                    in_main = False
+                    block = self.subroutines[label] = _Block()
+                elif in_main:
+                    if falls_through:
+                        block.successors.append(label)
+                    block = self.main[label] = _Block()
+                falls_through = True
+                continue
+            if op == "intcblock":
+                self.intc = [int(arg, 0) for arg in args]
+            elif op == "bytecblock":
+                self.bytec = parse_bytes_list(args, line)
+            if op in ("intcblock", "bytecblock"):
+                self.constant_lines.add(line)
+            elif line not in seen:
+                block.lines.add(line)
+            seen.add(line)
+
+            if op == "callsub":
+                block.calls.add(args[0])
+            elif op in ("b", "bz", "bnz"):
+                block.successors.append(args[0])
+            elif op in ("switch", "match"):
+                block.successors.extend(args)
+            if in_main and op == "bnz" and len(recent) >= 3:
+                self._dispatch_branch(recent[-3:], args[0], selectors)
+            falls_through = op not in ("b", "return", "err", "retsub")
+            recent = [*recent[-2:], tokens]
+
+    def reachable(self, label: str) -> set[str]:
+        """The main program blocks reachable from ``label``"""
+        found, todo = set(), [label]
+        while todo:
+            if (label := todo.pop()) not in found and label in self.main:
+                found.add(label)
+                todo.extend(self.main[label].successors)
+        return found
+
+    def called(self, labels: set[str]) -> set[str]:
+        """The subroutines called by ``labels``, directly or not"""
+        found, todo = set(), list(labels)
+        while todo:
+            if (label := todo.pop()) not in found and label in self.subroutines:
+                found.add(label)
+                todo.extend(self.subroutines[label].calls)
+        return found
+
+    def constant(self, tokens: list[str]) -> int | bytes | None:
+        """The value pushed by a constant opcode, if ``tokens`` is one"""
+        op, *args = tokens
+        try:
+            if op in ("intc", "bytec") or op[:-1] in ("intc_", "bytec_"):
+                index = int(args[0] if args else op[-1])
+                return (self.intc if op.startswith("intc") else self.bytec)[index]
+            if op in ("int", "pushint"):
+                return int(args[0], 0)
+            if op in ("byte", "pushbytes"):
+                return parse_bytes(args, 0)[0]
+            if op == "method":
+                return encoding.checksum(parse_bytes(args, 0)[0])[:4]
+        except (IndexError, ValueError):
+            pass
+        return None
+
+    def _dispatch_branch(
+        self, condition: list[list[str]], label: str, selectors: dict[bytes, str]
+    ) -> None:
+        # the routers branch to a method when `txna ApplicationArgs 0; <selector>; ==`,
+        # and to the bare calls when `txn NumAppArgs; <0>; ==`
+        loaded, value, compare = condition
+        if compare != ["=="]:
+            return
+        constant = self.constant(value)
+        if loaded == ["txna", "ApplicationArgs", "0"] and constant in selectors:
+            assert isinstance(constant, bytes)
+            self.method_roots.setdefault(label, selectors[constant])
+        elif loaded == ["txn", "NumAppArgs"] and constant == 0:
+            self.bare_root = self.bare_root or label
+
+
+def _attribute_constants(
+    report: SizeReport,
+    layout: _Layout,
+    spec: ApplicationSpecification,
+    app: "Application | None",
+    selectors: set[bytes],
+) -> None:
+    state_keys: dict[bytes, str] = {}
+    for scope in ("global", "local"):
+        declared_values = spec.schema.get(scope, {}).get("declared", {})  # type: ignore[attr-defined]
+        for name, declared in declared_values.items():
+            key = declared["key"]
+            state_keys[key.encode()] = f"{scope}.{name}"
+            if key.startswith("0x"):
+                state_keys[bytes.fromhex(key[2:])] = f"{scope}.{name}"
+
+    programs = _precompiled_programs(app) if app is not None else {}
+
+    def attribute(value: bytes) -> None:
+        size = len(encode_uvarint(len(value))) + len(value)
+        if value in selectors:
+            # counted as part of the dispatch
+            return
+        if name := next(
+            (
+                name
+                for name, program in programs.items()
+                if value == program
+                or (len(value) >= _MIN_PRECOMPILE_MATCH and value in program)
+            ),
+            None,
+        ):
+            view, key = report.precompiles, name
+        elif value in state_keys:
+            view, key = report.state, state_keys[value]
+        else:
+            preview = value[:8].hex() + ("..." if len(value) > 8 else "")
+            view, key = report.constants, f"0x{preview}"
+        view[key] = view.get(key, 0) + size
+
+    for line, tokens in layout.statements:
+        op, *args = tokens
+        if op in ("bytecblock", "pushbytess"):
+            for value in parse_bytes_list(args, line):
+                attribute(value)
+        elif op in ("byte", "pushbytes", "method"):
+            if isinstance(constant := layout.constant(tokens), bytes):
+                attribute(constant)
+
+    report.constants = dict(
+        sorted(report.constants.items(), key=lambda kv: -kv[1])[:_MAX_CONSTANTS]
+    )
+
+
+def _precompiled_programs(app: "Application") -> dict[str, bytes]:
+    """Each program embeddable by ``app``, and the address of each logic signature"""
+    from beaker.precompile import _lsig_label
+
+    programs = {}
+    for child, precompiled in app._precompiled_apps.items():
+        programs[f"{child.name}.approval"] = precompiled.approval_program.raw_binary
+        programs[f"{child.name}.clear"] = precompiled.clear_program.raw_binary
+    for teal, binary in [
+        *(
+            (lsig.program, p.logic_program.raw_binary)
+            for lsig, p in app._precompiled_lsigs.items()
+        ),
+        *(
+            (lsig.program, p.logic_program.raw_binary)
+            for lsig, p in app._precompiled_lsig_templates.items()
+        ),
+    ]:
+        programs[_lsig_label(teal)] = binary
+        programs[f"{_lsig_label(teal)}.address"] = encoding.checksum(
+            PROGRAM_DOMAIN_SEPARATOR.encode() + binary
+        )
+    return programs
+
+
+def _line_sizes(program: AssembledProgram) -> dict[int, int]:
+    """The bytes of bytecode assembled from each source line"""
+    sizes: dict[int, int] = {}
+    pcs = sorted(program.pc_to_line)
+    for pc, end in zip(pcs, [*pcs[1:], len(program.bytecode)], strict=True):
+        line = program.pc_to_line[pc]
+        sizes[line] = sizes.get(line, 0) + end - pc
+    return sizes
@@ -0,0 +1,123 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from pyteal import PyTealSourceMap, TealComponent
+
+try:
+    from pyteal.compiler.sourcemap import _PyTealSourceMapper
+except (
+    ImportError
+):  # not in every version of PyTeal, see beaker.application._compile_router
+    _PyTealSourceMapper = None  # type: ignore[assignment,misc]
+
+if TYPE_CHECKING:
+    from algosdk.v2client.algod import AlgodClient
+
+__all__ = [
+    "LazySourceMap",
+    "SourceMaps",
+]
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+class LazySourceMap:
+    """
+    The PyTeal source map and annotated TEAL of a program, generated the first time either
+    is accessed (or in the background, once ``prefetch`` is called) rather than during
+    ``Application.build``.
+    """
+
+    def __init__(
+        self,
+        teal: str,
+        teal_chunks: list[str],
+        components: list[TealComponent],
+        *,
+        teal_filename: str | None = None,
+        algod_client: "AlgodClient | None" = None,
+        annotate_teal_headers: bool = False,
+        annotate_teal_concise: bool = False,
+    ):
+        self.teal = teal
+        self._teal_chunks = teal_chunks
+        self._components = components
+        self._teal_filename = teal_filename
+        self._algod_client = algod_client
+        self._annotate_teal_headers = annotate_teal_headers
+        self._annotate_teal_concise = annotate_teal_concise
+        self._mapper: _PyTealSourceMapper | None = None
+        self._annotated_teal: str | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def sourcemap(self) -> PyTealSourceMap:
+        """The source map, relating each line of ``teal`` to the PyTeal that produced it"""
+        return self._build().get_sourcemap(self.teal)
+
+    @property
+    def annotated_teal(self) -> str:
+        """``teal``, with comments describing the PyTeal that produced each line"""
+        with self._lock:
+            if self._annotated_teal is None:
+                self._annotated_teal = self._build_locked().annotated_teal(
+                    omit_headers=not self._annotate_teal_headers,
+                    concise=self._annotate_teal_concise,
+                )
+            return self._annotated_teal
+
+    def build(self) -> None:
+        """Generate the source map now, if it hasn't been already"""
+        self._build()
+
+    def line_sources(self) -> list[str]:
+        """
+        The PyTeal that produced each line of ``teal``, as ``file:qualified name`` (e.g.
+        ``contract.py:GlobalStateBlob.read``)
+        """
+        with self._lock:
+            return [
+                f"{tmi.file()}:{tmi.code_qualname()}"
+                for tmi in self._build_locked()._cached_tmis
+            ]
+
+    def prefetch(self) -> "Future[str]":
+        """Start generating the annotated TEAL (and so the source map) on a background thread"""
+        global _executor
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="beaker-sourcemap"
+                )
+            executor = _executor
+        return executor.submit(lambda: self.annotated_teal)
+
+    def _build(self) -> _PyTealSourceMapper:
+        with self._lock:
+            return self._build_locked()
+
+    def _build_locked(self) -> _PyTealSourceMapper:
+        if self._mapper is None:
+            self._mapper = _PyTealSourceMapper(
+                teal_chunks=self._teal_chunks,
+                components=self._components,
+                build=True,
+                teal_filename=self._teal_filename,
+                include_pcs=self._algod_client is not None,
+                algod=self._algod_client,
+            )
+        return self._mapper
+
+
+@dataclass(frozen=True)
+class SourceMaps:
+    approval: LazySourceMap
+    clear: LazySourceMap
+
+    def prefetch(self) -> None:
+        """Start generating both source maps on a background thread"""
+        self.approval.prefetch()
+        self.clear.prefetch()
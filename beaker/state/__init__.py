@@ -5,6 +5,7 @@ from beaker.state._abc import (
     StateStorage,
 )
 from beaker.state.blob import GlobalStateBlob, LocalStateBlob, StateBlob
+from beaker.state.cache import cached_state
 from beaker.state.primitive import (
     GlobalStateValue,
     LocalStateValue,
@@ -32,6 +33,7 @@ __all__ = [
     "StateBlob",
     "StateStorage",
     "StateValue",
+    "cached_state",
     "identity_key_gen",
     "prefix_key_gen",
 ]
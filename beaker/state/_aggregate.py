@@ -1,21 +1,38 @@
+import itertools
+import string
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
 from functools import cached_property
 from typing import Any, Generic, TypeVar
 
 from algokit_utils import AppSpecStateDict
 from algosdk.transaction import StateSchema
-from pyteal import Expr, Seq, TealType
+from pyteal import Bytes, Expr, Int, Seq, TealType, While
 
-from beaker.consts import MAX_GLOBAL_STATE, MAX_LOCAL_STATE
+from beaker.consts import APP_CALL_BUDGET, MAX_GLOBAL_STATE, MAX_LOCAL_STATE
+from beaker.lib.inline import InlineAssembly
 from beaker.state._abc import (
     AppSpecSchemaFragment,
     GlobalStateStorage,
     LocalStateStorage,
     StateStorage,
 )
+from beaker.state.blob import GlobalStateBlob, LocalStateBlob
+from beaker.state.primitive import StateValue
+from beaker.state.reserved import ReservedStateValue
 
 ST = TypeVar("ST", bound=StateStorage)
 T = TypeVar("T")
 
+# rough size in bytes of the code to put a state value, besides its key
+_PUT_SIZE = 4
+# and of the code of a loop putting the values keyed in a table, besides the table
+_LOOP_SIZE = 30
+# the cost of setting up and tearing down that loop, and of each of its iterations
+_LOOP_COST = 8
+_ITERATION_COST = 10
+
 
 def _get_attrs_of_type(namespace: Any, type_: type[T]) -> dict[str, T]:  # noqa: ANN401
     result = {}
@@ -64,6 +81,65 @@ class StateAggregate(Generic[ST]):
     def total_keys(self) -> int:
         return self.schema.num_uints + self.schema.num_byte_slices
 
+    @contextmanager
+    def compact_keys(self, *, enabled: bool = True) -> Iterator[dict[str, str]]:
+        """
+        Within, key the state values whose key defaults to their attribute name by a
+        letter (or two, past 52 values) instead, yielding the new key of each by its name.
+
+        Keys are assigned in order of name, so adding, removing or renaming a state value
+        may change the keys of the others. Keys starting with the prefix of a reserved state
+        value are skipped, and ValueError is raised if a reserved state value has no prefix
+        (so may use any key).
+        """
+        values = (
+            {
+                name: field
+                for name, field in sorted(self._fields.items())
+                if isinstance(field, StateValue) and field._key_from_name
+            }
+            if enabled
+            else {}
+        )
+        compacted = {id(value) for value in values.values()}
+        taken = set()
+        prefixes = []
+        for name, field in self._fields.items():
+            if isinstance(field, StateValue) and id(field) not in compacted:
+                taken.add(field.str_key())
+            elif isinstance(field, GlobalStateBlob | LocalStateBlob):
+                taken.update(key.decode("latin-1") for key in field.blob.byte_keys)
+            elif isinstance(field, ReservedStateValue) and values:
+                if field._prefix is None:
+                    raise ValueError(
+                        f"Can't compact state keys, as reserved state value {name} may "
+                        "use any key, give it a prefix"
+                    )
+                prefixes.append(field._prefix)
+        letters = string.ascii_letters
+        candidates = itertools.chain(
+            letters, (a + b for a, b in itertools.product(letters, repeat=2))
+        )
+        keys = dict(
+            zip(
+                values,
+                (
+                    k
+                    for k in candidates
+                    if k not in taken and not k.startswith(tuple(prefixes))
+                ),
+                strict=False,
+            )
+        )
+        previous = {name: value._compact_key for name, value in values.items()}
+        try:
+            for name, value in values.items():
+                value._compact_key = Bytes(keys[name])
+            yield keys
+        finally:
+            for name, value in values.items():
+                value._compact_key = previous[name]
+
 
 class GlobalStateAggregate(StateAggregate[GlobalStateStorage]):
     def __init__(self, namespace: Any):  # noqa: ANN401
@@ -76,7 +152,7 @@ class GlobalStateAggregate(StateAggregate[GlobalStateStorage]):
 
     def initialize(self) -> Expr:
         """Generate expression from state values to initialize a default value"""
-        return Seq(*filter(None, (f.initialize() for f in self._fields.values())))
+        return _initialize(self._fields, acct=None)
 
 
 class LocalStateAggregate(StateAggregate[LocalStateStorage]):
@@ -90,6 +166,84 @@ class LocalStateAggregate(StateAggregate[LocalStateStorage]):
 
     def initialize(self, acct: Expr) -> Expr:
         """Generate expression from state values to initialize a default value"""
-        return Seq(
-            *filter(None, (f.initialize(acct=acct) for f in self._fields.values()))
-        )
+        return _initialize(self._fields, acct=acct)
+
+
+def _initialize(fields: dict[str, Any], acct: Expr | None) -> Expr:
+    """
+    Initialize the state values of ``fields`` to their defaults, putting each value unless
+    there are enough with the same default and key length that it's smaller to loop over a
+    table of their keys, and the loop fits in the budget of an app call.
+    """
+    entries = {name: _table_entry(field) for name, field in fields.items()}
+    tables: defaultdict[tuple[str, int], list[bytes]] = defaultdict(list)
+    for table_key, key in filter(None, entries.values()):
+        tables[table_key].append(key)
+
+    put_size = _PUT_SIZE if acct is None else _PUT_SIZE + 2
+    looped = {
+        table_key: keys
+        for table_key, keys in tables.items()
+        if _LOOP_SIZE + len(keys) * table_key[1] < len(keys) * put_size
+        and _LOOP_COST + len(keys) * _ITERATION_COST <= APP_CALL_BUDGET
+    }
+
+    inits = []
+    for name, field in fields.items():
+        if (entry := entries[name]) is None or (table_key := entry[0]) not in looped:
+            inits.append(
+                field.initialize() if acct is None else field.initialize(acct=acct)
+            )
+        elif keys := looped[table_key]:
+            # in place of the first value of the table
+            inits.append(_put_all(keys, field.default_value, acct))
+            looped[table_key] = []
+    return Seq(*filter(None, inits))
+
+
+def _table_entry(field: Any) -> tuple[tuple[str, int], bytes] | None:  # noqa: ANN401
+    """The table a state value could be initialized from, by its default and key length"""
+    if (
+        not isinstance(field, StateValue)
+        or field.static
+        or not isinstance(field.key, Bytes)
+        or not isinstance(default := field.default_value, Int | Bytes)
+        or (key := _key_bytes(field.key)) is None
+    ):
+        return None
+    return (f"{field.stack_type} {default}", len(key)), key
+
+
+def _key_bytes(key: Bytes) -> bytes | None:
+    match key.base:
+        case "utf8":
+            escaped = key.byte_str[1:-1].replace('\\"', '"')
+            return escaped.encode("latin-1").decode("unicode-escape").encode("latin-1")
+        case "base16":
+            return bytes.fromhex(key.byte_str)
+        case _:
+            return None
+
+
+def _put_all(keys: list[bytes], default: Expr, acct: Expr | None) -> Expr:
+    """
+    Put ``default`` for each of ``keys``, which are the same length, looping over the
+    table of them from the end with the default (and account) kept on the stack.
+    """
+    width = len(keys[0])
+    if acct is None:
+        # [default, table, end] -> [default, table, end - width]
+        put = ["dup2", f"pushint {width}", "extract3", "dig 3", "app_global_put"]
+        stack: tuple[Expr, ...] = (default,)
+    else:
+        # [acct, default, table, end] -> [acct, default, table, end - width]
+        put = ["dig 3", "dig 2", "dig 2", f"pushint {width}", "extract3", "dig 4"]
+        put += ["app_local_put"]
+        stack = (acct, default)
+    return Seq(
+        InlineAssembly(f"pushint {width * len(keys)}", *stack, Bytes(b"".join(keys))),
+        While(InlineAssembly("dup", type=TealType.uint64)).Do(
+            *map(InlineAssembly, [f"pushint {width}", "-", *put])
+        ),
+        *(InlineAssembly("pop") for _ in range(len(stack) + 2)),
+    )
@@ -1,11 +1,13 @@
-from abc import ABC, abstractmethod
+from abc import ABC
 from copy import copy
 from typing import Literal
 
-from pyteal import Expr, TealType, Txn
+from pyteal import Expr, Int, TealType, Txn
 
 from beaker.consts import MAX_GLOBAL_STATE, MAX_LOCAL_STATE
-from beaker.lib.storage import GlobalBlob, LocalBlob
+from beaker.lib.storage.blob import BlobStorage
+from beaker.lib.storage.global_blob import GlobalBlob
+from beaker.lib.storage.local_blob import LocalBlob
 
 __all__ = [
     "StateBlob",
@@ -16,64 +18,13 @@ __all__ = [
 from beaker.state._abc import GlobalStateStorage, LocalStateStorage, StateStorage
 
 
-class StateBlob(StateStorage, ABC):
+class StateBlob(StateStorage, BlobStorage, ABC):
     def value_type(self) -> Literal[TealType.bytes, TealType.uint64]:
         return TealType.bytes
 
     def app_spec_json(self) -> None:
         return None
 
-    @abstractmethod
-    def read(self, start: Expr, stop: Expr) -> Expr:
-        """
-        Reads some bytes from the buffer
-
-        Args:
-            start: An ``Expr`` that represents the start index to read from. Should evaluate to ``uint64``.
-            stop: An ``Expr`` that represents the stop index to read until. Should evaluate to ``uint64``.
-        Returns:
-            The bytes read from the blob from start to stop
-        """
-        ...
-
-    @abstractmethod
-    def write(self, start: Expr, buff: Expr) -> Expr:
-        """
-        Writes the buffer to the blob
-
-        Args:
-            start: An ``Expr`` that represents where to start writing. Should evaluate to ``uint64``.
-            buff: An ``Expr`` that represents the bytes to write. Should evaluate to ``bytes``.
-
-        """
-        ...
-
-    @abstractmethod
-    def read_byte(self, idx: Expr) -> Expr:
-        """
-        Reads a single byte from the given index
-
-        Args:
-            idx: An ``Expr`` that represents the index into the blob to read the byte from. Should evaluate to ``uint64``.
-
-        Returns:
-            A single byte as a ``uint64``
-
-        """
-        ...
-
-    @abstractmethod
-    def write_byte(self, idx: Expr, byte: Expr) -> Expr:
-        """
-        Writes a single byte to the given index
-
-        Args:
-            idx: An ``Expr`` that represents the index to write the byte to. Should evaluate to ``uint64``.
-            byte: An ``Expr`` That represents the index to write the byte to. Should evaluate to ``uint64``.
-
-        """
-        ...
-
 
 class LocalStateBlob(LocalStateStorage, StateBlob):
     def __init__(
@@ -106,6 +57,34 @@ class LocalStateBlob(LocalStateStorage, StateBlob):
     def write_byte(self, idx: Expr, byte: Expr) -> Expr:
         return self.blob.set_byte(idx, byte, acct=self.acct)
 
+    def read_all(self) -> Expr:
+        """Reads the whole blob, which must fit in a single value"""
+        return self.blob.read_all(acct=self.acct)
+
+    def get_bit(self, idx: Expr) -> Expr:
+        """Gets a single bit, counting from the highest bit of the first byte"""
+        return self.blob.get_bit(idx, acct=self.acct)
+
+    def set_bit(self, idx: Expr, value: Expr = Int(1)) -> Expr:  # noqa: B008
+        """Sets a single bit, to 1 by default"""
+        return self.blob.set_bit(idx, value, acct=self.acct)
+
+    def clear_bit(self, idx: Expr) -> Expr:
+        """Clears a single bit"""
+        return self.blob.clear_bit(idx, acct=self.acct)
+
+    def popcount(self, start: Expr, stop: Expr) -> Expr:
+        """Counts the bits set from the bit index start until stop"""
+        return self.blob.popcount(start, stop, acct=self.acct)
+
+    def find_first_set(self) -> Expr:
+        """Finds the index of the first bit set, or the number of bits if none are"""
+        return self.blob.find_first_set(acct=self.acct)
+
+    def find_first_zero(self) -> Expr:
+        """Finds the index of the first bit not set, or the number of bits if all are"""
+        return self.blob.find_first_zero(acct=self.acct)
+
 
 class GlobalStateBlob(GlobalStateStorage, StateBlob):
     def __init__(
@@ -131,3 +110,31 @@ class GlobalStateBlob(GlobalStateStorage, StateBlob):
 
     def write_byte(self, idx: Expr, byte: Expr) -> Expr:
         return self.blob.set_byte(idx, byte)
+
+    def read_all(self) -> Expr:
+        """Reads the whole blob, which must fit in a single value"""
+        return self.blob.read_all()
+
+    def get_bit(self, idx: Expr) -> Expr:
+        """Gets a single bit, counting from the highest bit of the first byte"""
+        return self.blob.get_bit(idx)
+
+    def set_bit(self, idx: Expr, value: Expr = Int(1)) -> Expr:  # noqa: B008
+        """Sets a single bit, to 1 by default"""
+        return self.blob.set_bit(idx, value)
+
+    def clear_bit(self, idx: Expr) -> Expr:
+        """Clears a single bit"""
+        return self.blob.clear_bit(idx)
+
+    def popcount(self, start: Expr, stop: Expr) -> Expr:
+        """Counts the bits set from the bit index start until stop"""
+        return self.blob.popcount(start, stop)
+
+    def find_first_set(self) -> Expr:
+        """Finds the index of the first bit set, or the number of bits if none are"""
+        return self.blob.find_first_set()
+
+    def find_first_zero(self) -> Expr:
+        """Finds the index of the first bit not set, or the number of bits if all are"""
+        return self.blob.find_first_zero()
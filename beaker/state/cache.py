@@ -0,0 +1,272 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+from pyteal import (
+    Assert,
+    Bytes,
+    CompileOptions,
+    Expr,
+    If,
+    Int,
+    Op,
+    Return,
+    ScratchVar,
+    Seq,
+    TealBlock,
+    TealInputError,
+    TealSimpleBlock,
+    TealType,
+    TxnExpr,
+    TxnField,
+)
+from pyteal.ast.return_ import ExitProgram
+
+if TYPE_CHECKING:
+    from beaker.state.primitive import StateValue
+
+__all__ = [
+    "cached_state",
+]
+
+# the cache of the innermost cached_state scope being built, if any
+_active_cache: ContextVar["_StateCache | None"] = ContextVar(
+    "beaker.state_cache", default=None
+)
+
+
+def cached_state(body: Callable[[], Expr]) -> Expr:
+    """
+    Build ``body`` with its reads and writes of ``GlobalStateValue``/``LocalStateValue`` served
+    from scratch slots: each value read is loaded once when the scope begins, and each value
+    written is stored once when it ends, however many times it is accessed in between.
+
+    .. code-block:: python
+
+        @app.external
+        def swap(amount: abi.Uint64) -> Expr:
+            return cached_state(
+                lambda: Seq(
+                    app.state.reserve_a.increment(amount.get()),
+                    app.state.reserve_b.set(k / app.state.reserve_a.get()),
+                )
+            )
+
+    Values keyed by a constant are cached, local values only for ``Txn.sender()``; other
+    values (and ``get_external``) access state directly. Writes of ``static`` values are
+    checked and made immediately, and ``get_maybe`` isn't supported in the scope, use
+    ``exists`` and ``get`` instead.
+
+    The cache only covers expressions built by ``body``: state accessed by a ``Subroutine``
+    called from it, or by using a state value as an expression rather than calling ``get``,
+    bypasses the cache and doesn't see pending writes. ``body`` must not return (or
+    approve or reject) anywhere, even in a branch, as its writes would be lost.
+
+    Values read are loaded when the scope begins, even when read only in a branch not
+    taken, so reading a sender's local state fails unless the sender has opted in.
+    """
+    if _active_cache.get() is not None:
+        # nested scopes share the outermost cache
+        return body()
+
+    cache = _StateCache()
+    token = _active_cache.set(cache)
+    try:
+        expr = body()
+    finally:
+        _active_cache.reset(token)
+
+    if _returns(expr):
+        raise TealInputError(
+            "cached_state body must not return, its writes would be lost"
+        )
+    cache.find_unconditional_writes(expr)
+    if expr.type_of() == TealType.none:
+        return Seq(*cache.loads(), expr, *cache.stores())
+    result = ScratchVar(expr.type_of())
+    return Seq(*cache.loads(), result.store(expr), *cache.stores(), result.load())
+
+
+def cache_entry(value: "StateValue", *, local: bool) -> "_CacheEntry | None":
+    """The entry caching ``value`` in the scope being built, if it can be cached"""
+    if (cache := _active_cache.get()) is None or not isinstance(value.key, Bytes):
+        return None
+    if local and not _is_sender(getattr(value, "acct", None)):
+        return None
+    key = ("local" if local else "global", value.key.byte_str)
+    if (entry := cache.entries.get(key)) is None:
+        entry = cache.entries[key] = _CacheEntry(value)
+    return entry
+
+
+class _StateCache:
+    def __init__(self) -> None:
+        self.entries: dict[tuple[str, str], _CacheEntry] = {}
+
+    def find_unconditional_writes(self, expr: Expr) -> None:
+        """Note the writes made whenever ``expr`` is, so don't need a flag to store them"""
+        writes = {id(w): e for e in self.entries.values() for w in e.writes}
+        todo = [expr]
+        while todo:
+            if (entry := writes.get(id(expr := todo.pop()))) is not None:
+                entry.written = True
+            elif isinstance(expr, Seq):
+                todo.extend(expr.args)
+
+    def loads(self) -> list[Expr]:
+        with _suspended():
+            return [load for entry in self.entries.values() if (load := entry.load())]
+
+    def stores(self) -> list[Expr]:
+        with _suspended():
+            return [s for entry in self.entries.values() if (s := entry.store())]
+
+
+class _CacheEntry:
+    def __init__(self, value: "StateValue"):
+        self.state_value = value
+        self.value = ScratchVar(value.stack_type)
+        self.read = False
+        # whether the value exists, kept if it is checked or deleted
+        self.exists: ScratchVar | None = None
+        self.reads_existence = False
+        # the writes and deletes of the value, whether one is always made (so the value
+        # is always stored), and if not, whether one was made at runtime
+        self.writes: list[Expr] = []
+        self.written = False
+        self.dirty: ScratchVar | None = None
+        self.deleted = False
+
+    def get(self) -> Expr:
+        self.read = True
+        return self.value.load()
+
+    def exists_flag(self) -> Expr:
+        self.read = self.reads_existence = True
+        return self._exists().load()
+
+    def set(self, val: Expr) -> Expr:
+        if self.state_value.static:
+            # written immediately, so the check that it isn't already set is too
+            with _suspended():
+                return Seq(
+                    self.value.store(val),
+                    self.state_value.set(self.value.load()),
+                    _Deferred(lambda: self._mark_exists(Int(1))),
+                )
+        return self._write(
+            self.value.store(val), _Deferred(lambda: self._mark_exists(Int(1)))
+        )
+
+    def delete(self) -> Expr:
+        self.deleted = True
+        self._exists()
+        zero = Int(0) if self.state_value.stack_type == TealType.uint64 else Bytes("")
+        return self._write(
+            self.value.store(zero), _Deferred(lambda: self._mark_exists(Int(0)))
+        )
+
+    def get_must(self) -> Expr:
+        return Seq(Assert(self.exists_flag()), self.get())
+
+    def get_else(self, val: Expr) -> Expr:
+        return If(self.exists_flag(), self.get(), val)
+
+    def load(self) -> Expr | None:
+        loads = []
+        if self.writes and not self.written:
+            loads.append(self._dirty().store(Int(0)))
+        if self.read and self.reads_existence:
+            loads += [
+                maybe := self.state_value.get_maybe(),
+                self.value.store(maybe.value()),
+                self._exists().store(maybe.hasValue()),
+            ]
+        elif self.read:
+            loads.append(self.value.store(self.state_value.get()))
+        return Seq(*loads) if loads else None
+
+    def store(self) -> Expr | None:
+        if not self.writes:
+            return None
+        write = self.state_value.set(self.value.load())
+        if self.deleted:
+            assert self.exists is not None
+            write = If(self.exists.load(), write, self.state_value.delete())
+        return write if self.written else If(self._dirty().load()).Then(write)
+
+    def _write(self, *exprs: Expr) -> Expr:
+        write = Seq(
+            *exprs,
+            _Deferred(lambda: Seq() if self.written else self._dirty().store(Int(1))),
+        )
+        self.writes.append(write)
+        return write
+
+    def _dirty(self) -> ScratchVar:
+        if self.dirty is None:
+            self.dirty = ScratchVar(TealType.uint64)
+        return self.dirty
+
+    def _exists(self) -> ScratchVar:
+        if self.exists is None:
+            self.exists = ScratchVar(TealType.uint64)
+        return self.exists
+
+    def _mark_exists(self, exists: Expr) -> Expr:
+        # only known once the whole scope is built
+        return Seq() if self.exists is None else self.exists.store(exists)
+
+
+class _Deferred(Expr):
+    """An expression built when it's compiled, after the whole scope has been built"""
+
+    def __init__(self, build: Callable[[], Expr]):
+        super().__init__()
+        self._build = build
+
+    def __teal__(self, options: CompileOptions) -> tuple[TealBlock, TealSimpleBlock]:
+        return self._build().__teal__(options)
+
+    def __str__(self) -> str:
+        return "(deferred)"
+
+    def type_of(self) -> TealType:
+        return TealType.none
+
+    def has_return(self) -> bool:
+        return False
+
+
+def _returns(expr: Expr) -> bool:
+    """Whether ``expr`` returns from the program (or a subroutine it's in) anywhere in it"""
+    seen: set[int] = set()
+    todo: list[object] = [expr]
+    while todo:
+        node = todo.pop()
+        if isinstance(node, list | tuple):
+            todo.extend(node)
+        elif isinstance(node, Expr) and id(node) not in seen:
+            if isinstance(node, Return | ExitProgram):
+                return True
+            seen.add(id(node))
+            todo.extend(vars(node).values())
+    return False
+
+
+@contextmanager
+def _suspended() -> Iterator[None]:
+    token = _active_cache.set(None)
+    try:
+        yield
+    finally:
+        _active_cache.reset(token)
+
+
+def _is_sender(acct: Expr | None) -> bool:
+    return (
+        isinstance(acct, TxnExpr)
+        and acct.op == Op.txn
+        and acct.field == TxnField.sender
+    )
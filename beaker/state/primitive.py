@@ -38,6 +38,7 @@ from beaker.state._abc import (
     LocalStateStorage,
     StateStorage,
 )
+from beaker.state.cache import _CacheEntry, cache_entry
 
 
 class StateValue(Expr, StateStorage):
@@ -75,6 +76,10 @@ class StateValue(Expr, StateStorage):
         elif key is not None:
             require_type(key, TealType.bytes)
         self._key = key
+        # whether the key defaulted to the attribute name, so may be compacted
+        self._key_from_name = False
+        # the key assigned by compact_keys, while building an app that compacts them
+        self._compact_key: Bytes | None = None
 
         if default is not None:
             require_type(default, self.stack_type)
@@ -83,9 +88,12 @@ class StateValue(Expr, StateStorage):
     def __set_name__(self, owner: type, name: str) -> None:
         if self._key is None:
             self._key = Bytes(name)
+            self._key_from_name = True
 
     @property
     def key(self) -> Expr:
+        if self._compact_key is not None:
+            return self._compact_key
         if self._key is None:
             raise TealInputError(f"{self} has no key defined")
         return self._key
@@ -148,14 +156,15 @@ class StateValue(Expr, StateStorage):
         return self.stack_type
 
     def app_spec_json(self) -> AppSpecSchemaFragment:
-        return AppSpecSchemaFragment(
-            "declared",
-            {
-                "type": self.value_type().name,
-                "key": self.str_key(),
-                "descr": self.descr or "",
-            },
-        )
+        data: dict[str, str | bool] = {
+            "type": self.value_type().name,
+            "key": self.str_key(),
+            "descr": self.descr or "",
+        }
+        if self._compact_key is not None:
+            # lets clients map the key back to the name it is declared under
+            data["compact"] = True
+        return AppSpecSchemaFragment("declared", data)
 
     @abstractmethod
     def set(self, val: Expr) -> Expr:
@@ -185,6 +194,16 @@ class StateValue(Expr, StateStorage):
     def delete(self) -> Expr:
         """deletes the key from state, if the value is static it will be a compile time error"""
 
+    def _cache_entry(self) -> _CacheEntry | None:
+        """The entry for this value in the ``cached_state`` scope being built, if any"""
+        return cache_entry(self, local=isinstance(self, LocalStateStorage))
+
+    def _check_not_cached(self) -> None:
+        if self._cache_entry() is not None:
+            raise TealInputError(
+                f"{self}: get_maybe isn't supported within cached_state, use exists and get"
+            )
+
     def _check_not_static(self) -> None:
         if self.static:
             raise TealInputError(f"StateValue {self} is static")
@@ -218,6 +237,8 @@ class GlobalStateValue(StateValue, GlobalStateStorage):
 
     def set(self, val: Expr) -> Expr:
         self._check_match_type(val)
+        if (entry := self._cache_entry()) is not None:
+            return entry.set(val)
         if self.static:
             return Seq(
                 v := App.globalGetEx(Int(0), self.key),
@@ -227,16 +248,23 @@ class GlobalStateValue(StateValue, GlobalStateStorage):
         return App.globalPut(self.key, val)
 
     def get(self) -> Expr:
+        if (entry := self._cache_entry()) is not None:
+            return entry.get()
         return App.globalGet(self.key)
 
     def get_maybe(self) -> MaybeValue:
+        self._check_not_cached()
         return App.globalGetEx(Int(0), self.key)
 
     def get_must(self) -> Expr:
+        if (entry := self._cache_entry()) is not None:
+            return entry.get_must()
         return Seq(val := self.get_maybe(), Assert(val.hasValue()), val.value())
 
     def get_else(self, val: Expr) -> Expr:
         self._check_match_type(val)
+        if (entry := self._cache_entry()) is not None:
+            return entry.get_else(val)
         return Seq(v := self.get_maybe(), If(v.hasValue(), v.value(), val))
 
     def get_external(self, app_id: Expr) -> MaybeValue:
@@ -244,10 +272,14 @@ class GlobalStateValue(StateValue, GlobalStateStorage):
         return App.globalGetEx(app_id, self.key)
 
     def exists(self) -> Expr:
+        if (entry := self._cache_entry()) is not None:
+            return entry.exists_flag()
         return Seq(val := self.get_maybe(), val.hasValue())
 
     def delete(self) -> Expr:
         self._check_not_static()
+        if (entry := self._cache_entry()) is not None:
+            return entry.delete()
         return App.globalDel(self.key)
 
 
@@ -289,6 +321,8 @@ class LocalStateValue(StateValue, LocalStateStorage):
 
     def set(self, val: Expr) -> Expr:
         self._check_match_type(val)
+        if (entry := self._cache_entry()) is not None:
+            return entry.set(val)
 
         if self.static:
             return Seq(
@@ -300,16 +334,23 @@ class LocalStateValue(StateValue, LocalStateStorage):
         return App.localPut(self.acct, self.key, val)
 
     def get(self) -> Expr:
+        if (entry := self._cache_entry()) is not None:
+            return entry.get()
         return App.localGet(self.acct, self.key)
 
     def get_maybe(self) -> MaybeValue:
+        self._check_not_cached()
         return App.localGetEx(self.acct, Int(0), self.key)
 
     def get_must(self) -> Expr:
+        if (entry := self._cache_entry()) is not None:
+            return entry.get_must()
         return Seq(val := self.get_maybe(), Assert(val.hasValue()), val.value())
 
     def get_else(self, val: Expr) -> Expr:
         self._check_match_type(val)
+        if (entry := self._cache_entry()) is not None:
+            return entry.get_else(val)
         return Seq(v := self.get_maybe(), If(v.hasValue(), v.value(), val))
 
     def get_external(self, app_id: Expr) -> MaybeValue:
@@ -317,9 +358,13 @@ class LocalStateValue(StateValue, LocalStateStorage):
         return App.localGetEx(self.acct, app_id, self.key)
 
     def exists(self) -> Expr:
+        if (entry := self._cache_entry()) is not None:
+            return entry.exists_flag()
         return Seq(val := self.get_maybe(), val.hasValue())
 
     def delete(self) -> Expr:
+        if (entry := self._cache_entry()) is not None:
+            return entry.delete()
         return App.localDel(self.acct, self.key)
 
     def __getitem__(self, acct: Expr) -> "LocalStateValue":
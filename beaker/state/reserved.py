@@ -66,10 +66,13 @@ class ReservedStateValue(Generic[ST], StateStorage, ABC):
         self.max_keys = max_keys
         self.descr = descr
         self.key_gen = key_gen
+        # what every key starts with, if known
+        self._prefix = prefix or None
 
     def __set_name__(self, owner: type, name: str) -> None:
         if self.key_gen is None:
             self.key_gen = prefix_key_gen(name)
+            self._prefix = name
 
     @property
     def key_gen(self) -> KeyGenerator | None:
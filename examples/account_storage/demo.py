@@ -93,7 +93,8 @@ def main() -> None:
         )
 
         # Did the expected byte have the expected integer value?
-        assert int(blob[idx // 8]) == 2 ** (idx % 8)
+        # (bits are counted from the highest bit of each byte)
+        assert int(blob[idx // 8]) == 2 ** (7 - idx % 8)
         print(f"bit set correctly at index {idx}")
 
 
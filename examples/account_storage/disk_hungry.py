@@ -54,31 +54,5 @@ def flip_bit(nonce_acct: pt.abi.Account, bit_idx: pt.abi.Uint32) -> pt.Expr:
     Allows caller to flip a bit at a given index for some
     account that has already opted in
     """
-
-    return pt.Seq(
-        # Read byte
-        (byte := pt.ScratchVar()).store(
-            app.state.data[nonce_acct.address()].read_byte(byte_idx(bit_idx.get()))
-        ),
-        # Flip bit
-        byte.store(
-            pt.SetBit(
-                byte.load(),
-                bit_in_byte_idx(bit_idx.get()),
-                pt.Not(pt.GetBit(byte.load(), bit_in_byte_idx(bit_idx.get()))),
-            )
-        ),
-        # Write byte
-        app.state.data[nonce_acct.address()].write_byte(
-            byte_idx(bit_idx.get()), byte.load()
-        ),
-    )
-
-
-# no decorator, these are inlined
-def byte_idx(bit_idx: pt.Expr) -> pt.Int:
-    return bit_idx / pt.Int(8)
-
-
-def bit_in_byte_idx(bit_idx: pt.Expr) -> pt.Int:
-    return bit_idx % pt.Int(8)
+    data = app.state.data[nonce_acct.address()]
+    return data.set_bit(bit_idx.get(), pt.Not(data.get_bit(bit_idx.get())))
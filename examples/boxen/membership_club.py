@@ -130,15 +130,8 @@ def add_member(
 
 @app.external(authorize=beaker.Authorize.only_creator())
 def update_role(member: pt.abi.Account, new_role: pt.abi.Uint8) -> pt.Expr:
-    return pt.Seq(
-        (mr := MembershipRecord()).decode(
-            app.state.membership_records[member.address()].get()
-        ),
-        # retain their voted status
-        (voted := pt.abi.Bool()).set(mr.voted),
-        mr.set(new_role, voted),
-        app.state.membership_records[member.address()].set(mr),
-    )
+    # only the role is written, retaining their voted status
+    return app.state.membership_records[member.address()].field("role").set(new_role)
 
 
 @app.external
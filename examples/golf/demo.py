@@ -23,7 +23,9 @@ def get_box(app_client: client.ApplicationClient, name: bytes) -> list[int]:
 
     vals = []
     data = base64.b64decode(box_contents["value"])
-    for idx in range(len(data) // 8):
+    # the list is prefixed by its length
+    length, data = int.from_bytes(data[:2], "big"), data[2:]
+    for idx in range(length):
         vals.append(int.from_bytes(data[idx * 8 : (idx + 1) * 8], "big"))
 
     return vals
@@ -50,8 +52,8 @@ def main() -> None:
         boxes=boxes,
     )
 
-    # Shuffle 0-511
-    nums = list(range(512))
+    # Shuffle as many ints as fit
+    nums = list(range(sorted_integers.MAX_INTS))
     random.shuffle(nums)
     budgets = []
     for idx, n in enumerate(nums):
@@ -0,0 +1,216 @@
+import re
+from pathlib import Path
+
+import pyteal as pt
+import pytest
+from algosdk import logic
+from algosdk.source_map import SourceMap
+
+from beaker import Application, LogicSignature, OfflineAssembler, precompiled
+from beaker.assembler import (
+    TealAssemblyError,
+    assemble,
+    encode_uvarint,
+    parse_bytes,
+    parse_bytes_list,
+    parse_int,
+    tokenize,
+)
+from beaker.compilation import Program
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def test_matches_algod_bytecode() -> None:
+    # C2CMain embeds the bytecode algod produced for C2CSub
+    sub_teal = (EXAMPLES / "c2c" / "C2CSub.artifacts" / "approval.teal").read_text()
+    main_teal = (EXAMPLES / "c2c" / "C2CMain.artifacts" / "approval.teal").read_text()
+
+    bytecode = assemble(sub_teal).bytecode
+    assert f"pushbytes 0x{bytecode.hex()} " in main_teal
+
+
+def test_matches_algod_source_map() -> None:
+    # the annotated TEAL records the pc algod reported for each line
+    annotated = (
+        EXAMPLES / "source_mapping" / "SourceMapped.artifacts" / "approval.teal"
+    ).read_text()
+    teal_lines = []
+    expected_pcs = {}
+    for idx, line in enumerate(annotated.splitlines()[1:]):
+        code, _, annotation = line.partition("//    ")
+        teal_lines.append(code)
+        if match := re.match(r"\s*\((\d+)\)", annotation):
+            expected_pcs[idx] = int(match[1])
+
+    source_map = SourceMap(assemble("\n".join(teal_lines)).source_map())
+    actual_pcs = {
+        idx: pcs[0]
+        for idx in expected_pcs
+        if (pcs := source_map.get_pcs_for_line(idx)) is not None
+    }
+    assert len(expected_pcs) > 50
+    assert actual_pcs == expected_pcs
+
+
+def test_pseudo_op_constants_sorted_by_use() -> None:
+    program = assemble(
+        "\n".join(
+            [
+                "#pragma version 8",
+                "int 7",
+                "int 1",
+                "int 1",
+                "byte 0x01",
+                'byte "abc"',
+                "byte 0x01",
+                "+",
+            ]
+        )
+    )
+    assert program.bytecode == bytes.fromhex(
+        "08"
+        "20010126010101"  # intcblock 1, bytecblock 0x01
+        "8107"  # pushint 7 (used once)
+        "2222"  # intc_0 x 2
+        "28"  # bytec_0
+        "8003616263"  # pushbytes "abc" (used once)
+        "28"  # bytec_0
+        "08"  # +
+    )
+
+
+def test_pseudo_op_constants_before_v4() -> None:
+    program = assemble("#pragma version 3\nint 7\nint 1\nint 1")
+    # in order of first appearance, and never pushed
+    assert program.bytecode == bytes.fromhex("0320020701222323")
+
+
+def test_pseudo_op_with_explicit_block() -> None:
+    assert assemble("#pragma version 8\nintcblock 1\nint 1").bytecode == bytes.fromhex(
+        "082001018101"
+    )
+    assert assemble("#pragma version 3\nintcblock 1 2\nint 2").bytecode == (
+        bytes.fromhex("032002010223")
+    )
+    with pytest.raises(TealAssemblyError, match="does not appear"):
+        assemble("#pragma version 3\nintcblock 1 2\nint 3")
+
+
+def test_pseudo_ops() -> None:
+    address = "AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAY5HFKQ"
+    program = assemble(
+        "\n".join(
+            [
+                "#pragma version 8",
+                f"addr {address}",
+                'method "add(uint64,uint64)uint64"',
+                "txn ApplicationArgs 1",
+                "int pay",
+                "byte base64 AQI=",
+                "extract",
+                "replace 1",
+            ]
+        )
+    )
+    zero_address = "00" * 32
+    assert program.bytecode == bytes.fromhex(
+        "08"
+        f"8020{zero_address}"  # addr
+        "8004fe6bdf69"  # method
+        "361a01"  # txna ApplicationArgs 1
+        "8101"  # pushint 1
+        "80020102"  # pushbytes 0x0102
+        "58"  # extract3
+        "5c01"  # replace2 1
+    )
+
+
+def test_branches() -> None:
+    program = assemble(
+        "\n".join(
+            [
+                "#pragma version 8",
+                "loop: // a comment",
+                "pushint 1; bnz done",
+                "b loop",
+                "done:",
+                "switch loop done",
+                "callsub sub",
+                "sub:",
+                "retsub",
+            ]
+        )
+    )
+    assert program.bytecode == bytes.fromhex(
+        "08"
+        "8101"  # pushint 1
+        "400003"  # bnz done
+        "42fff8"  # b loop
+        "8d02fff2fffa"  # switch loop done
+        "880000"  # callsub sub
+        "89"  # retsub
+    )
+    assert program.pc_to_line == {1: 2, 3: 2, 6: 3, 9: 5, 15: 6, 18: 8}
+
+    with pytest.raises(TealAssemblyError, match="back reference"):
+        assemble("#pragma version 3\nloop:\nint 1\nbnz loop")
+    with pytest.raises(TealAssemblyError, match="undefined label"):
+        assemble("#pragma version 8\nb nowhere")
+
+
+@pytest.mark.parametrize(
+    ("teal", "error"),
+    [
+        ("#pragma version 8\nfoo", "unknown opcode"),
+        ("#pragma version 2\nassert", "introduced in v3"),
+        ("#pragma version 8\ntxn Nope", "unknown field"),
+        ("#pragma version 8\npushint", "expects 1 immediate"),
+        ('#pragma version 8\nbyte "abc', "unterminated"),
+        ("#pragma version 99", "unsupported version"),
+        ("#pragma version 8\nint 1\n#pragma version 8", "only allowed before"),
+    ],
+)
+def test_errors(teal: str, error: str) -> None:
+    with pytest.raises(TealAssemblyError, match=error):
+        assemble(teal)
+
+
+def test_program_hash() -> None:
+    program = Program("#pragma version 8\npushint 1\nreturn", OfflineAssembler())
+    assert program.raw_binary == bytes.fromhex("08810143")
+    assert program.binary_hash == logic.address(program.raw_binary)
+    assert program.source_map.get_line_for_pc(1) == 1
+    assert program.source_map.get_line_for_pc(3) == 2
+
+
+def test_build_offline() -> None:
+    lsig = LogicSignature(pt.Approve())
+    app = Application("Offline")
+
+    @app.external
+    def check(*, output: pt.abi.Address) -> pt.Expr:
+        return output.set(precompiled(lsig).address())
+
+    app.build(OfflineAssembler())
+
+    expected = logic.address(assemble(lsig.program).bytecode)
+    assert app._precompiled_lsigs[lsig].logic_program.binary_hash == expected
+
+
+def test_parsing() -> None:
+    assert tokenize('int 1; byte "a; b" // comment', 0) == [
+        ["int", "1"],
+        ["byte", '"a; b"'],
+    ]
+    assert [parse_int(t, 0) for t in ["0x10", "010", "1_000", "OptIn"]] == [
+        16,
+        8,
+        1000,
+        1,
+    ]
+    assert parse_bytes(["base64", "AA==", "0x01"], 0) == (b"\x00", ["0x01"])
+    assert parse_bytes_list(['"a\\x01"', "b32(ME)"], 0) == [b"a\x01", b"a"]
+    assert encode_uvarint(300) == b"\xac\x02"
+    with pytest.raises(TealAssemblyError, match="^3: unable to parse"):
+        parse_int("x", 2)
@@ -0,0 +1,112 @@
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from _pytest.capture import CaptureFixture
+from _pytest.monkeypatch import MonkeyPatch
+
+from beaker import build_many
+from beaker.batch import AppBuildResult, discover
+from beaker.cli import main
+
+MODULE = """
+import pyteal as pt
+import beaker
+
+child = beaker.Application("{prefix}Child")
+
+@child.external
+def value(*, output: pt.abi.Uint64) -> pt.Expr:
+    return output.set(pt.Int({value}))
+
+parent = beaker.Application("{prefix}Parent")
+
+@parent.external
+def child_hash(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+    return output.set(pt.Sha512_256(beaker.precompiled(child).approval_program.binary))
+
+alias = parent
+"""
+
+
+@pytest.fixture()
+def modules(tmp_path: Path, monkeypatch: MonkeyPatch) -> Iterator[Path]:
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    (source_dir / "batch_a.py").write_text(MODULE.format(prefix="A", value=1))
+    (source_dir / "batch_b.py").write_text(MODULE.format(prefix="B", value=1))
+    (source_dir / "batch_c.py").write_text(MODULE.format(prefix="A", value=3))
+    monkeypatch.syspath_prepend(str(source_dir))
+    yield source_dir
+    for name in ("batch_a", "batch_b", "batch_c"):
+        sys.modules.pop(name, None)
+
+
+def statuses(results: list[AppBuildResult]) -> dict[str, str]:
+    return {r.name: r.status for r in results}
+
+
+def test_build_many(modules: Path, tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    results = build_many(["batch_a", "batch_b"], out, max_workers=2)
+    assert statuses(results) == dict.fromkeys(
+        ["AChild", "AParent", "BChild", "BParent"], "written"
+    )
+    assert sorted(p.name for p in (out / "AParent.artifacts").iterdir()) == [
+        ".fingerprint",
+        "application.json",
+        "approval.teal",
+        "clear.teal",
+        "contract.json",
+    ]
+
+    results = build_many(["batch_a", "batch_b"], out, max_workers=2)
+    assert set(statuses(results).values()) == {"skipped"}
+
+    # the parent embeds the child, so both change
+    (modules / "batch_a.py").write_text(MODULE.format(prefix="A", value=2))
+    # the apps are found in this process before they're built, so import it again
+    sys.modules.pop("batch_a")
+    results = build_many(["batch_a", "batch_b"], out, max_workers=2)
+    assert statuses(results) == {
+        "AChild": "written",
+        "AParent": "written",
+        "BChild": "skipped",
+        "BParent": "skipped",
+    }
+    assert results[0].written == ("approval.teal", "application.json")
+
+    results = build_many(["batch_b"], out, max_workers=1, force=True)
+    assert set(statuses(results).values()) == {"unchanged"}
+
+
+def test_build_many_collision(modules: Path, tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    with pytest.raises(ValueError, match="share the output directory"):
+        build_many(["batch_a", "batch_c"], out, max_workers=2)
+    # nothing was built or written
+    assert not out.exists()
+
+    # the same app found twice isn't a collision, and is only built once
+    results = build_many(["batch_a:child", "batch_a", "batch_a"], out, max_workers=2)
+    assert [(r.module, r.name) for r in results] == [
+        ("batch_a:child", "AChild"),
+        ("batch_a", "AParent"),
+    ]
+
+
+def test_discover(modules: Path) -> None:
+    assert [app.name for app in discover("batch_a")] == ["AChild", "AParent"]
+    assert [app.name for app in discover("batch_a:child")] == ["AChild"]
+    with pytest.raises(TypeError, match="not an Application"):
+        discover("batch_a:pt")
+
+
+def test_cli(modules: Path, tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    out = str(tmp_path / "out")
+    assert main(["build", "batch_b:child", "-o", out, "-j", "1"]) == 0
+    assert capsys.readouterr().out.startswith("written   BChild (batch_b:child)")
+
+    assert main(["build", "batch_b:child", "-o", out]) == 0
+    assert capsys.readouterr().out.startswith("skipped   BChild")
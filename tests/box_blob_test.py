@@ -0,0 +1,116 @@
+import pyteal as pt
+import pytest
+
+from beaker.application import Application
+from beaker.consts import MAX_BOX_SIZE
+from beaker.lib.storage import BoxBlob
+from beaker.lib.storage.blob import BlobStorage
+from beaker.state import GlobalStateBlob, LocalStateBlob
+
+from tests.conftest import method_ops
+
+options = pt.CompileOptions(version=pt.MAX_TEAL_VERSION, mode=pt.Mode.Application)
+
+
+def assert_teal_equal(actual: pt.Expr, expected: pt.Expr) -> None:
+    with pt.TealComponent.Context.ignoreExprEquality():
+        assert actual.__teal__(options)[0] == expected.__teal__(options)[0]
+
+
+def test_box_blob() -> None:
+    blob = BoxBlob(name="b")
+
+    assert blob._max_bytes == MAX_BOX_SIZE
+    assert_teal_equal(blob.create(), pt.BoxCreate(pt.Bytes("b"), pt.Int(MAX_BOX_SIZE)))
+
+    start, stop = pt.Int(20000), pt.Int(20008)
+    assert_teal_equal(
+        blob.read(start, stop), pt.BoxExtract(pt.Bytes("b"), start, stop - start)
+    )
+    buff = pt.Bytes("abc")
+    assert_teal_equal(
+        blob.write(start, buff), pt.BoxReplace(pt.Bytes("b"), start, buff)
+    )
+
+
+def test_box_blob_errors() -> None:
+    with pytest.raises(ValueError, match="size"):
+        BoxBlob(MAX_BOX_SIZE + 1)
+    with pytest.raises(pt.TealInputError, match="read at once"):
+        BoxBlob(4097, name="b").read_all()
+
+
+def test_box_blob_app() -> None:
+    class State:
+        blob = BoxBlob(1024)
+
+    t = Application("T", state=State())
+
+    @t.external
+    def bootstrap() -> pt.Expr:
+        return pt.Pop(t.state.blob.create())
+
+    @t.external
+    def read(
+        start: pt.abi.Uint16, stop: pt.abi.Uint16, *, output: pt.abi.DynamicBytes
+    ) -> pt.Expr:
+        return output.set(t.state.blob.read(start.get(), stop.get()))
+
+    @t.external
+    def write(start: pt.abi.Uint16, buff: pt.abi.DynamicBytes) -> pt.Expr:
+        return t.state.blob.write(start.get(), buff.get())
+
+    @t.external
+    def flip_byte(idx: pt.abi.Uint16) -> pt.Expr:
+        blob = t.state.blob
+        return blob.write_byte(idx.get(), pt.Int(0xFF) ^ blob.read_byte(idx.get()))
+
+    @t.external
+    def read_all(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+        return output.set(t.state.blob.read_all())
+
+    program = t.build().approval_program
+    assert "box_create" in program and "0x626c6f62" in program  # "blob"
+    assert "box_extract" in program and "box_replace" in program
+    # no pages to loop over, just a call of each method and its caster
+    assert program.count("callsub") == 10
+
+
+def test_box_blob_bits() -> None:
+    class State:
+        blob = BoxBlob(5000)
+
+    # the same reads and writes as the state blobs
+    assert isinstance(State.blob, BlobStorage)
+    assert isinstance(GlobalStateBlob(), BlobStorage)
+    assert isinstance(LocalStateBlob(), BlobStorage)
+
+    t = Application("T", state=State())
+
+    @t.external
+    def flip_bit(idx: pt.abi.Uint64) -> pt.Expr:
+        blob = t.state.blob
+        return blob.set_bit(idx.get(), pt.Not(blob.get_bit(idx.get())))
+
+    @t.external
+    def clear_bit(idx: pt.abi.Uint64) -> pt.Expr:
+        return t.state.blob.clear_bit(idx.get())
+
+    @t.external(read_only=True)
+    def popcount(
+        start: pt.abi.Uint64, stop: pt.abi.Uint64, *, output: pt.abi.Uint64
+    ) -> pt.Expr:
+        return output.set(t.state.blob.popcount(start.get(), stop.get()))
+
+    @t.external(read_only=True)
+    def first_free(*, output: pt.abi.Uint64) -> pt.Expr:
+        return output.set(t.state.blob.find_first_zero())
+
+    program = t.build().approval_program
+    # a bit is read and written in the byte holding it
+    assert method_ops(program, "setbitimpl").count("box_extract") == 1
+    assert method_ops(program, "setbitimpl").count("box_replace") == 1
+    # searched a chunk at a time, inverted to find the first bit set
+    first_free_ops = method_ops(program, "findfirstzeroimpl")
+    assert first_free_ops.count("box_extract") == 1
+    assert "b~" in first_free_ops and "bitlen" in first_free_ops
@@ -0,0 +1,176 @@
+import base64
+import random
+
+import pyteal as pt
+import pytest
+from algosdk.v2client.algod import AlgodClient
+
+from beaker import Application, consts, sandbox
+from beaker.client import ApplicationClient, BoxBTreeClient
+from beaker.lib.storage import BoxBTree
+
+ORDER = 3
+
+
+class State:
+    index = BoxBTree(order=ORDER)
+
+
+def test_btree_layout() -> None:
+    index = BoxBTree(name="idx")
+
+    # a node of the default order fits in what one box reference may read
+    assert index._node_size <= 1024 < BoxBTree(order=63, name="i")._node_size
+    assert index.meta_box_name() == b"idx"
+    assert index.node_box_name(1) == b"idx" + (1).to_bytes(8, "big")
+
+    with pytest.raises(ValueError, match="order"):
+        BoxBTree(order=2)
+    with pytest.raises(ValueError, match="larger than a box"):
+        BoxBTree(order=2048)
+
+
+def test_btree_app() -> None:
+    app = Application("Indexed", state=State())
+    index = app.state.index
+
+    @app.external
+    def bootstrap() -> pt.Expr:
+        return index.create()
+
+    @app.external
+    def add(key: pt.abi.Uint64, *, output: pt.abi.Bool) -> pt.Expr:
+        return output.set(index.insert(key.get()))
+
+    @app.external
+    def remove(key: pt.abi.Uint64, *, output: pt.abi.Bool) -> pt.Expr:
+        return output.set(index.delete(key.get()))
+
+    @app.external(read_only=True)
+    def has(key: pt.abi.Uint64, *, output: pt.abi.Bool) -> pt.Expr:
+        return output.set(index.contains(key.get()))
+
+    @app.external(read_only=True)
+    def scan(
+        start: pt.abi.Uint64,
+        limit: pt.abi.Uint64,
+        *,
+        output: pt.abi.DynamicArray[pt.abi.Uint64],
+    ) -> pt.Expr:
+        return index.store_scan_into(start.get(), limit.get(), output)
+
+    program = app.build().approval_program
+    # a subroutine of each operation, sharing the search and split
+    for name in ("insert", "delete", "contains", "scan", "split", "search"):
+        assert f"\n{name}impl_" in program
+    assert "box_create" in program and "box_get" not in program
+
+
+def node(
+    keys: list[int], *, next_id: int = 0, children: list[int] | None = None
+) -> bytes:
+    leaf = children is None
+    data = bytes([leaf]) + len(keys).to_bytes(2, "big") + next_id.to_bytes(8, "big")
+    data += b"".join(k.to_bytes(8, "big") for k in keys).ljust(8 * ORDER, b"\x00")
+    data += b"".join(c.to_bytes(8, "big") for c in children or [])
+    return data.ljust(State.index._node_size, b"\x00")
+
+
+class _BoxAlgod(AlgodClient):
+    def __init__(self, boxes: dict[bytes, bytes]):
+        super().__init__("", "http://localhost")
+        self.boxes = boxes
+
+    def application_box_by_name(
+        self, application_id: int, box_name: bytes, **kwargs: object
+    ) -> dict[str, str]:
+        return {"value": base64.b64encode(self.boxes[box_name]).decode()}
+
+
+def test_client_box_references() -> None:
+    index = State.index
+    # a root with a full leaf of keys less than 10 and a leaf of the rest
+    boxes = {
+        index.meta_box_name(): b"".join(i.to_bytes(8, "big") for i in (3, 4, 5)),
+        index.node_box_name(1): node([1, 5, 7], next_id=2),
+        index.node_box_name(2): node([10, 20]),
+        index.node_box_name(3): node([10], children=[1, 2]),
+    }
+    app = Application("Indexed", state=State())
+    app_client = ApplicationClient(_BoxAlgod(boxes), app.build(), app_id=7)
+    tree = BoxBTreeClient(app_client, index)
+
+    def refs(*node_ids: int) -> list[tuple[int, bytes]]:
+        return [(7, index.meta_box_name())] + [
+            (7, index.node_box_name(n)) for n in node_ids
+        ]
+
+    assert tree.keys() == [1, 5, 7, 10, 20]
+    assert tree.box_references("contains", 20) == refs(3, 2)
+    # the full leaf is split into a new node
+    assert tree.box_references("insert", 6) == refs(3, 1, 4)
+    assert tree.box_references("insert", 15) == refs(3, 2)
+    # the scan continues into the next leaf for its third key
+    assert tree.box_references("scan", 5, limit=2) == refs(3, 1)
+    assert tree.box_references("scan", 5, limit=3) == refs(3, 1, 2)
+
+
+def test_btree() -> None:
+    app = Application("Indexed", state=State())
+    index = app.state.index
+
+    @app.external
+    def bootstrap() -> pt.Expr:
+        return index.create()
+
+    @app.external
+    def add(key: pt.abi.Uint64, *, output: pt.abi.Bool) -> pt.Expr:
+        return output.set(index.insert(key.get()))
+
+    @app.external
+    def remove(key: pt.abi.Uint64, *, output: pt.abi.Bool) -> pt.Expr:
+        return output.set(index.delete(key.get()))
+
+    @app.external(read_only=True)
+    def scan(
+        start: pt.abi.Uint64,
+        limit: pt.abi.Uint64,
+        *,
+        output: pt.abi.DynamicArray[pt.abi.Uint64],
+    ) -> pt.Expr:
+        return index.store_scan_into(start.get(), limit.get(), output)
+
+    app_client = ApplicationClient(
+        sandbox.get_algod_client(), app, signer=sandbox.get_accounts()[0].signer
+    )
+    app_client.create()
+    app_client.fund(10 * consts.algo)
+    tree = BoxBTreeClient(app_client, index)
+    app_client.call(
+        "bootstrap",
+        boxes=[
+            (app_client.app_id, index.meta_box_name()),
+            (app_client.app_id, index.node_box_name(1)),
+        ],
+    )
+
+    keys = random.Random(3).sample(range(1000), 40)
+    for key in keys:
+        result = app_client.call(
+            "add", key=key, boxes=tree.box_references("insert", key)
+        )
+        assert result.return_value is True
+    for key in keys[::4]:
+        boxes = tree.box_references("delete", key)
+        assert app_client.call("remove", key=key, boxes=boxes).return_value is True
+
+    expected = sorted(set(keys) - set(keys[::4]))
+    assert tree.keys() == expected
+    start = expected[5]
+    result = app_client.call(
+        "scan",
+        start=start,
+        limit=12,
+        boxes=tree.box_references("scan", start, limit=12),
+    )
+    assert result.return_value == expected[5:17]
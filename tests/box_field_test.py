@@ -0,0 +1,127 @@
+import pyteal as pt
+import pytest
+from algosdk.abi import ABIType
+
+from beaker import Application
+from beaker.lib.storage import BoxField, BoxList, BoxMapping
+
+options = pt.CompileOptions(version=pt.MAX_TEAL_VERSION, mode=pt.Mode.Application)
+
+
+class Record(pt.abi.NamedTuple):
+    role: pt.abi.Field[pt.abi.Uint8]
+    voted: pt.abi.Field[pt.abi.Bool]
+    active: pt.abi.Field[pt.abi.Bool]
+    balance: pt.abi.Field[pt.abi.Uint64]
+    admin: pt.abi.Field[pt.abi.Bool]
+    owner: pt.abi.Field[pt.abi.Address]
+
+
+RECORD = pt.abi.type_spec_from_annotation(Record)
+
+
+def test_field_positions() -> None:
+    # the bytes each field changes in the encoding, to compare with
+    codec = ABIType.from_string(str(RECORD))
+    zero = [0, False, False, 0, False, b"\x00" * 32]
+    base = codec.encode(zero)
+
+    for i, value in enumerate([7, True, True, 2**64 - 1, True, b"\xff" * 32]):
+        field = BoxField(pt.Bytes("b"), None, RECORD, i)
+        changed = codec.encode([*zero[:i], value, *zero[i + 1 :]])
+        diff = [j for j, (a, b) in enumerate(zip(base, changed, strict=True)) if a != b]
+
+        offset = field.offset
+        assert isinstance(offset, pt.Int)
+        if field.bit is None:
+            size = field.type_spec.byte_length_static()
+            assert diff == list(range(offset.value, offset.value + size))
+        else:
+            assert diff == [offset.value]
+            assert changed[offset.value] == 0x80 >> field.bit
+
+
+def test_mapping_field() -> None:
+    m = BoxMapping(pt.abi.Address, Record)
+    field = m[pt.Txn.sender()].field("balance")
+
+    expected, _ = pt.BoxExtract(pt.Txn.sender(), pt.Int(2), pt.Int(8)).__teal__(options)
+    actual, _ = field.get().__teal__(options)
+    with pt.TealComponent.Context.ignoreExprEquality():
+        assert actual == expected
+
+    val = pt.abi.Uint64()
+    expected, _ = pt.BoxReplace(pt.Txn.sender(), pt.Int(2), val.encode()).__teal__(
+        options
+    )
+    actual, _ = field.set(val).__teal__(options)
+    with pt.TealComponent.Context.ignoreExprEquality():
+        assert actual == expected
+
+    with pytest.raises(pt.TealTypeError):
+        field.set(pt.abi.Uint32())
+
+    expected, _ = pt.BoxReplace(
+        pt.Txn.sender(),
+        pt.Int(2),
+        pt.Itob(
+            pt.Btoi(pt.BoxExtract(pt.Txn.sender(), pt.Int(2), pt.Int(8))) + pt.Int(1)
+        ),
+    ).__teal__(options)
+    actual, _ = field.update(lambda v: pt.Itob(pt.Btoi(v) + pt.Int(1))).__teal__(
+        options
+    )
+    with pt.TealComponent.Context.ignoreExprEquality():
+        assert actual == expected
+
+
+def test_list_field() -> None:
+    lst = BoxList(Record, 10, name="l")
+    field = lst[pt.Int(3)].field("admin")
+
+    # after the element's offset, role, the byte of the bools after it and balance
+    expected, _ = (pt.Int(lst._element_size) * pt.Int(3) + pt.Int(10)).__teal__(options)
+    actual, _ = field.offset.__teal__(options)
+    with pt.TealComponent.Context.ignoreExprEquality():
+        assert actual == expected
+    assert field.bit == 0
+
+
+def test_field_errors() -> None:
+    with pytest.raises(pt.TealInputError, match="no field"):
+        BoxMapping(pt.abi.Address, Record)[pt.Txn.sender()].field("missing")
+    with pytest.raises(pt.TealInputError, match="by index"):
+        BoxList(pt.abi.Tuple2[pt.abi.Uint8, pt.abi.Uint8], 2, name="l")[
+            pt.Int(0)
+        ].field("role")
+    with pytest.raises(pt.TealInputError, match="static"):
+        BoxMapping(pt.abi.Address, pt.abi.Tuple2[pt.abi.Uint8, pt.abi.String])[
+            pt.Txn.sender()
+        ].field(0)
+    with pytest.raises(pt.TealInputError, match="tuple"):
+        BoxMapping(pt.abi.Address, pt.abi.Uint64)[pt.Txn.sender()].field(0)
+
+
+def test_field_app() -> None:
+    class State:
+        records = BoxMapping(pt.abi.Address, Record)
+
+    app = Application("Fields", state=State())
+
+    @app.external
+    def vote(*, output: pt.abi.Bool) -> pt.Expr:
+        record = app.state.records[pt.Txn.sender()]
+        return pt.Seq(
+            record.field("voted").store_into(output),
+            pt.Assert(pt.Not(output.get())),
+            output.set(pt.Int(1)),
+            record.field("voted").set(output),
+        )
+
+    @app.external
+    def vote_again(voted: pt.abi.Bool) -> pt.Expr:
+        return app.state.records[pt.Txn.sender()].field("voted").set(voted)
+
+    program = app.build().approval_program
+    assert "box_get" not in program and "box_put" not in program
+    assert "getbit" in program and "setbit" in program
@@ -0,0 +1,207 @@
+import base64
+import re
+
+import pyteal as pt
+import pytest
+from algosdk.v2client.algod import AlgodClient
+
+from beaker import Application, consts, sandbox
+from beaker.client import ApplicationClient, BoxHashMapClient
+from beaker.lib.storage import BoxHashMap
+from beaker.lib.storage.box_hash_map import slot_hash
+
+from tests.conftest import method_ops
+
+
+class Member(pt.abi.NamedTuple):
+    points: pt.abi.Field[pt.abi.Uint64]
+    active: pt.abi.Field[pt.abi.Bool]
+
+
+class State:
+    members = BoxHashMap(pt.abi.Address, Member, 16)
+    counts = BoxHashMap(pt.abi.Uint64, pt.abi.Uint64, 4, boxes=2)
+
+
+def test_hash_map_app() -> None:
+    app = Application("Members", state=State())
+
+    @app.external
+    def join(member: pt.abi.Address, info: Member) -> pt.Expr:
+        return app.state.members[member].set(info)
+
+    @app.external
+    def count(key: pt.abi.Uint64) -> pt.Expr:
+        return app.state.counts[key].set(key)
+
+    program = app.build().approval_program
+
+    # each operation hashes the key and probes from there, in a subroutine for each map
+    assert len(re.findall(r"\nprobeimpl_\d+:", program)) == 2
+    assert program.count("sha256") == program.count("callsub probeimpl_")
+
+    count_ops = method_ops(program, "count")
+    # the box is picked by the hash, and the entry is written in one op, after the count if it's new
+    assert count_ops.count("pushbytes 0x636f756e7473") == 1
+    assert count_ops.count("box_replace") == 2
+    # abi keys and values are the right size already
+    assert "len" not in count_ops
+
+
+def test_hash_map_field_finds_entry_once() -> None:
+    app = Application("Members", state=State())
+
+    @app.external
+    def add_points(member: pt.abi.Address, points: pt.abi.Uint64) -> pt.Expr:
+        return (
+            app.state.members[member]
+            .field("points")
+            .update(lambda v: pt.Itob(pt.Btoi(v) + points.get()))
+        )
+
+    @app.external
+    def deactivate(member: pt.abi.Address) -> pt.Expr:
+        return app.state.members[member].field("active").set(pt.Bytes("base16", "00"))
+
+    program = app.build().approval_program
+    # including the bool, read for the bits it shares a byte with before it's written
+    for name in ("add_points", "deactivate"):
+        ops = method_ops(program, name)
+        assert sum(op.startswith("callsub probeimpl_") for op in ops) == 1
+        assert ops.count("box_extract") == ops.count("box_replace") + 1 == 2
+
+
+def test_hash_map_box_names() -> None:
+    assert State.members.box_names() == [b"members"]
+    assert State.counts.box_names() == [
+        b"counts" + i.to_bytes(8, "big") for i in range(2)
+    ]
+    key = (7).to_bytes(8, "big")
+    assert State.counts.key_box_name(key) == State.counts.box_name(slot_hash(key) % 2)
+    # a flat min balance per box rather than per entry
+    assert State.members.min_balance() == consts.BOX_FLAT_MIN_BALANCE + (
+        consts.BOX_BYTE_MIN_BALANCE * (len(b"members") + 8 + 16 * (1 + 32 + 9))
+    )
+
+
+def test_hash_map_errors() -> None:
+    with pytest.raises(ValueError, match="capacity"):
+        BoxHashMap(pt.abi.Uint64, pt.abi.Uint64, 0)
+    with pytest.raises(ValueError, match="boxes"):
+        BoxHashMap(pt.abi.Uint64, pt.abi.Uint64, 1, boxes=0)
+    with pytest.raises(ValueError, match="larger than a box"):
+        BoxHashMap(pt.abi.Uint64, pt.abi.Uint64, consts.MAX_BOX_SIZE // 17 + 1)
+    with pytest.raises(AssertionError):
+        BoxHashMap(pt.abi.String, pt.abi.Uint64, 1)
+    with pytest.raises(pt.TealTypeError):
+        State.members[pt.abi.Uint64()]
+    with pytest.raises(pt.TealTypeError):
+        State.members[pt.Bytes("a")].set(pt.abi.Uint64())
+
+
+class _BoxAlgod(AlgodClient):
+    def __init__(self, boxes: dict[bytes, bytes]):
+        super().__init__("", "http://localhost")
+        self.boxes = boxes
+
+    def application_box_by_name(
+        self, application_id: int, box_name: bytes, **kwargs: object
+    ) -> dict[str, str]:
+        return {"value": base64.b64encode(self.boxes[box_name]).decode()}
+
+
+def test_client_reads_entries() -> None:
+    def slot(marker: int, key: int, value: int) -> bytes:
+        return bytes([marker]) + key.to_bytes(8, "big") + value.to_bytes(8, "big")
+
+    empty = bytes(17)
+    boxes = {
+        # a count, then an entry, a deleted one and empty slots
+        State.counts.box_name(0): (1).to_bytes(8, "big")
+        + slot(1, 3, 30)
+        + slot(2, 4, 40)
+        + empty * 2,
+        State.counts.box_name(1): (1).to_bytes(8, "big") + empty * 3 + slot(1, 5, 50),
+    }
+    app = Application("Members", state=State())
+    app_client = ApplicationClient(_BoxAlgod(boxes), app.build(), app_id=1)
+
+    counts = BoxHashMapClient(app_client, State.counts)
+    assert counts.read() == {3: 30, 5: 50}
+    assert counts.read(raw=True)[(3).to_bytes(8, "big")] == (30).to_bytes(8, "big")
+    assert counts.box_reference(9) == (
+        1,
+        State.counts.key_box_name((9).to_bytes(8, "big")),
+    )
+    assert counts.box_references() == [(1, n) for n in State.counts.box_names()]
+
+
+def test_hash_map() -> None:
+    app = Application("Members", state=State())
+    members_map = app.state.members
+
+    @app.external
+    def bootstrap() -> pt.Expr:
+        return pt.Seq(
+            pt.Assert(members_map.create()), pt.Assert(app.state.counts.create())
+        )
+
+    @app.external
+    def join(member: pt.abi.Address, info: Member) -> pt.Expr:
+        return members_map[member].set(info)
+
+    @app.external
+    def leave(member: pt.abi.Address, *, output: pt.abi.Bool) -> pt.Expr:
+        return output.set(members_map[member].delete())
+
+    @app.external
+    def add_points(member: pt.abi.Address, points: pt.abi.Uint64) -> pt.Expr:
+        return (
+            members_map[member]
+            .field("points")
+            .update(lambda v: pt.Itob(pt.Btoi(v) + points.get()))
+        )
+
+    @app.external(read_only=True)
+    def lookup(member: pt.abi.Address, *, output: Member) -> pt.Expr:
+        return members_map[member].store_into(output)
+
+    @app.external(read_only=True)
+    def size(*, output: pt.abi.Uint64) -> pt.Expr:
+        return output.set(members_map.size())
+
+    @app.external
+    def count(key: pt.abi.Uint64) -> pt.Expr:
+        return app.state.counts[key].set(key)
+
+    accounts = sandbox.get_accounts()
+    app_client = ApplicationClient(
+        sandbox.get_algod_client(), app, signer=accounts[0].signer
+    )
+    app_client.create()
+    # the account's own min balance, and that of the boxes
+    app_client.fund(
+        consts.algo // 10 + State.members.min_balance() + State.counts.min_balance()
+    )
+    members = BoxHashMapClient(app_client, State.members)
+    counts = BoxHashMapClient(app_client, State.counts)
+    app_client.call(
+        "bootstrap", boxes=members.box_references() + counts.box_references()
+    )
+
+    boxes = members.box_references()
+    for acct in accounts:
+        app_client.call("join", member=acct.address, info=(10, True), boxes=boxes)
+    app_client.call("add_points", member=accounts[0].address, points=5, boxes=boxes)
+    assert app_client.call(
+        "leave", member=accounts[1].address, boxes=boxes
+    ).return_value
+
+    first = app_client.call("lookup", member=accounts[0].address, boxes=boxes)
+    assert first.return_value == [15, True]
+    assert app_client.call("size", boxes=boxes).return_value == len(accounts) - 1
+    expected = {acct.address: [10, True] for acct in accounts[2:]}
+    assert members.read() == {accounts[0].address: [15, True], **expected}
+
+    app_client.call("count", key=9, boxes=[counts.box_reference(9)])
+    assert counts.read() == {9: 9}
@@ -1,8 +1,13 @@
+from typing import Literal
+
 import pyteal as pt
+import pytest
 
 from beaker.application import Application
 from beaker.lib.storage import BoxList
 
+from tests.conftest import method_ops
+
 options = pt.CompileOptions(version=pt.MAX_TEAL_VERSION, mode=pt.Mode.Application)
 
 
@@ -54,3 +59,86 @@ def test_list_app() -> None:
 
     compiled = t.build()
     assert compiled.approval_program
+
+
+def test_list_ranges() -> None:
+    lst = BoxList(pt.abi.Uint64, 100, name="l")
+    start, stop = pt.Int(10), pt.Int(20)
+
+    expected, _ = pt.BoxExtract(
+        pt.Bytes("l"), pt.Int(8) * start, pt.Int(8) * (stop - start)
+    ).__teal__(options)
+    actual, _ = lst.get_range(start, stop).__teal__(options)
+    with pt.TealComponent.Context.ignoreExprEquality():
+        assert actual == expected
+
+    buff = pt.Bytes(b"\x00" * 16)
+    expected, _ = pt.BoxReplace(pt.Bytes("l"), pt.Int(8) * start, buff).__teal__(
+        options
+    )
+    actual, _ = lst.set_range(start, buff).__teal__(options)
+    with pt.TealComponent.Context.ignoreExprEquality():
+        assert actual == expected
+
+
+def test_list_with_length() -> None:
+    lst = BoxList(pt.abi.Uint64, 100, name="l", with_length=True)
+
+    # the length is stored before the elements
+    assert lst._box_size == 2 + 8 * 100
+    expected, _ = pt.BoxExtract(
+        pt.Bytes("l"), pt.Int(8) * pt.Int(10) + pt.Int(2), pt.Int(8)
+    ).__teal__(options)
+    actual, _ = lst[pt.Int(10)].get().__teal__(options)
+    with pt.TealComponent.Context.ignoreExprEquality():
+        assert actual == expected
+
+    without = BoxList(pt.abi.Uint64, 100, name="l")
+    for method in (without.length, lambda: without.append(pt.Bytes("x"))):
+        with pytest.raises(pt.TealInputError, match="with_length"):
+            method()
+
+
+def test_list_binary_search_errors() -> None:
+    with pytest.raises(pt.TealInputError, match="compared"):
+        BoxList(pt.abi.StaticBytes[Literal[65]], 10, name="l").binary_search(
+            pt.Bytes("x")
+        )
+    with pytest.raises(pt.TealTypeError):
+        BoxList(pt.abi.Uint64, 10, name="l").binary_search(pt.abi.Uint32())
+
+
+def test_list_ops_app() -> None:
+    class State:
+        lst = BoxList(pt.abi.Uint64, 100, with_length=True)
+
+    t = Application("T", state=State())
+    lst = t.state.lst
+
+    @t.external
+    def add(val: pt.abi.Uint64) -> pt.Expr:
+        return lst.insert(lst.binary_search(val), val)
+
+    @t.external
+    def push(val: pt.abi.Uint64) -> pt.Expr:
+        return lst.append(val)
+
+    @t.external
+    def swap(i: pt.abi.Uint16, j: pt.abi.Uint16) -> pt.Expr:
+        return lst.swap(i.get(), j.get())
+
+    @t.external
+    def page(
+        start: pt.abi.Uint16,
+        stop: pt.abi.Uint16,
+        *,
+        output: pt.abi.DynamicArray[pt.abi.Uint64],
+    ) -> pt.Expr:
+        return lst.store_range_into(start.get(), stop.get(), output)
+
+    program = t.build().approval_program
+    assert "b<" in program
+    # besides reading the length for the search and the insert, and writing it,
+    # the moved elements are read and written in one op each
+    add_ops = method_ops(program, "add")
+    assert add_ops.count("box_extract") == 3 and add_ops.count("box_replace") == 3
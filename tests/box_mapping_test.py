@@ -42,9 +42,8 @@ def test_mapping() -> None:
     with pt.TealComponent.Context.ignoreExprEquality(), pt.TealComponent.Context.ignoreScratchSlotEquality():
         assert actual == expected
 
-    expected, _ = pt.Seq(
-        pt.Pop(pt.BoxDelete(pt.Txn.sender())), pt.BoxPut(pt.Txn.sender(), v.encode())
-    ).__teal__(options)
+    # a static value is put in place
+    expected, _ = pt.BoxPut(pt.Txn.sender(), v.encode()).__teal__(options)
     actual, _ = item.set(v).__teal__(options)
 
     with pt.TealComponent.Context.ignoreExprEquality():
@@ -121,6 +120,23 @@ def test_mapping_with_set_resize() -> None:
     app_client.call(do_things, boxes=[(app_client.app_id, "m_a")])
 
 
+def test_mapping_set_dynamic_value() -> None:
+    m = BoxMapping(pt.abi.Address, pt.abi.String)
+    item = m[pt.Txn.sender()]
+
+    def compiled(version: int) -> str:
+        return pt.compileTeal(
+            pt.Seq(item.set(pt.Bytes("value")), pt.Approve()),
+            pt.Mode.Application,
+            version=version,
+        )
+
+    # resized when its size changes, or before box_resize, deleted and put again
+    assert "box_resize" in compiled(10) and "box_del" not in compiled(10)
+    assert "box_resize" not in compiled(8) and "box_del" in compiled(8)
+    assert compiled(10).count("box_put") == compiled(8).count("box_put") == 1
+
+
 def test_mapping_with_bad_prefix() -> None:
     with pytest.raises(pt.TealTypeError):
         BoxMapping(pt.abi.String, pt.abi.Uint64, prefix=pt.Int(1))
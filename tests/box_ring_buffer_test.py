@@ -0,0 +1,122 @@
+import base64
+
+import pyteal as pt
+import pytest
+from algosdk.v2client.algod import AlgodClient
+
+from beaker import Application, consts, sandbox
+from beaker.client import ApplicationClient, BoxRingBufferClient
+from beaker.lib.storage import BoxLog, BoxRingBuffer
+
+from tests.conftest import method_ops
+
+
+class Price(pt.abi.NamedTuple):
+    timestamp: pt.abi.Field[pt.abi.Uint64]
+    price: pt.abi.Field[pt.abi.Uint64]
+
+
+class State:
+    prices = BoxRingBuffer(Price, 3)
+    history = BoxLog(pt.abi.Uint64, 2)
+
+
+def test_ring_buffer_app() -> None:
+    app = Application("Prices", state=State())
+
+    @app.external
+    def push(price: Price) -> pt.Expr:
+        return app.state.prices.push(price)
+
+    @app.external
+    def pop(*, output: Price) -> pt.Expr:
+        return output.decode(app.state.prices.pop())
+
+    @app.external
+    def record(value: pt.abi.Uint64) -> pt.Expr:
+        return app.state.history.append(value)
+
+    program = app.build().approval_program
+
+    # the counts and the record are each read or written in one op
+    push_ops = method_ops(program, "push")
+    assert push_ops.count("box_extract") == 1 and push_ops.count("box_replace") == 2
+    pop_ops = method_ops(program, "pop")
+    assert pop_ops.count("box_extract") == 2 and pop_ops.count("box_replace") == 1
+    record_ops = method_ops(program, "record")
+    assert record_ops.count("box_extract") == 1
+    assert record_ops.count("box_replace") == 2
+
+
+def test_ring_buffer_errors() -> None:
+    with pytest.raises(ValueError, match="capacity"):
+        BoxRingBuffer(pt.abi.Uint64, 0)
+    with pytest.raises(ValueError, match="larger than a box"):
+        BoxLog(pt.abi.Uint64, consts.MAX_BOX_SIZE // 8)
+    with pytest.raises(pt.TealTypeError):
+        State.prices.push(pt.abi.Uint64())
+
+
+class _BoxAlgod(AlgodClient):
+    def __init__(self, boxes: dict[bytes, bytes]):
+        super().__init__("", "http://localhost")
+        self.boxes = boxes
+
+    def application_box_by_name(
+        self, application_id: int, box_name: bytes, **kwargs: object
+    ) -> dict[str, str]:
+        return {"value": base64.b64encode(self.boxes[box_name]).decode()}
+
+
+def test_client_reads_records_oldest_first() -> None:
+    def uint64s(*values: int) -> bytes:
+        return b"".join(v.to_bytes(8, "big") for v in values)
+
+    # five pushed and one popped, so the third is oldest and the fifth in the second slot
+    boxes = {
+        b"prices": uint64s(2, 5) + uint64s(4, 40, 5, 50, 3, 30),
+        b"history": uint64s(0, 1) + uint64s(7, 0),
+    }
+    app = Application("Prices", state=State())
+    app_client = ApplicationClient(_BoxAlgod(boxes), app.build(), app_id=1)
+
+    prices = BoxRingBufferClient(app_client, State.prices)
+    assert list(prices) == [[3, 30], [4, 40], [5, 50]]
+    assert prices.read(raw=True)[0] == uint64s(3, 30)
+    assert BoxRingBufferClient(app_client, State.history).read() == [7]
+
+
+def test_ring_buffer() -> None:
+    app = Application("Prices", state=State())
+    prices = app.state.prices
+
+    @app.external
+    def bootstrap() -> pt.Expr:
+        return pt.Seq(pt.Assert(prices.create()), pt.Assert(app.state.history.create()))
+
+    @app.external
+    def push(price: Price) -> pt.Expr:
+        return prices.push(price)
+
+    @app.external
+    def pop(*, output: Price) -> pt.Expr:
+        return output.decode(prices.pop())
+
+    @app.external(read_only=True)
+    def latest(*, output: Price) -> pt.Expr:
+        return output.decode(prices.latest())
+
+    app_client = ApplicationClient(
+        sandbox.get_algod_client(), app, signer=sandbox.get_accounts()[0].signer
+    )
+    app_client.create()
+    app_client.fund(1 * consts.algo)
+    boxes = [(app_client.app_id, b"prices"), (app_client.app_id, b"history")]
+    app_client.call("bootstrap", boxes=boxes)
+
+    for ts in range(1, 6):
+        app_client.call("push", price=(ts, ts * 10), boxes=boxes)
+    # only the newest three are kept
+    assert app_client.call("pop", boxes=boxes).return_value == [3, 30]
+    assert app_client.call("latest", boxes=boxes).return_value == [5, 50]
+    assert list(BoxRingBufferClient(app_client, State.prices)) == [[4, 40], [5, 50]]
@@ -0,0 +1,259 @@
+import functools
+from pathlib import Path
+
+import pyteal as pt
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from beaker import (
+    Application,
+    BuildCache,
+    BuildOptions,
+    GlobalStateValue,
+    LogicSignature,
+    OfflineAssembler,
+    precompiled,
+    unconditional_create_approval,
+)
+from beaker.build_cache import application_fingerprint
+from beaker.precompile import PrecompileNode
+
+
+class State:
+    counter = GlobalStateValue(pt.TealType.uint64, default=pt.Int(1))
+
+
+def make_app(name: str = "Cached", *, version: int = 8) -> Application:
+    app = Application(
+        name, state=State(), build_options=BuildOptions(avm_version=version)
+    ).apply(unconditional_create_approval, initialize_global_state=True)
+
+    @app.external
+    def add(a: pt.abi.Uint64, b: pt.abi.Uint64, *, output: pt.abi.Uint64) -> pt.Expr:
+        return output.set(a.get() + b.get())
+
+    return app
+
+
+def test_cache_hit_skips_pyteal(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    cache = BuildCache(tmp_path)
+    expected = make_app().build(cache=cache)
+    assert cache.stats.misses == 1
+    assert cache.stats.stores == 1
+    assert len(cache) == 1
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("PyTeal should not be invoked on a cache hit")
+
+    monkeypatch.setattr(pt.Router, "compile", fail)
+    actual = make_app().build(cache=cache)
+
+    assert cache.stats.hits == 1
+    assert actual.to_json() == expected.to_json()
+
+
+def test_cache_shared_between_instances(tmp_path: Path) -> None:
+    make_app().build(cache=BuildCache(tmp_path))
+
+    other = BuildCache(tmp_path)
+    assert other.get(other.key(make_app()) or "") is not None
+    assert other.stats.hits == 1
+
+
+def test_fingerprint_is_stable() -> None:
+    assert application_fingerprint(make_app()) == application_fingerprint(make_app())
+
+
+def test_fingerprint_changes_with_inputs() -> None:
+    base = application_fingerprint(make_app())
+
+    assert application_fingerprint(make_app(name="Other")) != base
+    assert application_fingerprint(make_app(version=9)) != base
+
+    app = make_app()
+
+    @app.external
+    def extra() -> pt.Expr:
+        return pt.Approve()
+
+    assert application_fingerprint(app) != base
+
+    class OtherState:
+        counter = GlobalStateValue(pt.TealType.uint64, default=pt.Int(2))
+
+    app = Application("Cached", state=OtherState())
+    app2 = Application("Cached", state=State())
+    assert application_fingerprint(app) != application_fingerprint(app2)
+
+
+def test_fingerprint_covers_closures() -> None:
+    def make(value: int) -> Application:
+        app = Application("Closure")
+
+        @app.external
+        def get(*, output: pt.abi.Uint64) -> pt.Expr:
+            return output.set(pt.Int(value))
+
+        return app
+
+    assert application_fingerprint(make(1)) == application_fingerprint(make(1))
+    assert application_fingerprint(make(1)) != application_fingerprint(make(2))
+
+
+def test_annotated_builds_are_not_cached(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path)
+    app = Application(
+        "Annotated",
+        build_options=BuildOptions(with_sourcemaps=True, annotate_teal=True),
+    )
+    assert cache.key(app) is None
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path)
+    make_app("First").build(cache=cache)
+    entry_size = cache.size_bytes
+
+    cache.max_bytes = entry_size * 2 + entry_size // 2
+    make_app("Second").build(cache=cache)
+    # touch the first entry so that the second is the least recently used
+    assert make_app("First").build(cache=cache)
+    assert cache.stats.hits == 1
+
+    make_app("Third").build(cache=cache)
+    assert cache.stats.evictions == 1
+    assert len(cache) == 2
+    assert cache.get(cache.key(make_app("Second")) or "") is None
+    assert cache.get(cache.key(make_app("First")) or "") is not None
+
+
+def test_corrupt_entry_is_a_miss(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path)
+    app = make_app()
+    key = cache.key(app)
+    assert key is not None
+    (tmp_path / f"{key}.json").write_text("{not json")
+
+    assert app.build(cache=cache).approval_program
+    assert cache.stats.misses == 1
+    assert cache.get(key) is not None
+
+
+def test_clear(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path)
+    make_app().build(cache=cache)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size_bytes == 0
+
+
+def test_bad_max_bytes(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="max_bytes"):
+        BuildCache(tmp_path, max_bytes=0)
+
+
+def make_tree(lsig_body: pt.Expr) -> Application:
+    lsig = LogicSignature(lsig_body)
+    child = Application("Child")
+
+    @child.external
+    def lsig_addr(*, output: pt.abi.Address) -> pt.Expr:
+        return output.set(precompiled(lsig).address())
+
+    parent = Application("Parent")
+
+    @parent.external
+    def child_hash(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+        return output.set(pt.Sha512_256(precompiled(child).approval_program.binary))
+
+    sibling = make_app("Sibling")
+    grandparent = Application("Grandparent")
+
+    @grandparent.external
+    def hashes(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+        return output.set(
+            pt.Concat(
+                pt.Sha512_256(precompiled(parent).approval_program.binary),
+                pt.Sha512_256(precompiled(sibling).approval_program.binary),
+            )
+        )
+
+    return grandparent
+
+
+def test_incremental_precompiles(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path)
+    first = make_tree(pt.Approve())
+    expected = first.build(OfflineAssembler(), cache=cache)
+    assert cache.stats.stores == 4
+
+    unchanged = make_tree(pt.Approve())
+    assert unchanged.build(OfflineAssembler(), cache=cache).to_json() == (
+        expected.to_json()
+    )
+    assert cache.stats.hits == 1
+    assert unchanged.precompile_graph == first.precompile_graph
+
+    changed = make_tree(pt.Reject())
+    changed.build(OfflineAssembler(), cache=cache)
+    # only the sibling is untouched by the change to the logic signature
+    assert cache.stats.hits == 2
+    assert cache.stats.stores == 7
+
+    lsig_name = changed.precompile_graph.children[0].children[0].children[0].name
+    assert changed.precompile_graph.changed_since(first.precompile_graph) == [
+        ("Grandparent",),
+        ("Grandparent", "Parent"),
+        ("Grandparent", "Parent", "Child"),
+        ("Grandparent", "Parent", "Child", lsig_name),
+    ]
+    assert changed.precompile_graph.changed_since(changed.precompile_graph) == []
+
+
+def test_precompile_graph_round_trip() -> None:
+    app = make_tree(pt.Approve())
+    app.build(OfflineAssembler())
+
+    graph = app.precompile_graph
+    assert PrecompileNode.from_dict(graph.to_dict()) == graph
+    assert [path for path, _ in graph.walk()] == [
+        ("Grandparent",),
+        ("Grandparent", "Parent"),
+        ("Grandparent", "Parent", "Child"),
+        (
+            "Grandparent",
+            "Parent",
+            "Child",
+            graph.children[0].children[0].children[0].name,
+        ),
+        ("Grandparent", "Sibling"),
+    ]
+    assert graph.children[0].children[0].children[0].kind == "logic_signature"
+
+
+def test_precompile_entries_need_their_assembler(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path)
+    app = make_tree(pt.Approve())
+    app.build(OfflineAssembler(), cache=cache)
+
+    key = cache.key(app) or ""
+    assert cache.get(key, OfflineAssembler()) is not None
+    assert cache.get(key) is None
+
+
+def test_unseen_precompiles_are_not_cached(tmp_path: Path) -> None:
+    # the child only exists once the handler runs, so the fingerprint can't see it
+    @functools.cache
+    def child() -> Application:
+        return make_app("Child")
+
+    app = Application("Parent")
+
+    @app.external
+    def child_hash(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+        return output.set(pt.Sha512_256(precompiled(child()).approval_program.binary))
+
+    cache = BuildCache(tmp_path)
+    app.build(OfflineAssembler(), cache=cache)
+    # only the child, as the parent's key does not cover it
+    assert cache.stats.stores == 1
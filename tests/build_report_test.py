@@ -0,0 +1,123 @@
+from pathlib import Path
+from typing import Any, cast
+
+import pyteal as pt
+from algosdk.v2client.algod import AlgodClient
+
+from beaker import (
+    Application,
+    BuildCache,
+    BuildReport,
+    ConcurrentAssembler,
+    LogicSignature,
+    OfflineAssembler,
+    precompiled,
+)
+from beaker.assembler import assemble
+
+
+class FakeAlgod:
+    """Stands in for algod, assembling programs in process"""
+
+    def status(self) -> dict[str, Any]:
+        return {"last-round": 1}
+
+    def versions(self) -> dict[str, Any]:
+        return {
+            "genesis_id": "fake-v1.0",
+            "genesis_hash_b64": "",
+            "build": {"major": 1, "minor": 0, "build_number": 0, "commit_hash": ""},
+        }
+
+    def compile(self, source: str, *, source_map: bool = False) -> dict[str, Any]:
+        return assemble(source).compile_response()
+
+
+def make_nested() -> Application:
+    lsig = LogicSignature(pt.Approve())
+    child = Application("Child")
+
+    @child.external
+    def lsig_addr(*, output: pt.abi.Address) -> pt.Expr:
+        return output.set(precompiled(lsig).address())
+
+    parent = Application("Parent")
+
+    @parent.external
+    def child_hash(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+        return output.set(pt.Sha512_256(precompiled(child).approval_program.binary))
+
+    return parent
+
+
+def test_phases() -> None:
+    report = BuildReport()
+    app = Application("Plain")
+
+    @app.external
+    def add(a: pt.abi.Uint64, b: pt.abi.Uint64, *, output: pt.abi.Uint64) -> pt.Expr:
+        return output.set(a.get() + b.get())
+
+    spec = app.build(report=report)
+
+    assert report.name == "Plain"
+    assert list(report.phases) == ["registration", "ast", "teal"]
+    assert report.total_seconds > 0
+    assert report.algod_calls == 0
+    assert report.program_sizes == {
+        "approval": len(spec.approval_program),
+        "clear": len(spec.clear_program),
+    }
+    assert report.summary().startswith("Plain: ")
+
+
+def test_precompile_reports() -> None:
+    report = BuildReport()
+    make_nested().build(cast(AlgodClient, FakeAlgod()), report=report)
+
+    assert report.algod_calls == 0
+    assert "precompiles" in report.phases
+    (child,) = report.precompiles
+    assert child.name == "Child"
+    # approval and clear programs
+    assert child.algod_calls == 2
+    assert child.algod_bytes_sent > 0
+    assert child.algod_bytes_received > 0
+    assert set(child.program_sizes) == {
+        "approval",
+        "clear",
+        "approval_binary",
+        "clear_binary",
+    }
+    (lsig,) = child.precompiles
+    assert lsig.name.startswith("LogicSignature(")
+    assert lsig.algod_calls == 1
+    assert lsig.program_sizes["logic_binary"] == len(
+        assemble(LogicSignature(pt.Approve()).program).bytecode
+    )
+
+    # a precompile's time is counted in its parent's precompiles phase
+    assert report.phases["precompiles"] >= child.total_seconds
+    assert len(report.summary().splitlines()) == 3
+    assert report.to_dict()["precompiles"][0]["algod_calls"] == 2
+
+
+def test_concurrent_compiles_are_attributed() -> None:
+    report = BuildReport()
+    with ConcurrentAssembler(cast(AlgodClient, FakeAlgod())) as assembler:
+        make_nested().build(assembler, report=report)
+
+    (child,) = report.precompiles
+    assert child.algod_calls == 2
+    assert child.precompiles[0].algod_calls == 1
+
+
+def test_cached(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path)
+    make_nested().build(OfflineAssembler(), cache=cache)
+
+    report = BuildReport()
+    make_nested().build(OfflineAssembler(), cache=cache, report=report)
+    assert report.cached
+    assert list(report.phases) == ["cache"]
+    assert report.precompiles == []
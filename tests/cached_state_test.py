@@ -0,0 +1,192 @@
+import pyteal as pt
+import pytest
+
+from beaker import Application, GlobalStateValue, LocalStateValue
+from beaker.cost import analyze_costs
+from beaker.state import cached_state
+
+from tests.conftest import method_ops
+from tests.helpers import UnitTestingApp, assert_output
+
+
+class PoolState:
+    reserve_a = GlobalStateValue(pt.TealType.uint64, default=pt.Int(100))
+    reserve_b = GlobalStateValue(pt.TealType.uint64, default=pt.Int(200))
+    label = GlobalStateValue(pt.TealType.bytes)
+    creator = GlobalStateValue(pt.TealType.bytes, static=True)
+    deposited = LocalStateValue(pt.TealType.uint64)
+
+
+def test_cached_state_reads_and_writes_each_key_once() -> None:
+    def swap_ops(*, cached: bool) -> list[str]:
+        app = Application("Pool", state=PoolState())
+        s = app.state
+
+        @app.external
+        def swap(amount: pt.abi.Uint64, *, output: pt.abi.Uint64) -> pt.Expr:
+            def body() -> pt.Expr:
+                return pt.Seq(
+                    s.reserve_a.increment(amount.get()),
+                    # out = b - k / (a + in), for k = a * b before the swap
+                    output.set(
+                        s.reserve_b.get()
+                        - (s.reserve_a.get() - amount.get())
+                        * s.reserve_b.get()
+                        / s.reserve_a.get()
+                    ),
+                    pt.Assert(output.get() < s.reserve_b.get()),
+                    s.reserve_b.decrement(output.get()),
+                    s.deposited.increment(amount.get()),
+                    s.deposited.increment(pt.Int(1)),
+                )
+
+            return cached_state(body) if cached else body()
+
+        return method_ops(app.build().approval_program, "swap")
+
+    uncached = swap_ops(cached=False)
+    cached = swap_ops(cached=True)
+
+    assert uncached.count("app_global_get") == 7
+    assert uncached.count("app_global_put") == 2
+    assert uncached.count("app_local_get") == uncached.count("app_local_put") == 2
+    assert cached.count("app_global_get") == 2
+    assert cached.count("app_global_put") == 2
+    assert cached.count("app_local_get") == cached.count("app_local_put") == 1
+
+
+def test_cached_state_is_cheaper() -> None:
+    def make_quoter(*, cached: bool) -> Application:
+        app = Application("Quoter", state=PoolState())
+        s = app.state
+
+        @app.external(read_only=True)
+        def quote(amount: pt.abi.Uint64, *, output: pt.abi.Uint64) -> pt.Expr:
+            # quotes in steps, reading the reserves each time
+            i = pt.ScratchVar(pt.TealType.uint64)
+
+            def body() -> pt.Expr:
+                return pt.Seq(
+                    output.set(pt.Int(0)),
+                    pt.For(
+                        i.store(pt.Int(0)),
+                        i.load() < pt.Int(8),
+                        i.store(i.load() + pt.Int(1)),
+                    ).Do(
+                        output.set(
+                            output.get()
+                            + s.reserve_b.get()
+                            * amount.get()
+                            / (s.reserve_a.get() + amount.get() * i.load())
+                        )
+                    ),
+                )
+
+            return cached_state(body) if cached else body()
+
+        return app
+
+    sig = "quote(uint64)uint64"
+    uncached = analyze_costs(make_quoter(cached=False).build()).methods[sig].cost
+    cached = analyze_costs(make_quoter(cached=True).build()).methods[sig].cost
+    assert uncached is not None and cached is not None
+    assert cached < uncached
+
+
+def test_cached_state_static_values_are_written_immediately() -> None:
+    app = Application("Static", state=PoolState())
+
+    @app.external
+    def claim() -> pt.Expr:
+        return cached_state(lambda: app.state.creator.set(pt.Txn.sender()))
+
+    ops = method_ops(app.build().approval_program, "claim")
+    # still checked that it isn't set yet, and put without a dirty check
+    assert ops.index("app_global_get_ex") < ops.index("assert")
+    assert ops.index("assert") < ops.index("app_global_put")
+    assert not any(op.startswith(("bnz ", "bz ")) for op in ops)
+
+
+def test_cached_state_uncached_values() -> None:
+    app = Application("Other", state=PoolState())
+
+    @app.external
+    def other(acct: pt.abi.Account, *, output: pt.abi.Uint64) -> pt.Expr:
+        deposited = app.state.deposited[acct.address()]
+        return cached_state(
+            lambda: pt.Seq(
+                deposited.increment(),
+                output.set(deposited.get() + deposited.get()),
+            )
+        )
+
+    # other accounts' local state is accessed directly
+    ops = method_ops(app.build().approval_program, "other")
+    assert ops.count("app_local_get") == 3
+
+
+def test_cached_state_errors() -> None:
+    state = PoolState()
+    with pytest.raises(pt.TealInputError, match="get_maybe"):
+        cached_state(lambda: pt.Seq(state.label.get_maybe(), pt.Pop(pt.Int(1))))
+    with pytest.raises(pt.TealInputError, match="must not return"):
+        cached_state(lambda: pt.Seq(state.reserve_a.increment(), pt.Approve()))
+    with pytest.raises(pt.TealInputError, match="must not return"):
+        cached_state(
+            lambda: pt.Seq(
+                state.reserve_a.increment(),
+                pt.If(state.reserve_a.get() > pt.Int(10)).Then(pt.Reject()),
+                state.reserve_b.increment(),
+            )
+        )
+    with pytest.raises(pt.TealInputError, match="static"):
+        cached_state(lambda: state.creator.delete())
+
+
+def test_cached_state_returns_the_value_of_the_body() -> None:
+    state = PoolState()
+    expr = cached_state(
+        lambda: pt.Seq(state.reserve_a.set(pt.Int(1)), state.reserve_a.get())
+    )
+    assert expr.type_of() == pt.TealType.uint64
+
+
+def test_cached_state_semantics() -> None:
+    app = UnitTestingApp(name="Cached", state=PoolState())
+    s = app.state
+
+    @app.external
+    def unit_test(*, output: pt.abi.DynamicArray[pt.abi.Byte]) -> pt.Expr:
+        return pt.Seq(
+            app.initialize_global_state(),
+            s.label.set(pt.Bytes("old")),
+            cached_state(
+                lambda: pt.Seq(
+                    s.reserve_a.increment(pt.Int(5)),
+                    s.reserve_a.decrement(pt.Int(1)),
+                    # deleted then written again, so stored
+                    s.label.delete(),
+                    pt.Assert(pt.Not(s.label.exists())),
+                    s.label.set(
+                        pt.Concat(s.label.get_else(pt.Bytes("new")), pt.Bytes("!"))
+                    ),
+                    # written only on a path not taken, so not stored
+                    pt.If(s.reserve_a.get() == pt.Int(0)).Then(
+                        s.reserve_b.set(pt.Int(0))
+                    ),
+                    s.deposited.set(s.reserve_a.get()),
+                )
+            ),
+            (out := pt.abi.String()).set(
+                pt.Concat(
+                    pt.Itob(s.reserve_a.get()),
+                    pt.Itob(s.reserve_b.get()),
+                    pt.Itob(s.deposited.get()),
+                    s.label.get(),
+                )
+            ),
+            output.decode(out.encode()),
+        )
+
+    expected = b"".join(i.to_bytes(8, "big") for i in (104, 200, 104)) + b"new!"
+    assert_output(app, [], [list(expected)])
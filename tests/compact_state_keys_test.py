@@ -0,0 +1,141 @@
+import base64
+
+import pyteal as pt
+import pytest
+from algosdk.v2client.algod import AlgodClient
+
+from beaker import (
+    Application,
+    BuildOptions,
+    GlobalStateBlob,
+    GlobalStateValue,
+    LocalStateValue,
+    ReservedGlobalStateValue,
+)
+from beaker.client import ApplicationClient
+
+
+class State:
+    governor = GlobalStateValue(pt.TealType.bytes)
+    ratio = GlobalStateValue(pt.TealType.uint64, default=pt.Int(10))
+    explicit = GlobalStateValue(pt.TealType.uint64, key="a")
+    blob = GlobalStateBlob(keys=[0, ord("b")])
+    balance = LocalStateValue(pt.TealType.uint64)
+
+
+def make_app(*, compact: bool) -> Application:
+    app = Application(
+        "Compact",
+        state=State(),
+        build_options=BuildOptions(compact_state_keys=compact),
+    )
+
+    @app.external
+    def set_ratio(ratio: pt.abi.Uint64) -> pt.Expr:
+        return pt.Seq(app.state.ratio.set(ratio.get()), app.state.balance.increment())
+
+    @app.external(read_only=True)
+    def scaled(
+        value: pt.abi.Uint64,
+        ratio: pt.abi.Uint64 = app.state.ratio,  # type: ignore[assignment]
+        *,
+        output: pt.abi.Uint64,
+    ) -> pt.Expr:
+        return output.set(value.get() * ratio.get())
+
+    return app
+
+
+def test_compact_state_keys() -> None:
+    named = make_app(compact=False).build()
+    app = make_app(compact=True)
+    spec = app.build()
+
+    assert len(spec.approval_program) < len(named.approval_program)
+    assert '"ratio"' in named.approval_program
+    assert '"ratio"' not in spec.approval_program
+
+    declared = spec.schema["global"]["declared"]
+    # assigned in order of name, skipping the keys taken by the others
+    assert {name: d["key"] for name, d in declared.items()} == {
+        "explicit": "a",
+        "governor": "c",
+        "ratio": "d",
+    }
+    assert declared["ratio"]["compact"] is True
+    assert "compact" not in declared["explicit"]
+    assert spec.schema["local"]["declared"]["balance"]["key"] == "a"
+    assert spec.hints["scaled(uint64,uint64)uint64"].default_arguments["ratio"] == {
+        "source": "global-state",
+        "data": "d",
+    }
+    assert spec.global_state_schema.dictify() == named.global_state_schema.dictify()
+
+    # the keys are only compacted while building
+    assert app.state.ratio.str_key() == "ratio"
+    assert make_app(compact=False).build().approval_program == named.approval_program
+
+
+def test_compact_state_keys_past_one_letter() -> None:
+    values = {f"value_{i}": GlobalStateValue(pt.TealType.uint64) for i in range(60)}
+    app = Application(
+        "Many",
+        state=type("ManyState", (), values)(),
+        build_options=BuildOptions(compact_state_keys=True),
+    )
+    keys = [d["key"] for d in app.build().schema["global"]["declared"].values()]
+    assert len(set(keys)) == 60
+    assert sorted(len(k) for k in keys) == [1] * 52 + [2] * 8
+
+
+def test_compact_state_keys_skip_reserved_prefixes() -> None:
+    class ReservedState:
+        first = GlobalStateValue(pt.TealType.uint64)
+        second = GlobalStateValue(pt.TealType.uint64)
+        third = GlobalStateValue(pt.TealType.uint64)
+        prefixed = ReservedGlobalStateValue(pt.TealType.uint64, 2, prefix="b")
+        # prefixed by its name
+        c = ReservedGlobalStateValue(pt.TealType.uint64, 2)
+
+    app = Application(
+        "Reserved",
+        state=ReservedState(),
+        build_options=BuildOptions(compact_state_keys=True),
+    )
+    declared = app.build().schema["global"]["declared"]
+    assert [d["key"] for d in declared.values()] == ["a", "d", "e"]
+
+    class UnprefixedState:
+        value = GlobalStateValue(pt.TealType.uint64)
+        any_key = ReservedGlobalStateValue(pt.TealType.uint64, 2, prefix="")
+
+    unprefixed = Application(
+        "Unprefixed",
+        state=UnprefixedState(),
+        build_options=BuildOptions(compact_state_keys=True),
+    )
+    with pytest.raises(ValueError, match="any_key may use any key"):
+        unprefixed.build()
+
+
+class _StateAlgod(AlgodClient):
+    def __init__(self, state: dict[bytes, int]):
+        super().__init__("", "http://localhost")
+        self.state = [
+            {"key": base64.b64encode(k).decode(), "value": {"type": 2, "uint": v}}
+            for k, v in state.items()
+        ]
+
+    def application_info(self, *args: object, **kwargs: object) -> dict[str, object]:
+        return {"params": {"global-state": self.state}}
+
+
+def test_client_names_compact_keys() -> None:
+    spec = make_app(compact=True).build()
+    client = ApplicationClient(
+        _StateAlgod({b"a": 1, b"d": 2, b"\x00": 3}), spec, app_id=1
+    )
+
+    # only the compacted keys are named
+    assert client.get_global_state() == {"a": 1, "ratio": 2, "\x00": 3}
+    assert client.get_global_state(raw=True) == {b"a": 1, b"d": 2, b"\x00": 3}
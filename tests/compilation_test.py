@@ -0,0 +1,404 @@
+import base64
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, cast
+
+import pyteal as pt
+import pytest
+from algosdk import encoding
+from algosdk.v2client.algod import AlgodClient
+
+from beaker import (
+    Application,
+    BuildCache,
+    CompileCache,
+    ConcurrentAssembler,
+    LogicSignature,
+    OfflineAssembler,
+    precompiled,
+)
+from beaker.assembler import TealAssemblyError, assemble
+from beaker.compilation import Assembler, CompileMismatchError, Program
+from beaker.precompile import PrecompileRegistry
+
+
+class CountingClient:
+    """Stands in for algod, "assembling" a program to the hash of its source"""
+
+    def __init__(self, genesis_id: str = "testnet-v1.0", build_number: int = 1):
+        self.genesis_id = genesis_id
+        self.build_number = build_number
+        self.compiled: list[str] = []
+        self.versions_calls = 0
+
+    def status(self) -> dict[str, Any]:
+        return {"last-round": 1}
+
+    def versions(self) -> dict[str, Any]:
+        self.versions_calls += 1
+        return {
+            "genesis_id": self.genesis_id,
+            "genesis_hash_b64": "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=",
+            "build": {
+                "major": 3,
+                "minor": 16,
+                "build_number": self.build_number,
+                "commit_hash": "abc123",
+            },
+        }
+
+    def compile(self, source: str, *, source_map: bool = False) -> dict[str, Any]:
+        self.compiled.append(source)
+        binary = hashlib.sha256(source.encode()).digest()
+        return {
+            "result": base64.b64encode(binary).decode(),
+            "hash": encoding.encode_address(binary),
+            "sourcemap": {
+                "version": 3,
+                "sources": [],
+                "names": [],
+                "mappings": "AAAA;AACA",
+            },
+        }
+
+
+def as_client(client: CountingClient) -> AlgodClient:
+    return cast(AlgodClient, client)
+
+
+def test_program_without_cache_always_compiles() -> None:
+    client = CountingClient()
+    Program("#pragma version 8\nint 1", as_client(client))
+    Program("#pragma version 8\nint 1", as_client(client))
+    assert len(client.compiled) == 2
+    assert client.versions_calls == 0
+
+
+def test_memory_tier() -> None:
+    client = CountingClient()
+    cache = CompileCache(persist=False)
+    first = Program("#pragma version 8\nint 1", as_client(client), cache=cache)
+    second = Program("#pragma version 8\nint 1", as_client(client), cache=cache)
+
+    assert len(client.compiled) == 1
+    assert client.versions_calls == 1
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert cache.directory is None
+    assert first.raw_binary == second.raw_binary
+    assert first.binary_hash == second.binary_hash
+    assert second.source_map.get_pcs_for_line(1) == [1]
+
+    Program("#pragma version 8\nint 2", as_client(client), cache=cache)
+    assert len(client.compiled) == 2
+    assert len(cache) == 2
+
+
+def test_disk_tier(tmp_path: Path) -> None:
+    teal = "#pragma version 8\nint 1"
+    expected = Program(teal, as_client(CountingClient()), cache=CompileCache(tmp_path))
+
+    client = CountingClient()
+    cache = CompileCache(tmp_path)
+    actual = Program(teal, as_client(client), cache=cache)
+
+    assert client.compiled == []
+    assert cache.stats.hits == 1
+    assert actual.raw_binary == expected.raw_binary
+    assert actual.binary_hash == expected.binary_hash
+
+    cache.clear()
+    assert len(cache) == 0
+    assert list(tmp_path.glob("*.json")) == []
+
+
+def test_corrupt_entry_is_a_miss(tmp_path: Path) -> None:
+    teal = "#pragma version 8\nint 1"
+    client = CountingClient()
+    cache = CompileCache(tmp_path)
+    (tmp_path / f"{cache.key(teal, as_client(client))}.json").write_text("{")
+
+    Program(teal, as_client(client), cache=cache)
+    assert len(client.compiled) == 1
+    assert cache.stats.misses == 1
+
+
+def test_key_includes_node() -> None:
+    cache = CompileCache(persist=False)
+    teal = "#pragma version 8\nint 1"
+    key = cache.key(teal, as_client(CountingClient()))
+
+    assert key == cache.key(teal, as_client(CountingClient()))
+    assert key != cache.key(teal, as_client(CountingClient(genesis_id="mainnet-v1.0")))
+    assert key != cache.key(teal, as_client(CountingClient(build_number=2)))
+    assert key != cache.key(teal + "\npop", as_client(CountingClient()))
+
+
+def test_nested_precompiles_share_cache() -> None:
+    lsig = LogicSignature(pt.Approve())
+    child = Application("Child")
+
+    @child.external
+    def lsig_addr(*, output: pt.abi.Address) -> pt.Expr:
+        return output.set(precompiled(lsig).address())
+
+    parent = Application("Parent")
+
+    @parent.external
+    def child_hash(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+        return output.set(
+            pt.Sha512_256(precompiled(child).approval_program.binary),
+        )
+
+    def make_grandparent() -> Application:
+        grandparent = Application("Grandparent")
+
+        @grandparent.external
+        def parent_hash(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+            return output.set(
+                pt.Sha512_256(precompiled(parent).approval_program.binary),
+            )
+
+        return grandparent
+
+    client = CountingClient()
+    cache = CompileCache(persist=False)
+
+    expected = make_grandparent().build(as_client(client), compile_cache=cache)
+    # lsig, child approval, parent approval and the clear program they have in common
+    assert len(client.compiled) == 4
+    assert cache.stats.stores == 4
+    assert cache.stats.hits == 1
+
+    actual = make_grandparent().build(as_client(client), compile_cache=cache)
+    assert len(client.compiled) == 4
+    # parent approval and clear programs
+    assert cache.stats.hits == 3
+    assert actual.approval_program == expected.approval_program
+
+
+class SlowAlgod:
+    """Stands in for algod, taking ``delay`` seconds to assemble each program"""
+
+    def __init__(self, delay: float, *, tamper: bool = False):
+        self.delay = delay
+        self.tamper = tamper
+        self.compiled: list[str] = []
+
+    def compile(self, teal: str) -> dict[str, Any]:
+        time.sleep(self.delay)
+        self.compiled.append(teal)
+        result = assemble(teal + ("\npop" if self.tamper else ""))
+        return result.compile_response()
+
+
+class SlowAssembler(Assembler):
+    def __init__(self, algod: SlowAlgod):
+        self.algod = algod
+
+    def compile(self, teal: str) -> dict[str, Any]:
+        return self.algod.compile(teal)
+
+    @property
+    def identity(self) -> str:
+        return "slow"
+
+
+def make_nested() -> Application:
+    lsig = LogicSignature(pt.Approve())
+    child = Application("Child")
+
+    @child.external
+    def lsig_addr(*, output: pt.abi.Address) -> pt.Expr:
+        return output.set(precompiled(lsig).address())
+
+    parent = Application("Parent")
+
+    @parent.external
+    def child_hash(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+        return output.set(pt.Sha512_256(precompiled(child).approval_program.binary))
+
+    sibling = Application("Sibling")
+    grandparent = Application("Grandparent")
+
+    @grandparent.external
+    def hashes(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+        return output.set(
+            pt.Concat(
+                pt.Sha512_256(precompiled(parent).approval_program.binary),
+                pt.Sha512_256(precompiled(sibling).approval_program.binary),
+            )
+        )
+
+    return grandparent
+
+
+def test_concurrent_assembler() -> None:
+    algod = SlowAlgod(0.1)
+    expected = make_nested().build(OfflineAssembler())
+
+    with ConcurrentAssembler(SlowAssembler(algod), max_workers=8) as assembler:
+        actual = make_nested().build(assembler)
+
+    assert actual.approval_program == expected.approval_program
+    report = assembler.report
+    # lsig, child, parent and sibling approval programs and their shared clear program
+    assert len(algod.compiled) == 7
+    assert len(report.timings) == 7
+    assert not any(t.blocking for t in report.timings)
+    assert report.total_seconds >= 0.7
+    assert report.wall_seconds < report.total_seconds / 2
+
+    assert report.critical_path[:2] == ("Parent", "Child")
+    assert report.critical_path[2].startswith("LogicSignature(")
+    # parent and child each compile two programs
+    assert report.critical_path_seconds >= 0.5
+
+
+def test_concurrent_assembler_mismatch(tmp_path: Path) -> None:
+    wrapped = SlowAssembler(SlowAlgod(0, tamper=True))
+    assembler = ConcurrentAssembler(wrapped)
+    compile_cache = CompileCache(tmp_path / "compile")
+    build_cache = BuildCache(tmp_path / "build")
+    registry = PrecompileRegistry()
+    with pytest.raises(CompileMismatchError):
+        make_nested().build(
+            assembler,
+            cache=build_cache,
+            compile_cache=compile_cache,
+            precompiles=registry,
+        )
+    assembler.close()
+
+    # nothing that was assembled is kept
+    assert len(compile_cache) == 0
+    assert not list((tmp_path / "compile").glob("*.json"))
+    assert build_cache.stats.stores == 0
+    assert len(registry) == 0
+    # and what is kept after a good build isn't used by the wrapped assembler alone
+    assert assembler.identity != wrapped.identity
+    assert compile_cache.key("int 1", assembler) != compile_cache.key("int 1", wrapped)
+
+
+def test_concurrent_assembler_caches_once_verified(tmp_path: Path) -> None:
+    compile_cache = CompileCache(tmp_path)
+    with ConcurrentAssembler(SlowAssembler(SlowAlgod(0.05))) as assembler:
+        make_nested().build(assembler, compile_cache=compile_cache)
+    # the five distinct programs, stored after the build checked them
+    assert compile_cache.stats.stores == 5
+    assert len(list(tmp_path.glob("*.json"))) == 5
+
+
+def test_concurrent_assembler_fallback() -> None:
+    algod = SlowAlgod(0)
+    assembler = ConcurrentAssembler(SlowAssembler(algod))
+    # not something the offline assembler understands, so must wait for the result
+    with pytest.raises(TealAssemblyError):
+        assembler.compile("#pragma version 8\nnot_an_op")
+    assert algod.compiled == ["#pragma version 8\nnot_an_op"]
+
+    with pytest.raises(ValueError, match="max_workers"):
+        ConcurrentAssembler(SlowAssembler(algod), max_workers=0)
+
+
+def test_shared_precompiles() -> None:
+    def make_child() -> Application:
+        child = Application("Child")
+
+        @child.external
+        def hello(*, output: pt.abi.String) -> pt.Expr:
+            return output.set("hello")
+
+        return child
+
+    def make_parent(name: str, child: Application) -> Application:
+        parent = Application(name)
+
+        @parent.external
+        def child_hash(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+            return output.set(pt.Sha512_256(precompiled(child).approval_program.binary))
+
+        return parent
+
+    def make_factory(name: str, child: Application) -> Application:
+        first = make_parent("First", child)
+        second = make_parent("Second", child)
+        factory = Application(name)
+
+        @factory.external
+        def parent_hashes(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+            return output.set(
+                pt.Concat(
+                    precompiled(first).approval_program.binary,
+                    precompiled(second).approval_program.binary,
+                )
+            )
+
+        return factory
+
+    # a child precompiled by two parents is built once within a build
+    client = CountingClient()
+    make_factory("Factory", make_child()).build(as_client(client))
+    child_programs = [t for t in client.compiled if "hello" in t]
+    assert len(child_programs) == 1
+
+    # but built again by another build, unless they share a registry
+    make_factory("Factory", make_child()).build(as_client(client))
+    assert len([t for t in client.compiled if "hello" in t]) == 2
+
+    registry = PrecompileRegistry()
+    client = CountingClient()
+    first = make_parent("First", make_child()).build(
+        as_client(client), precompiles=registry
+    )
+    assert len(client.compiled) == 2
+    assert len(registry) == 1
+
+    # an identical child is only built and compiled once
+    second = make_parent("Second", make_child()).build(
+        as_client(client), precompiles=registry
+    )
+    assert len(client.compiled) == 2
+    assert registry.stats.hits == 1
+    assert second.approval_program == first.approval_program.replace("First", "Second")
+
+    # but not shared with another network
+    make_parent("Third", make_child()).build(
+        as_client(CountingClient(genesis_id="mainnet-v1.0")), precompiles=registry
+    )
+    assert len(registry) == 2
+
+
+def test_precompile_registry_is_bounded() -> None:
+    registry = PrecompileRegistry(max_entries=2)
+    for key in ("a", "b", "a", "c"):
+        registry.get_or_create(key, key.upper)
+    # b was used least recently
+    assert len(registry) == 2
+    assert registry.get_or_create("a", lambda: "new") == ("A", False)
+    assert registry.get_or_create("b", lambda: "new") == ("new", True)
+
+    with pytest.raises(ValueError, match="max_entries"):
+        PrecompileRegistry(max_entries=0)
+
+
+def test_precompile_registry_is_thread_safe() -> None:
+    registry = PrecompileRegistry()
+    calls: list[int] = []
+
+    def factory() -> int:
+        time.sleep(0.05)
+        calls.append(1)
+        return len(calls)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(lambda _: registry.get_or_create("key", factory), range(4))
+        )
+
+    assert calls == [1]
+    assert sorted(results) == [(1, False), (1, False), (1, False), (1, True)]
+    assert registry.stats.misses == 1
+    assert registry.stats.hits == 3
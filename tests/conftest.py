@@ -1,4 +1,5 @@
 import inspect
+import re
 import subprocess
 from collections.abc import Iterator
 from pathlib import Path
@@ -6,6 +7,7 @@ from pathlib import Path
 import pytest
 
 from beaker import Application, LogicSignature, LogicSignatureTemplate, sandbox
+from beaker.assembler import tokenize
 
 
 def check_application_artifacts_output_stability(
@@ -116,6 +118,25 @@ def check_lsig_output_stability(
         )
 
 
+def method_ops(program: str, name: str) -> list[str]:
+    """
+    The ops of the subroutine implementing the ABI method ``name`` in the TEAL ``program``,
+    up to its first ``retsub``, each with its immediates but without comments, e.g.
+    ``"pushint 2"``
+    """
+    # as PyTeal labels subroutines
+    label = re.sub(r"[^A-Za-z0-9]", "", name)
+    lines = program.splitlines()
+    start = next(i for i, line in enumerate(lines) if re.match(rf"{label}_\d+:$", line))
+    ops: list[str] = []
+    for line_no, line in enumerate(lines[start + 1 :], start + 1):
+        for tokens in tokenize(line, line_no):
+            if tokens == ["retsub"]:
+                return ops
+            ops.append(" ".join(tokens))
+    return ops
+
+
 @pytest.fixture(autouse=True, scope="function")
 def reset_pyteal() -> Iterator[None]:
     """Reset all known PyTeal global values to prevent tests from interfering with each other"""
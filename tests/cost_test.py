@@ -0,0 +1,202 @@
+import pyteal as pt
+import pytest
+
+from beaker import Application, BuildOptions, BuildReport
+from beaker.consts import APP_CALL_BUDGET
+from beaker.cost import MethodCost, analyze_costs, program_cost
+
+
+def test_program_cost_straight_line() -> None:
+    teal = "#pragma version 8\nint 1\nint 2 // comment\n+\npop\nint 1\nreturn\n"
+    assert program_cost(teal) == 6
+
+
+def test_program_cost_takes_most_expensive_successful_branch() -> None:
+    teal = """#pragma version 8
+txna ApplicationArgs 0
+btoi
+bnz expensive
+int 1
+return
+expensive:
+byte "a"
+sha256
+pop
+int 1
+return
+failing:
+"""
+    assert program_cost(teal, app_args=[None]) == 3 + 4 + 35
+    assert program_cost(teal, app_args=[b"\x00"]) == 5
+    # a branch that can only fail doesn't count
+    failing = teal.replace("int 1\nreturn\nfailing", "err\nfailing")
+    assert program_cost(failing, app_args=[None]) == 5
+
+
+@pytest.mark.parametrize(
+    ("constant", "same"),
+    [
+        ("base64 AAE=", "0x0001"),
+        ("b32(AAAQ)", "0x0001"),
+        ('"\\x01\\n"', "0x010a"),
+        (
+            "addr AAAQEAYEAUDAOCAJBIFQYDIOB4IBCEQTCQKRMFYYDENBWHA5DYP7MUPJQE",
+            "0x" + bytes(range(32)).hex(),
+        ),
+        ('method "f()void"', "0x2d4970c7"),
+    ],
+)
+def test_program_cost_constants(constant: str, same: str) -> None:
+    # constants are parsed as the assembler does, so the branch on them is known
+    teal = f"""#pragma version 8
+{"byte " if not constant.startswith(("addr", "method")) else ""}{constant}
+byte {same}; ==
+bnz done
+byte "a"; sha256; pop
+done:
+int 1
+return
+"""
+    assert program_cost(teal) == 6
+    assert program_cost(teal.replace("bnz", "bz")) == 6 + 2 + 35
+
+
+def test_program_cost_loops() -> None:
+    loop = """#pragma version 8
+int 0
+store 0
+loop:
+load 0
+{bound}
+<
+bz done
+load 0
+int 1
++
+store 0
+b loop
+done:
+int 1
+return
+"""
+    assert program_cost(loop.format(bound="int 10")) == 2 + 10 * 9 + 4 + 2
+    assert program_cost(loop.format(bound="txn Fee")) is None
+
+
+def test_program_cost_subroutines() -> None:
+    teal = """#pragma version 8
+int 3
+callsub double
+callsub double
+pop
+int 1
+return
+double:
+proto 1 1
+frame_dig -1
+frame_dig -1
++
+retsub
+"""
+    assert program_cost(teal) == 4 + 2 * (1 + 5)
+
+
+def test_program_cost_unbounded_recursion() -> None:
+    teal = """#pragma version 8
+callsub recurse
+int 1
+return
+recurse:
+callsub recurse
+retsub
+"""
+    assert program_cost(teal) is None
+
+
+def make_app(*, analyze_costs: bool = False) -> Application:
+    app = Application("Costly", build_options=BuildOptions(analyze_costs=analyze_costs))
+
+    @app.external
+    def add(a: pt.abi.Uint64, b: pt.abi.Uint64, *, output: pt.abi.Uint64) -> pt.Expr:
+        return output.set(a.get() + b.get())
+
+    @app.external
+    def hash_many(*, output: pt.abi.Uint64) -> pt.Expr:
+        i = pt.ScratchVar(pt.TealType.uint64)
+        return pt.Seq(
+            pt.For(
+                i.store(pt.Int(0)), i.load() < pt.Int(30), i.store(i.load() + pt.Int(1))
+            ).Do(pt.Pop(pt.Sha256(pt.Itob(i.load())))),
+            output.set(i.load()),
+        )
+
+    @app.external
+    def hash_n(n: pt.abi.Uint64, *, output: pt.abi.Uint64) -> pt.Expr:
+        i = pt.ScratchVar(pt.TealType.uint64)
+        return pt.Seq(
+            pt.For(
+                i.store(pt.Int(0)), i.load() < n.get(), i.store(i.load() + pt.Int(1))
+            ).Do(pt.Pop(pt.Sha256(pt.Itob(i.load())))),
+            output.set(i.load()),
+        )
+
+    return app
+
+
+def test_analyze_costs() -> None:
+    analysis = analyze_costs(make_app().build())
+
+    add = analysis.methods["add(uint64,uint64)uint64"]
+    assert add.cost is not None and add.cost < 100
+    assert not add.exceeds_budget and add.group_size == 1
+
+    hash_many = analysis.methods["hash_many()uint64"]
+    assert hash_many.cost is not None and hash_many.cost > 30 * 35
+    assert hash_many.exceeds_budget
+    assert hash_many.group_size == -(-hash_many.cost // APP_CALL_BUDGET)
+    assert hash_many.fits_in_group
+
+    assert analysis.methods["hash_n(uint64)uint64"] == MethodCost(None)
+    assert analysis.bare_calls["no_op"].cost is not None
+    assert list(analysis.over_budget()) == ["hash_many()uint64"]
+
+
+def test_analyze_costs_counts_the_dispatch_to_the_method() -> None:
+    def method_b_cost(weight: int) -> int | None:
+        app = Application("Dispatch")
+
+        @app.external
+        def a() -> pt.Expr:
+            return pt.Approve()
+
+        @app.external(weight=weight)
+        def b() -> pt.Expr:
+            return pt.Approve()
+
+        return analyze_costs(app.build()).methods["b()void"].cost
+
+    unweighted, weighted = method_b_cost(0), method_b_cost(1)
+    assert unweighted is not None and weighted is not None
+    # one less selector comparison: txna, bytec, ==, bnz
+    assert unweighted - weighted == 4
+
+
+def test_build_with_analyze_costs() -> None:
+    app = make_app(analyze_costs=True)
+    report = BuildReport()
+    with pytest.warns(UserWarning, match="hash_many"):
+        spec = app.build(report=report)
+
+    hints = spec.dictify()["hints"]
+    assert hints["hash_many()uint64"]["cost"]["group_size"] > 1
+    assert hints["hash_n(uint64)uint64"]["cost"] == {"cost": None, "group_size": None}
+    assert report.method_costs["add(uint64,uint64)uint64"] == (
+        hints["add(uint64,uint64)uint64"]["cost"]["cost"]
+    )
+    assert "costs" in report.phases
+    assert "over budget: hash_many()uint64" in report.summary()
+
+
+def test_build_without_analyze_costs() -> None:
+    spec = make_app().build()
+    assert all("cost" not in hint for hint in spec.dictify()["hints"].values())
@@ -0,0 +1,89 @@
+from typing import Literal
+
+import pyteal as pt
+import pytest
+from algosdk import abi as sdk_abi
+
+from beaker import Application, BuildOptions, unconditional_create_approval
+from beaker.cost import analyze_costs, program_cost
+
+METHOD_COUNT = 16
+
+
+def make_app(
+    dispatch: Literal["linear", "binary"] = "linear",
+    weights: dict[str, int] | None = None,
+) -> Application:
+    app = Application("Dispatch", build_options=BuildOptions(dispatch=dispatch))
+    app.apply(unconditional_create_approval)
+    for i in range(METHOD_COUNT):
+
+        def handler(a: pt.abi.Uint64, *, output: pt.abi.Uint64) -> pt.Expr:
+            return output.set(a.get())
+
+        name = f"method{i}"
+        app.external(name=name, weight=(weights or {}).get(name, 0))(handler)
+    return app
+
+
+def selector(app: Application, name: str) -> bytes:
+    (ext,) = (e for sig, e in app.abi_externals.items() if sig.startswith(f"{name}("))
+    return sdk_abi.Method.from_signature(ext.method.method_signature()).get_selector()
+
+
+def method_costs(app: Application) -> dict[str, int]:
+    """The cost of a call to each method, which differ only by the cost of dispatch"""
+    costs = {}
+    for sig, cost in analyze_costs(app.build()).methods.items():
+        # a cost of 0 means no call succeeds, so the method isn't dispatched to
+        assert cost.cost, f"{sig} can't be called"
+        costs[sig.split("(")[0]] = cost.cost
+    return costs
+
+
+def test_weighted_dispatch_checks_heavier_methods_first() -> None:
+    unweighted = method_costs(make_app())
+    weighted = method_costs(make_app(weights={"method15": 10, "method7": 5}))
+
+    assert weighted["method15"] == unweighted["method0"]
+    assert weighted["method15"] < weighted["method7"] < weighted["method0"]
+    assert sorted(weighted.values()) == sorted(unweighted.values())
+
+
+def test_weight_does_not_change_the_contract() -> None:
+    unweighted = make_app().build()
+    weighted = make_app(weights={"method15": 10}).build()
+
+    assert weighted.contract.dictify() == unweighted.contract.dictify()
+    assert weighted.approval_program != unweighted.approval_program
+
+
+def test_weight_rejected_for_bare_methods() -> None:
+    app = Application("Bare")
+    with pytest.raises(ValueError, match="weight"):
+        app.external(bare=True, method_config={"opt_in": pt.CallConfig.CALL}, weight=1)
+
+
+def test_binary_dispatch() -> None:
+    app = make_app("binary")
+    spec = app.build()
+
+    # each method is found, and only by its exact selector
+    method_costs(app)
+    method3 = selector(app, "method3")
+    assert program_cost(spec.approval_program, app_args=[method3, None])
+    assert program_cost(spec.approval_program, app_args=[b"\x00" + method3, None]) == 0
+    assert program_cost(spec.approval_program, app_args=[b"\x00\x00\x00\x00"]) == 0
+    # bare calls are still handled
+    assert analyze_costs(spec).bare_calls["no_op"].bounded
+
+
+def test_binary_dispatch_cost() -> None:
+    linear = method_costs(make_app())
+    weighted = method_costs(make_app(weights={"method15": 10}))
+    binary = method_costs(make_app("binary"))
+
+    # the cost of linear dispatch grows with the method's position, binary's doesn't
+    assert list(linear.values()) == list(range(41, 102, 4))
+    assert set(binary.values()) == {56, 60}
+    assert weighted["method15"] == linear["method0"]
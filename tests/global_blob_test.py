@@ -140,3 +140,74 @@ def test_global_blob_single_subroutine() -> None:
 
     expected = list(b"deadbeef")
     assert_output(app, [], [expected], opups=1)
+
+
+def test_global_blob_write_read_unaligned() -> None:
+    app = UnitTestingApp(name="LB", state=GlobalBlobState())
+    data = bytes(range(256)) + bytes(range(88))
+
+    @app.external
+    def unit_test(*, output: pt.abi.DynamicArray[pt.abi.Byte]) -> pt.Expr:
+        return pt.Seq(
+            app.state.blob.zero(),
+            # over the end of the first page, two whole pages and the start of the last
+            app.state.blob.write(pt.Int(100), pt.Bytes(data)),
+            (s := pt.abi.String()).set(
+                app.state.blob.read(pt.Int(90), pt.Int(100 + len(data) + 10))
+            ),
+            output.decode(s.encode()),
+        )
+
+    expected = list(bytes(10) + data + bytes(10))
+    assert_output(app, [], [expected], opups=1)
+
+
+def test_global_blob_read_all() -> None:
+    with pytest.raises(pt.TealInputError, match="can't be read at once"):
+        GlobalBlob().read_all()
+
+    class SmallBlobState:
+        blob = GlobalBlob(keys=4)
+
+    app = UnitTestingApp(name="LB", state=SmallBlobState())
+
+    @app.external
+    def unit_test(*, output: pt.abi.DynamicArray[pt.abi.Byte]) -> pt.Expr:
+        return pt.Seq(
+            app.state.blob.zero(),
+            # up to the very end of the blob
+            app.state.blob.write(pt.Int(blob_page_size * 4 - 3), pt.Bytes("end")),
+            (s := pt.abi.String()).set(app.state.blob.read_all()),
+            output.decode(s.encode()),
+        )
+
+    expected = list(bytes(blob_page_size * 4 - 3) + b"end")
+    assert_output(app, [], [expected])
+
+
+def test_global_blob_bits() -> None:
+    app = UnitTestingApp(name="LB", state=GlobalBlobState())
+    blob = app.state.blob
+
+    @app.external
+    def unit_test(*, output: pt.abi.DynamicArray[pt.abi.Uint64]) -> pt.Expr:
+        return pt.Seq(
+            blob.zero(),
+            (none_set := pt.abi.Uint64()).set(blob.find_first_set()),
+            *(blob.set_bit(pt.Int(i)) for i in (3, 9, 10, 1100, 1101)),
+            blob.set_bit(pt.Int(0), pt.Int(0)),
+            blob.clear_bit(pt.Int(9)),
+            (first_set := pt.abi.Uint64()).set(blob.find_first_set()),
+            (first_zero := pt.abi.Uint64()).set(blob.find_first_zero()),
+            (bit := pt.abi.Uint64()).set(blob.get_bit(pt.Int(1100))),
+            (count := pt.abi.Uint64()).set(blob.popcount(pt.Int(3), pt.Int(1101))),
+            # the whole blob, more bytes than a value may hold
+            (total := pt.abi.Uint64()).set(
+                blob.popcount(pt.Int(0), pt.Int(blob_page_size * 8 * 64))
+            ),
+            (byte := pt.abi.Uint64()).set(blob.get_byte(pt.Int(1))),
+            output.set([none_set, first_set, first_zero, bit, count, total, byte]),
+        )
+
+    expected = [blob_page_size * 8 * 64, 3, 0, 1, 3, 4, 0b00100000]
+    assert_output(app, [], [expected], opups=1)
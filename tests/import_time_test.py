@@ -0,0 +1,60 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def imported(statement: str) -> set[str]:
+    """The modules imported after running ``statement`` in a new interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-c", f"{statement}\nimport sys\nprint(*sys.modules)"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_import_beaker_is_lazy() -> None:
+    modules = imported("import beaker")
+    assert {name for name in modules if name.startswith("beaker.")} == {"beaker._lazy"}
+    for dependency in ("algosdk", "algokit_utils", "pyteal"):
+        assert dependency not in modules
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "from beaker import Application",
+        "import beaker; beaker.GlobalStateValue",
+        "from beaker.client import Network",
+    ],
+)
+def test_import_doesnt_import_clients(statement: str) -> None:
+    modules = imported(statement)
+    assert "beaker.client.application_client" not in modules
+    assert "beaker.localnet" not in modules
+    # nor what's only needed to build an app, or storage it doesn't use
+    for module in (
+        "beaker.assembler",
+        "beaker.build_cache",
+        "beaker.compilation",
+        "beaker.cost",
+        "beaker.precompile",
+        "beaker.sourcemap",
+    ):
+        assert module not in modules
+    assert not {m for m in modules if m.startswith("beaker.lib.storage.box_")}
+
+
+def test_lazy_names() -> None:
+    import beaker
+    from beaker import client
+
+    assert set(beaker.__all__) <= set(dir(beaker))
+    for name in beaker.__all__:
+        assert getattr(beaker, name) is not None
+    for name in client.__all__:
+        assert getattr(client, name) is not None
+    with pytest.raises(AttributeError, match="no attribute 'missing'"):
+        beaker.missing
@@ -138,3 +138,69 @@ def test_local_blob_single_subroutine() -> None:
 
     expected = list(b"deadbeef")
     assert_output(app, [], [expected])
+
+
+def test_local_blob_write_read_unaligned() -> None:
+    app = UnitTestingApp(name="LB", state=LocalBlobTestState())
+    data = bytes(range(256))[:300] + bytes(range(44))
+
+    @app.external
+    def unit_test(*, output: pt.abi.DynamicArray[pt.abi.Byte]) -> pt.Expr:
+        return pt.Seq(
+            app.state.blob.zero(),
+            # over the end of the first page, two whole pages and the start of the last
+            app.state.blob.write(pt.Int(100), pt.Bytes(data)),
+            (s := pt.abi.String()).set(
+                app.state.blob.read(pt.Int(90), pt.Int(100 + len(data) + 10))
+            ),
+            output.decode(s.encode()),
+        )
+
+    expected = list(bytes(10) + data + bytes(10))
+    assert_output(app, [], [expected])
+
+
+def test_local_blob_read_all() -> None:
+    app = UnitTestingApp(name="LB", state=LocalBlobTestState())
+
+    @app.external
+    def unit_test(*, output: pt.abi.DynamicArray[pt.abi.Byte]) -> pt.Expr:
+        return pt.Seq(
+            app.state.blob.zero(),
+            # up to the very end of the blob
+            app.state.blob.write(pt.Int(blob_page_size * 5 - 3), pt.Bytes("end")),
+            (s := pt.abi.String()).set(app.state.blob.read_all()),
+            output.decode(s.encode()),
+        )
+
+    expected = list(bytes(blob_page_size * 5 - 3) + b"end")
+    assert_output(app, [], [expected])
+
+
+def test_local_blob_bits() -> None:
+    app = UnitTestingApp(name="LB", state=LocalBlobTestState())
+    blob = app.state.blob
+    page_bits = blob_page_size * 8
+
+    @app.external
+    def unit_test(*, output: pt.abi.DynamicArray[pt.abi.Uint64]) -> pt.Expr:
+        # sets every bit of the first page and the first two of the next
+        return pt.Seq(
+            blob.zero(),
+            blob.write(pt.Int(0), pt.BytesNot(pt.Bytes(b"\x00" * blob_page_size))),
+            blob.set_bit(pt.Int(page_bits)),
+            blob.set_bit(pt.Int(page_bits + 1)),
+            blob.clear_bit(pt.Int(page_bits - 1)),
+            (first_zero := pt.abi.Uint64()).set(blob.find_first_zero()),
+            (count := pt.abi.Uint64()).set(
+                blob.popcount(pt.Int(5), pt.Int(page_bits + 5))
+            ),
+            (total := pt.abi.Uint64()).set(
+                blob.popcount(pt.Int(0), blob.max_bytes * pt.Int(8))
+            ),
+            (bit := pt.abi.Uint64()).set(blob.get_bit(pt.Int(page_bits))),
+            output.set([first_zero, count, total, bit]),
+        )
+
+    expected = [page_bits - 1, page_bits - 4, page_bits + 1, 1]
+    assert_output(app, [], [expected], opups=1)
@@ -0,0 +1,142 @@
+from collections.abc import Iterator
+from typing import Any
+
+import pyteal as pt
+import pytest
+from algokit_utils import ApplicationSpecification
+from feature_gates import FeatureGates  # type: ignore[import-untyped]
+
+import beaker.application
+from beaker import Application, BuildOptions, BuildReport
+from beaker.sourcemap import SourceMaps
+
+
+@pytest.fixture(autouse=True)
+def _sourcemap_enabled() -> Iterator[None]:
+    FeatureGates.set_sourcemap_enabled(gate=True)
+    yield
+    FeatureGates.set_sourcemap_enabled(gate=False)
+
+
+def make_app(
+    weights: tuple[int, int] = (0, 0), **options: Any  # noqa: ANN401
+) -> Application:
+    app = Application("Routed", build_options=BuildOptions(**options))
+
+    @app.create(bare=True)
+    def create() -> pt.Expr:
+        return pt.Approve()
+
+    @app.opt_in(bare=True)
+    def opt_in() -> pt.Expr:
+        return pt.Approve()
+
+    @app.external(weight=weights[0])
+    def add(a: pt.abi.Uint64, b: pt.abi.Uint64, *, output: pt.abi.Uint64) -> pt.Expr:
+        return output.set(a.get() + b.get())
+
+    @app.external(read_only=True, weight=weights[1])
+    def greet(name: pt.abi.String, *, output: pt.abi.String) -> pt.Expr:
+        return output.set(pt.Concat(pt.Bytes("hi "), name.get()))
+
+    @app.close_out
+    def close_out() -> pt.Expr:
+        return pt.Approve()
+
+    return app
+
+
+def router_compile(
+    router: pt.Router,
+    options: BuildOptions,
+    algod_client: object,
+    report: BuildReport | None,
+    *,
+    weights: dict[str, int],
+) -> tuple[str, str, object, SourceMaps | None]:
+    results = router.compile(
+        version=options.avm_version,
+        assemble_constants=options.assemble_constants,
+        optimize=options.optimize_options,
+        with_sourcemaps=options.with_sourcemaps,
+    )
+    return results.approval_teal, results.clear_teal, results.abi_contract, None
+
+
+def spec_programs(spec: ApplicationSpecification) -> tuple[str, str, object]:
+    return spec.approval_program, spec.clear_program, spec.contract.dictify()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"assemble_constants": False},
+        {"avm_version": 8},
+        {"avm_version": 7},
+        {"frame_pointers": False, "scratch_slots": False},
+        {"with_sourcemaps": True},
+    ],
+)
+def test_matches_router_compile(
+    monkeypatch: pytest.MonkeyPatch, options: dict[str, Any]
+) -> None:
+    # beaker compiles the router itself, building on PyTeal internals, so check it still
+    # does what Router.compile does with the installed version of PyTeal
+    built = make_app(**options).build(report=BuildReport())
+
+    monkeypatch.setattr(beaker.application, "_compile_router", router_compile)
+    expected = make_app(**options).build()
+
+    assert spec_programs(built) == spec_programs(expected)
+
+
+def test_weights_order_router_compile(monkeypatch: pytest.MonkeyPatch) -> None:
+    # methods are dispatched in order of weight by reordering them for Router._build_program
+    weighted = make_app(weights=(1, 2)).build()
+
+    monkeypatch.setattr(beaker.application, "_compile_router", router_compile)
+    unweighted = make_app().build()
+    app = make_app()
+    order = ["greet", "add", "close_out"]
+    app.abi_externals = dict(
+        sorted(app.abi_externals.items(), key=lambda e: order.index(e[0].split("(")[0]))
+    )
+    reordered = app.build()
+
+    assert weighted.approval_program != unweighted.approval_program
+    assert weighted.approval_program == reordered.approval_program
+    assert weighted.contract.dictify() == unweighted.contract.dictify()
+
+
+def test_annotate_requires_sourcemaps() -> None:
+    with pytest.raises(ValueError, match="with_sourcemap"):
+        make_app(annotate_teal=True).build()
+
+
+def test_falls_back_to_router_compile(monkeypatch: pytest.MonkeyPatch) -> None:
+    # without the PyTeal internals it builds on, beaker compiles with Router.compile
+    monkeypatch.setattr(beaker.application, "_has_router_internals", lambda _: False)
+    built = make_app().build(report=BuildReport())
+    with pytest.warns(UserWarning, match="method weights, source maps"):
+        weighted = make_app(weights=(1, 2), with_sourcemaps=True).build()
+
+    monkeypatch.setattr(beaker.application, "_compile_router", router_compile)
+    expected = make_app().build()
+
+    assert spec_programs(built) == spec_programs(expected)
+    assert spec_programs(weighted) == spec_programs(expected)
+
+
+def test_detects_router_internals(monkeypatch: pytest.MonkeyPatch) -> None:
+    detected: list[bool] = []
+    has_router_internals = beaker.application._has_router_internals
+
+    def spy(router: pt.Router) -> bool:
+        detected.append(has_router_internals(router))
+        return detected[-1]
+
+    monkeypatch.setattr(beaker.application, "_has_router_internals", spy)
+    make_app().build()
+
+    assert detected == [True]
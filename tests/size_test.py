@@ -0,0 +1,175 @@
+import json
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import pyteal as pt
+import pytest
+from _pytest.capture import CaptureFixture
+from _pytest.monkeypatch import MonkeyPatch
+from feature_gates import FeatureGates  # type: ignore[import-untyped]
+
+from beaker import Application, BuildOptions, GlobalStateValue, OfflineAssembler
+from beaker.cli import main
+from beaker.size import SizeChange, SizeReport, analyze_sizes
+
+BIG = b"x" * 200
+
+
+class State:
+    counter = GlobalStateValue(pt.TealType.uint64)
+
+
+def make_app(*, extra: bool = False, **options: bool | str) -> Application:
+    app = Application("Sized", state=State(), build_options=BuildOptions(**options))  # type: ignore[arg-type]
+
+    @pt.Subroutine(pt.TealType.uint64)
+    def shared(x: pt.Expr) -> pt.Expr:
+        return x + pt.Int(1)
+
+    @pt.Subroutine(pt.TealType.bytes)
+    def only_big() -> pt.Expr:
+        return pt.Bytes(BIG)
+
+    @app.external
+    def small(*, output: pt.abi.Uint64) -> pt.Expr:
+        return output.set(shared(app.state.counter.get()))
+
+    @app.external
+    def big(*, output: pt.abi.Uint64) -> pt.Expr:
+        return output.set(shared(pt.Len(only_big())))
+
+    if extra:
+
+        @app.external
+        def added(*, output: pt.abi.Uint64) -> pt.Expr:
+            return output.set(pt.Int(1))
+
+    return app
+
+
+def test_analyze_sizes() -> None:
+    spec = make_app().build()
+    report = analyze_sizes(spec)
+
+    # the methods and sections divide up the whole approval program
+    assert sum(report.sections.values()) + sum(report.methods.values()) == (
+        report.approval
+    )
+    assert report.clear == 4 and report.extra_pages == 0
+    assert report.methods["big()uint64"] > len(BIG) > report.methods["small()uint64"]
+    # called by both methods, so neither's
+    assert report.sections["shared_subroutines"] == report.subroutines["shared"]
+    assert report.subroutines["onlybig"] > len(BIG)
+    assert report.state == {"global.counter": 1 + len("counter")}
+    assert report.constants[f"0x{BIG[:8].hex()}..."] == 2 + len(BIG)
+    assert report.sources == {}
+
+
+def test_analyze_sizes_binary_dispatch() -> None:
+    linear = analyze_sizes(make_app().build())
+    binary = analyze_sizes(make_app(dispatch="binary").build())
+
+    assert sum(binary.sections.values()) + sum(binary.methods.values()) == (
+        binary.approval
+    )
+    assert binary.methods == linear.methods
+
+
+def test_analyze_sizes_precompiles() -> None:
+    child = Application("Child")
+
+    @child.external
+    def padded(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+        return output.set(pt.Bytes(BIG))
+
+    parent = Application("Parent")
+
+    @parent.external
+    def child_hash(*, output: pt.abi.DynamicBytes) -> pt.Expr:
+        precompiled = parent.precompiled(child)
+        return output.set(pt.Sha512_256(precompiled.approval_program.binary))
+
+    report = analyze_sizes(parent.build(OfflineAssembler()), app=parent)
+
+    child_approval = len(parent._precompiled_apps[child].approval_program.raw_binary)
+    assert report.precompiles == {"Child.approval": 2 + child_approval}
+    assert report.methods["child_hash()byte[]"] > child_approval
+    # without the app, the program is just a big constant
+    assert analyze_sizes(parent.build(OfflineAssembler())).precompiles == {}
+
+
+@pytest.fixture()
+def _sourcemap_enabled() -> Iterator[None]:
+    FeatureGates.set_sourcemap_enabled(gate=True)
+    yield
+    FeatureGates.set_sourcemap_enabled(gate=False)
+
+
+@pytest.mark.usefixtures("_sourcemap_enabled")
+def test_analyze_sizes_sources() -> None:
+    app = make_app(with_sourcemaps=True, lazy_sourcemaps=True)
+    report = analyze_sizes(app.build(), app=app)
+
+    assert sum(report.sources.values()) + report.sections["header"] == report.approval
+    (only_big,) = (size for name, size in report.sources.items() if "only_big" in name)
+    assert only_big > len(BIG)
+
+
+def test_diff() -> None:
+    before = analyze_sizes(make_app().build())
+    after = analyze_sizes(make_app(extra=True).build())
+
+    assert after.diff(after).changes == []
+    diff = after.diff(before)
+    assert diff.grew and not before.diff(after).grew
+    assert diff.changes[0] == SizeChange(
+        "total", "approval", before.approval, after.approval
+    )
+    assert (
+        SizeChange("methods", "added()uint64", 0, after.methods["added()uint64"])
+        in diff.changes
+    )
+    assert "methods.added()uint64" in diff.summary()
+
+    # reports round trip through json, to compare with those of an earlier build
+    loaded = SizeReport.from_dict(json.loads(json.dumps(before.to_dict())))
+    assert loaded == before
+    assert after.diff(loaded).changes == diff.changes
+
+
+MODULE = """
+import pyteal as pt
+import beaker
+
+app = beaker.Application("CliSized")
+
+@app.external
+def value(*, output: pt.abi.Uint64) -> pt.Expr:
+    return output.set(pt.Int({value}))
+"""
+
+
+@pytest.fixture()
+def module(tmp_path: Path, monkeypatch: MonkeyPatch) -> Iterator[Path]:
+    path = tmp_path / "sized.py"
+    path.write_text(MODULE.format(value=1))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield path
+    sys.modules.pop("sized", None)
+
+
+def test_cli(module: Path, tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    before = tmp_path / "before.json"
+    assert main(["size", "sized", "--json", str(before)]) == 0
+    assert "CliSized: approval=" in capsys.readouterr().out
+    assert "CliSized" in json.loads(before.read_text())
+
+    assert main(["size", "sized", "--compare", str(before), "--fail-on-growth"]) == 0
+    assert capsys.readouterr().out.strip() == "CliSized: no change"
+
+    # a bigger constant can't use pushint's one byte encoding
+    module.write_text(MODULE.format(value=2**40))
+    sys.modules.pop("sized")
+    assert main(["size", "sized", "--compare", str(before), "--fail-on-growth"]) == 1
+    assert "total.approval" in capsys.readouterr().out
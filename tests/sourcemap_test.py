@@ -0,0 +1,82 @@
+from collections.abc import Iterator
+from typing import Any
+
+import pyteal as pt
+import pytest
+from algokit_utils import ApplicationSpecification
+from feature_gates import FeatureGates  # type: ignore[import-untyped]
+
+from beaker import Application, BuildOptions, BuildReport
+
+
+@pytest.fixture(autouse=True)
+def _sourcemap_enabled() -> Iterator[None]:
+    FeatureGates.set_sourcemap_enabled(gate=True)
+    yield
+    FeatureGates.set_sourcemap_enabled(gate=False)
+
+
+def make_app(**options: Any) -> Application:  # noqa: ANN401
+    app = Application(
+        "Mapped", build_options=BuildOptions(with_sourcemaps=True, **options)
+    )
+
+    @app.external
+    def add(a: pt.abi.Uint64, b: pt.abi.Uint64, *, output: pt.abi.Uint64) -> pt.Expr:
+        return output.set(a.get() + b.get())
+
+    return app
+
+
+def build(
+    app: Application, report: BuildReport | None = None
+) -> ApplicationSpecification:
+    # annotations name the line the build was called from, so use the same one throughout
+    return app.build(report=report)
+
+
+def test_lazy_sourcemaps() -> None:
+    eager = make_app(annotate_teal=True)
+    eager_spec = build(eager)
+    plain_spec = build(make_app())
+
+    lazy = make_app(annotate_teal=True, lazy_sourcemaps=True)
+    report = BuildReport()
+    lazy_spec = build(lazy, report)
+
+    # not annotated, and nothing generated yet
+    assert lazy_spec.approval_program == plain_spec.approval_program
+    assert lazy_spec.clear_program == plain_spec.clear_program
+    assert "sourcemap" not in report.phases
+    assert "annotate" not in report.phases
+
+    source_maps = lazy.source_maps
+    assert source_maps is not None
+    assert source_maps.approval.teal == lazy_spec.approval_program
+    assert source_maps.approval.annotated_teal == eager_spec.approval_program
+    assert source_maps.clear.annotated_teal == eager_spec.clear_program
+    assert source_maps.approval.sourcemap.r3_sourcemap is not None
+
+
+def test_prefetch() -> None:
+    eager_spec = build(make_app(annotate_teal=True))
+
+    app = make_app(annotate_teal=True, lazy_sourcemaps=True)
+    build(app)
+    assert app.source_maps is not None
+    future = app.source_maps.approval.prefetch()
+    assert future.result() == eager_spec.approval_program
+
+
+def test_eager_sourcemaps() -> None:
+    app = make_app()
+    report = BuildReport()
+    app.build(report=report)
+
+    assert "sourcemap" in report.phases
+    assert app.source_maps is not None
+    assert app.source_maps.approval.sourcemap.r3_sourcemap is not None
+
+    plain = Application("Plain")
+    plain.build()
+    assert plain.source_maps is None
@@ -1,12 +1,20 @@
 import pyteal as pt
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
 
 from beaker import (
+    Application,
+    BuildOptions,
     GlobalStateValue,
     LocalStateValue,
     ReservedGlobalStateValue,
     ReservedLocalStateValue,
 )
+from beaker.client import ApplicationClient
+from beaker.consts import APP_CALL_BUDGET
+from beaker.cost import analyze_costs
+from beaker.sandbox import get_accounts, get_algod_client
+from beaker.state import _aggregate
 from beaker.state._aggregate import GlobalStateAggregate, LocalStateAggregate
 
 
@@ -86,3 +94,78 @@ def test_local_state_instance() -> None:
 
     with pytest.raises(Exception):
         LocalStateAggregate(MyBigState())
+
+
+def make_big_app() -> Application:
+    values: dict[str, GlobalStateValue | LocalStateValue]
+    values = {f"value_{i}": GlobalStateValue(pt.TealType.uint64) for i in range(60)}
+    values["label"] = GlobalStateValue(pt.TealType.bytes, default=pt.Bytes("big"))
+    values["held"] = LocalStateValue(pt.TealType.uint64, default=pt.Int(7))
+    values.update({f"note_{i}": LocalStateValue(pt.TealType.bytes) for i in range(15)})
+    app = Application(
+        "Big",
+        state=type("BigState", (), values)(),
+        build_options=BuildOptions(compact_state_keys=True),
+    )
+
+    @app.create
+    def create() -> pt.Expr:
+        return app.initialize_global_state()
+
+    @app.opt_in
+    def opt_in() -> pt.Expr:
+        return app.initialize_local_state()
+
+    return app
+
+
+def test_initialize_loops_over_large_tables(monkeypatch: MonkeyPatch) -> None:
+    looped = make_big_app().build()
+    with monkeypatch.context() as m:
+        m.setattr(_aggregate, "_LOOP_SIZE", APP_CALL_BUDGET)
+        unrolled = make_big_app().build()
+
+    # the one letter keys are looped over, the few two letter keys and odd defaults aren't
+    assert looped.approval_program.count("extract3") == 2
+    assert looped.approval_program.count("app_global_put") == 1 + 9 + 1
+    assert looped.approval_program.count("app_local_put") == 1 + 1
+    assert len(looped.approval_program) < len(unrolled.approval_program)
+
+    costs = analyze_costs(looped).methods
+    unrolled_costs = analyze_costs(unrolled).methods
+    for method in ("create()void", "opt_in()void"):
+        cost, unrolled_cost = costs[method].cost, unrolled_costs[method].cost
+        assert cost is not None and unrolled_cost is not None
+        assert unrolled_cost < cost <= APP_CALL_BUDGET
+
+
+def test_initialize_small_state_is_unrolled() -> None:
+    class State:
+        a = GlobalStateValue(pt.TealType.uint64)
+        b = GlobalStateValue(pt.TealType.uint64)
+        counter = GlobalStateValue(pt.TealType.uint64)
+
+    app = Application("Small", state=State())
+
+    @app.create
+    def create() -> pt.Expr:
+        return app.initialize_global_state()
+
+    approval = app.build().approval_program
+    assert "extract3" not in approval
+    assert approval.count("app_global_put") == 3
+
+
+def test_initialize_large_tables() -> None:
+    app = make_big_app()
+    acct, *_ = get_accounts()
+    client = ApplicationClient(get_algod_client(), app, signer=acct.signer)
+    client.create()
+    client.opt_in()
+
+    global_state = client.get_global_state()
+    assert global_state.pop("label") == "big"
+    assert global_state == {f"value_{i}": 0 for i in range(60)}
+    local_state = client.get_local_state()
+    assert local_state.pop("held") == 7
+    assert local_state == {f"note_{i}": "" for i in range(15)}